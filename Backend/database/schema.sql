@@ -94,6 +94,26 @@ CREATE TABLE IF NOT EXISTS public.saldos_dispositivo (
 CREATE UNIQUE INDEX IF NOT EXISTS uq_saldo_dispositivo_tiempo
   ON public.saldos_dispositivo (sucursal_id, dispositivo_id, medido_en);
 
+-- Change feed for the API read snapshots (SNAPSHOT_CACHE_LISTEN): one NOTIFY
+-- per statement with the table name as payload.
+CREATE OR REPLACE FUNCTION public.notify_saldos_cambio() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('capi_saldos', TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tr_saldos_sucursal_notify ON public.saldos_sucursal;
+CREATE TRIGGER tr_saldos_sucursal_notify
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.saldos_sucursal
+  FOR EACH STATEMENT EXECUTE FUNCTION public.notify_saldos_cambio();
+
+DROP TRIGGER IF EXISTS tr_saldos_dispositivo_notify ON public.saldos_dispositivo;
+CREATE TRIGGER tr_saldos_dispositivo_notify
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.saldos_dispositivo
+  FOR EACH STATEMENT EXECUTE FUNCTION public.notify_saldos_cambio();
+
 CREATE INDEX IF NOT EXISTS ix_saldo_dispositivo_latest
   ON public.saldos_dispositivo (sucursal_id, dispositivo_id, medido_en DESC);
 
@@ -204,6 +224,56 @@ CREATE TABLE IF NOT EXISTS alerts.historical_alerts (
   updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Full-text search: alerts.capi_es is the text search configuration behind the
+-- stored search_vector (Spanish stemming, accent-insensitive when unaccent is
+-- installed). Swap dictionaries with ALTER TEXT SEARCH CONFIGURATION and touch
+-- the rows (UPDATE ... SET title = title) to regenerate the stored vectors.
+-- pg_trgm is optional and backs the similarity fallback for typos.
+DO $$
+BEGIN
+  BEGIN
+    CREATE EXTENSION IF NOT EXISTS unaccent;
+  EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'unaccent no disponible: la busqueda de alertas distingue acentos';
+  END;
+  BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+  EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'pg_trgm no disponible: busqueda de alertas sin fallback por similitud';
+  END;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_ts_config
+    WHERE cfgname = 'capi_es' AND cfgnamespace = 'alerts'::regnamespace
+  ) THEN
+    CREATE TEXT SEARCH CONFIGURATION alerts.capi_es (COPY = pg_catalog.spanish);
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'unaccent') THEN
+      ALTER TEXT SEARCH CONFIGURATION alerts.capi_es
+        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+  END IF;
+END
+$$;
+
+ALTER TABLE alerts.historical_alerts
+  ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('alerts.capi_es', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('alerts.capi_es', coalesce(description, '')), 'B')
+  ) STORED;
+CREATE INDEX IF NOT EXISTS ix_historical_alerts_search
+  ON alerts.historical_alerts USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS ix_historical_alerts_timestamp
+  ON alerts.historical_alerts ("timestamp" DESC);
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+    EXECUTE 'CREATE INDEX IF NOT EXISTS ix_historical_alerts_title_trgm
+               ON alerts.historical_alerts USING gin (title gin_trgm_ops)';
+  END IF;
+END
+$$;
+
 CREATE TABLE IF NOT EXISTS alerts.affected_entities (
   alert_id UUID REFERENCES alerts.historical_alerts(id) ON DELETE CASCADE,
   entity_type TEXT NOT NULL,
@@ -235,8 +305,19 @@ CREATE TABLE IF NOT EXISTS public.alertas (
   dedupe_clave TEXT
 );
 
-CREATE INDEX IF NOT EXISTS ix_alertas_estado_tiempo ON public.alertas (estado, creada_en DESC);
-CREATE INDEX IF NOT EXISTS ix_alertas_agente        ON public.alertas (agente_id, creada_en DESC);
+-- Keyset pagination on (creada_en, id): one index per filter column used by
+-- the alerts listing, with the remaining filter columns INCLUDEd so combined
+-- filters are resolved without visiting the heap.
+DROP INDEX IF EXISTS public.ix_alertas_estado_tiempo;
+DROP INDEX IF EXISTS public.ix_alertas_agente;
+CREATE INDEX IF NOT EXISTS ix_alertas_keyset
+  ON public.alertas (creada_en DESC, id DESC) INCLUDE (estado, prioridad, agente_id);
+CREATE INDEX IF NOT EXISTS ix_alertas_estado_keyset
+  ON public.alertas (estado, creada_en DESC, id DESC) INCLUDE (prioridad, agente_id);
+CREATE INDEX IF NOT EXISTS ix_alertas_prioridad_keyset
+  ON public.alertas (prioridad, creada_en DESC, id DESC) INCLUDE (estado, agente_id);
+CREATE INDEX IF NOT EXISTS ix_alertas_agente_keyset
+  ON public.alertas (agente_id, creada_en DESC, id DESC) INCLUDE (estado, prioridad);
 CREATE INDEX IF NOT EXISTS ix_alertas_evento        ON public.alertas (evento_id);
 CREATE INDEX IF NOT EXISTS ix_alertas_sucursal      ON public.alertas (sucursal_id);
 CREATE INDEX IF NOT EXISTS ix_alertas_dispositivo   ON public.alertas (dispositivo_id);
@@ -369,3 +450,308 @@ CREATE TABLE IF NOT EXISTS alerts.alert_metrics (
   recorded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
   created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+
+-- Dashboard aggregates maintained in the same transaction as the writes, so
+-- the critical-alert and team-workload widgets read one row per team / a
+-- single row instead of scanning history. Both keep the semantics of the
+-- original ad-hoc queries (the critical summary counts one row per joined
+-- ai_analysis, like the LEFT JOIN did).
+CREATE INDEX IF NOT EXISTS ix_ai_analysis_alert ON alerts.ai_analysis (alert_id);
+
+CREATE TABLE IF NOT EXISTS alerts.team_workload_summary (
+  team_name TEXT PRIMARY KEY,
+  total_tasks BIGINT NOT NULL DEFAULT 0,
+  pending_tasks BIGINT NOT NULL DEFAULT 0,
+  in_progress_tasks BIGINT NOT NULL DEFAULT 0,
+  completed_tasks BIGINT NOT NULL DEFAULT 0,
+  progress_sum BIGINT NOT NULL DEFAULT 0,
+  progress_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS alerts.critical_alert_rollup (
+  alert_id UUID PRIMARY KEY,
+  joined_rows BIGINT NOT NULL,
+  impact_sum NUMERIC NOT NULL,
+  confidence_sum NUMERIC NOT NULL,
+  confidence_count BIGINT NOT NULL,
+  high_fraud_risk BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alerts.critical_alerts_summary (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  total_critical BIGINT NOT NULL DEFAULT 0,
+  total_financial_impact NUMERIC NOT NULL DEFAULT 0,
+  confidence_sum NUMERIC NOT NULL DEFAULT 0,
+  confidence_count BIGINT NOT NULL DEFAULT 0,
+  high_fraud_risk BIGINT NOT NULL DEFAULT 0
+);
+
+-- Statement-level triggers over the transition tables: a bulk write touches
+-- each summary row once instead of once per row.
+CREATE OR REPLACE FUNCTION alerts.track_team_workload() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  source TEXT;
+BEGIN
+  FOREACH source IN ARRAY CASE TG_OP
+    WHEN 'INSERT' THEN ARRAY['new_rows'] WHEN 'DELETE' THEN ARRAY['old_rows'] ELSE ARRAY['old_rows', 'new_rows'] END
+  LOOP
+    EXECUTE format($sql$
+      INSERT INTO alerts.team_workload_summary AS s (
+        team_name, total_tasks, pending_tasks, in_progress_tasks, completed_tasks, progress_sum, progress_count
+      )
+      SELECT
+        assigned_to_team,
+        $1 * count(*),
+        $1 * count(*) FILTER (WHERE status = 'pending'),
+        $1 * count(*) FILTER (WHERE status = 'in_progress'),
+        $1 * count(*) FILTER (WHERE status = 'completed'),
+        $1 * COALESCE(sum(progress_percentage), 0),
+        $1 * count(progress_percentage)
+      FROM %I
+      WHERE assigned_to_team IS NOT NULL
+      GROUP BY assigned_to_team
+      ON CONFLICT (team_name) DO UPDATE SET
+        total_tasks = s.total_tasks + EXCLUDED.total_tasks,
+        pending_tasks = s.pending_tasks + EXCLUDED.pending_tasks,
+        in_progress_tasks = s.in_progress_tasks + EXCLUDED.in_progress_tasks,
+        completed_tasks = s.completed_tasks + EXCLUDED.completed_tasks,
+        progress_sum = s.progress_sum + EXCLUDED.progress_sum,
+        progress_count = s.progress_count + EXCLUDED.progress_count
+    $sql$, source)
+    USING CASE source WHEN 'old_rows' THEN -1 ELSE 1 END;
+  END LOOP;
+  RETURN NULL;
+END;
+$$;
+
+-- Recomputes the share of the given alerts from current data and applies the
+-- difference; idempotent, so trigger order (e.g. FK cascades) does not matter.
+-- A transaction-scoped advisory lock per alert (taken in id order, so two
+-- writers cannot deadlock) makes concurrent writers to the same alert read
+-- each other's rollup row; the row itself is upserted and the summary only
+-- receives the delta.
+CREATE OR REPLACE FUNCTION alerts.refresh_critical_alerts(p_alert_ids UUID[])
+RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+  ids UUID[];
+  removed alerts.critical_alert_rollup%ROWTYPE;
+  added alerts.critical_alert_rollup%ROWTYPE;
+BEGIN
+  SELECT array_agg(DISTINCT id ORDER BY id) INTO ids FROM unnest(p_alert_ids) AS id WHERE id IS NOT NULL;
+  IF COALESCE(cardinality(ids), 0) = 0 THEN
+    RETURN;
+  END IF;
+
+  PERFORM pg_advisory_xact_lock(hashtextextended('alerts.critical_alert_rollup:' || id::text, 0))
+  FROM unnest(ids) WITH ORDINALITY AS t(id, position)
+  ORDER BY position;
+
+  SELECT NULL, COALESCE(sum(joined_rows), 0), COALESCE(sum(impact_sum), 0), COALESCE(sum(confidence_sum), 0),
+         COALESCE(sum(confidence_count), 0), COALESCE(sum(high_fraud_risk), 0)
+  INTO removed
+  FROM alerts.critical_alert_rollup
+  WHERE alert_id = ANY (ids);
+
+  -- Alertas que dejaron de ser criticas activas (o se borraron)
+  DELETE FROM alerts.critical_alert_rollup r
+  WHERE r.alert_id = ANY (ids)
+    AND NOT EXISTS (
+      SELECT 1 FROM alerts.historical_alerts ha
+      WHERE ha.id = r.alert_id AND ha.priority = 'critical' AND ha.status = 'active'
+    );
+
+  WITH upserted AS (
+    INSERT INTO alerts.critical_alert_rollup AS r
+    SELECT
+      ha.id,
+      n.joined,
+      COALESCE(ha.financial_impact, 0) * n.joined,
+      COALESCE(ha.confidence_score, 0) * n.joined,
+      CASE WHEN ha.confidence_score IS NULL THEN 0 ELSE n.joined END,
+      n.high_fraud
+    FROM alerts.historical_alerts ha
+    CROSS JOIN LATERAL (
+      SELECT GREATEST(count(*), 1) AS joined, count(*) FILTER (WHERE aa.probability_fraud > 0.7) AS high_fraud
+      FROM alerts.ai_analysis aa
+      WHERE aa.alert_id = ha.id
+    ) n
+    WHERE ha.id = ANY (ids) AND ha.priority = 'critical' AND ha.status = 'active'
+    ON CONFLICT (alert_id) DO UPDATE SET
+      joined_rows = EXCLUDED.joined_rows,
+      impact_sum = EXCLUDED.impact_sum,
+      confidence_sum = EXCLUDED.confidence_sum,
+      confidence_count = EXCLUDED.confidence_count,
+      high_fraud_risk = EXCLUDED.high_fraud_risk
+    RETURNING r.*
+  )
+  SELECT NULL, COALESCE(sum(joined_rows), 0), COALESCE(sum(impact_sum), 0), COALESCE(sum(confidence_sum), 0),
+         COALESCE(sum(confidence_count), 0), COALESCE(sum(high_fraud_risk), 0)
+  INTO added FROM upserted;
+
+  -- Solo se toca la fila unica del resumen si el delta no es cero
+  IF (added.joined_rows, added.impact_sum, added.confidence_sum, added.confidence_count, added.high_fraud_risk)
+     IS DISTINCT FROM
+     (removed.joined_rows, removed.impact_sum, removed.confidence_sum, removed.confidence_count, removed.high_fraud_risk) THEN
+    UPDATE alerts.critical_alerts_summary SET
+      total_critical = total_critical + added.joined_rows - removed.joined_rows,
+      total_financial_impact = total_financial_impact + added.impact_sum - removed.impact_sum,
+      confidence_sum = confidence_sum + added.confidence_sum - removed.confidence_sum,
+      confidence_count = confidence_count + added.confidence_count - removed.confidence_count,
+      high_fraud_risk = high_fraud_risk + added.high_fraud_risk - removed.high_fraud_risk
+    WHERE id;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION alerts.track_critical_alerts() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  source TEXT;
+  batch UUID[];
+  alert_ids UUID[] := '{}';
+BEGIN
+  FOREACH source IN ARRAY CASE TG_OP
+    WHEN 'INSERT' THEN ARRAY['new_rows'] WHEN 'DELETE' THEN ARRAY['old_rows'] ELSE ARRAY['old_rows', 'new_rows'] END
+  LOOP
+    IF TG_TABLE_NAME = 'historical_alerts' THEN
+      -- Solo cuentan las alertas que eran o son criticas activas
+      EXECUTE format('SELECT array_agg(id) FROM %I WHERE priority = ''critical'' AND status = ''active''', source)
+        INTO batch;
+    ELSE
+      EXECUTE format('SELECT array_agg(alert_id) FROM %I WHERE alert_id IS NOT NULL', source) INTO batch;
+    END IF;
+    alert_ids := alert_ids || COALESCE(batch, '{}');
+  END LOOP;
+  PERFORM alerts.refresh_critical_alerts(alert_ids);
+  RETURN NULL;
+END;
+$$;
+
+-- Full recomputation: backfill on first install and after TRUNCATE.
+CREATE OR REPLACE FUNCTION alerts.rebuild_dashboard_summaries()
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+  DELETE FROM alerts.team_workload_summary;
+  INSERT INTO alerts.team_workload_summary
+  SELECT
+    assigned_to_team,
+    count(*),
+    count(*) FILTER (WHERE status = 'pending'),
+    count(*) FILTER (WHERE status = 'in_progress'),
+    count(*) FILTER (WHERE status = 'completed'),
+    COALESCE(sum(progress_percentage), 0),
+    count(progress_percentage)
+  FROM alerts.human_tasks
+  WHERE assigned_to_team IS NOT NULL
+  GROUP BY assigned_to_team;
+
+  DELETE FROM alerts.critical_alert_rollup;
+  INSERT INTO alerts.critical_alert_rollup
+  SELECT
+    ha.id,
+    GREATEST(count(aa.id), 1),
+    COALESCE(ha.financial_impact, 0) * GREATEST(count(aa.id), 1),
+    COALESCE(ha.confidence_score, 0) * GREATEST(count(aa.id), 1),
+    CASE WHEN ha.confidence_score IS NULL THEN 0 ELSE GREATEST(count(aa.id), 1) END,
+    count(*) FILTER (WHERE aa.probability_fraud > 0.7)
+  FROM alerts.historical_alerts ha
+  LEFT JOIN alerts.ai_analysis aa ON aa.alert_id = ha.id
+  WHERE ha.priority = 'critical' AND ha.status = 'active'
+  GROUP BY ha.id;
+
+  INSERT INTO alerts.critical_alerts_summary (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+  UPDATE alerts.critical_alerts_summary SET
+    total_critical = r.joined_rows,
+    total_financial_impact = r.impact_sum,
+    confidence_sum = r.confidence_sum,
+    confidence_count = r.confidence_count,
+    high_fraud_risk = r.high_fraud_risk
+  FROM (
+    SELECT
+      COALESCE(sum(joined_rows), 0) AS joined_rows,
+      COALESCE(sum(impact_sum), 0) AS impact_sum,
+      COALESCE(sum(confidence_sum), 0) AS confidence_sum,
+      COALESCE(sum(confidence_count), 0) AS confidence_count,
+      COALESCE(sum(high_fraud_risk), 0) AS high_fraud_risk
+    FROM alerts.critical_alert_rollup
+  ) r
+  WHERE id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION alerts.rebuild_dashboard_summaries_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM alerts.rebuild_dashboard_summaries();
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tr_human_tasks_workload_insert ON alerts.human_tasks;
+CREATE TRIGGER tr_human_tasks_workload_insert
+  AFTER INSERT ON alerts.human_tasks REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_team_workload();
+
+DROP TRIGGER IF EXISTS tr_human_tasks_workload_update ON alerts.human_tasks;
+CREATE TRIGGER tr_human_tasks_workload_update
+  AFTER UPDATE ON alerts.human_tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_team_workload();
+
+DROP TRIGGER IF EXISTS tr_human_tasks_workload_delete ON alerts.human_tasks;
+CREATE TRIGGER tr_human_tasks_workload_delete
+  AFTER DELETE ON alerts.human_tasks REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_team_workload();
+
+DROP TRIGGER IF EXISTS tr_historical_alerts_critical_insert ON alerts.historical_alerts;
+CREATE TRIGGER tr_historical_alerts_critical_insert
+  AFTER INSERT ON alerts.historical_alerts REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_historical_alerts_critical_update ON alerts.historical_alerts;
+CREATE TRIGGER tr_historical_alerts_critical_update
+  AFTER UPDATE ON alerts.historical_alerts REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_historical_alerts_critical_delete ON alerts.historical_alerts;
+CREATE TRIGGER tr_historical_alerts_critical_delete
+  AFTER DELETE ON alerts.historical_alerts REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_ai_analysis_critical_insert ON alerts.ai_analysis;
+CREATE TRIGGER tr_ai_analysis_critical_insert
+  AFTER INSERT ON alerts.ai_analysis REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_ai_analysis_critical_update ON alerts.ai_analysis;
+CREATE TRIGGER tr_ai_analysis_critical_update
+  AFTER UPDATE ON alerts.ai_analysis REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_ai_analysis_critical_delete ON alerts.ai_analysis;
+CREATE TRIGGER tr_ai_analysis_critical_delete
+  AFTER DELETE ON alerts.ai_analysis REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.track_critical_alerts();
+
+DROP TRIGGER IF EXISTS tr_human_tasks_truncate ON alerts.human_tasks;
+CREATE TRIGGER tr_human_tasks_truncate
+  AFTER TRUNCATE ON alerts.human_tasks
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.rebuild_dashboard_summaries_trigger();
+
+DROP TRIGGER IF EXISTS tr_historical_alerts_truncate ON alerts.historical_alerts;
+CREATE TRIGGER tr_historical_alerts_truncate
+  AFTER TRUNCATE ON alerts.historical_alerts
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.rebuild_dashboard_summaries_trigger();
+
+DROP TRIGGER IF EXISTS tr_ai_analysis_truncate ON alerts.ai_analysis;
+CREATE TRIGGER tr_ai_analysis_truncate
+  AFTER TRUNCATE ON alerts.ai_analysis
+  FOR EACH STATEMENT EXECUTE FUNCTION alerts.rebuild_dashboard_summaries_trigger();
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM alerts.critical_alerts_summary) THEN
+    PERFORM alerts.rebuild_dashboard_summaries();
+  END IF;
+END
+$$;
@@ -10,6 +10,8 @@ import json
 
 import logging
 
+import math
+
 import re
 
 import textwrap
@@ -48,6 +50,8 @@ from src.infrastructure.external.google import (
 
     GMAIL_MODIFY_SCOPE,
 
+    GMAIL_BATCH_SIZE,
+
     DRIVE_SCOPE,
 
     CALENDAR_SCOPE,
@@ -58,6 +62,8 @@ from src.infrastructure.external.google import (
 
 from src.infrastructure.agents.progress_emitter import agent_progress
 
+from .message_cache import GmailMessageCache, summarize_message
+
 from .push_service import AgenteGPushService
 
 
@@ -148,6 +154,8 @@ class AgenteGAgent(BaseAgent):
 
         compose_with_llm: bool = True,
 
+        message_cache: GmailMessageCache | None = None,
+
     ) -> None:
 
         super().__init__(self.AGENT_NAME)
@@ -185,6 +193,8 @@ class AgenteGAgent(BaseAgent):
         self._compose_with_llm = compose_with_llm
         self._llm_executor: ThreadPoolExecutor | None = ThreadPoolExecutor(max_workers=1)
 
+        self.message_cache = message_cache if message_cache is not None else self._default_message_cache()
+
 
 
     @property
@@ -599,33 +609,11 @@ class AgenteGAgent(BaseAgent):
 
         response = self.gmail.list_messages(query=query, label_ids=label_ids, max_results=int(params.get("max_results", 10)))
 
-        message_summaries = []
-
-        for item in response.get("messages", [])[:10]:
-
-            msg = self.gmail.get_message(item["id"], format="metadata")
-
-            headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        message_ids = [item["id"] for item in response.get("messages", [])[:10]]
 
-            message_summaries.append(
+        message_summaries, fetch_metrics = self._fetch_message_summaries(message_ids)
 
-                {
 
-                    "id": msg.get("id"),
-
-                    "thread_id": msg.get("threadId"),
-
-                    "snippet": msg.get("snippet"),
-
-                    "from": headers.get("from"),
-
-                    "subject": headers.get("subject"),
-
-                    "date": headers.get("date"),
-
-                }
-
-            )
 
         artifact = {
 
@@ -641,16 +629,93 @@ class AgenteGAgent(BaseAgent):
 
         metrics = {
 
-            "google_api_calls": 1 + len(message_summaries),
+            "google_api_calls": 1 + fetch_metrics["google_api_calls"],
 
             "items": len(message_summaries),
 
+            "cache_hits": fetch_metrics["cache_hits"],
+
         }
 
         return OperationResult(message=message, data=response, artifact=artifact, metrics=metrics)
 
 
 
+    def _default_message_cache(self) -> GmailMessageCache | None:
+
+        """Cache local solo para el cliente real de Gmail (requiere batch + history)."""
+
+        if not isinstance(self.gmail, GmailClient):
+
+            return None
+
+        storage_dir = getattr(getattr(self.push_service, "settings", None), "storage_dir", None)
+
+        if storage_dir is None:
+
+            return None
+
+        try:
+
+            return GmailMessageCache(storage_dir / "gmail_message_cache.sqlite3")
+
+        except Exception as exc:  # pragma: no cover - cache opcional
+
+            logger.warning("agente_g_cache_unavailable", extra={"error": str(exc)})
+
+            return None
+
+
+
+    def _fetch_message_summaries(self, message_ids: list[str]) -> tuple[list[Dict[str, Any]], Dict[str, int]]:
+
+        """Resuelve metadatos: delta via history.list, cache SQLite y un batch para los faltantes."""
+
+        cache = self.message_cache
+
+        if cache is None or not hasattr(self.gmail, "batch_get_messages"):
+
+            summaries = []
+
+            for message_id in message_ids:
+
+                msg = self.gmail.get_message(message_id, format="metadata")
+
+                summaries.append(summarize_message(msg))
+
+            return summaries, {"google_api_calls": len(summaries), "cache_hits": 0}
+
+
+
+        api_calls = 0
+
+        try:
+
+            api_calls += cache.sync(self.gmail)["api_calls"]
+
+            cached = cache.get_many(message_ids)
+
+        except Exception as exc:
+
+            logger.warning("agente_g_cache_sync_failed", extra={"error": str(exc)})
+
+            cached = {}
+
+        missing = [message_id for message_id in message_ids if message_id not in cached]
+
+        if missing:
+
+            fetched = [summarize_message(msg) for msg in self.gmail.batch_get_messages(missing, format="metadata")]
+
+            api_calls += math.ceil(len(missing) / GMAIL_BATCH_SIZE)
+
+            cache.upsert_many(fetched)
+
+            cached.update({item["id"]: item for item in fetched})
+
+        summaries = [cached[message_id] for message_id in message_ids if message_id in cached]
+
+        return summaries, {"google_api_calls": api_calls, "cache_hits": len(message_ids) - len(missing)}
 
 
 
@@ -0,0 +1,195 @@
+"""Cache local de metadatos de Gmail para Agente G.
+
+Guarda en SQLite el resumen de cada mensaje (remitente, asunto, fecha,
+etiquetas) y se sincroniza de forma incremental con ``history.list`` a partir
+del ultimo ``historyId`` almacenado, de modo que los listados repetidos solo
+consultan a Gmail por el delta.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from .push_service import extract_history_updates
+
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+HISTORY_PAGE_SIZE = 500
+
+
+def summarize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce un recurso ``users.messages`` (format=metadata) al resumen que usa Agente G."""
+    headers = {h["name"].lower(): h["value"] for h in message.get("payload", {}).get("headers", [])}
+    return {
+        "id": message.get("id"),
+        "thread_id": message.get("threadId"),
+        "snippet": message.get("snippet"),
+        "from": headers.get("from"),
+        "subject": headers.get("subject"),
+        "date": headers.get("date"),
+        "label_ids": list(message.get("labelIds") or []),
+    }
+
+
+class GmailMessageCache:
+    """Cache SQLite de mensajes de Gmail sincronizado por ``historyId``."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    # ------------------------------------------------------------------
+    # Lectura / escritura
+    # ------------------------------------------------------------------
+
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(message_ids)
+        if not ids:
+            return {}
+        placeholders = ",".join("?" for _ in ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, summary FROM messages WHERE id IN ({placeholders})",
+                ids,
+            ).fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def upsert_many(self, summaries: Iterable[Dict[str, Any]]) -> None:
+        rows = [(item["id"], json.dumps(item, ensure_ascii=False)) for item in summaries if item.get("id")]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO messages(id, summary) VALUES (?, ?)", rows)
+
+    def delete_many(self, message_ids: Iterable[str]) -> None:
+        rows = [(message_id,) for message_id in message_ids if message_id]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    @property
+    def history_id(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'history_id'").fetchone()
+        return row[0] if row else None
+
+    def reset(self, history_id: Optional[str]) -> None:
+        """Descarta los mensajes cacheados y fija un nuevo cursor."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._set_history_id(history_id)
+
+    def _set_history_id(self, history_id: Optional[str]) -> None:
+        if history_id is None:
+            self._conn.execute("DELETE FROM sync_state WHERE key = 'history_id'")
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state(key, value) VALUES ('history_id', ?)",
+                (str(history_id),),
+            )
+
+    # ------------------------------------------------------------------
+    # Sincronizacion
+    # ------------------------------------------------------------------
+
+    def sync(self, gmail: Any) -> Dict[str, int]:
+        """Aplica el delta de ``history.list`` desde el ultimo ``historyId``.
+
+        Los mensajes nuevos no se descargan aqui: se resuelven como faltantes
+        cuando aparecen en un listado. Retorna contadores de la sincronizacion.
+        """
+        stats = {"api_calls": 0, "deleted": 0, "label_changes": 0}
+        with self._lock:
+            start_history_id = self.history_id
+            if not start_history_id:
+                profile = gmail.get_profile()
+                stats["api_calls"] += 1
+                self.reset(profile.get("historyId"))
+                return stats
+
+            updates: List[Dict[str, Any]] = []
+            latest_history_id = start_history_id
+            page_token: Optional[str] = None
+            try:
+                while True:
+                    response = gmail.list_history(
+                        start_history_id=start_history_id,
+                        history_types=HISTORY_TYPES,
+                        max_results=HISTORY_PAGE_SIZE,
+                        page_token=page_token,
+                    )
+                    stats["api_calls"] += 1
+                    updates.extend(extract_history_updates(response))
+                    latest_history_id = response.get("historyId") or latest_history_id
+                    page_token = response.get("nextPageToken")
+                    if not page_token:
+                        break
+            except HttpError as exc:
+                if getattr(exc.resp, "status", None) != 404:
+                    raise
+                # El historyId expiro: se reconstruye el cache desde cero
+                logger.info("agente_g_cache_history_expired", extra={"history_id": start_history_id})
+                profile = gmail.get_profile()
+                stats["api_calls"] += 1
+                self.reset(profile.get("historyId"))
+                return stats
+
+            self._apply_updates(updates, stats)
+            with self._conn:
+                self._set_history_id(latest_history_id)
+        return stats
+
+    def _apply_updates(self, updates: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+        deleted = [update["message_id"] for update in updates if update["type"] == "message_deleted"]
+        label_updates = [update for update in updates if update["type"] in {"label_added", "label_removed"}]
+
+        cached = self.get_many({update["message_id"] for update in label_updates if update.get("message_id")})
+        for update in label_updates:
+            summary = cached.get(update.get("message_id"))
+            if summary is None:
+                continue
+            labels = list(summary.get("label_ids") or [])
+            for label in update.get("label_ids") or []:
+                if update["type"] == "label_added" and label not in labels:
+                    labels.append(label)
+                elif update["type"] == "label_removed" and label in labels:
+                    labels.remove(label)
+            summary["label_ids"] = labels
+            stats["label_changes"] += 1
+
+        self.upsert_many(cached.values())
+        self.delete_many(deleted)
+        stats["deleted"] = len(deleted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["GmailMessageCache", "summarize_message"]
@@ -72,6 +72,57 @@ class AgenteGPushSettings:
         )
 
 
+def extract_history_updates(history_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normaliza las entradas de ``history.list`` en eventos por mensaje."""
+    updates: List[Dict[str, Any]] = []
+    for entry in history_response.get("history", []) or []:
+        entry_id = entry.get("id")
+        for added in entry.get("messagesAdded", []) or []:
+            message = added.get("message", {})
+            updates.append(
+                {
+                    "type": "message_added",
+                    "message_id": message.get("id"),
+                    "thread_id": message.get("threadId"),
+                    "label_ids": message.get("labelIds"),
+                    "history_entry_id": entry_id,
+                }
+            )
+        for removed in entry.get("messagesDeleted", []) or []:
+            message = removed.get("message", {})
+            updates.append(
+                {
+                    "type": "message_deleted",
+                    "message_id": message.get("id"),
+                    "thread_id": message.get("threadId"),
+                    "history_entry_id": entry_id,
+                }
+            )
+        for labels_added in entry.get("labelsAdded", []) or []:
+            message = labels_added.get("message", {})
+            updates.append(
+                {
+                    "type": "label_added",
+                    "message_id": message.get("id"),
+                    "thread_id": message.get("threadId"),
+                    "label_ids": labels_added.get("labelIds"),
+                    "history_entry_id": entry_id,
+                }
+            )
+        for labels_removed in entry.get("labelsRemoved", []) or []:
+            message = labels_removed.get("message", {})
+            updates.append(
+                {
+                    "type": "label_removed",
+                    "message_id": message.get("id"),
+                    "thread_id": message.get("threadId"),
+                    "label_ids": labels_removed.get("labelIds"),
+                    "history_entry_id": entry_id,
+                }
+            )
+    return updates
+
+
 class AgenteGPushService:
     """Administra el ciclo de vida de la suscripción push de Gmail."""
 
@@ -263,53 +314,7 @@ class AgenteGPushService:
         raise PermissionError("Token de verificación inválido para push de Agente G")
 
     def _extract_updates(self, history_response: Dict[str, Any]) -> List[Dict[str, Any]]:
-        updates: List[Dict[str, Any]] = []
-        for entry in history_response.get("history", []) or []:
-            entry_id = entry.get("id")
-            for added in entry.get("messagesAdded", []) or []:
-                message = added.get("message", {})
-                updates.append(
-                    {
-                        "type": "message_added",
-                        "message_id": message.get("id"),
-                        "thread_id": message.get("threadId"),
-                        "label_ids": message.get("labelIds"),
-                        "history_entry_id": entry_id,
-                    }
-                )
-            for removed in entry.get("messagesDeleted", []) or []:
-                message = removed.get("message", {})
-                updates.append(
-                    {
-                        "type": "message_deleted",
-                        "message_id": message.get("id"),
-                        "thread_id": message.get("threadId"),
-                        "history_entry_id": entry_id,
-                    }
-                )
-            for labels_added in entry.get("labelsAdded", []) or []:
-                message = labels_added.get("message", {})
-                updates.append(
-                    {
-                        "type": "label_added",
-                        "message_id": message.get("id"),
-                        "thread_id": message.get("threadId"),
-                        "label_ids": labels_added.get("labelIds"),
-                        "history_entry_id": entry_id,
-                    }
-                )
-            for labels_removed in entry.get("labelsRemoved", []) or []:
-                message = labels_removed.get("message", {})
-                updates.append(
-                    {
-                        "type": "label_removed",
-                        "message_id": message.get("id"),
-                        "thread_id": message.get("threadId"),
-                        "label_ids": labels_removed.get("labelIds"),
-                        "history_entry_id": entry_id,
-                    }
-                )
-        return updates
+        return extract_history_updates(history_response)
 
     def _write_history_snapshot(self, snapshot: Dict[str, Any]) -> str:
         timestamp = self._clock().strftime("%Y%m%dT%H%M%S%f")
@@ -338,4 +343,4 @@ class AgenteGPushService:
         self._status_cache = copy.deepcopy(status)
 
 
-__all__ = ["AgenteGPushService", "AgenteGPushSettings"]
+__all__ = ["AgenteGPushService", "AgenteGPushSettings", "extract_history_updates"]
@@ -0,0 +1,310 @@
+"""Vectorized cash-policy engine for El Cajas.
+
+Loads every branch balance and the cash policies once and evaluates channel
+ratios, threshold breaches and recommendations as whole-frame operations.
+The arithmetic mirrors the historical per-branch loop step by step so both
+produce identical numbers.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+AVERAGE_BILL_VALUE = 1000.0  # ARS por billete asumido para estimar peso transportado
+CHANNEL_FIELDS = {
+    "ATM": "total_atm",
+    "ATS": "total_ats",
+    "Tesoro": "total_tesoro",
+    "Ventanilla": "total_cajas_ventanilla",
+    "Buzon": "total_buzon_depositos",
+    "Recaudacion": "total_recaudacion",
+    "Caja Chica": "total_caja_chica",
+    "Otros": "total_otros",
+}
+TOTAL_CHANNEL = "Saldo Total"
+DEFAULT_TOTAL_POLICY = {
+    "max_surplus_pct": 0.08,
+    "max_deficit_pct": 0.05,
+    "min_buffer_amount": 0.0,
+    "truck_fixed_cost": 0.0,
+    "truck_variable_cost_per_kg": 0.0,
+}
+SEVERITY_LABELS = np.array(["ok", "warning", "alert"], dtype=object)
+
+_TOTAL_FIELDS = ("saldo_total_sucursal", "caja_teorica_sucursal")
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _numeric(column: pd.Series) -> np.ndarray:
+    """Coerce a raw column like ``ElCajasAgent._to_float`` (invalid -> 0.0)."""
+    return pd.to_numeric(column, errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    denominator = np.broadcast_to(denominator, numerator.shape)
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator != 0)
+
+
+@dataclass
+class PolicyEvaluation:
+    """Result frames of one network-wide evaluation.
+
+    ``branches`` has one row per input branch (same order), ``channels`` one
+    row per branch and channel, and ``recommendations`` is ordered exactly as
+    the per-branch engine emitted them (total first, then channels in
+    ``CHANNEL_FIELDS`` order, deviation before buffer).
+    """
+
+    branches: pd.DataFrame
+    channels: pd.DataFrame
+    recommendations: pd.DataFrame
+    channel_names: List[str]
+    channel_has_policy: np.ndarray
+
+    def channel_details(self) -> List[List[Dict[str, Any]]]:
+        """Per-branch ``channels`` lists in the agent's output shape."""
+        count = len(self.channel_names)
+        amounts = self.channels["amount"].tolist()
+        estimates = self.channels["estimated_teorica"].tolist()
+        shares = self.channels["share"].tolist()
+        deviations = self.channels["deviation_pct"].tolist()
+        details: List[List[Dict[str, Any]]] = []
+        for offset in range(0, len(amounts), count):
+            branch_channels: List[Dict[str, Any]] = []
+            for position, channel in enumerate(self.channel_names):
+                index = offset + position
+                info = {
+                    "channel": channel,
+                    "amount": amounts[index],
+                    "estimated_teorica": estimates[index],
+                    "share": shares[index],
+                }
+                if self.channel_has_policy[position]:
+                    info["deviation_pct"] = deviations[index]
+                branch_channels.append(info)
+            details.append(branch_channels)
+        return details
+
+    def recommendations_by_branch(self) -> List[List[Dict[str, Any]]]:
+        grouped: List[List[Dict[str, Any]]] = [[] for _ in range(len(self.branches))]
+        for record in self.recommendations.to_dict("records"):
+            grouped[record.pop("branch")].append(record)
+        return grouped
+
+
+class CashPolicyEngine:
+    """Evaluate cash policies for many branches at once."""
+
+    def __init__(
+        self,
+        channel_fields: Optional[Mapping[str, str]] = None,
+        average_bill_value: float = AVERAGE_BILL_VALUE,
+    ) -> None:
+        self.channel_fields = dict(channel_fields or CHANNEL_FIELDS)
+        self.average_bill_value = average_bill_value
+
+    def evaluate(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        policy_map: Mapping[str, Mapping[str, Any]],
+    ) -> PolicyEvaluation:
+        channel_names = list(self.channel_fields)
+        channel_columns = list(self.channel_fields.values())
+        records = list(rows)
+        frame = pd.DataFrame.from_records(records, columns=[*_TOTAL_FIELDS, *channel_columns])
+        branch_count = len(frame)
+
+        measured = _numeric(frame["saldo_total_sucursal"])
+        theoretical = _numeric(frame["caja_teorica_sucursal"])
+        difference = measured - theoretical
+        deviation_total = _safe_divide(difference, theoretical)
+
+        # --- Saldo total ---------------------------------------------------
+        total_policy = policy_map.get(TOTAL_CHANNEL.lower()) or DEFAULT_TOTAL_POLICY
+        allowed_positive = theoretical * _to_float(total_policy.get("max_surplus_pct"))
+        allowed_negative = theoretical * _to_float(total_policy.get("max_deficit_pct"))
+        has_theoretical = theoretical > 0
+        total_withdraw = has_theoretical & (difference > allowed_positive)
+        total_deposit = has_theoretical & ~total_withdraw & (difference < -allowed_negative)
+
+        # --- Canales (matriz sucursal x canal) ----------------------------
+        amounts = np.column_stack([_numeric(frame[column]) for column in channel_columns]) if channel_columns else np.zeros((branch_count, 0))
+        shares = _safe_divide(amounts, measured[:, None])
+        estimates = np.where(theoretical[:, None] != 0, theoretical[:, None] * shares, amounts)
+        deviations = amounts - estimates
+        deviation_pct = _safe_divide(deviations, estimates)
+
+        policies = [policy_map.get(channel.lower()) for channel in channel_names]
+        has_policy = np.array([bool(policy) for policy in policies], dtype=bool)
+
+        def policy_vector(key: str) -> np.ndarray:
+            return np.array([_to_float(policy.get(key)) if policy else 0.0 for policy in policies], dtype=float)
+
+        surplus_pct = policy_vector("max_surplus_pct")
+        deficit_pct = policy_vector("max_deficit_pct")
+        min_buffer = policy_vector("min_buffer_amount")
+        positive_estimate = has_policy & (estimates > 0)
+        channel_withdraw = positive_estimate & (deviation_pct > surplus_pct)
+        channel_deposit = positive_estimate & ~channel_withdraw & (deviation_pct < -deficit_pct)
+        buffer_breach = has_policy & (amounts < min_buffer)
+
+        severity = np.zeros(branch_count, dtype=int)
+        severity = np.where((channel_withdraw | channel_deposit).any(axis=1), 1, severity)
+        severity = np.where(total_withdraw | total_deposit | buffer_breach.any(axis=1), 2, severity)
+
+        # El motor original reutilizaba ``deviation_pct`` dentro del bucle de
+        # canales: el desvio informado es el del ultimo canal con politica.
+        reported_deviation = deviation_total
+        if has_policy.any():
+            last_policy_channel = int(np.flatnonzero(has_policy)[-1])
+            reported_deviation = deviation_pct[:, last_policy_channel]
+
+        branch_ids = [row.get("sucursal_id") or str(row.get("sucursal_numero") or "desconocida") for row in records]
+        branches = pd.DataFrame(
+            {
+                "branch_id": branch_ids,
+                "branch_name": [
+                    row.get("sucursal_nombre") or f"Sucursal {branch_id}"
+                    for row, branch_id in zip(records, branch_ids)
+                ],
+                "measured_total": measured,
+                "theoretical_total": theoretical,
+                "difference": difference,
+                "deviation_pct": reported_deviation,
+                "status": SEVERITY_LABELS[severity],
+            }
+        )
+
+        channels = pd.DataFrame(
+            {
+                "branch": np.repeat(np.arange(branch_count), len(channel_names)),
+                "channel": np.tile(np.array(channel_names, dtype=object), branch_count),
+                "amount": amounts.ravel(),
+                "estimated_teorica": estimates.ravel(),
+                "share": shares.ravel(),
+                "deviation_pct": deviation_pct.ravel(),
+            }
+        )
+
+        branch_index = np.arange(branch_count)
+        parts = [
+            self._recommendation_part(
+                mask=total_withdraw,
+                branch=branch_index,
+                rank=0,
+                channel=TOTAL_CHANNEL,
+                action="withdraw",
+                amount=difference - allowed_positive,
+                policy=total_policy,
+                reason="Exceso vs caja teorica",
+            ),
+            self._recommendation_part(
+                mask=total_deposit,
+                branch=branch_index,
+                rank=0,
+                channel=TOTAL_CHANNEL,
+                action="deposit",
+                amount=np.abs(difference) - allowed_negative,
+                policy=total_policy,
+                reason="Deficit vs caja teorica",
+            ),
+        ]
+        for position, (channel, policy) in enumerate(zip(channel_names, policies)):
+            if not policy:
+                continue
+            rank = 2 * position + 1
+            parts.extend(
+                [
+                    self._recommendation_part(
+                        mask=channel_withdraw[:, position],
+                        branch=branch_index,
+                        rank=rank,
+                        channel=channel,
+                        action="withdraw",
+                        amount=deviations[:, position] - estimates[:, position] * surplus_pct[position],
+                        policy=policy,
+                        reason="Exceso canal vs distribucion esperada",
+                    ),
+                    self._recommendation_part(
+                        mask=channel_deposit[:, position],
+                        branch=branch_index,
+                        rank=rank,
+                        channel=channel,
+                        action="deposit",
+                        amount=np.abs(deviations[:, position]) - estimates[:, position] * deficit_pct[position],
+                        policy=policy,
+                        reason="Deficit canal vs distribucion esperada",
+                    ),
+                    self._recommendation_part(
+                        mask=buffer_breach[:, position],
+                        branch=branch_index,
+                        rank=rank + 1,
+                        channel=channel,
+                        action="deposit",
+                        amount=min_buffer[position] - amounts[:, position],
+                        policy=policy,
+                        reason="Monto por debajo del colchon minimo",
+                    ),
+                ]
+            )
+        recommendations = pd.concat(parts, ignore_index=True)
+        recommendations = recommendations.sort_values(["branch", "rank"], kind="stable").drop(columns="rank").reset_index(drop=True)
+
+        return PolicyEvaluation(
+            branches=branches,
+            channels=channels,
+            recommendations=recommendations,
+            channel_names=channel_names,
+            channel_has_policy=has_policy,
+        )
+
+    def _recommendation_part(
+        self,
+        *,
+        mask: np.ndarray,
+        branch: np.ndarray,
+        rank: int,
+        channel: str,
+        action: str,
+        amount: np.ndarray,
+        policy: Mapping[str, Any],
+        reason: str,
+    ) -> pd.DataFrame:
+        effective = np.maximum(amount[mask], 0)
+        bill_count = effective / self.average_bill_value if self.average_bill_value > 0 else np.zeros_like(effective)
+        kilograms = bill_count / 1000.0
+        fixed_cost = _to_float(policy.get("truck_fixed_cost"))
+        variable_cost = _to_float(policy.get("truck_variable_cost_per_kg"))
+        urgency = "inmediato" if channel == "ATM" else ("programar" if action == "withdraw" else "proximo turno")
+        return pd.DataFrame(
+            {
+                "branch": branch[mask],
+                "rank": rank,
+                "channel": channel,
+                "action": action,
+                "amount": effective,
+                "reason": reason,
+                "urgency": urgency,
+                "estimated_cost": fixed_cost + variable_cost * kilograms,
+                "weight_kg": kilograms,
+            }
+        )
+
+
+__all__ = [
+    "AVERAGE_BILL_VALUE",
+    "CHANNEL_FIELDS",
+    "CashPolicyEngine",
+    "PolicyEvaluation",
+]
@@ -12,20 +12,34 @@ from __future__ import annotations
 import json
 import logging
 import re
+import sqlite3
 import threading
 import hashlib
 import textwrap
 import unicodedata
 from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Callable
 from urllib.parse import urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
+try:  # Optional fast HTML backends; BeautifulSoup remains the fallback
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser  # type: ignore
+    except ImportError:
+        _SelectolaxParser = None
+try:
+    import lxml.html as _lxml_html  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    _lxml_html = None
+
 from src.core.exceptions import AgentError
 from src.domain.agents.agent_protocol import BaseAgent, AgentRequest, AgentResponse, IntentType
 from src.infrastructure.agents.progress_emitter import agent_progress
@@ -338,6 +352,223 @@ class CapiNoticiasConfigManager:
             logger.error("Error writing %s: %s", path, exc)
 
 
+class NoticiasIndexStore:
+    """Indice SQLite de noticias persistidas y vistas materializadas por segmento.
+
+    Reemplaza la reescritura completa de ``index.json`` y de los segmentos en
+    cada corrida: las altas son inserciones sobre un indice unico por
+    fingerprint y cada segmento se mantiene de forma incremental.
+    """
+
+    MARKER_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+    def __init__(self, db_path: Path, legacy_index_path: Optional[Path] = None) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        if legacy_index_path is not None:
+            self._import_legacy_index(Path(legacy_index_path))
+
+    def _create_schema(self) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS articles (
+                    fingerprint TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    published_at TEXT,
+                    entry TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_articles_published ON articles(published_at)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS segment_items (
+                    timeframe TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    priority_score REAL NOT NULL,
+                    urgent INTEGER NOT NULL,
+                    marker TEXT,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (timeframe, fingerprint)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_segment_items_marker ON segment_items(timeframe, marker)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_segment_items_rank "
+                "ON segment_items(timeframe, priority_score DESC, urgent DESC)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS segment_meta (
+                    timeframe TEXT PRIMARY KEY,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _import_legacy_index(self, path: Path) -> None:
+        """Migra una sola vez el ``index.json`` global previo a la tabla ``articles``."""
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_index_imported'").fetchone():
+                return
+            legacy: Dict[str, Any] = {}
+            if path.exists():
+                try:
+                    text = path.read_text(encoding="utf-8")
+                    legacy = json.loads(text) if text.strip() else {}
+                except Exception as exc:
+                    logger.warning("[capi_noticias] No se pudo migrar index.json: %s", exc)
+                    return
+            for fingerprint, entry in (legacy or {}).items():
+                if isinstance(entry, dict):
+                    self.add({**entry, "fingerprint": entry.get("fingerprint") or fingerprint})
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta(key, value) VALUES ('legacy_index_imported', ?)",
+                (datetime.utcnow().isoformat(),),
+            )
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa escrituras en una sola transaccion (reentrante)."""
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self._conn
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.rollback()
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.commit()
+
+    def contains(self, fingerprint: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM articles WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row is not None
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM articles WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """Inserta una noticia; retorna ``False`` si el fingerprint ya existia."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO articles(fingerprint, url, published_at, entry) VALUES (?, ?, ?, ?)",
+                (
+                    entry["fingerprint"],
+                    entry.get("url") or "",
+                    entry.get("published_at"),
+                    json.dumps(entry, ensure_ascii=False),
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def segment_is_seeded(self, timeframe: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM segment_meta WHERE timeframe = ?", (timeframe,)).fetchone()
+        return row is not None
+
+    def touch_segment(self, timeframe: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO segment_meta(timeframe, updated_at) VALUES (?, ?)",
+                (timeframe, datetime.utcnow().isoformat()),
+            )
+
+    def prune_segment(self, timeframe: str, horizon: datetime) -> int:
+        """Elimina items anteriores al horizonte; los items sin fecha se conservan."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM segment_items WHERE timeframe = ? AND marker < ?",
+                (timeframe, horizon.strftime(self.MARKER_FORMAT)),
+            )
+        return cursor.rowcount
+
+    def upsert_segment_items(self, timeframe: str, items: List[Dict[str, Any]], markers: List[Optional[datetime]]) -> int:
+        """Agrega items o reemplaza los existentes solo si mejoran la prioridad."""
+        changed = 0
+        with self.transaction() as conn:
+            for item, marker in zip(items, markers):
+                cursor = conn.execute(
+                    """
+                    INSERT INTO segment_items(timeframe, fingerprint, priority_score, urgent, marker, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(timeframe, fingerprint) DO UPDATE SET
+                        priority_score = excluded.priority_score,
+                        urgent = excluded.urgent,
+                        marker = excluded.marker,
+                        payload = excluded.payload
+                    WHERE excluded.priority_score > segment_items.priority_score
+                    """,
+                    (
+                        timeframe,
+                        item["fingerprint"],
+                        float(item.get("priority_score", 0.0) or 0.0),
+                        1 if item.get("urgency_level") == "high" else 0,
+                        marker.strftime(self.MARKER_FORMAT) if marker else None,
+                        json.dumps(item, ensure_ascii=False),
+                    ),
+                )
+                changed += cursor.rowcount
+        return changed
+
+    def trim_segment(self, timeframe: str, max_items: int) -> int:
+        """Conserva solo los ``max_items`` mejor rankeados del segmento."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM segment_items
+                WHERE timeframe = ? AND rowid NOT IN (
+                    SELECT rowid FROM segment_items
+                    WHERE timeframe = ?
+                    ORDER BY priority_score DESC, urgent DESC, rowid ASC
+                    LIMIT ?
+                )
+                """,
+                (timeframe, timeframe, max(0, int(max_items))),
+            )
+        return cursor.rowcount
+
+    def segment_items(self, timeframe: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT payload FROM segment_items
+                WHERE timeframe = ?
+                ORDER BY priority_score DESC, urgent DESC, rowid ASC
+                """,
+                (timeframe,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def segment_updated_at(self, timeframe: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT updated_at FROM segment_meta WHERE timeframe = ?", (timeframe,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class NoticiasStorage:
     """Persistencia de salidas de Capi Noticias en el workspace."""
 
@@ -352,6 +583,7 @@ class NoticiasStorage:
         self.segments_root = Path(segments_root) if segments_root else self.root.parent / "segments"
         self.segments_root.mkdir(parents=True, exist_ok=True)
         self.index_path = self.root / "index.json"
+        self.index_store = NoticiasIndexStore(self.root / "index.sqlite3", legacy_index_path=self.index_path)
         self._lock = threading.RLock()
         self._segment_config_provider = segment_config_provider or (
             lambda: {name: defaults.copy() for name, defaults in DEFAULT_SEGMENT_CONFIG.items()}
@@ -378,8 +610,7 @@ class NoticiasStorage:
 
         generated_at = self._parse_datetime(run_result.get("generated_at")) or datetime.utcnow()
 
-        with self._lock:
-            index = self._load_index()
+        with self._lock, self.index_store.transaction():
             for article in articles:
                 try:
                     canonical_url = (article.get("url") or "").strip()
@@ -398,7 +629,7 @@ class NoticiasStorage:
                     published = self._parse_datetime(article.get("published_at")) or generated_at
                     fingerprint = self._compute_fingerprint(canonical_url, published)
 
-                    if fingerprint in index:
+                    if self.index_store.contains(fingerprint):
                         summary["skipped"].append(
                             {
                                 "fingerprint": fingerprint,
@@ -436,7 +667,7 @@ class NoticiasStorage:
                         "md_path": str(md_path.relative_to(self.root)),
                         "json_path": str(json_path.relative_to(self.root)),
                     }
-                    index[fingerprint] = entry
+                    self.index_store.add(entry)
                     summary["saved"].append(entry)
                     self._append_daily_index(output_dir, published, entry)
                 except Exception as exc:
@@ -447,9 +678,8 @@ class NoticiasStorage:
                             "reason": str(exc),
                         }
                     )
-            self._save_index(index)
 
-        summary["segments"] = self.segment_aggregator.update_segments(run_result, summary["saved"], index)
+        summary["segments"] = self.segment_aggregator.update_segments(run_result, summary["saved"])
         return summary
 
     def _ensure_output_dir(self, published: datetime) -> Path:
@@ -626,23 +856,6 @@ class NoticiasStorage:
         with index_path.open("a", encoding="utf-8") as handle:
             handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
 
-    def _load_index(self) -> Dict[str, Any]:
-        if not self.index_path.exists():
-            return {}
-        try:
-            text = self.index_path.read_text(encoding="utf-8")
-            return json.loads(text) if text.strip() else {}
-        except Exception as exc:
-            logger.warning("[capi_noticias] No se pudo leer index.json: %s", exc)
-            return {}
-
-    def _save_index(self, index: Dict[str, Any]) -> None:
-        try:
-            self.index_path.parent.mkdir(parents=True, exist_ok=True)
-            self.index_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
-        except Exception as exc:
-            logger.warning("[capi_noticias] No se pudo persistir index.json: %s", exc)
-
     def _escape_yaml(self, value: str) -> str:
         return value.replace('"', '\"')
 
@@ -671,7 +884,6 @@ class SegmentAggregator:
         self,
         run_result: Dict[str, Any],
         saved_entries: List[Dict[str, Any]],
-        index: Dict[str, Any],
     ) -> Dict[str, int]:
         articles = run_result.get("articles") or []
         generated_at = self._parse_datetime(run_result.get("generated_at")) or datetime.utcnow()
@@ -679,26 +891,54 @@ class SegmentAggregator:
         saved_map = {
             entry.get("fingerprint"): entry for entry in saved_entries if entry.get("fingerprint")
         }
+        store = self.storage.index_store
 
         with self._lock:
             segment_config = self._segment_config_provider()
             for timeframe, cfg in segment_config.items():
-                data = self._load_segment(cfg["file"], timeframe)
-                items = data.get("items", [])
-                items = self._filter_old(items, generated_at, cfg)
-                candidates = self._build_candidates(articles, saved_map, index, generated_at, cfg)
-                items = self._merge_items(items, candidates, cfg)
-                data["items"] = items
-                data["updated_at"] = datetime.utcnow().isoformat()
-                self._save_segment(cfg["file"], data)
+                changed = 0
+                with store.transaction():
+                    if not store.segment_is_seeded(timeframe):
+                        changed += self._seed_segment(timeframe, cfg)
+                    horizon = self._horizon(generated_at, cfg)
+                    if horizon is not None:
+                        changed += store.prune_segment(timeframe, horizon)
+                    candidates = self._build_candidates(articles, saved_map, generated_at, cfg)
+                    changed += store.upsert_segment_items(
+                        timeframe,
+                        candidates,
+                        [self._item_marker(item) for item in candidates],
+                    )
+                    changed += store.trim_segment(timeframe, cfg.get("max_items", 50))
+                    store.touch_segment(timeframe)
+                items = store.segment_items(timeframe)
+                # El JSON exportado es una vista acotada (max_items); solo se
+                # reescribe cuando la vista materializada cambio.
+                if changed or not (self.segments_root / cfg["file"]).exists():
+                    self._save_segment(
+                        cfg["file"],
+                        {
+                            "timeframe": timeframe,
+                            "items": items,
+                            "updated_at": store.segment_updated_at(timeframe),
+                        },
+                    )
                 summary[timeframe] = len(items)
         return summary
 
+    def _seed_segment(self, timeframe: str, cfg: Dict[str, Any]) -> int:
+        """Carga en la vista SQLite el segmento JSON previo (migracion unica)."""
+        items = [item for item in self._load_segment(cfg["file"], timeframe).get("items", []) if item.get("fingerprint")]
+        return self.storage.index_store.upsert_segment_items(
+            timeframe,
+            items,
+            [self._item_marker(item) for item in items],
+        )
+
     def _build_candidates(
         self,
         articles: List[Dict[str, Any]],
         saved_map: Dict[str, Dict[str, Any]],
-        index: Dict[str, Any],
         generated_at: datetime,
         cfg: Dict[str, Any],
     ) -> List[Dict[str, Any]]:
@@ -712,7 +952,7 @@ class SegmentAggregator:
             published = self._parse_datetime(article.get("published_at")) or generated_at
             fingerprint = self.storage._compute_fingerprint(url, published)
             if priority >= min_priority:
-                base = self._compose_segment_item(article, fingerprint, saved_map, index)
+                base = self._compose_segment_item(article, fingerprint, saved_map)
                 if base:
                     candidates.append(base)
 
@@ -725,7 +965,7 @@ class SegmentAggregator:
                     continue
                 published = self._parse_datetime(article.get("published_at")) or generated_at
                 fingerprint = self.storage._compute_fingerprint(url, published)
-                base = self._compose_segment_item(article, fingerprint, saved_map, index)
+                base = self._compose_segment_item(article, fingerprint, saved_map)
                 if base:
                     extra_candidates.append(base)
             extra_candidates.sort(key=lambda item: item["priority_score"], reverse=True)
@@ -746,11 +986,10 @@ class SegmentAggregator:
         article: Dict[str, Any],
         fingerprint: str,
         saved_map: Dict[str, Dict[str, Any]],
-        index: Dict[str, Any],
     ) -> Optional[Dict[str, Any]]:
         if not fingerprint:
             return None
-        entry = saved_map.get(fingerprint) or index.get(fingerprint) or {}
+        entry = saved_map.get(fingerprint) or self.storage.index_store.get(fingerprint) or {}
         return {
             "fingerprint": fingerprint,
             "headline": article.get("headline"),
@@ -768,52 +1007,16 @@ class SegmentAggregator:
             "stored_at": datetime.utcnow().isoformat(),
         }
 
-    def _merge_items(
-        self,
-        items: List[Dict[str, Any]],
-        candidates: List[Dict[str, Any]],
-        cfg: Dict[str, Any],
-    ) -> List[Dict[str, Any]]:
-        registry = {item.get("fingerprint"): item for item in items if item.get("fingerprint")}
-        for candidate in candidates:
-            fingerprint = candidate.get("fingerprint")
-            if not fingerprint:
-                continue
-            existing = registry.get(fingerprint)
-            if not existing or candidate.get("priority_score", 0.0) > existing.get("priority_score", 0.0):
-                registry[fingerprint] = candidate
-        result = list(registry.values())
-        result.sort(
-            key=lambda item: (
-                item.get("priority_score", 0.0),
-                1 if item.get("urgency_level") == "high" else 0,
-            ),
-            reverse=True,
-        )
-        max_items = cfg.get("max_items", 50)
-        return result[:max_items]
-
-    def _filter_old(
-        self,
-        items: List[Dict[str, Any]],
-        reference: datetime,
-        cfg: Dict[str, Any],
-    ) -> List[Dict[str, Any]]:
-        horizon: Optional[datetime] = None
+    @staticmethod
+    def _horizon(reference: datetime, cfg: Dict[str, Any]) -> Optional[datetime]:
         if "lookback_hours" in cfg:
-            horizon = reference - timedelta(hours=cfg["lookback_hours"])
-        elif "lookback_days" in cfg:
-            horizon = reference - timedelta(days=cfg["lookback_days"])
-        if horizon is None:
-            return items
-        filtered: List[Dict[str, Any]] = []
-        for item in items:
-            published = self._parse_datetime(item.get("published_at"))
-            stored = self._parse_datetime(item.get("stored_at"))
-            marker = published or stored
-            if marker is None or marker >= horizon:
-                filtered.append(item)
-        return filtered
+            return reference - timedelta(hours=cfg["lookback_hours"])
+        if "lookback_days" in cfg:
+            return reference - timedelta(days=cfg["lookback_days"])
+        return None
+
+    def _item_marker(self, item: Dict[str, Any]) -> Optional[datetime]:
+        return self._parse_datetime(item.get("published_at")) or self._parse_datetime(item.get("stored_at"))
 
     def _load_segment(self, file_name: str, timeframe: str) -> Dict[str, Any]:
         path = self.segments_root / file_name
@@ -860,12 +1063,172 @@ class SegmentAggregator:
         if dt.tzinfo is not None:
             return dt.astimezone(timezone.utc).replace(tzinfo=None)
         return dt
+
+
+_SCRIPT_BLOCK_RE = re.compile(
+    r"<script\b(?P<attrs>[^>]*)>(?P<body>.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_JSONLD_TYPE_RE = re.compile(r"""\btype\s*=\s*(["']?)application/ld\+json\1(?=[\s/>]|$)""", re.IGNORECASE)
+_ARTICLE_BODY_CLASS_RE = re.compile("article__body|note-body|content-body")
+_NON_TEXT_TAGS = {"script", "style", "template", "noscript"}
+# lxml rechaza un ``str`` con declaracion de encoding: el texto ya viene decodificado
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>", re.IGNORECASE)
+
+
+def _join_text(parts: Iterable[str], separator: str) -> str:
+    """Replica ``get_text(separator, strip=True)`` de BeautifulSoup."""
+    return separator.join(text.strip() for text in parts if text and text.strip())
+
+
+def _class_matches(value: Optional[str], pattern: re.Pattern) -> bool:
+    if not value:
+        return False
+    return any(pattern.search(token) for token in value.split()) or bool(pattern.search(value))
+
+
+class _SoupDocument:
+    """Documento respaldado por BeautifulSoup (``html.parser``)."""
+
+    def __init__(self, html: str) -> None:
+        self._soup = BeautifulSoup(html, "html.parser")
+
+    def first_text(self, tag: str, separator: str = "") -> Optional[str]:
+        node = self._soup.find(tag)
+        return node.get_text(separator, strip=True) if node else None
+
+    def first_text_by_class(self, tag: str, pattern: re.Pattern, separator: str = " ") -> Optional[str]:
+        node = self._soup.find(tag, class_=pattern)
+        return node.get_text(separator, strip=True) if node else None
+
+    def anchor_hrefs(self, container: str) -> List[str]:
+        return [anchor.get("href") for anchor in self._soup.select(f"{container} a") if anchor.get("href")]
+
+
+class _LxmlDocument:
+    """Documento respaldado por ``lxml.html``."""
+
+    def __init__(self, html: str) -> None:
+        body = _XML_DECLARATION_RE.sub("", html, count=1)
+        try:
+            self._root = _lxml_html.document_fromstring(body) if body.strip() else _lxml_html.Element("html")
+        except _lxml_html.etree.ParserError:
+            # "Document is empty" (p. ej. solo comentarios): como bs4, un documento sin nodos
+            self._root = _lxml_html.Element("html")
+
+    def first_text(self, tag: str, separator: str = "") -> Optional[str]:
+        for node in self._root.iter(tag):
+            return _join_text(self._texts(node), separator)
+        return None
+
+    def first_text_by_class(self, tag: str, pattern: re.Pattern, separator: str = " ") -> Optional[str]:
+        for node in self._root.iter(tag):
+            if _class_matches(node.get("class"), pattern):
+                return _join_text(self._texts(node), separator)
+        return None
+
+    def anchor_hrefs(self, container: str) -> List[str]:
+        return [href for href in self._root.xpath(f"//{container}//a/@href") if href]
+
+    def _texts(self, node: Any) -> Iterator[str]:
+        if not isinstance(node.tag, str) or node.tag.lower() in _NON_TEXT_TAGS:
+            return
+        if node.text:
+            yield node.text
+        for child in node:
+            yield from self._texts(child)
+            if child.tail:
+                yield child.tail
+
+
+class _SelectolaxDocument:
+    """Documento respaldado por selectolax (lexbor/modest)."""
+
+    def __init__(self, html: str) -> None:
+        self._tree = _SelectolaxParser(html)
+
+    def first_text(self, tag: str, separator: str = "") -> Optional[str]:
+        node = self._tree.css_first(tag)
+        return _join_text(self._texts(node), separator) if node is not None else None
+
+    def first_text_by_class(self, tag: str, pattern: re.Pattern, separator: str = " ") -> Optional[str]:
+        for node in self._tree.css(f"{tag}[class]"):
+            if _class_matches(node.attributes.get("class"), pattern):
+                return _join_text(self._texts(node), separator)
+        return None
+
+    def anchor_hrefs(self, container: str) -> List[str]:
+        return [
+            node.attributes.get("href")
+            for node in self._tree.css(f"{container} a")
+            if node.attributes.get("href")
+        ]
+
+    def _texts(self, node: Any) -> Iterator[str]:
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                yield child.text_content
+            elif not child.tag.startswith("-") and child.tag not in _NON_TEXT_TAGS:
+                yield from self._texts(child)
+
+
+class ArticleHTMLParser:
+    """Abstraccion de parseo HTML para el fetcher de noticias.
+
+    Los bloques JSON-LD se leen con un escaneo directo de ``<script>`` sin
+    construir el arbol; el DOM solo se arma cuando hace falta un fallback.
+    El backend por defecto es BeautifulSoup (el unico en requirements.txt);
+    selectolax y lxml se usan solo si se piden explicitamente.
+    """
+
+    DEFAULT_BACKEND = "bs4"
+
+    BACKENDS: Dict[str, Callable[[str], Any]] = {
+        "selectolax": _SelectolaxDocument,
+        "lxml": _LxmlDocument,
+        "bs4": _SoupDocument,
+    }
+
+    def __init__(self, backend: Optional[str] = None) -> None:
+        available = self.available_backends()
+        if backend is None:
+            backend = self.DEFAULT_BACKEND
+        elif backend not in available:
+            raise ValueError(f"Backend HTML no disponible: {backend}")
+        self.backend = backend
+        self._document_factory = self.BACKENDS[backend]
+
+    @staticmethod
+    def available_backends() -> List[str]:
+        backends: List[str] = []
+        if _SelectolaxParser is not None:
+            backends.append("selectolax")
+        if _lxml_html is not None:
+            backends.append("lxml")
+        backends.append("bs4")
+        return backends
+
+    def iter_jsonld(self, html: str) -> Iterator[Any]:
+        """Itera los bloques ``application/ld+json`` decodificados, en orden."""
+        for match in _SCRIPT_BLOCK_RE.finditer(html):
+            if not _JSONLD_TYPE_RE.search(match.group("attrs")):
+                continue
+            try:
+                yield json.loads(match.group("body") or "{}")
+            except json.JSONDecodeError:
+                continue
+
+    def document(self, html: str) -> Any:
+        return self._document_factory(html)
+
+
 class AmbitoNewsFetcher:
     """Obtiene noticias desde Ambito.com y normaliza resultados."""
 
-    def __init__(self, timeout: float = REQUEST_TIMEOUT) -> None:
+    def __init__(self, timeout: float = REQUEST_TIMEOUT, parser: Optional[ArticleHTMLParser] = None) -> None:
         self.timeout = timeout
         self.headers = {"User-Agent": USER_AGENT}
+        self.parser = parser or ArticleHTMLParser()
 
     def collect_articles(self, source_urls: Iterable[str], per_source_limit: int) -> List[NewsArticle]:
         articles: List[NewsArticle] = []
@@ -912,15 +1275,9 @@ class AmbitoNewsFetcher:
         return response.text
 
     def _extract_article_urls(self, html: str, base_url: str) -> List[str]:
-        soup = BeautifulSoup(html, "html.parser")
         urls: List[str] = []
 
-        for script in soup.find_all("script", {"type": "application/ld+json"}):
-            try:
-                data = json.loads(script.string or "{}")
-            except json.JSONDecodeError:
-                continue
-
+        for data in self.parser.iter_jsonld(html):
             for item in self._iterate_jsonld(data):
                 if isinstance(item, dict) and item.get("@type") in {"CollectionPage", "ItemList"}:
                     elements = []
@@ -940,9 +1297,8 @@ class AmbitoNewsFetcher:
 
         # Fallback: buscar anchors en tarjetas de noticias
         if not urls:
-            for anchor in soup.select("article a"):
-                href = anchor.get("href")
-                if href and href.startswith("/"):
+            for href in self.parser.document(html).anchor_hrefs("article"):
+                if href.startswith("/"):
                     candidate = urljoin(base_url, href)
                     if _is_allowed_domain(candidate):
                         urls.append(candidate)
@@ -957,15 +1313,9 @@ class AmbitoNewsFetcher:
         return unique_urls
 
     def _parse_article(self, html: str, url: str, source_url: str) -> Optional[NewsArticle]:
-        soup = BeautifulSoup(html, "html.parser")
         article_data: Optional[Dict[str, Any]] = None
 
-        for script in soup.find_all("script", {"type": "application/ld+json"}):
-            try:
-                data = json.loads(script.string or "{}")
-            except json.JSONDecodeError:
-                continue
-
+        for data in self.parser.iter_jsonld(html):
             for item in self._iterate_jsonld(data):
                 if isinstance(item, dict) and item.get("@type") in {"NewsArticle", "Article"}:
                     article_data = item
@@ -973,10 +1323,15 @@ class AmbitoNewsFetcher:
             if article_data:
                 break
 
+        # El DOM solo se construye si el JSON-LD no trae titular o cuerpo
+        document = None
+
         headline = article_data.get("headline") if article_data else None
         if not headline:
-            title_tag = soup.find("h1")
-            headline = title_tag.get_text(strip=True) if title_tag else "Sin ttulo"
+            document = document or self.parser.document(html)
+            headline = document.first_text("h1")
+            if headline is None:
+                headline = "Sin título"
 
         description = article_data.get("description") if article_data else ""
         keywords_raw = article_data.get("keywords") if article_data else []
@@ -999,9 +1354,8 @@ class AmbitoNewsFetcher:
 
         body = article_data.get("articleBody") if article_data else None
         if not body:
-            body_tag = soup.find("div", class_=re.compile("article__body|note-body|content-body"))
-            if body_tag:
-                body = body_tag.get_text(" ", strip=True)
+            document = document or self.parser.document(html)
+            body = document.first_text_by_class("div", _ARTICLE_BODY_CLASS_RE, " ")
 
         snippet_source = body or description or ""
         snippet = snippet_source.strip().replace("\n", " ")[:320]
@@ -34,6 +34,7 @@ from src.application.services.agent_registry_service import (
     AgentManifest
 )
 from src.application.services.token_usage_service import TokenUsageService
+from src.application.services.agent_authorization_service import invalidate_agent_privileges
 from typing import Any, Dict, List, Set
 from datetime import datetime
 from src.infrastructure.database.postgres_client import PostgreSQLClient
@@ -326,7 +327,7 @@ async def list_agent_privileges():
 async def update_agent_privilege(nombre: str, payload: dict = Body(...)):
     """Pseudocódigo:
     1. Validar que el `nivel_privilegio` solicitado esté dentro del conjunto permitido.
-    2. Abrir la conexión a Postgres, verificar que el agente exista y actualizar su nivel.
+    2. Abrir la conexión a Postgres, verificar que el agente exista, actualizar su nivel e invalidar la cache de privilegios.
     3. Leer el registro actualizado y devolverlo; si hay fallos o no existe, responder con el error adecuado.
     """
     nivel = str(payload.get("nivel_privilegio", "")).strip().lower()
@@ -361,6 +362,7 @@ async def update_agent_privilege(nombre: str, payload: dict = Body(...)):
                 nivel,
                 nombre,
             )
+            invalidate_agent_privileges(nombre)
 
             # Devolver estado actualizado
             updated = await conn.fetchrow(
@@ -5,7 +5,7 @@ Author: Claude Code Expert
 """
 
 from typing import List, Optional, Dict, Any, Literal
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response
 from pydantic import BaseModel, Field
 from datetime import datetime
 import logging
@@ -16,7 +16,12 @@ from ..infrastructure.database.postgres_client import (
     AlertPriority,
     AlertStatus
 )
-from ..core.exceptions import DatabaseError
+from ..core.exceptions import DatabaseError, ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -205,8 +210,10 @@ async def update_alert_status_endpoint(
     description="Retrieve historical alerts with filtering and pagination"
 )
 async def get_historical_alerts(
+    response: Response,
     limit: int = Query(50, ge=1, le=200, description="Maximum number of alerts to return"),
-    offset: int = Query(0, ge=0, description="Number of alerts to skip"),
+    offset: int = Query(0, ge=0, description="Number of alerts to skip (ignored when cursor is set)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header of the previous page"),
     status: Optional[str] = Query(None, description="Filter by status (active, in_progress, resolved)"),
     priority: Optional[str] = Query(None, description="Filter by priority (low, medium, high, critical)"),
     agent: Optional[str] = Query(None, description="Filter by agent source"),
@@ -214,16 +221,29 @@ async def get_historical_alerts(
 ) -> List[AlertSummaryResponse]:
     """Get historical alerts with optional filters"""
     try:
-        alerts = await db.get_historical_alerts(
+        page = await db.get_historical_alerts_page(
             limit=limit,
             offset=offset,
             status_filter=status,
             priority_filter=priority,
-            agent_filter=agent
+            agent_filter=agent,
+            cursor=cursor
         )
 
-        return [AlertSummaryResponse(**alert) for alert in alerts]
-
+        headers = {"X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else {}
+        if orjson is not None:
+            # Las filas ya vienen con la forma de AlertSummaryResponse desde SQL:
+            # se serializan directo sin revalidar cada fila con pydantic.
+            return Response(
+                content=orjson.dumps(page["items"], option=orjson.OPT_UTC_Z),
+                media_type="application/json",
+                headers=headers,
+            )
+        response.headers.update(headers)
+        return [AlertSummaryResponse(**alert) for alert in page["items"]]
+
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except DatabaseError as e:
         logger.error(f"Database error retrieving alerts: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -231,6 +251,30 @@ async def get_historical_alerts(
         logger.error(f"Unexpected error retrieving alerts: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get(
+    "/search",
+    response_model=List[SearchResponse],
+    summary="Search Alerts",
+    description="Full-text search across alert titles and descriptions"
+)
+async def search_alerts(
+    q: str = Query(..., min_length=3, description="Search query (minimum 3 characters)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    db: PostgreSQLClient = Depends(get_db_client)
+) -> List[SearchResponse]:
+    """Search alerts using full-text search"""
+    try:
+        results = await db.search_alerts(search_term=q, limit=limit)
+
+        return [SearchResponse(**result) for result in results]
+
+    except DatabaseError as e:
+        logger.error(f"Database error searching alerts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    except Exception as e:
+        logger.error(f"Unexpected error searching alerts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get(
     "/{alert_id}",
     response_model=AlertDetailResponse,
@@ -259,30 +303,6 @@ async def get_alert_details(
         logger.error(f"Unexpected error retrieving alert {alert_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get(
-    "/search",
-    response_model=List[SearchResponse],
-    summary="Search Alerts",
-    description="Full-text search across alert titles and descriptions"
-)
-async def search_alerts(
-    q: str = Query(..., min_length=3, description="Search query (minimum 3 characters)"),
-    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
-    db: PostgreSQLClient = Depends(get_db_client)
-) -> List[SearchResponse]:
-    """Search alerts using full-text search"""
-    try:
-        results = await db.search_alerts(search_term=q, limit=limit)
-
-        return [SearchResponse(**result) for result in results]
-
-    except DatabaseError as e:
-        logger.error(f"Database error searching alerts: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-    except Exception as e:
-        logger.error(f"Unexpected error searching alerts: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-
 @router.get(
     "/summary/critical",
     response_model=CriticalAlertsSummaryResponse,
@@ -87,6 +87,7 @@ from src.observability.agent_metrics import record_feedback_event
 from src.voice.manager import VoiceOrchestrator
 from src.voice.settings import VoiceSettings
 from src.voice import metrics as voice_metrics
+from src.infrastructure.langgraph import node_metrics as graph_node_metrics
 
 # Logger configurado automÃ¡ticamente por sistema unificado
 logger = get_logger(__name__)
@@ -114,6 +115,19 @@ def _sanitize_for_json(value: Any) -> Any:
 app = FastAPI(title="CapiAgentes Chat Server")
 app.state.start_time = datetime.now()
 
+
+@app.on_event("shutdown")
+async def close_database_connections() -> None:
+    """Close the saldos LISTEN connection and the PostgreSQL pool on shutdown"""
+    from src.infrastructure.database.postgres_client import close_database
+    from src.infrastructure.database.snapshot_cache import get_snapshot_registry
+
+    try:
+        await get_snapshot_registry().close()
+        await close_database()
+    except Exception as exc:
+        logger.error(f"Error closing database connections: {exc}")
+
 # Global event broadcaster instance
 event_broadcaster = get_event_broadcaster()
 
@@ -137,6 +151,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include workspace router
@@ -963,6 +978,12 @@ async def get_metrics():
 
         metrics["voice"] = voice_snapshot
 
+        try:
+            metrics["graph_nodes"] = graph_node_metrics.snapshot()
+        except Exception as node_error:  # pragma: no cover - metrics collection should not break API
+            logger.warning({"event": "graph_node_metrics_collect_failed", "error": str(node_error)})
+            metrics["graph_nodes"] = {}
+
         return metrics
         
     except Exception as e:
@@ -5,7 +5,7 @@ Maps API endpoints for sucursal geodata feeds.
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 
 from ..infrastructure.database.postgres_client import (
@@ -13,6 +13,7 @@ from ..infrastructure.database.postgres_client import (
     PostgreSQLClient,
 )
 from ..core.exceptions import DatabaseError
+from .saldos_snapshots import SUCURSALES_TABLE, snapshot_response
 
 router = APIRouter(prefix="/api/maps", tags=["Maps"])
 
@@ -56,11 +57,11 @@ async def get_db_client() -> PostgreSQLClient:
     description="Devuelve sucursales con geolocalizacion para renderizar en mapas.",
 )
 async def list_sucursales(
+    request: Request,
     db: PostgreSQLClient = Depends(get_db_client),
-) -> List[SucursalResponse]:
+) -> Response:
     try:
-        rows = await db.get_sucursales()
-        return [SucursalResponse(**row) for row in rows]
+        return await snapshot_response(request, db, SUCURSALES_TABLE, db.get_sucursales, SucursalResponse)
     except DatabaseError as exc:
         raise HTTPException(status_code=500, detail="Database error") from exc
     except Exception as exc:
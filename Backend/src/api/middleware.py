@@ -1,259 +1,385 @@
+import asyncio
+import hmac
+import sqlite3
+import threading
 import time
 import uuid
-from typing import Dict, Optional
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
-from fastapi import Request, Response, HTTPException, status
-from fastapi.middleware.base import BaseHTTPMiddleware
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+from fastapi import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import RequestResponseEndpoint
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from src.core.config import settings
-from src.core.logging import get_logger, log_request, log_error
+from src.core.config import get_settings
+from src.core.logging import get_logger
 from src.core.exceptions import HTTPRateLimitError, HTTPAuthenticationError
 
 logger = get_logger(__name__)
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Add unique request ID to each request"""
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+PRODUCTION_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data: https:; "
+    "connect-src 'self'"
+)
+RATE_LIMIT_EXEMPT_PATHS = ("/health", "/metrics")
+API_KEY_EXCLUDED_PATHS = ("/health", "/metrics", "/docs", "/openapi.json", "/redoc")
+
+def _gcra(tat: Optional[float], now: float, limit: int, window: float) -> Tuple[bool, float, int]:
+    """GCRA step: return ``(allowed, new_tat, remaining)`` for one request.
+
+    ``tat`` (theoretical arrival time) is the only state per key. A request is
+    allowed while the bucket would not be pushed more than ``window`` seconds
+    ahead of ``now``; this admits bursts of ``limit`` requests and then one
+    request every ``window / limit`` seconds.
+    """
+    # Un TAT mas alla de la ventana solo puede venir de otro reloj (ej. reinicio del host)
+    if tat is None or tat < now or tat > now + window:
+        tat = now
+    backlog = tat - now + window / limit
+    if backlog > window:
+        return False, tat, 0
+    return True, now + backlog, int((window - backlog) * limit / window + 1e-9)
+
+
+class RateLimitBackend(ABC):
+    """Rate limit state shared by the middleware; one GCRA timestamp per key."""
+
+    @abstractmethod
+    def is_allowed(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        """Check if request is allowed and return remaining requests"""
+        raise NotImplementedError
+
+    async def is_allowed_async(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        """Check from the event loop; backends that block override this."""
+        return self.is_allowed(key, limit, window)
+
+    def close(self) -> None:
+        return None
+
+
+class RateLimitStore(RateLimitBackend):
+    """In-memory GCRA rate limit store, sharded with LRU eviction of idle keys.
+
+    Each key holds a single ``time.monotonic()`` float, so memory per client
+    is constant whatever its request rate. Keys are spread over ``shards``
+    ordered dicts without locks: every dict operation is atomic under the GIL
+    and the worst interleaving of two threads admits one extra request. A key
+    whose TAT is in the past is indistinguishable from a new one and is evicted
+    from the LRU end when new keys arrive; ``max_keys`` bounds the total size
+    even under key floods.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000):
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(shards)]
+        self._max_keys_per_shard = max(1, max_keys // shards)
+
+    def is_allowed(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        now = time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        tat = shard.get(key)
+        allowed, new_tat, remaining = _gcra(tat, now, limit, window)
+        if tat is None:
+            self._evict_idle(shard, now)
+            shard[key] = new_tat
+        elif allowed:
+            shard[key] = new_tat
+            try:
+                shard.move_to_end(key)
+            except KeyError:
+                # Desalojada por otro hilo entre ambas operaciones
+                shard[key] = new_tat
+        return allowed, remaining
+
+    def _evict_idle(self, shard: OrderedDict, now: float) -> None:
+        # El extremo LRU es el TAT mas viejo: se corta en la primera clave activa
+        while shard:
+            try:
+                oldest_key = next(iter(shard))
+            except (StopIteration, RuntimeError):
+                return
+            if shard.get(oldest_key, now) > now and len(shard) < self._max_keys_per_shard:
+                return
+            shard.pop(oldest_key, None)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class SQLiteRateLimitStore(RateLimitBackend):
+    """GCRA store in a SQLite file shared by every worker on the same host.
+
+    ``time.monotonic()`` is system-wide on Linux, so all workers agree on the
+    clock; each check is a single-row read and upsert inside ``BEGIN IMMEDIATE``.
+    Idle rows are purged every ``PURGE_EVERY`` checks. Checks from the event
+    loop run on a dedicated thread, so waiting on another worker's write lock
+    never stalls the loop.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+        self._checks = 0
+        # Un solo hilo: los chequeos se serializan igual en el lock y no ocupan el pool por defecto
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit-sqlite")
+
+    def is_allowed(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.monotonic()
+                row = self._conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                allowed, new_tat, remaining = _gcra(row[0] if row else None, now, limit, window)
+                self._conn.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat),
+                )
+                self._checks += 1
+                if self._checks % self.PURGE_EVERY == 0:
+                    self._conn.execute("DELETE FROM rate_limits WHERE tat < ?", (now,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        return allowed, remaining
+
+    async def is_allowed_async(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.is_allowed, key, limit, window)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def build_rate_limit_store(settings) -> RateLimitBackend:
+    """Return the rate limit store configured by ``RATE_LIMIT_BACKEND``."""
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimitStore(settings.RATE_LIMIT_SQLITE_PATH)
+    return RateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+# Global rate limit store
+rate_limit_store = RateLimitStore()
+
+
+class CapiHTTPMiddleware:
+    """Single pure-ASGI middleware: request ID, logging, API key, rate limit and security headers.
+
+    Replaces the stacked ``BaseHTTPMiddleware`` layers. Each HTTP request is
+    handled in one pass without extra task groups or body streams: headers are
+    added to the ``http.response.start`` message and body chunks are forwarded
+    as they are produced, so streaming responses are not buffered. WebSocket
+    and lifespan traffic is passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limit_enabled: bool = True,
+        rate_limit_requests: int = 100,
+        rate_limit_window: int = 60,
+        required_paths: Optional[List[str]] = None,
+        api_key: Optional[str] = None,
+        rate_limit_store: Optional[RateLimitBackend] = None,
+    ):
+        self.app = app
+        self.rate_limit_enabled = rate_limit_enabled
+        self.rate_limit_requests = rate_limit_requests
+        self.rate_limit_window = rate_limit_window
+        self.required_paths = tuple(required_paths or ["/api/"])
+        self.rate_limit_store = rate_limit_store
+        self.excluded_paths = API_KEY_EXCLUDED_PATHS
+
+        settings = get_settings()
+        self.api_key = (api_key or settings.API_KEY_BACKEND).encode()
+        security_headers = dict(SECURITY_HEADERS)
+        # CSP header for production
+        if settings.is_production:
+            security_headers["Content-Security-Policy"] = PRODUCTION_CSP
+        self.security_headers = list(security_headers.items())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Log all HTTP requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        start_time = time.time()
-        request_id = getattr(request.state, 'request_id', None)
-        
-        # Log request
+        # Compatible con request.state.request_id en los endpoints
+        scope.setdefault("state", {})["request_id"] = request_id
+        method = scope["method"]
+        path = scope["path"]
+        client_ip = scope["client"][0] if scope.get("client") else None
+        request_headers = _header_map(scope)
+
         logger.info(
-            f"Request started: {request.method} {request.url.path}",
+            f"Request started: {method} {path}",
             extra={
                 "request_id": request_id,
-                "request_method": request.method,
-                "request_path": str(request.url.path),
-                "request_query": str(request.url.query),
-                "client_host": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-                "event_type": "request_started"
-            }
+                "request_method": method,
+                "request_path": path,
+                "request_query": scope.get("query_string", b"").decode("latin-1"),
+                "client_host": client_ip,
+                "user_agent": request_headers.get("user-agent"),
+                "event_type": "request_started",
+            },
         )
-        
+
+        response_headers = [("X-Request-ID", request_id), *self.security_headers]
         try:
-            response = await call_next(request)
-            response_time = time.time() - start_time
-            
-            # Log successful response
-            log_request(
-                logger, 
-                request.method, 
-                str(request.url.path), 
-                response.status_code, 
-                response_time,
-                request_id
-            )
-            
-            return response
-            
+            self._authenticate(scope, path, client_ip, request_headers)
+            response_headers.extend(await self._rate_limit(method, path, client_ip))
+        except HTTPException as exc:
+            rejection = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await rejection(scope, receive, _with_headers(send, response_headers))
+            self._log_completed(method, path, exc.status_code, start_time, request_id)
+            return
+
+        status_code = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                for name, value in response_headers:
+                    headers[name] = value
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
         except Exception as exc:
-            response_time = time.time() - start_time
-            
-            # Log error
-            log_error(
-                logger, 
-                exc, 
-                {
+            logger.error(
+                f"Request failed: {method} {path}: {exc}",
+                exc_info=exc,
+                extra={
                     "request_id": request_id,
-                    "request_method": request.method,
-                    "request_path": str(request.url.path),
-                    "response_time_ms": round(response_time * 1000, 2)
-                }
+                    "request_method": method,
+                    "request_path": path,
+                    "response_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+                    "event_type": "request_failed",
+                },
             )
             raise
+        self._log_completed(method, path, status_code, start_time, request_id)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to responses"""
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        response = await call_next(request)
-        
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        
-        # CSP header for production
-        if settings.is_production:
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline'; "
-                "style-src 'self' 'unsafe-inline'; "
-                "img-src 'self' data: https:; "
-                "connect-src 'self'"
-            )
-        
-        return response
+    def _authenticate(self, scope: Scope, path: str, client_ip: Optional[str], headers: Dict[str, str]) -> None:
+        # Skip authentication for excluded paths
+        if path.startswith(self.excluded_paths) or not path.startswith(self.required_paths):
+            return
 
-class RateLimitStore:
-    """In-memory rate limit store with sliding window"""
-    
-    def __init__(self):
-        self._store: Dict[str, deque] = defaultdict(deque)
-        self._cleanup_interval = 300  # 5 minutes
-        self._last_cleanup = datetime.now()
-    
-    def is_allowed(self, key: str, limit: int, window: int) -> tuple[bool, int]:
-        """Check if request is allowed and return remaining requests"""
-        now = datetime.now()
-        
-        # Cleanup old entries periodically
-        if (now - self._last_cleanup).seconds > self._cleanup_interval:
-            self._cleanup_old_entries(now, window)
-            self._last_cleanup = now
-        
-        # Get or create bucket
-        bucket = self._store[key]
-        
-        # Remove expired entries
-        cutoff = now - timedelta(seconds=window)
-        while bucket and bucket[0] < cutoff:
-            bucket.popleft()
-        
-        # Check limit
-        if len(bucket) >= limit:
-            return False, 0
-        
-        # Add current request
-        bucket.append(now)
-        remaining = limit - len(bucket)
-        
-        return True, remaining
-    
-    def _cleanup_old_entries(self, now: datetime, window: int):
-        """Clean up old entries to prevent memory leak"""
-        cutoff = now - timedelta(seconds=window * 2)  # Double window for safety
-        
-        for key in list(self._store.keys()):
-            bucket = self._store[key]
-            
-            # Remove expired entries
-            while bucket and bucket[0] < cutoff:
-                bucket.popleft()
-            
-            # Remove empty buckets
-            if not bucket:
-                del self._store[key]
+        # Check API key in header, query parameter as fallback
+        api_key = headers.get("x-api-key")
+        if not api_key:
+            api_key = (parse_qs(scope.get("query_string", b"").decode("latin-1")).get("api_key") or [None])[0]
 
-# Global rate limit store
-rate_limit_store = RateLimitStore()
+        if not api_key or not hmac.compare_digest(api_key.encode(), self.api_key):
+            logger.warning(
+                f"Invalid API key attempt from {client_ip or 'unknown'}",
+                extra={
+                    "client_ip": client_ip or "unknown",
+                    "path": path,
+                    "event_type": "authentication_failed",
+                },
+            )
+            raise HTTPAuthenticationError("Invalid API key")
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware with sliding window"""
-    
-    def __init__(self, app, enabled: bool = True, requests: int = 100, window: int = 60):
-        super().__init__(app)
-        self.enabled = enabled
-        self.requests = requests
-        self.window = window
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        if not self.enabled:
-            return await call_next(request)
-        
+    async def _rate_limit(self, method: str, path: str, client_ip: Optional[str]) -> List[Tuple[str, str]]:
         # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/metrics"]:
-            return await call_next(request)
-        
+        if not self.rate_limit_enabled or path in RATE_LIMIT_EXEMPT_PATHS:
+            return []
+
         # Create rate limit key (IP + endpoint)
-        client_ip = request.client.host if request.client else "unknown"
-        endpoint = f"{request.method}:{request.url.path}"
-        rate_limit_key = f"{client_ip}:{endpoint}"
-        
-        # Check rate limit
-        allowed, remaining = rate_limit_store.is_allowed(
-            rate_limit_key, 
-            self.requests, 
-            self.window
+        endpoint = f"{method}:{path}"
+        store = self.rate_limit_store or rate_limit_store
+        allowed, remaining = await store.is_allowed_async(
+            f"{client_ip or 'unknown'}:{endpoint}",
+            self.rate_limit_requests,
+            self.rate_limit_window,
         )
-        
         if not allowed:
             logger.warning(
-                f"Rate limit exceeded for {client_ip} on {endpoint}",
+                f"Rate limit exceeded for {client_ip or 'unknown'} on {endpoint}",
                 extra={
-                    "client_ip": client_ip,
+                    "client_ip": client_ip or "unknown",
                     "endpoint": endpoint,
-                    "event_type": "rate_limit_exceeded"
-                }
+                    "event_type": "rate_limit_exceeded",
+                },
             )
-            raise HTTPRateLimitError("Rate limit exceeded", self.window)
-        
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(self.requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Window"] = str(self.window)
-        
-        return response
-
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    """API key authentication middleware"""
-    
-    def __init__(self, app, required_paths: Optional[list] = None):
-        super().__init__(app)
-        self.required_paths = required_paths or ["/api/"]
-        self.excluded_paths = ["/health", "/metrics", "/docs", "/openapi.json", "/redoc"]
-    
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        path = request.url.path
-        
-        # Skip authentication for excluded paths
-        if any(path.startswith(excluded) for excluded in self.excluded_paths):
-            return await call_next(request)
-        
-        # Check if path requires authentication
-        requires_auth = any(path.startswith(required) for required in self.required_paths)
-        
-        if requires_auth:
-            # Check API key in header
-            api_key = request.headers.get("X-API-Key")
-            
-            if not api_key:
-                # Check in query parameter as fallback
-                api_key = request.query_params.get("api_key")
-            
-            if not api_key or api_key != settings.API_KEY_BACKEND:
-                logger.warning(
-                    f"Invalid API key attempt from {request.client.host if request.client else 'unknown'}",
-                    extra={
-                        "client_ip": request.client.host if request.client else "unknown",
-                        "path": path,
-                        "event_type": "authentication_failed"
-                    }
-                )
-                raise HTTPAuthenticationError("Invalid API key")
-        
-        return await call_next(request)
+            raise HTTPRateLimitError("Rate limit exceeded", self.rate_limit_window)
+
+        return [
+            ("X-RateLimit-Limit", str(self.rate_limit_requests)),
+            ("X-RateLimit-Remaining", str(remaining)),
+            ("X-RateLimit-Window", str(self.rate_limit_window)),
+        ]
+
+    @staticmethod
+    def _log_completed(method: str, path: str, status_code: int, start_time: float, request_id: str) -> None:
+        response_time_ms = round((time.perf_counter() - start_time) * 1000, 2)
+        logger.info(
+            f"Request completed: {method} {path} {status_code} in {response_time_ms}ms",
+            extra={
+                "request_id": request_id,
+                "request_method": method,
+                "request_path": path,
+                "status_code": status_code,
+                "response_time_ms": response_time_ms,
+                "event_type": "request_completed",
+            },
+        )
+
+
+def _header_map(scope: Scope) -> Dict[str, str]:
+    return {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+
+def _with_headers(send: Send, response_headers: List[Tuple[str, str]]) -> Send:
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            for name, value in response_headers:
+                headers[name] = value
+        await send(message)
+
+    return wrapped
+
 
 def setup_middleware(app):
     """Setup all middleware for the application"""
+    settings = get_settings()
     
     # Security middleware
     if settings.is_production:
         app.add_middleware(
             TrustedHostMiddleware,
-            allowed_hosts=settings.ALLOWED_HOSTS
+            allowed_hosts=settings.allowed_hosts
         )
     
     # CORS middleware
@@ -263,19 +389,14 @@ def setup_middleware(app):
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
     
-    # Custom middleware (order matters - last added is executed first)
-    app.add_middleware(SecurityHeadersMiddleware)
-    
-    if settings.RATE_LIMIT_ENABLED:
-        app.add_middleware(
-            RateLimitMiddleware,
-            enabled=settings.RATE_LIMIT_ENABLED,
-            requests=settings.RATE_LIMIT_REQUESTS,
-            window=settings.RATE_LIMIT_WINDOW
-        )
-    
-    app.add_middleware(APIKeyMiddleware)
-    app.add_middleware(LoggingMiddleware)
-    app.add_middleware(RequestIDMiddleware)
\ No newline at end of file
+    # Request ID, logging, API key, rate limit and security headers in a single pass
+    app.add_middleware(
+        CapiHTTPMiddleware,
+        rate_limit_enabled=settings.RATE_LIMIT_ENABLED,
+        rate_limit_requests=settings.RATE_LIMIT_REQUESTS,
+        rate_limit_window=settings.RATE_LIMIT_WINDOW,
+        rate_limit_store=build_rate_limit_store(settings),
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field, ConfigDict
 
 from ..core.exceptions import DatabaseError
@@ -11,6 +11,12 @@ from ..infrastructure.database.postgres_client import (
     PostgreSQLClient,
     get_postgres_client,
 )
+from .saldos_snapshots import (
+    DISPOSITIVOS_TABLE,
+    SUCURSALES_TABLE,
+    invalidate_saldos,
+    snapshot_response,
+)
 
 router = APIRouter(prefix="/api/saldos", tags=["Saldos"])
 
@@ -102,10 +108,9 @@ class DispositivoResponse(DispositivoBase):
 
 
 @router.get("/sucursales", response_model=List[SucursalResponse])
-async def list_sucursales(db: PostgreSQLClient = Depends(get_db_client)) -> List[SucursalResponse]:
+async def list_sucursales(request: Request, db: PostgreSQLClient = Depends(get_db_client)) -> Response:
     try:
-        rows = await db.get_sucursales()
-        return [SucursalResponse(**row) for row in rows]
+        return await snapshot_response(request, db, SUCURSALES_TABLE, db.get_sucursales, SucursalResponse)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
@@ -117,6 +122,7 @@ async def create_sucursal(
 ) -> SucursalResponse:
     try:
         record = await db.create_sucursal(payload.model_dump(exclude_unset=True))
+        invalidate_saldos(SUCURSALES_TABLE)
         return SucursalResponse(**record)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -130,6 +136,7 @@ async def update_sucursal(
 ) -> SucursalResponse:
     try:
         record = await db.update_sucursal(sucursal_id, payload.model_dump(exclude_unset=True))
+        invalidate_saldos(SUCURSALES_TABLE)
         return SucursalResponse(**record)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
@@ -146,13 +153,13 @@ async def delete_sucursal(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sucursal no encontrada")
+    invalidate_saldos(SUCURSALES_TABLE)
 
 
 @router.get("/dispositivos", response_model=List[DispositivoResponse])
-async def list_dispositivos(db: PostgreSQLClient = Depends(get_db_client)) -> List[DispositivoResponse]:
+async def list_dispositivos(request: Request, db: PostgreSQLClient = Depends(get_db_client)) -> Response:
     try:
-        rows = await db.get_dispositivos()
-        return [DispositivoResponse(**row) for row in rows]
+        return await snapshot_response(request, db, DISPOSITIVOS_TABLE, db.get_dispositivos, DispositivoResponse)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
@@ -164,6 +171,7 @@ async def create_dispositivo(
 ) -> DispositivoResponse:
     try:
         record = await db.create_dispositivo(payload.model_dump(exclude_unset=True))
+        invalidate_saldos(DISPOSITIVOS_TABLE)
         return DispositivoResponse(**record)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -177,6 +185,7 @@ async def update_dispositivo(
 ) -> DispositivoResponse:
     try:
         record = await db.update_dispositivo(record_id, payload.model_dump(exclude_unset=True))
+        invalidate_saldos(DISPOSITIVOS_TABLE)
         return DispositivoResponse(**record)
     except DatabaseError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
@@ -193,3 +202,4 @@ async def delete_dispositivo(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dispositivo no encontrado")
+    invalidate_saldos(DISPOSITIVOS_TABLE)
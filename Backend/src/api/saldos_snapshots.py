@@ -0,0 +1,60 @@
+"""
+ETag-aware snapshot responses shared by the /api/maps and /api/saldos read endpoints.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+from ..core.config import get_settings
+from ..infrastructure.database.postgres_client import PostgreSQLClient
+from ..infrastructure.database.snapshot_cache import RenderedSnapshot, get_snapshot_registry
+
+SUCURSALES_TABLE = "saldos_sucursal"
+DISPOSITIVOS_TABLE = "saldos_dispositivo"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def _renderer(model: Type[BaseModel]) -> Callable[[List[Dict[str, Any]]], bytes]:
+    adapter = _list_adapter(model)
+    return lambda rows: adapter.dump_json(adapter.validate_python(rows))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+async def snapshot_response(
+    request: Request,
+    db: PostgreSQLClient,
+    table: str,
+    load: Callable[[], Awaitable[List[Dict[str, Any]]]],
+    model: Type[BaseModel],
+) -> Response:
+    """Serve ``List[model]`` from the shared snapshot, answering ``304`` on a matching ETag."""
+    registry = get_snapshot_registry()
+    if get_settings().SNAPSHOT_CACHE_LISTEN and isinstance(db, PostgreSQLClient):
+        registry.start_listener(db._get_database_url())
+
+    view = f"{request.url.path}:{model.__module__}.{model.__qualname__}"
+    snapshot: RenderedSnapshot = await registry.snapshot(table).render(view, load, _renderer(model))
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+def invalidate_saldos(*tables: str) -> None:
+    """Drop the snapshots touched by a write (all saldos tables when none given)."""
+    get_snapshot_registry().invalidate(tables or None)
@@ -4,12 +4,16 @@ Detecta anomalías y genera alertas basadas en análisis financiero
 """
 import logging
 import time
+import weakref
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from uuid import uuid4
 
+from .alert_store import ActiveAlertStore, AlertArchive, AlertHistory
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +36,183 @@ class AlertCategory(Enum):
     OPERATIONAL = "operational"
 
 
+DEFAULT_TREND_WINDOW = 20
+DEFAULT_VOLATILITY_ALPHA = 0.3
+STREAM_ENTITY_KEY = "entity_id"
+# Cota del estado incremental por condición: entidades retenidas y segundos sin observaciones
+STREAM_MAX_ENTITIES = 10_000
+STREAM_ENTITY_TTL_SECONDS = 3600.0
+
+
+def _extract_metric_value(data: Dict[str, Any], metric: str) -> Optional[float]:
+    """Extrae valor de métrica de los datos"""
+    try:
+        # Soporte para paths anidados como "metrics.total_volume"
+        keys = metric.split(".")
+        value = data
+        for key in keys:
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return None
+
+        return float(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _extract_time_series(data: Dict[str, Any], metric: str) -> List[float]:
+    """Extrae serie temporal de métrica"""
+    # Implementación simplificada - busca arrays de valores
+    values = []
+    metric_value = _extract_metric_value(data, metric)
+
+    if metric_value is not None:
+        values.append(metric_value)
+
+    # Busca datos históricos si están disponibles
+    if "historical_data" in data:
+        historical = data["historical_data"]
+        if isinstance(historical, list):
+            for entry in historical:
+                val = _extract_metric_value(entry, metric)
+                if val is not None:
+                    values.append(val)
+
+    return values
+
+
+class EvaluationContext:
+    """
+    Datos de una evaluación con extracción memoizada por métrica.
+
+    Las condiciones que comparten métrica reutilizan el mismo valor y la misma
+    serie.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.has_history = "historical_data" in data
+        self._values: Dict[str, Optional[float]] = {}
+        self._series: Dict[str, List[float]] = {}
+
+    def value(self, metric: str) -> Optional[float]:
+        if metric not in self._values:
+            self._values[metric] = _extract_metric_value(self.data, metric)
+        return self._values[metric]
+
+    def series(self, metric: str) -> List[float]:
+        if metric not in self._series:
+            self._series[metric] = _extract_time_series(self.data, metric)
+        return self._series[metric]
+
+    def entity(self, entity_key: str) -> Any:
+        return self.data.get(entity_key)
+
+
+class WelfordStats:
+    """Media y varianza poblacional incrementales (Welford)"""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std_dev(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+
+class SlidingTrend:
+    """Pendiente de regresión lineal sobre una ventana fija, con sumas corridas"""
+
+    __slots__ = ("values", "sum_y", "sum_iy", "_pushes")
+
+    def __init__(self, window: int):
+        self.values: deque = deque(maxlen=max(2, window))
+        self.sum_y = 0.0
+        self.sum_iy = 0.0  # sum(i * y_i) con i = posición dentro de la ventana
+        self._pushes = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.values.maxlen:
+            self.sum_y -= self.values.popleft()
+            # Los valores restantes bajan una posición
+            self.sum_iy -= self.sum_y
+        self.sum_iy += len(self.values) * value
+        self.sum_y += value
+        self.values.append(value)
+
+        # Resincroniza una vez por ventana para acotar el error de redondeo acumulado
+        self._pushes += 1
+        if self._pushes % self.values.maxlen == 0:
+            self.sum_y = sum(self.values)
+            self.sum_iy = sum(i * y for i, y in enumerate(self.values))
+
+    @property
+    def slope(self) -> Optional[float]:
+        n = len(self.values)
+        if n < 2:
+            return None
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self.sum_iy - sum_x * self.sum_y) / (n * sum_xx - sum_x ** 2)
+
+
+class EwmaVolatility:
+    """Volatilidad de cambios porcentuales con media y varianza exponenciales"""
+
+    __slots__ = ("alpha", "last", "observations", "changes", "mean", "variance")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.last: Optional[float] = None
+        self.observations = 0
+        self.changes = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def push(self, value: float) -> None:
+        self.observations += 1
+        if self.last:
+            change = (value - self.last) / self.last
+            if self.changes == 0:
+                self.mean = change
+            else:
+                diff = change - self.mean
+                increment = self.alpha * diff
+                self.mean += increment
+                self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+            self.changes += 1
+        self.last = value
+
+    @property
+    def volatility(self) -> float:
+        return self.variance ** 0.5
+
+
+class IncreaseRun:
+    """Racha actual de aumentos consecutivos"""
+
+    __slots__ = ("last", "run")
+
+    def __init__(self):
+        self.last: Optional[float] = None
+        self.run = 0
+
+    def push(self, value: float) -> None:
+        self.run = self.run + 1 if self.last is not None and value > self.last else 0
+        self.last = value
+
+
 @dataclass
 class AlertCondition:
     """Condición para disparar una alerta"""
@@ -39,29 +220,89 @@ class AlertCondition:
     condition_type: str  # "threshold", "pattern", "anomaly", "trend"
     parameters: Dict[str, Any]
     enabled: bool = True
+    # Estado incremental por entidad (LRU): entidad -> [estado, último uso]
+    _streams: "OrderedDict[Any, List[Any]]" = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
     
-    def evaluate(self, data: Dict[str, Any]) -> bool:
-        """Evalúa si la condición se cumple"""
+    def evaluate(self, data: Dict[str, Any], context: Optional[EvaluationContext] = None) -> bool:
+        """Evalúa si la condición se cumple.
+
+        Con ``historical_data`` evalúa la serie completa. Las condiciones con
+        ``parameters["stream"]`` tratan cada payload sin historia como una
+        observación nueva de su entidad (``entity_key``, por defecto
+        ``entity_id``) y evalúan en O(1) sobre el estado incremental; el estado
+        retiene a lo sumo ``max_entities`` entidades y descarta las que no se
+        observan en ``entity_ttl_seconds``.
+        """
         if not self.enabled:
             return False
+
+        if context is None:
+            context = EvaluationContext(data)
             
         try:
             if self.condition_type == "threshold":
-                return self._evaluate_threshold(data)
+                return self._evaluate_threshold(context)
             elif self.condition_type == "pattern":
-                return self._evaluate_pattern(data)
+                return self._evaluate_pattern(context)
             elif self.condition_type == "anomaly":
-                return self._evaluate_anomaly(data)
+                return self._evaluate_anomaly(context)
             elif self.condition_type == "trend":
-                return self._evaluate_trend(data)
+                return self._evaluate_trend(context)
             else:
                 logger.warning(f"Unknown condition type: {self.condition_type}")
                 return False
         except Exception as e:
             logger.error(f"Error evaluating condition {self.name}: {e}")
             return False
+
+    def reset_streams(self) -> None:
+        """Descarta el estado incremental de todas las entidades"""
+        self._streams.clear()
+
+    def _is_streaming(self, context: EvaluationContext) -> bool:
+        return bool(self.parameters.get("stream")) and not context.has_history
+
+    def _observe(self, context: EvaluationContext, metric: str, factory) -> Optional[Any]:
+        """Suma la observación actual al estado de la entidad y lo devuelve"""
+        value = context.value(metric)
+        if value is None:
+            return None
+        entity_key = self.parameters.get("entity_key", STREAM_ENTITY_KEY)
+        key = context.entity(entity_key)
+        if key is None:
+            # Sin entidad no hay serie a la que sumar la observación
+            logger.debug(f"Condición {self.name}: payload sin {entity_key}, se omite la observación")
+            return None
+
+        now = time.monotonic()
+        ttl = self.parameters.get("entity_ttl_seconds", STREAM_ENTITY_TTL_SECONDS)
+        entry = self._streams.get(key)
+        if entry is not None and now - entry[1] > ttl:
+            # Serie vencida: se reinicia como una entidad nueva
+            del self._streams[key]
+            entry = None
+        if entry is None:
+            self._evict_streams(now, ttl)
+            entry = self._streams[key] = [factory(), now]
+        else:
+            entry[1] = now
+            self._streams.move_to_end(key)
+        state = entry[0]
+        state.push(value)
+        return state
+
+    def _evict_streams(self, now: float, ttl: float) -> None:
+        # El extremo LRU es la entidad observada hace más tiempo
+        max_entities = max(1, int(self.parameters.get("max_entities", STREAM_MAX_ENTITIES)))
+        while self._streams:
+            oldest = next(iter(self._streams))
+            if len(self._streams) < max_entities and now - self._streams[oldest][1] <= ttl:
+                return
+            del self._streams[oldest]
     
-    def _evaluate_threshold(self, data: Dict[str, Any]) -> bool:
+    def _evaluate_threshold(self, context: EvaluationContext) -> bool:
         """Evalúa condiciones de umbral"""
         metric = self.parameters.get("metric")
         threshold = self.parameters.get("threshold")
@@ -70,7 +311,7 @@ class AlertCondition:
         if not metric or threshold is None:
             return False
             
-        value = self._extract_metric_value(data, metric)
+        value = context.value(metric)
         if value is None:
             return False
             
@@ -85,28 +326,35 @@ class AlertCondition:
         else:
             return False
     
-    def _evaluate_pattern(self, data: Dict[str, Any]) -> bool:
+    def _evaluate_pattern(self, context: EvaluationContext) -> bool:
         """Evalúa patrones en los datos"""
         pattern_type = self.parameters.get("pattern_type")
         
         if pattern_type == "consecutive_increases":
-            return self._check_consecutive_increases(data)
+            return self._check_consecutive_increases(context)
         elif pattern_type == "volatility_spike":
-            return self._check_volatility_spike(data)
+            return self._check_volatility_spike(context)
         elif pattern_type == "unusual_distribution":
-            return self._check_unusual_distribution(data)
+            return self._check_unusual_distribution(context)
         else:
             return False
     
-    def _evaluate_anomaly(self, data: Dict[str, Any]) -> bool:
+    def _evaluate_anomaly(self, context: EvaluationContext) -> bool:
         """Evalúa anomalías estadísticas"""
         metric = self.parameters.get("metric")
         threshold_std = self.parameters.get("threshold_std", 2.0)
         
         if not metric:
             return False
+
+        if self._is_streaming(context):
+            stats = self._observe(context, metric, WelfordStats)
+            if stats is None or stats.count < 10:
+                return False
+            z_score = abs(context.value(metric) - stats.mean) / max(stats.std_dev, 0.001)
+            return z_score > threshold_std
             
-        values = self._extract_time_series(data, metric)
+        values = context.series(metric)
         if len(values) < 10:  # Necesita suficientes datos
             return False
             
@@ -119,7 +367,7 @@ class AlertCondition:
         
         return z_score > threshold_std
     
-    def _evaluate_trend(self, data: Dict[str, Any]) -> bool:
+    def _evaluate_trend(self, context: EvaluationContext) -> bool:
         """Evalúa tendencias en los datos"""
         metric = self.parameters.get("metric")
         trend_type = self.parameters.get("trend_type", "increasing")
@@ -127,23 +375,30 @@ class AlertCondition:
         
         if not metric:
             return False
-            
-        values = self._extract_time_series(data, metric)
-        if len(values) < min_periods:
-            return False
-            
-        # Simple trend detection usando regresión lineal básica
-        n = len(values)
-        x_mean = (n - 1) / 2
-        y_mean = sum(values) / n
-        
-        numerator = sum((i - x_mean) * (values[i] - y_mean) for i in range(n))
-        denominator = sum((i - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
+
+        if self._is_streaming(context):
+            window = max(min_periods, self.parameters.get("window", DEFAULT_TREND_WINDOW))
+            trend = self._observe(context, metric, lambda: SlidingTrend(window))
+            if trend is None or len(trend.values) < min_periods:
+                return False
+            slope = trend.slope
+        else:
+            values = context.series(metric)
+            if len(values) < min_periods:
+                return False
+
+            # Simple trend detection usando regresión lineal básica
+            n = len(values)
+            x_mean = (n - 1) / 2
+            y_mean = sum(values) / n
+
+            numerator = sum((i - x_mean) * (values[i] - y_mean) for i in range(n))
+            denominator = sum((i - x_mean) ** 2 for i in range(n))
+
+            slope = numerator / denominator if denominator else None
+
+        if slope is None:
             return False
-            
-        slope = numerator / denominator
         
         if trend_type == "increasing":
             return slope > self.parameters.get("threshold", 0.01)
@@ -154,46 +409,22 @@ class AlertCondition:
     
     def _extract_metric_value(self, data: Dict[str, Any], metric: str) -> Optional[float]:
         """Extrae valor de métrica de los datos"""
-        try:
-            # Soporte para paths anidados como "metrics.total_volume"
-            keys = metric.split(".")
-            value = data
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    return None
-            
-            return float(value) if value is not None else None
-        except (ValueError, TypeError):
-            return None
+        return _extract_metric_value(data, metric)
     
     def _extract_time_series(self, data: Dict[str, Any], metric: str) -> List[float]:
         """Extrae serie temporal de métrica"""
-        # Implementación simplificada - busca arrays de valores
-        values = []
-        metric_value = self._extract_metric_value(data, metric)
-        
-        if metric_value is not None:
-            values.append(metric_value)
-            
-        # Busca datos históricos si están disponibles
-        if "historical_data" in data:
-            historical = data["historical_data"]
-            if isinstance(historical, list):
-                for entry in historical:
-                    val = self._extract_metric_value(entry, metric)
-                    if val is not None:
-                        values.append(val)
-        
-        return values
+        return _extract_time_series(data, metric)
     
-    def _check_consecutive_increases(self, data: Dict[str, Any]) -> bool:
+    def _check_consecutive_increases(self, context: EvaluationContext) -> bool:
         """Verifica aumentos consecutivos"""
         metric = self.parameters.get("metric")
         min_consecutive = self.parameters.get("min_consecutive", 3)
+
+        if self._is_streaming(context):
+            run = self._observe(context, metric, IncreaseRun) if metric else None
+            return run is not None and run.run >= min_consecutive
         
-        values = self._extract_time_series(data, metric)
+        values = context.series(metric)
         if len(values) < min_consecutive + 1:
             return False
             
@@ -208,12 +439,19 @@ class AlertCondition:
                 
         return False
     
-    def _check_volatility_spike(self, data: Dict[str, Any]) -> bool:
+    def _check_volatility_spike(self, context: EvaluationContext) -> bool:
         """Verifica picos de volatilidad"""
         metric = self.parameters.get("metric")
         volatility_threshold = self.parameters.get("volatility_threshold", 0.1)
+
+        if self._is_streaming(context):
+            alpha = self.parameters.get("ewma_alpha", DEFAULT_VOLATILITY_ALPHA)
+            ewma = self._observe(context, metric, lambda: EwmaVolatility(alpha)) if metric else None
+            if ewma is None or ewma.observations < 5 or ewma.changes < 3:
+                return False
+            return ewma.volatility > volatility_threshold
         
-        values = self._extract_time_series(data, metric)
+        values = context.series(metric)
         if len(values) < 5:
             return False
             
@@ -233,7 +471,7 @@ class AlertCondition:
         
         return volatility > volatility_threshold
     
-    def _check_unusual_distribution(self, data: Dict[str, Any]) -> bool:
+    def _check_unusual_distribution(self, context: EvaluationContext) -> bool:
         """Verifica distribuciones inusuales"""
         # Implementación simplificada
         return False
@@ -279,14 +517,22 @@ class AlertEngine:
     Monitorea condiciones y genera alertas automáticas
     """
     
-    def __init__(self):
-        """Inicializa el motor de alertas"""
+    def __init__(self, history_size: int = 1000, archive: Optional[AlertArchive] = None):
+        """Inicializa el motor de alertas.
+
+        Args:
+            history_size: Alertas que conserva el historial en memoria
+            archive: Destino de las alertas que salen del historial (p.ej. ``SQLiteAlertArchive``)
+        """
         self.conditions: List[AlertCondition] = []
-        self.active_alerts: List[Alert] = []
-        self.alert_history: List[Alert] = []
+        self.active_alerts = ActiveAlertStore()
+        self.alert_history = AlertHistory(max_size=history_size, archive=archive)
+        # Al cerrar, al recolectar el motor o al salir el proceso se escribe el último lote
+        self._history_finalizer = weakref.finalize(self, self.alert_history.flush)
         self.metrics = {
             "total_evaluations": 0,
             "alerts_triggered": 0,
+            "alerts_deduplicated": 0,
             "alerts_resolved": 0,
             "conditions_checked": 0,
             "avg_evaluation_time": 0.0
@@ -412,15 +658,28 @@ class AlertEngine:
         self.metrics["total_evaluations"] += 1
         
         logger.info(f"[{trace_id}] Evaluando {len(self.conditions)} condiciones de alerta")
+
+        # Una sola extracción por métrica, compartida entre condiciones
+        context = EvaluationContext(data)
         
         for condition in self.conditions:
             try:
                 self.metrics["conditions_checked"] += 1
                 
-                if condition.evaluate(data):
+                if condition.evaluate(data, context):
+                    # Una sola alerta activa por condición y entidad; sin entidad no se deduplica
+                    entity = context.entity(condition.parameters.get("entity_key", STREAM_ENTITY_KEY))
+                    dedupe_key = (condition.name, entity) if entity is not None else None
+                    existing = self.active_alerts.find(dedupe_key) if dedupe_key is not None else None
+                    if existing is not None:
+                        existing.metadata["occurrences"] = existing.metadata.get("occurrences", 1) + 1
+                        existing.metadata["last_triggered_at"] = datetime.now(timezone.utc).isoformat()
+                        self.metrics["alerts_deduplicated"] += 1
+                        continue
+
                     alert = self._create_alert(condition, data, trace_id)
                     new_alerts.append(alert)
-                    self.active_alerts.append(alert)
+                    self.active_alerts.add(alert, dedupe_key)
                     self.alert_history.append(alert)
                     self.metrics["alerts_triggered"] += 1
                     
@@ -439,7 +698,7 @@ class AlertEngine:
     
     def _create_alert(self, condition: AlertCondition, data: Dict[str, Any], trace_id: str) -> Alert:
         """Crea alerta basada en condición disparada"""
-        alert_id = f"alert_{int(time.time())}_{condition.name}"
+        alert_id = f"alert_{int(time.time())}_{condition.name}_{uuid4().hex[:8]}"
         
         # Determinar severidad y categoría basado en la condición
         severity, category = self._determine_alert_properties(condition, data)
@@ -608,45 +867,36 @@ class AlertEngine:
     
     def resolve_alert(self, alert_id: str, resolution_note: Optional[str] = None) -> bool:
         """Marca alerta como resuelta"""
-        for alert in self.active_alerts:
-            if alert.id == alert_id:
-                alert.resolved = True
-                alert.resolved_at = datetime.now(timezone.utc)
-                if resolution_note:
-                    alert.metadata["resolution_note"] = resolution_note
-                
-                # Remover de alertas activas
-                self.active_alerts.remove(alert)
-                self.metrics["alerts_resolved"] += 1
-                
-                logger.info(f"Alerta resuelta: {alert_id}")
-                return True
-        
-        logger.warning(f"Alerta no encontrada para resolver: {alert_id}")
-        return False
+        alert = self.active_alerts.remove(alert_id)
+        if alert is None:
+            logger.warning(f"Alerta no encontrada para resolver: {alert_id}")
+            return False
+
+        alert.resolved = True
+        alert.resolved_at = datetime.now(timezone.utc)
+        if resolution_note:
+            alert.metadata["resolution_note"] = resolution_note
+
+        # Si ya salió del historial en memoria, se actualiza la copia archivada
+        self.alert_history.record_resolution(alert)
+        self.metrics["alerts_resolved"] += 1
+
+        logger.info(f"Alerta resuelta: {alert_id}")
+        return True
     
     def get_active_alerts(self, severity_filter: Optional[AlertSeverity] = None,
                          category_filter: Optional[AlertCategory] = None) -> List[Alert]:
         """Obtiene alertas activas con filtros opcionales"""
-        filtered_alerts = self.active_alerts.copy()
-        
-        if severity_filter:
-            filtered_alerts = [a for a in filtered_alerts if a.severity == severity_filter]
-            
-        if category_filter:
-            filtered_alerts = [a for a in filtered_alerts if a.category == category_filter]
-        
-        return filtered_alerts
+        return self.active_alerts.filter(severity_filter, category_filter)
     
     def get_alert_summary(self) -> Dict[str, Any]:
         """Obtiene resumen del estado de alertas"""
-        active_by_severity = {}
-        for severity in AlertSeverity:
-            active_by_severity[severity.value] = len([a for a in self.active_alerts if a.severity == severity])
-        
-        active_by_category = {}
-        for category in AlertCategory:
-            active_by_category[category.value] = len([a for a in self.active_alerts if a.category == category])
+        active_by_severity = {
+            severity.value: self.active_alerts.count_by_severity(severity) for severity in AlertSeverity
+        }
+        active_by_category = {
+            category.value: self.active_alerts.count_by_category(category) for category in AlertCategory
+        }
         
         return {
             "total_active_alerts": len(self.active_alerts),
@@ -669,16 +919,22 @@ class AlertEngine:
             )
     
     def clear_resolved_alerts(self, older_than_hours: int = 24):
-        """Limpia alertas resueltas más antiguas que X horas"""
+        """Saca del historial en memoria las alertas resueltas de más de X horas (se archivan)"""
         cutoff_time = datetime.now(timezone.utc)
         cutoff_timestamp = cutoff_time.timestamp() - (older_than_hours * 3600)
         
-        initial_count = len(self.alert_history)
-        self.alert_history = [
-            a for a in self.alert_history 
-            if not a.resolved or a.resolved_at.timestamp() > cutoff_timestamp
-        ]
+        cleaned = self.alert_history.remove_where(
+            lambda a: a.resolved and a.resolved_at.timestamp() <= cutoff_timestamp
+        )
+        self.alert_history.flush()
         
-        cleaned = initial_count - len(self.alert_history)
         if cleaned > 0:
-            logger.info(f"Limpiadas {cleaned} alertas resueltas de más de {older_than_hours}h")
\ No newline at end of file
+            logger.info(f"Limpiadas {cleaned} alertas resueltas de más de {older_than_hours}h")
+
+    def flush_history(self):
+        """Escribe al archivo las alertas desalojadas pendientes del último lote"""
+        self.alert_history.flush()
+
+    def close(self):
+        """Escribe el último lote pendiente del historial; el archivo lo cierra quien lo creó"""
+        self._history_finalizer()
@@ -0,0 +1,246 @@
+"""
+Alert Store - Almacenamiento acotado de alertas del AlertEngine
+Alertas activas indexadas por ID, severidad, categoría y condición+entidad;
+historial en ring buffer que descarga lo desalojado a un archivo SQLite
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, Hashable, Iterator, List, Optional, Protocol, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .alert_engine import Alert, AlertCategory, AlertSeverity
+
+logger = logging.getLogger(__name__)
+
+DedupeKey = Tuple[str, Hashable]
+
+
+class ActiveAlertStore:
+    """Alertas activas con búsqueda, alta y resolución en O(1)"""
+
+    def __init__(self):
+        self._alerts: Dict[str, "Alert"] = {}
+        self._by_severity: Dict["AlertSeverity", Dict[str, "Alert"]] = {}
+        self._by_category: Dict["AlertCategory", Dict[str, "Alert"]] = {}
+        self._by_dedupe: Dict[DedupeKey, str] = {}
+        self._dedupe_of: Dict[str, DedupeKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self) -> Iterator["Alert"]:
+        return iter(list(self._alerts.values()))
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._alerts
+
+    def get(self, alert_id: str) -> Optional["Alert"]:
+        return self._alerts.get(alert_id)
+
+    def find(self, dedupe_key: DedupeKey) -> Optional["Alert"]:
+        """Alerta activa de la misma condición y entidad, si existe"""
+        alert_id = self._by_dedupe.get(dedupe_key)
+        return self._alerts.get(alert_id) if alert_id is not None else None
+
+    def add(self, alert: "Alert", dedupe_key: Optional[DedupeKey] = None) -> None:
+        self._alerts[alert.id] = alert
+        self._by_severity.setdefault(alert.severity, {})[alert.id] = alert
+        self._by_category.setdefault(alert.category, {})[alert.id] = alert
+        if dedupe_key is not None:
+            self._by_dedupe[dedupe_key] = alert.id
+            self._dedupe_of[alert.id] = dedupe_key
+
+    def remove(self, alert_id: str) -> Optional["Alert"]:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+        self._by_severity[alert.severity].pop(alert_id, None)
+        self._by_category[alert.category].pop(alert_id, None)
+        dedupe_key = self._dedupe_of.pop(alert_id, None)
+        if dedupe_key is not None and self._by_dedupe.get(dedupe_key) == alert_id:
+            del self._by_dedupe[dedupe_key]
+        return alert
+
+    def filter(
+        self,
+        severity: Optional["AlertSeverity"] = None,
+        category: Optional["AlertCategory"] = None,
+    ) -> List["Alert"]:
+        """Alertas activas por severidad y/o categoría, recorriendo el índice más chico"""
+        if severity is None and category is None:
+            return list(self._alerts.values())
+        by_severity = self._by_severity.get(severity, {}) if severity is not None else None
+        by_category = self._by_category.get(category, {}) if category is not None else None
+        if by_category is None:
+            return list(by_severity.values())
+        if by_severity is None:
+            return list(by_category.values())
+        smaller, other = sorted((by_severity, by_category), key=len)
+        return [alert for alert_id, alert in smaller.items() if alert_id in other]
+
+    def count_by_severity(self, severity: "AlertSeverity") -> int:
+        return len(self._by_severity.get(severity, ()))
+
+    def count_by_category(self, category: "AlertCategory") -> int:
+        return len(self._by_category.get(category, ()))
+
+
+class AlertArchive(Protocol):
+    """Destino de las alertas que salen del historial en memoria"""
+
+    def write_many(self, alerts: List[Dict[str, Any]]) -> None: ...
+
+
+class SQLiteAlertArchive:
+    """Archivo SQLite de alertas desalojadas del ring buffer (upsert por ID)"""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS alert_history (
+                    id TEXT PRIMARY KEY,
+                    triggered_by TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    triggered_at TEXT NOT NULL,
+                    resolved INTEGER NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_alert_history_triggered_at ON alert_history (triggered_at)"
+            )
+
+    def write_many(self, alerts: List[Dict[str, Any]]) -> None:
+        rows = [
+            (
+                alert["id"],
+                alert["triggered_by"],
+                alert["severity"],
+                alert["category"],
+                alert["triggered_at"],
+                int(bool(alert["resolved"])),
+                json.dumps(alert, ensure_ascii=False, default=str),
+            )
+            for alert in alerts
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO alert_history "
+                "(id, triggered_by, severity, category, triggered_at, resolved, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM alert_history").fetchone()[0]
+
+    def recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM alert_history ORDER BY triggered_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class AlertHistory:
+    """
+    Historial acotado: ring buffer de las últimas ``max_size`` alertas.
+
+    Las alertas desalojadas se acumulan y se escriben al ``archive`` en lotes
+    de ``spill_batch`` o cuando el lote pendiente tiene más de
+    ``flush_interval`` segundos; sin archivo se descartan.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        archive: Optional[AlertArchive] = None,
+        spill_batch: int = 100,
+        flush_interval: float = 30.0,
+    ):
+        self.max_size = max(1, max_size)
+        self.archive = archive
+        self.spill_batch = max(1, spill_batch)
+        self.flush_interval = flush_interval
+        self._ring: Deque["Alert"] = deque()
+        self._ids: Dict[str, "Alert"] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_since = 0.0
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __iter__(self) -> Iterator["Alert"]:
+        return iter(list(self._ring))
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._ids
+
+    def append(self, alert: "Alert") -> None:
+        if len(self._ring) >= self.max_size:
+            self._spill(self._ring.popleft())
+        self._ring.append(alert)
+        self._ids[alert.id] = alert
+
+    def record_resolution(self, alert: "Alert") -> None:
+        """Refleja una resolución de una alerta que ya salió del ring buffer"""
+        if alert.id not in self._ids:
+            self._queue(alert)
+
+    def remove_where(self, predicate) -> int:
+        """Saca del ring las alertas que cumplen ``predicate`` (se archivan)"""
+        kept: Deque["Alert"] = deque()
+        removed = 0
+        for alert in self._ring:
+            if predicate(alert):
+                self._spill(alert)
+                removed += 1
+            else:
+                kept.append(alert)
+        self._ring = kept
+        return removed
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self.archive is None:
+            return
+        try:
+            self.archive.write_many(pending)
+        except Exception as e:
+            logger.error(f"No se pudo archivar historial de alertas ({len(pending)}): {e}")
+
+    def _spill(self, alert: "Alert") -> None:
+        self._ids.pop(alert.id, None)
+        self._queue(alert)
+
+    def _queue(self, alert: "Alert") -> None:
+        if self.archive is None:
+            return
+        now = time.monotonic()
+        if not self._pending:
+            self._pending_since = now
+        self._pending.append(alert.to_dict())
+        if len(self._pending) >= self.spill_batch or now - self._pending_since >= self.flush_interval:
+            self.flush()
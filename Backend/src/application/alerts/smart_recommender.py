@@ -2,11 +2,16 @@
 Smart Recommender - Sistema de recomendaciones inteligentes
 Genera recomendaciones basadas en análisis financiero y LLM
 """
+import asyncio
+import hashlib
 import logging
+import math
+import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from uuid import uuid4
 
@@ -102,24 +107,206 @@ class Recommendation:
         }
 
 
+# Métricas que definen la "forma" de una situación para reutilizar recomendaciones LLM
+_SIGNATURE_RATIOS = ("risk_score", "performance_score", "liquidity_ratio", "variance")
+
+
+# Campos que identifican a la entidad: su valor no puede quedar en el texto cacheado
+_ENTITY_FIELDS = ("entity_id", "entity_name", "branch_name", "sucursal")
+# Valores más cortos (o numéricos) coinciden con cantidades del texto: no se templan
+_MIN_TEMPLATE_TOKEN_LENGTH = 3
+
+
+def _bucket_ratio(value: Any) -> str:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return "-"
+    if not math.isfinite(number):
+        return str(number)
+    return f"{round(number, 1):.1f}"
+
+
+def _bucket_magnitude(value: Any) -> str:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return "-"
+    if not math.isfinite(number):
+        return str(number)
+    return str(int(math.log10(number))) if number >= 1 else "0"
+
+
+def _entity_values(data: Dict[str, Any]) -> Dict[str, str]:
+    values = {}
+    for name in _ENTITY_FIELDS:
+        value = data.get(name)
+        if isinstance(value, (str, int)) and not isinstance(value, bool) and str(value).strip():
+            values[name] = str(value).strip()
+    return values
+
+
+def _entity_tokens(data: Dict[str, Any]) -> Dict[str, str]:
+    """Valores de la entidad que pueden buscarse en texto libre sin pisar cantidades"""
+    tokens = {}
+    for name in _ENTITY_FIELDS:
+        value = data.get(name)
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if len(value) >= _MIN_TEMPLATE_TOKEN_LENGTH and not value.isdigit():
+            tokens[name] = value
+    return tokens
+
+
+def _anonymize_request(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de la solicitud para el LLM con ``<campo>`` en lugar de cada valor de la entidad"""
+    anonymized = dict(data)
+    for name in _entity_values(data):
+        anonymized[name] = f"<{name}>"
+    analysis = anonymized.get("analysis")
+    if isinstance(analysis, str):
+        anonymized["analysis"] = _template_text(analysis, _entity_tokens(data))
+    return anonymized
+
+
+def _template_text(text: str, tokens: Dict[str, str]) -> str:
+    """Reemplaza los valores de la entidad por ``<campo>`` (los más largos primero)"""
+    for name, value in sorted(tokens.items(), key=lambda item: len(item[1]), reverse=True):
+        text = re.sub(rf"(?<!\w){re.escape(value)}(?!\w)", f"<{name}>", text)
+    return text
+
+
+def _fill_text(text: str, tokens: Dict[str, str]) -> str:
+    fallback = next(iter(tokens.values()), "la entidad")
+    for name in _ENTITY_FIELDS:
+        text = text.replace(f"<{name}>", tokens.get(name, fallback))
+    return text
+
+
+def _rewrite_recommendation(rec: "Recommendation", rewrite: Callable[[str], str], **changes) -> "Recommendation":
+    return replace(
+        rec,
+        title=rewrite(rec.title),
+        description=rewrite(rec.description),
+        rationale=rewrite(rec.rationale),
+        action_items=[replace(item, description=rewrite(item.description)) for item in rec.action_items],
+        success_metrics=[rewrite(metric) for metric in rec.success_metrics],
+        **changes,
+    )
+
+
+def recommendation_signature(data: Dict[str, Any], alerts: Optional[List] = None) -> str:
+    """
+    Firma canónica de una solicitud de recomendaciones: condición, severidad y
+    categoría de cada alerta más métricas agrupadas en buckets (ratios a 0.1,
+    volumen por orden de magnitud). Alertas de distintas entidades con la misma
+    forma comparten firma.
+    """
+    metrics = data.get("metrics", {}) or {}
+    parts = [f"{name}={_bucket_ratio(metrics.get(name))}" for name in _SIGNATURE_RATIOS]
+    parts.append(f"total_volume=1e{_bucket_magnitude(metrics.get('total_volume'))}")
+
+    alert_parts = set()
+    for alert in alerts or []:
+        if hasattr(alert, "severity") and hasattr(alert, "category"):
+            severity = getattr(alert.severity, "value", alert.severity)
+            category = getattr(alert.category, "value", alert.category)
+            alert_parts.add(f"{getattr(alert, 'triggered_by', '')}:{severity}:{category}")
+        else:
+            alert_parts.add(str(alert))
+    parts.extend(sorted(alert_parts))
+
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Cache TTL de recomendaciones LLM por firma, con coalescencia de pedidos.
+
+    Pedidos concurrentes con la misma firma esperan una sola llamada al LLM.
+    Los resultados vacíos (LLM fallido) no se guardan.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 512,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, List[Recommendation]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, signature: str) -> Optional[List["Recommendation"]]:
+        entry = self._entries.get(signature)
+        if entry is None:
+            return None
+        expires_at, recommendations = entry
+        if self._clock() >= expires_at:
+            del self._entries[signature]
+            return None
+        self._entries.move_to_end(signature)
+        return recommendations
+
+    def put(self, signature: str, recommendations: List["Recommendation"]) -> None:
+        if not recommendations or self.ttl_seconds <= 0:
+            return
+        self._entries[signature] = (self._clock() + self.ttl_seconds, recommendations)
+        self._entries.move_to_end(signature)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def get_or_load(self, signature: str, load) -> Tuple[List["Recommendation"], str]:
+        """Devuelve ``(recomendaciones, origen)`` con origen ``cache``, ``coalesced`` o ``llm``"""
+        cached = self.get(signature)
+        if cached is not None:
+            return cached, "cache"
+
+        pending = self._inflight.get(signature)
+        if pending is not None:
+            return await asyncio.shield(pending), "coalesced"
+
+        task = asyncio.ensure_future(load())
+        self._inflight[signature] = task
+
+        def settle(done: asyncio.Future) -> None:
+            # Corre aunque el primer solicitante se cancele: los demás siguen esperando
+            self._inflight.pop(signature, None)
+            if not done.cancelled() and done.exception() is None:
+                self.put(signature, done.result())
+
+        task.add_done_callback(settle)
+        return await asyncio.shield(task), "llm"
+
+
 class SmartRecommender:
     """
     Sistema de recomendaciones inteligentes para análisis financiero
     Combina reglas de negocio con LLM reasoning para generar recomendaciones
     """
     
-    def __init__(self, llm_reasoner=None):
+    def __init__(self, llm_reasoner=None, llm_cache_ttl: float = 300.0):
         """
         Inicializa el sistema de recomendaciones
         
         Args:
             llm_reasoner: Instancia de LLMReasoner para recomendaciones inteligentes
+            llm_cache_ttl: Segundos que se reutilizan las recomendaciones LLM de una misma firma
         """
         self.llm_reasoner = llm_reasoner
+        self.llm_cache = RecommendationCache(ttl_seconds=llm_cache_ttl)
         self.active_recommendations: List[Recommendation] = []
         self.recommendation_history: List[Recommendation] = []
         self.metrics = {
             "total_recommendations": 0,
+            "llm_calls": 0,
+            "llm_cache_hits": 0,
+            "llm_coalesced": 0,
             "recommendations_by_type": {},
             "recommendations_by_priority": {},
             "implementation_rate": 0.0,
@@ -209,29 +396,118 @@ class SmartRecommender:
             rule_based = self._generate_rule_based_recommendations(analysis_data, alert_context, trace_id)
             recommendations.extend(rule_based)
             
-            # Generar recomendaciones usando LLM si está disponible
+            # Recomendaciones LLM (cacheadas por firma) si está disponible
             if self.llm_reasoner:
-                llm_based = await self._generate_llm_recommendations(analysis_data, alert_context, trace_id)
+                llm_based = await self._cached_llm_recommendations(analysis_data, alert_context, trace_id)
                 recommendations.extend(llm_based)
             
-            # Post-procesar y filtrar recomendaciones
-            recommendations = self._post_process_recommendations(recommendations, trace_id)
-            
-            # Actualizar métricas
-            generation_time = time.time() - start_time
-            self._update_metrics(recommendations, generation_time)
-            
-            # Almacenar recomendaciones
-            for rec in recommendations:
-                self.active_recommendations.append(rec)
-                self.recommendation_history.append(rec)
-            
-            logger.info(f"[{trace_id}] Generadas {len(recommendations)} recomendaciones en {generation_time:.2f}s")
+            recommendations = self._store_recommendations(recommendations, trace_id, start_time)
             
         except Exception as e:
             logger.error(f"[{trace_id}] Error generando recomendaciones: {e}")
             
         return recommendations
+
+    async def stream_recommendations(self,
+                                     analysis_data: Dict[str, Any],
+                                     alert_context: Optional[List] = None,
+                                     trace_id: Optional[str] = None) -> AsyncIterator[List[Recommendation]]:
+        """
+        Igual que ``generate_recommendations`` pero en dos entregas: primero las
+        recomendaciones de templates (inmediatas) y después, si hay LLM, el
+        refinamiento cacheado/coalescido por firma.
+        """
+        if not trace_id:
+            trace_id = str(uuid4())
+
+        start_time = time.time()
+        delivered: List[Recommendation] = []
+        try:
+            rule_based = self._post_process_recommendations(
+                self._generate_rule_based_recommendations(analysis_data, alert_context, trace_id), trace_id
+            )
+            self._remember_recommendations(rule_based)
+            delivered.extend(rule_based)
+            yield rule_based
+
+            if self.llm_reasoner:
+                llm_based = await self._cached_llm_recommendations(analysis_data, alert_context, trace_id)
+                # Sin repetir títulos ya entregados en la primera tanda
+                seen = {self._title_key(rec) for rec in delivered}
+                refined = [
+                    rec for rec in self._post_process_recommendations(llm_based, trace_id)
+                    if self._title_key(rec) not in seen
+                ]
+                if refined:
+                    self._remember_recommendations(refined)
+                    delivered.extend(refined)
+                    yield refined
+        finally:
+            # Una sola generación en métricas, aunque se entregue en dos tandas
+            generation_time = time.time() - start_time
+            self._update_metrics(delivered, generation_time)
+            logger.info(f"[{trace_id}] Generadas {len(delivered)} recomendaciones en {generation_time:.2f}s")
+
+    def _store_recommendations(self, recommendations: List[Recommendation], trace_id: str,
+                               start_time: float) -> List[Recommendation]:
+        """Post-procesa, registra métricas y guarda como activas"""
+        recommendations = self._post_process_recommendations(recommendations, trace_id)
+
+        generation_time = time.time() - start_time
+        self._update_metrics(recommendations, generation_time)
+        self._remember_recommendations(recommendations)
+
+        logger.info(f"[{trace_id}] Generadas {len(recommendations)} recomendaciones en {generation_time:.2f}s")
+        return recommendations
+
+    def _remember_recommendations(self, recommendations: List[Recommendation]) -> None:
+        for rec in recommendations:
+            self.active_recommendations.append(rec)
+            self.recommendation_history.append(rec)
+
+    @staticmethod
+    def _title_key(rec: Recommendation) -> str:
+        return rec.title.lower().replace(" ", "")
+
+    async def _cached_llm_recommendations(self,
+                                          data: Dict[str, Any],
+                                          alerts: Optional[List],
+                                          trace_id: str) -> List[Recommendation]:
+        """Recomendaciones LLM reutilizadas entre solicitudes con la misma firma"""
+        signature = recommendation_signature(data, alerts)
+
+        tokens = _entity_tokens(data)
+        values = _entity_values(data)
+
+        async def load() -> List[Recommendation]:
+            self.metrics["llm_calls"] += 1
+            # El LLM solo ve marcadores: un número en su respuesta es una cantidad, no la entidad
+            generated = await self._generate_llm_recommendations(_anonymize_request(data), alerts, trace_id)
+            # Lo que se cachea no nombra a la entidad que originó la llamada
+            return [_rewrite_recommendation(rec, lambda text: _template_text(text, tokens)) for rec in generated]
+
+        if self.llm_cache.ttl_seconds <= 0:
+            cached, source = await load(), "llm"
+        else:
+            cached, source = await self.llm_cache.get_or_load(signature, load)
+
+        if source == "cache":
+            self.metrics["llm_cache_hits"] += 1
+        elif source == "coalesced":
+            self.metrics["llm_coalesced"] += 1
+
+        # Cada solicitud recibe copias propias (estado, IDs y contexto independientes)
+        return [
+            _rewrite_recommendation(
+                rec,
+                lambda text: _fill_text(text, values),
+                id=f"{rec.id}_{uuid4().hex[:8]}",
+                created_at=datetime.now(timezone.utc),
+                context_data=data.copy(),
+                metadata={**rec.metadata, "trace_id": trace_id, "signature": signature, "llm_source": source},
+            )
+            for rec in cached
+        ]
     
     def _generate_rule_based_recommendations(self, 
                                            data: Dict[str, Any], 
@@ -668,7 +944,7 @@ class SmartRecommender:
         seen_titles = set()
         
         for rec in recommendations:
-            title_key = rec.title.lower().replace(" ", "")
+            title_key = self._title_key(rec)
             if title_key not in seen_titles:
                 seen_titles.add(title_key)
                 unique_recommendations.append(rec)
@@ -723,7 +999,7 @@ class SmartRecommender:
         current_avg_time = self.metrics["avg_generation_time"]
         total_generations = len(self.recommendation_history)  # Proxy para total de generaciones
         
-        if total_generations == 1:
+        if total_generations <= 1:
             self.metrics["avg_generation_time"] = generation_time
         else:
             self.metrics["avg_generation_time"] = (
@@ -3,11 +3,16 @@ Servicio de autorización de agentes para control de acceso granular.
 Implementa un sistema de privilegios basado en roles para agentes del sistema.
 """
 
+import asyncio
+import concurrent.futures
 import json
 import logging
 import os
+import time
+from collections import deque
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Callable, Deque, Dict, List, Optional, Set, Any, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -15,6 +20,13 @@ from src.core.exceptions import AuthorizationError, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Antigüedad máxima del snapshot de niveles leído de public.agentes
+PRIVILEGE_CACHE_TTL_SECONDS = 60.0
+# Reintento cuando no hay event loop donde agendar la recarga (ej. llamadas síncronas al arrancar)
+PRIVILEGE_CACHE_NO_LOOP_RETRY_SECONDS = 1.0
+# Entradas de auditoría retenidas en memoria (security_policies.audit_log_limit)
+AUDIT_LOG_LIMIT = 10_000
+
 
 class PrivilegeLevel(Enum):
     """Niveles de privilegios disponibles"""
@@ -37,6 +49,102 @@ class AgentPrivileges:
     reason: str
 
 
+class PrivilegeLevelCache:
+    """Snapshot de ``nombre -> nivel_privilegio`` de ``public.agentes``.
+
+    Las consultas leen un dict en memoria y nunca esperan a la BD. Cuando el
+    snapshot vence (TTL) o se invalida, se agenda una recarga en segundo plano
+    sobre el pool asyncpg compartido, en el event loop actual o en el último
+    loop que la ejecutó. Los agentes ausentes de la tabla y los fallos de
+    conexión también quedan cacheados hasta el siguiente TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = PRIVILEGE_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.loads = 0
+        self.failures = 0
+        self._clock = clock
+        self._levels: Dict[str, str] = {}
+        self._loaded_at = float("-inf")
+        self._generation = 0
+        self._next_attempt = float("-inf")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Recarga en curso (Task o Future de otro loop); se retiene para que no la recolecte el GC
+        self._refresh_task: Optional[Union[asyncio.Future, concurrent.futures.Future]] = None
+
+    def get(self, agent_name: str) -> Optional[str]:
+        """Nivel cacheado del agente o None (sin fila en BD, BD no disponible o sin cargar)."""
+        if self._clock() - self._loaded_at >= self.ttl_seconds:
+            self._schedule_refresh()
+        return self._levels.get(agent_name)
+
+    def invalidate(self, agent_name: Optional[str] = None) -> None:
+        """Descartar el nivel de un agente (o todos) y agendar una recarga inmediata."""
+        if agent_name is None:
+            self._levels = {}
+        else:
+            self._levels.pop(agent_name, None)
+        self._generation += 1
+        self._loaded_at = float("-inf")
+        self._next_attempt = float("-inf")
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        now = self._clock()
+        # Una recarga en curso (o que nunca llegó a correr) no se repite hasta el TTL
+        if now < self._next_attempt:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._next_attempt = now + self.ttl_seconds
+        if not os.getenv('DATABASE_URL'):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            task = loop.create_task(self.refresh())
+        elif self._loop is not None and self._loop.is_running():
+            task = asyncio.run_coroutine_threadsafe(self.refresh(), self._loop)
+        else:
+            self._next_attempt = now + PRIVILEGE_CACHE_NO_LOOP_RETRY_SECONDS
+            return
+        self._refresh_task = task
+        task.add_done_callback(self._log_refresh_failure)
+
+    @staticmethod
+    def _log_refresh_failure(task: Union[asyncio.Future, concurrent.futures.Future]) -> None:
+        if task.cancelled():
+            logger.warning("Recarga de nivel_privilegio cancelada")
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Recarga de nivel_privilegio falló: {error!r}")
+
+    async def refresh(self) -> None:
+        """Recargar todos los niveles con una sola consulta al pool compartido."""
+        self._loop = asyncio.get_running_loop()
+        generation = self._generation
+        try:
+            # Importación perezosa para no requerir asyncpg en entornos sin Postgres
+            from src.infrastructure.database.postgres_client import get_postgres_client
+
+            async with get_postgres_client().get_connection() as conn:
+                rows = await conn.fetch("SELECT nombre, nivel_privilegio FROM public.agentes")
+            self._levels = {row[0]: row[1] for row in rows if row[1]}
+            self.loads += 1
+        except Exception as e:
+            self.failures += 1
+            logger.debug(f"No se pudo leer nivel_privilegio de BD: {e}")
+        finally:
+            self._next_attempt = float("-inf")
+            # Una invalidación durante la carga fuerza otra recarga en la próxima consulta
+            if generation == self._generation:
+                self._loaded_at = self._clock()
+
+
 class AgentAuthorizationService:
     """
     Servicio de autorización para agentes del sistema.
@@ -58,8 +166,16 @@ class AgentAuthorizationService:
 
         self.config_path = config_path
         self.config = self._load_config()
-        self.audit_log: List[Dict[str, Any]] = []
-        # Connection info will be read from env DATABASE_URL when needed
+        audit_limit = self.config['security_policies'].get('audit_log_limit', AUDIT_LOG_LIMIT)
+        self.audit_log: Deque[Dict[str, Any]] = deque(maxlen=audit_limit)
+        self.privilege_levels = PrivilegeLevelCache()
+        # Privilegios ya resueltos por (agente, nivel en BD); la config JSON no cambia en caliente
+        self._resolved: Dict[Tuple[str, Optional[str]], AgentPrivileges] = {}
+        # 'x*' y 'x' se comparan igual, como prefijo del path
+        self._restricted_prefixes = tuple(
+            restricted[:-1] if restricted.endswith('*') else restricted
+            for restricted in self.config.get('restricted_paths', [])
+        )
 
         logger.info(f"AgentAuthorizationService initialized with config: {config_path}")
 
@@ -86,36 +202,19 @@ class AgentAuthorizationService:
             raise AuthorizationError(f"No se pudo cargar configuración de privilegios: {e}")
 
     def _get_db_privilege_level(self, agent_name: str) -> Optional[str]:
-        """Intenta obtener nivel_privilegio desde la BD (public.agentes) de forma síncrona.
+        """Nivel de ``public.agentes`` desde el snapshot cacheado, sin esperar a la BD.
 
-        Usa psycopg2 y la variable de entorno DATABASE_URL. Si no está disponible
-        o hay error, devuelve None y el sistema seguirá con la configuración JSON.
+        Devuelve None si DATABASE_URL no está definido, el agente no tiene fila
+        o el snapshot aún no se cargó; el sistema sigue con la configuración JSON.
         """
-        dsn = os.getenv('DATABASE_URL')
-        if not dsn:
-            return None
-        try:
-            # Importación perezosa para no requerir psycopg2 en entornos sin Postgres
-            import psycopg2  # type: ignore
-            # Conexión rápida con timeout corto
-            conn = psycopg2.connect(dsn, connect_timeout=2)
-            try:
-                with conn, conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT nivel_privilegio FROM public.agentes WHERE nombre = %s LIMIT 1",
-                        (agent_name,),
-                    )
-                    row = cur.fetchone()
-                    if row and row[0]:
-                        return row[0]
-            finally:
-                conn.close()
-        except Exception as e:
-            logger.debug(f"No se pudo leer nivel_privilegio de BD para {agent_name}: {e}")
-        return None
+        return self.privilege_levels.get(agent_name)
 
     def get_agent_privileges(self, agent_name: str) -> AgentPrivileges:
         """Obtener privilegios de un agente específico"""
+        db_level = self._get_db_privilege_level(agent_name)
+        cached = self._resolved.get((agent_name, db_level))
+        if cached is not None:
+            return cached
         try:
             agent_config = self.config.get('agent_assignments', {}).get(agent_name)
             if not agent_config:
@@ -128,7 +227,7 @@ class AgentAuthorizationService:
                 }
 
             # Obtener nivel de privilegios (prioridad: BD -> config JSON -> 'restricted')
-            privilege_level_name = self._get_db_privilege_level(agent_name) or agent_config.get('privilege_level', 'restricted')
+            privilege_level_name = db_level or agent_config.get('privilege_level', 'restricted')
             # Validación segura del nivel
             try:
                 privilege_level = PrivilegeLevel[privilege_level_name.upper()]
@@ -165,7 +264,7 @@ class AgentAuthorizationService:
                 )
             )
 
-            return AgentPrivileges(
+            privileges = AgentPrivileges(
                 agent_name=agent_name,
                 privilege_level=privilege_level,
                 permissions=all_permissions,
@@ -174,6 +273,8 @@ class AgentAuthorizationService:
                 allowed_extensions=allowed_extensions,
                 reason=agent_config.get('reason', 'Sin razón especificada')
             )
+            self._resolved[(agent_name, db_level)] = privileges
+            return privileges
 
         except Exception as e:
             logger.error(f"Error obteniendo privilegios para agente {agent_name}: {e}")
@@ -204,7 +305,7 @@ class AgentAuthorizationService:
                 'agent_name': agent_name,
                 'operation': operation,
                 'path': path,
-                'timestamp': logger.name,  # Simplificado para este ejemplo
+                'timestamp': datetime.now().isoformat(),
                 'additional_params': kwargs
             }
 
@@ -233,7 +334,7 @@ class AgentAuthorizationService:
             audit_entry['result'] = 'APPROVED'
             self._log_audit(audit_entry)
 
-            logger.info(f"Operación autorizada: {agent_name} -> {operation} en {path}")
+            logger.debug(f"Operación autorizada: {agent_name} -> {operation} en {path}")
             return True
 
         except Exception as e:
@@ -285,15 +386,8 @@ class AgentAuthorizationService:
         path_obj = Path(path)
 
         # Verificar paths restringidos globalmente
-        restricted_paths = self.config.get('restricted_paths', [])
-        for restricted in restricted_paths:
-            if restricted.endswith('*'):
-                # Wildcard matching
-                pattern = restricted[:-1]
-                if str(path_obj).startswith(pattern):
-                    return False
-            elif str(path_obj).startswith(restricted):
-                return False
+        if str(path_obj).startswith(self._restricted_prefixes):
+            return False
 
         # Verificar extensiones permitidas
         if path_obj.suffix and path_obj.suffix not in privileges.allowed_extensions:
@@ -312,7 +406,7 @@ class AgentAuthorizationService:
         return any(pattern in path for pattern in critical_patterns)
 
     def _log_audit(self, entry: Dict[str, Any]) -> None:
-        """Registrar entrada de auditoría"""
+        """Registrar entrada de auditoría (append-only, descarta las más viejas al llenarse)"""
         if self.config.get('security_policies', {}).get('audit_trail', True):
             self.audit_log.append(entry)
 
@@ -322,7 +416,7 @@ class AgentAuthorizationService:
 
     def get_audit_log(self) -> List[Dict[str, Any]]:
         """Obtener log de auditoría"""
-        return self.audit_log.copy()
+        return list(self.audit_log)
 
     def elevate_privileges(self, agent_name: str, target_level: str,
                          justification: str) -> bool:
@@ -336,8 +430,18 @@ class AgentAuthorizationService:
 
         # Implementar lógica de elevación temporal si fuera necesario
         logger.info(f"Elevación de privilegios para {agent_name} a {target_level}: {justification}")
+        self.invalidate_privileges(agent_name)
         return True
 
+    def invalidate_privileges(self, agent_name: Optional[str] = None) -> None:
+        """Descartar privilegios cacheados de un agente (o de todos) tras un cambio de nivel."""
+        self.privilege_levels.invalidate(agent_name)
+        if agent_name is None:
+            self._resolved.clear()
+        else:
+            for key in [key for key in self._resolved if key[0] == agent_name]:
+                del self._resolved[key]
+
 
 # Instancia global del servicio (singleton)
 _authorization_service: Optional[AgentAuthorizationService] = None
@@ -351,6 +455,12 @@ def get_authorization_service() -> AgentAuthorizationService:
     return _authorization_service
 
 
+def invalidate_agent_privileges(agent_name: Optional[str] = None) -> None:
+    """Invalidar la cache de privilegios del singleton, si ya fue creado"""
+    if _authorization_service is not None:
+        _authorization_service.invalidate_privileges(agent_name)
+
+
 def authorize_agent_operation(agent_name: str, operation: str,
                             path: Optional[str] = None, **kwargs) -> bool:
     """Función de conveniencia para autorizar operaciones"""
@@ -4,9 +4,10 @@ from __future__ import annotations
 import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Deque, Dict, Iterable, Optional
 
 from src.core.logging import get_logger
 
@@ -22,19 +23,30 @@ logger = get_logger(__name__)
 
 
 class CapiNoticiasSchedulerService:
-    """Gestiona la ejecucion automatica del agente Capi Noticias."""
+    """Gestiona la ejecucion automatica del agente Capi Noticias.
+
+    El hilo del scheduler duerme exactamente hasta la proxima corrida y se
+    despierta antes si cambia la configuracion o se detiene el servicio.
+    """
+
+    LATENCY_HISTORY = 20
 
     def __init__(self) -> None:
         self.agent = CapiNoticiasAgent()
         self.config_manager = CapiNoticiasConfigManager()
         self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._run_lock = threading.Lock()
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._next_run: Optional[datetime] = None
+        self._enabled = True
+        self._interval_minutes = 60
         self._last_result: Optional[Dict[str, Any]] = None
         self._last_error: Optional[str] = None
         self._last_trigger: Optional[str] = None
         self._is_executing = False
+        self._run_latencies: Deque[Dict[str, Any]] = deque(maxlen=self.LATENCY_HISTORY)
 
     # ------------------------------------------------------------------
     # Control de scheduler
@@ -58,18 +70,22 @@ class CapiNoticiasSchedulerService:
             logger.info("[capi_noticias] Scheduler started")
 
     def stop(self) -> None:
-        with self._lock:
+        with self._wakeup:
             self._stop_event.set()
-            if self._thread and self._thread.is_alive():
-                self._thread.join(timeout=5)
-            self._thread = None
-            logger.info("[capi_noticias] Scheduler stopped")
+            self._wakeup.notify_all()
+            thread, self._thread = self._thread, None
+        # El join se hace fuera del lock: el hilo necesita readquirirlo para salir
+        if thread and thread.is_alive():
+            thread.join(timeout=5)
+        logger.info("[capi_noticias] Scheduler stopped")
 
     def refresh_schedule(self) -> None:
-        with self._lock:
+        with self._wakeup:
             config = self.config_manager.load_config()
-            interval = max(5, config.get("interval_minutes", 60))
-            self._next_run = datetime.utcnow() + timedelta(minutes=interval)
+            self._enabled = bool(config.get("enabled", True))
+            self._interval_minutes = max(5, config.get("interval_minutes", 60))
+            self._next_run = datetime.utcnow() + timedelta(minutes=self._interval_minutes)
+            self._wakeup.notify_all()
             logger.info("[capi_noticias] Next run scheduled at %s", self._next_run.isoformat())
 
     # ------------------------------------------------------------------
@@ -82,14 +98,13 @@ class CapiNoticiasSchedulerService:
         source_urls: Optional[Iterable[str]] = None,
         max_articles_per_source: Optional[int] = None,
     ) -> Dict[str, Any]:
-        with self._lock:
-            result = self._execute_cycle(
-                trigger=trigger,
-                override_interval=None,
-                source_override=list(source_urls) if source_urls else None,
-                per_source_override=max_articles_per_source,
-            )
-            return result or {}
+        result = self._execute_cycle(
+            trigger=trigger,
+            override_interval=None,
+            source_override=list(source_urls) if source_urls else None,
+            per_source_override=max_articles_per_source,
+        )
+        return result or {}
 
     # ------------------------------------------------------------------
     # Configuracion
@@ -142,6 +157,7 @@ class CapiNoticiasSchedulerService:
                     "last_error": self._last_error,
                     "last_result": self._last_result,
                     "last_trigger": self._last_trigger,
+                    "run_latencies": list(self._run_latencies),
                 },
             }
 
@@ -150,28 +166,35 @@ class CapiNoticiasSchedulerService:
     # ------------------------------------------------------------------
     def _run_loop(self) -> None:
         logger.info("[capi_noticias] Scheduler loop started")
+        while True:
+            with self._wakeup:
+                due_at = self._wait_until_due()
+                if due_at is None:
+                    break
+                interval = self._interval_minutes
+            started = datetime.utcnow()
+            logger.info("[capi_noticias] Executing scheduled run at %s", started.isoformat())
+            self._execute_cycle(
+                trigger="scheduler",
+                override_interval=interval,
+                source_override=None,
+                per_source_override=None,
+                scheduled_for=due_at,
+            )
+        logger.info("[capi_noticias] Scheduler loop ended")
+
+    def _wait_until_due(self) -> Optional[datetime]:
+        """Bloquea (con el lock tomado) hasta la proxima corrida; ``None`` al detener."""
         while not self._stop_event.is_set():
-            config = self.config_manager.load_config()
-            if not config.get("enabled", True):
-                time.sleep(10)
+            if not self._enabled or self._next_run is None:
+                # Sin corrida programada: solo un cambio de configuracion nos despierta
+                self._wakeup.wait()
                 continue
-
-            with self._lock:
-                now = datetime.utcnow()
-                interval = max(5, config.get("interval_minutes", 60))
-                if self._next_run is None or now >= self._next_run:
-                    logger.info("[capi_noticias] Executing scheduled run at %s", now.isoformat())
-                    self._execute_cycle(
-                        trigger="scheduler",
-                        override_interval=interval,
-                        source_override=None,
-                        per_source_override=None,
-                    )
-                wait_seconds = max(5.0, min(60.0, (self._next_run - now).total_seconds())) if self._next_run else 30.0
-
-            self._stop_event.wait(wait_seconds)
-
-        logger.info("[capi_noticias] Scheduler loop ended")
+            delay = (self._next_run - datetime.utcnow()).total_seconds()
+            if delay <= 0:
+                return self._next_run
+            self._wakeup.wait(delay)
+        return None
 
     def _execute_cycle(
         self,
@@ -180,11 +203,16 @@ class CapiNoticiasSchedulerService:
         override_interval: Optional[int],
         source_override: Optional[Iterable[str]],
         per_source_override: Optional[int],
+        scheduled_for: Optional[datetime] = None,
     ) -> Optional[Dict[str, Any]]:
-        if self._is_executing:
+        if not self._run_lock.acquire(blocking=False):
             logger.info("[capi_noticias] Execution already in progress, skipping trigger=%s", trigger)
+            if scheduled_for is not None:
+                self._reschedule(override_interval)
             return None
 
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
         self._is_executing = True
         try:
             result = self.agent.run_cycle(
@@ -196,12 +224,6 @@ class CapiNoticiasSchedulerService:
                 self._last_result = result
                 self._last_error = None
                 self._last_trigger = trigger
-                if override_interval is not None:
-                    self._next_run = datetime.utcnow() + timedelta(minutes=max(5, override_interval))
-                else:
-                    config = self.config_manager.load_config()
-                    interval = max(5, config.get("interval_minutes", 60))
-                    self._next_run = datetime.utcnow() + timedelta(minutes=interval)
             return result
         except Exception as exc:  # pragma: no cover - defensive
             logger.exception("[capi_noticias] Error during run: %s", exc)
@@ -210,7 +232,30 @@ class CapiNoticiasSchedulerService:
                 self._last_trigger = trigger
             return None
         finally:
-            self._is_executing = False
+            duration = time.perf_counter() - started
+            with self._lock:
+                self._is_executing = False
+                self._run_latencies.append(
+                    {
+                        "trigger": trigger,
+                        "started_at": started_at.isoformat(),
+                        "duration_seconds": round(duration, 3),
+                        "schedule_lag_seconds": (
+                            round((started_at - scheduled_for).total_seconds(), 3) if scheduled_for else None
+                        ),
+                        "success": self._last_error is None,
+                    }
+                )
+                if self._last_error is None or scheduled_for is not None:
+                    self._reschedule(override_interval)
+            self._run_lock.release()
+            logger.info("[capi_noticias] Run finished trigger=%s duration=%.2fs", trigger, duration)
+
+    def _reschedule(self, override_interval: Optional[int]) -> None:
+        with self._wakeup:
+            interval = override_interval if override_interval is not None else self._interval_minutes
+            self._next_run = datetime.utcnow() + timedelta(minutes=max(5, interval))
+            self._wakeup.notify_all()
 
 
 _scheduler_instance: Optional[CapiNoticiasSchedulerService] = None
@@ -1,27 +1,455 @@
 from __future__ import annotations
 
 import json
-from collections import defaultdict
+import sqlite3
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from json import JSONDecodeError
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict, Iterable, List, Optional
+from threading import Lock, RLock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from src.core.logging import get_logger
 
 _logger = get_logger(__name__)
 _lock = Lock()
 
+# Consumos recientes por agente que se devuelven en el resumen
+HISTORY_LIMIT = 180
+# Los agregados en memoria se vuelcan a SQLite cada N consumos o cada N segundos
+CHECKPOINT_EVERY_RECORDS = 500
+CHECKPOINT_INTERVAL_SECONDS = 60.0
+
+_USAGE_COLUMNS = "agent, timestamp, day, tokens, prompt_tokens, completion_tokens, cost_usd, model, provider"
+
+# Un ledger por archivo: todas las instancias del servicio comparten los mismos agregados.
+# Cada instancia suma una referencia y el ledger se cierra con la última.
+_ledgers: Dict[Path, "_TokenLedger"] = {}
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        if value.endswith("Z"):
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _usage_day(value: Optional[str]) -> Optional[str]:
+    parsed = _parse_timestamp(value)
+    return parsed.date().isoformat() if parsed else None
+
+
+def _build_empty_agent_entry() -> Dict[str, Any]:
+    return {
+        "total_tokens": 0,
+        "prompt_tokens_total": 0,
+        "completion_tokens_total": 0,
+        "cost_usd": 0.0,
+        "history": [],
+        "provider": "openai",
+    }
+
+
+def _build_empty_day_bucket() -> Dict[str, Any]:
+    return {"tokens": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+
+class _TokenLedger:
+    """Log append-only de consumos con agregados por agente y por día en memoria.
+
+    Cada consumo es un INSERT en ``usage_log``. Los totales por agente y por día
+    se mantienen en memoria y se vuelcan a ``agent_totals``/``daily_totals`` en
+    un checkpoint que registra el último id incorporado. Al abrir se cargan los
+    agregados del checkpoint y se reproducen solo los consumos posteriores, así
+    que la contabilidad es exacta aunque el proceso termine sin checkpoint.
+    """
+
+    def __init__(self, db_file: Path, legacy_file: Optional[Path] = None) -> None:
+        self._lock = RLock()
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self.daily: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.last_updated: Optional[str] = None
+        self._last_id = 0
+        self._pending = 0
+        self._dirty_days: Set[Tuple[str, str]] = set()
+        self._last_checkpoint = time.monotonic()
+        self.refs = 0
+
+        self._init_schema()
+        self._load(legacy_file)
+
+    def _init_schema(self) -> None:
+        with self._lock, self._conn as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS usage_log (
+                    id INTEGER PRIMARY KEY,
+                    agent TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    day TEXT,
+                    tokens INTEGER NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL,
+                    model TEXT,
+                    provider TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_log_agent ON usage_log (agent, id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agent_totals (
+                    agent TEXT PRIMARY KEY,
+                    total_tokens INTEGER NOT NULL,
+                    prompt_tokens_total INTEGER NOT NULL,
+                    completion_tokens_total INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL,
+                    last_seen TEXT,
+                    last_model TEXT,
+                    provider TEXT
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS daily_totals (
+                    day TEXT NOT NULL,
+                    agent TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL,
+                    PRIMARY KEY (day, agent)
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS ledger_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _load(self, legacy_file: Optional[Path]) -> None:
+        with self._lock:
+            conn = self._conn
+            for agent, total, prompt, completion, cost, last_seen, last_model, provider in conn.execute(
+                "SELECT agent, total_tokens, prompt_tokens_total, completion_tokens_total, cost_usd,"
+                " last_seen, last_model, provider FROM agent_totals"
+            ):
+                entry = self._agent_entry(agent)
+                entry.update(
+                    total_tokens=total,
+                    prompt_tokens_total=prompt,
+                    completion_tokens_total=completion,
+                    cost_usd=cost,
+                    provider=provider,
+                )
+                if last_seen:
+                    entry["last_seen"] = last_seen
+                if last_model:
+                    entry["last_model"] = last_model
+            for day, agent, tokens, prompt, completion, cost in conn.execute(
+                "SELECT day, agent, tokens, prompt_tokens, completion_tokens, cost_usd FROM daily_totals"
+            ):
+                self.daily.setdefault(day, {})[agent] = {
+                    "tokens": tokens,
+                    "prompt_tokens": prompt,
+                    "completion_tokens": completion,
+                    "cost_usd": cost,
+                }
+            state = dict(conn.execute("SELECT key, value FROM ledger_state"))
+            checkpoint_id = int(state.get("checkpoint_id") or 0)
+            self.last_updated = state.get("last_updated")
+            self._last_id = checkpoint_id
+
+            # El JSON anterior solo se importa sobre un log vacío: si ya hay consumos sin
+            # checkpoint (p. ej. porque el JSON no se pudo leer) se reproducen desde el inicio
+            if (not state and legacy_file is not None and legacy_file.exists()
+                    and conn.execute("SELECT 1 FROM usage_log LIMIT 1").fetchone() is None
+                    and self._migrate_legacy(legacy_file)):
+                return
+
+            # Consumos posteriores al último checkpoint: se reproducen en orden
+            replayed = 0
+            for row_id, *usage in conn.execute(
+                f"SELECT id, {_USAGE_COLUMNS} FROM usage_log WHERE id > ? ORDER BY id", (checkpoint_id,)
+            ):
+                self._apply(*usage)
+                self._last_id = row_id
+                replayed += 1
+
+            self._load_history()
+            if replayed:
+                _logger.info({"event": "token_usage_replayed", "records": replayed})
+                self.checkpoint()
+
+    def _load_history(self) -> None:
+        for agent, entry in self.agents.items():
+            rows = self._conn.execute(
+                f"SELECT {_USAGE_COLUMNS} FROM usage_log WHERE agent = ? ORDER BY id DESC LIMIT ?",
+                (agent, HISTORY_LIMIT),
+            ).fetchall()
+            entry["history"] = deque((self._history_record(*row) for row in reversed(rows)), maxlen=HISTORY_LIMIT)
+
+    def _migrate_legacy(self, legacy_file: Path) -> bool:
+        """Importa ``token_tracking.json``: los totales del archivo mandan, el historial alimenta los días.
+
+        El JSON queda intacto; el checkpoint en ``ledger_state`` evita volver a importarlo.
+        Devuelve ``False`` si el archivo no se pudo leer.
+        """
+        try:
+            with legacy_file.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            if not isinstance(data, dict):
+                raise ValueError("token_tracking.json no contiene un objeto")
+        except (JSONDecodeError, OSError, ValueError) as exc:
+            _logger.warning({"event": "token_tracking_load_failed", "error": str(exc)})
+            return False
+
+        # Importación y checkpoint en la misma transacción: un corte a mitad no duplica consumos
+        with self._lock, self._conn as conn:
+            for agent, legacy_entry in (data.get("agents") or {}).items():
+                entry = self._agent_entry(agent)
+                for record in legacy_entry.get("history") or []:
+                    usage = (
+                        agent,
+                        record.get("timestamp") or "",
+                        _usage_day(record.get("timestamp")),
+                        int(record.get("tokens", 0)),
+                        int(record.get("prompt_tokens", 0)),
+                        int(record.get("completion_tokens", 0)),
+                        float(record.get("cost_usd", 0.0)),
+                        record.get("model"),
+                        record.get("provider"),
+                    )
+                    cursor = conn.execute(
+                        f"INSERT INTO usage_log ({_USAGE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", usage
+                    )
+                    self._last_id = cursor.lastrowid
+                    self._apply_day(*usage[:7])
+                entry.update(
+                    total_tokens=int(legacy_entry.get("total_tokens", 0)),
+                    prompt_tokens_total=int(legacy_entry.get("prompt_tokens_total", 0)),
+                    completion_tokens_total=int(legacy_entry.get("completion_tokens_total", 0)),
+                    cost_usd=float(legacy_entry.get("cost_usd", 0.0)),
+                    provider=legacy_entry.get("provider", "openai"),
+                )
+                for key in ("last_seen", "last_model"):
+                    if legacy_entry.get(key):
+                        entry[key] = legacy_entry[key]
+            self.last_updated = data.get("last_updated")
+            self._load_history()
+            self.checkpoint()
+        _logger.info({"event": "token_tracking_migrated", "agents": len(self.agents), "records": self._last_id})
+        return True
+
+    def record(
+        self,
+        agent: str,
+        timestamp: str,
+        tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost_usd: float,
+        model: Optional[str],
+        provider: Optional[str],
+    ) -> Dict[str, Any]:
+        usage = (agent, timestamp, _usage_day(timestamp), tokens, prompt_tokens, completion_tokens, cost_usd, model, provider)
+        with self._lock:
+            with self._conn as conn:
+                cursor = conn.execute(f"INSERT INTO usage_log ({_USAGE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", usage)
+            self._last_id = cursor.lastrowid
+            entry = self._apply(*usage)
+            entry["history"].append(self._history_record(*usage))
+
+            self._pending += 1
+            if (self._pending >= CHECKPOINT_EVERY_RECORDS or
+                    time.monotonic() - self._last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS):
+                self.checkpoint()
+            return {key: entry[key] for key in ("total_tokens", "cost_usd", "prompt_tokens_total", "completion_tokens_total")}
+
+    def ensure_agents(self, agent_ids: Iterable[str]) -> bool:
+        with self._lock:
+            created = [agent for agent in agent_ids if agent not in self.agents]
+            for agent in created:
+                self._agent_entry(agent)
+            if created:
+                self.last_updated = self.last_updated or datetime.utcnow().isoformat()
+                self.checkpoint()
+            return bool(created)
+
+    def checkpoint(self) -> None:
+        """Vuelca los agregados en memoria y el último id incorporado en una sola transacción."""
+        with self._lock, self._conn as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO agent_totals (agent, total_tokens, prompt_tokens_total,"
+                " completion_tokens_total, cost_usd, last_seen, last_model, provider) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        agent,
+                        entry["total_tokens"],
+                        entry["prompt_tokens_total"],
+                        entry["completion_tokens_total"],
+                        entry["cost_usd"],
+                        entry.get("last_seen"),
+                        entry.get("last_model"),
+                        entry.get("provider"),
+                    )
+                    for agent, entry in self.agents.items()
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_totals (day, agent, tokens, prompt_tokens, completion_tokens, cost_usd)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (day, agent, bucket["tokens"], bucket["prompt_tokens"], bucket["completion_tokens"], bucket["cost_usd"])
+                    for day, agent in self._dirty_days
+                    for bucket in (self.daily[day][agent],)
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO ledger_state (key, value) VALUES (?, ?)",
+                [("checkpoint_id", str(self._last_id)), ("last_updated", self.last_updated)],
+            )
+            self._dirty_days.clear()
+            self._pending = 0
+            self._last_checkpoint = time.monotonic()
+
+    def snapshot_agents(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {agent: {**entry, "history": list(entry["history"])} for agent, entry in self.agents.items()}
+
+    def snapshot_days(self, first_day: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            return {
+                day: {agent: dict(bucket) for agent, bucket in agents.items()}
+                for day, agents in self.daily.items()
+                if day >= first_day
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self.checkpoint()
+            self._conn.close()
+
+    def _agent_entry(self, agent: str) -> Dict[str, Any]:
+        entry = self.agents.get(agent)
+        if entry is None:
+            entry = _build_empty_agent_entry()
+            entry["history"] = deque(maxlen=HISTORY_LIMIT)
+            self.agents[agent] = entry
+        return entry
+
+    def _apply(
+        self,
+        agent: str,
+        timestamp: str,
+        day: Optional[str],
+        tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost_usd: float,
+        model: Optional[str],
+        provider: Optional[str],
+    ) -> Dict[str, Any]:
+        entry = self._agent_entry(agent)
+        entry["total_tokens"] += tokens
+        entry["prompt_tokens_total"] += prompt_tokens
+        entry["completion_tokens_total"] += completion_tokens
+        entry["cost_usd"] = round(entry["cost_usd"] + cost_usd, 6)
+        entry["last_seen"] = timestamp
+        if model:
+            entry["last_model"] = model
+        if provider:
+            entry["provider"] = provider
+        self.last_updated = timestamp
+        self._apply_day(agent, timestamp, day, tokens, prompt_tokens, completion_tokens, cost_usd)
+        return entry
+
+    def _apply_day(
+        self,
+        agent: str,
+        timestamp: str,
+        day: Optional[str],
+        tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost_usd: float,
+    ) -> None:
+        if day is None:
+            return
+        bucket = self.daily.setdefault(day, {}).setdefault(agent, _build_empty_day_bucket())
+        bucket["tokens"] += tokens
+        bucket["prompt_tokens"] += prompt_tokens
+        bucket["completion_tokens"] += completion_tokens
+        bucket["cost_usd"] = round(bucket["cost_usd"] + cost_usd, 6)
+        self._dirty_days.add((day, agent))
+
+    @staticmethod
+    def _history_record(
+        agent: str,
+        timestamp: str,
+        day: Optional[str],
+        tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cost_usd: float,
+        model: Optional[str],
+        provider: Optional[str],
+    ) -> Dict[str, Any]:
+        return {
+            "timestamp": timestamp,
+            "tokens": tokens,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": cost_usd,
+            "model": model,
+            "provider": provider,
+        }
+
+
+def _acquire_ledger(token_file: Path) -> _TokenLedger:
+    key = token_file.resolve()
+    with _lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = _TokenLedger(token_file.with_suffix(".db"), legacy_file=token_file)
+            _ledgers[key] = ledger
+        ledger.refs += 1
+        return ledger
+
+
+def _release_ledger(token_file: Path, ledger: _TokenLedger) -> None:
+    key = token_file.resolve()
+    with _lock:
+        ledger.refs -= 1
+        if ledger.refs > 0:
+            return
+        if _ledgers.get(key) is ledger:
+            del _ledgers[key]
+    ledger.close()
 
 
 class TokenUsageService:
-    """Gestiona la persistencia del uso de tokens de los agentes."""
+    """Gestiona la persistencia del uso de tokens de los agentes.
+
+    Los consumos se agregan a un log en SQLite (``token_tracking.db``) y los
+    totales por agente y por día se sirven desde memoria, de modo que registrar
+    un consumo es un INSERT y el resumen cuesta O(días x agentes).
+    """
 
     def __init__(self, token_file: Path | None = None) -> None:
         backend_root = Path(__file__).resolve().parents[3]
         self._token_file = token_file or backend_root / "ia_workspace" / "data" / "token_tracking.json"
         self._token_file.parent.mkdir(parents=True, exist_ok=True)
+        self._ledger = _acquire_ledger(self._token_file)
+        self._closed = False
 
     def record_usage(
         self,
@@ -47,40 +475,9 @@ class TokenUsageService:
         cost_value = max(float(cost_usd), 0.0)
         timestamp = usage_timestamp or datetime.utcnow().isoformat()
 
-        with _lock:
-            data = self._load_data()
-            agents = data.setdefault("agents", {})
-            agent_entry = agents.setdefault(agent_id, self._build_empty_agent_entry())
-            if self._normalize_agent_entry(agent_entry):
-                data["agents"][agent_id] = agent_entry
-
-            agent_entry["total_tokens"] = int(agent_entry.get("total_tokens", 0)) + tokens_value
-            agent_entry["prompt_tokens_total"] = int(agent_entry.get("prompt_tokens_total", 0)) + prompt_tokens
-            agent_entry["completion_tokens_total"] = int(agent_entry.get("completion_tokens_total", 0)) + completion_tokens
-            agent_entry["cost_usd"] = round(float(agent_entry.get("cost_usd", 0.0)) + cost_value, 6)
-            agent_entry["last_seen"] = timestamp
-            if model:
-                agent_entry["last_model"] = model
-            if provider:
-                agent_entry["provider"] = provider
-
-            history = agent_entry.setdefault("history", [])
-            history.append(
-                {
-                    "timestamp": timestamp,
-                    "tokens": tokens_value,
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "cost_usd": cost_value,
-                    "model": model,
-                    "provider": provider,
-                }
-            )
-            if len(history) > 180:
-                agent_entry["history"] = history[-180:]
-
-            data["last_updated"] = timestamp
-            self._write_data(data)
+        totals = self._ledger.record(
+            agent_id, timestamp, tokens_value, prompt_tokens, completion_tokens, cost_value, model, provider
+        )
 
         return {
             "agent": agent_id,
@@ -88,42 +485,28 @@ class TokenUsageService:
             "prompt_tokens_recorded": prompt_tokens,
             "completion_tokens_recorded": completion_tokens,
             "cost_recorded": cost_value,
-            "total_tokens": agent_entry["total_tokens"],
-            "total_cost": agent_entry["cost_usd"],
-            "prompt_tokens_total": agent_entry["prompt_tokens_total"],
-            "completion_tokens_total": agent_entry["completion_tokens_total"],
+            "total_tokens": totals["total_tokens"],
+            "total_cost": totals["cost_usd"],
+            "prompt_tokens_total": totals["prompt_tokens_total"],
+            "completion_tokens_total": totals["completion_tokens_total"],
         }
 
     def ensure_agents(self, agent_names: Iterable[str]) -> None:
-        with _lock:
-            data = self._load_data()
-            if self._ensure_agent_entries(data, agent_names):
-                data["last_updated"] = data.get("last_updated") or datetime.utcnow().isoformat()
-                self._write_data(data)
+        self._ledger.ensure_agents(self._normalize_agent_name(name) for name in agent_names or [])
 
     def get_summary(self, default_agents: Iterable[str] | None = None, days: int = 30) -> Dict[str, Any]:
         if days <= 0:
             days = 30
-        with _lock:
-            data = self._load_data()
-            changed = False
-            if default_agents and self._ensure_agent_entries(data, default_agents):
-                changed = True
-            agents = data.get("agents", {})
-            for agent_id, entry in agents.items():
-                if self._normalize_agent_entry(entry):
-                    changed = True
-            if changed:
-                data["agents"] = agents
-                data["last_updated"] = data.get("last_updated") or datetime.utcnow().isoformat()
-                self._write_data(data)
+        if default_agents:
+            self.ensure_agents(default_agents)
+        agents = self._ledger.snapshot_agents()
 
         total_tokens = sum(int(agent.get("total_tokens", 0)) for agent in agents.values())
         total_cost = round(sum(float(agent.get("cost_usd", 0.0)) for agent in agents.values()), 6)
         total_prompt_tokens = sum(int(agent.get("prompt_tokens_total", 0)) for agent in agents.values())
         total_completion_tokens = sum(int(agent.get("completion_tokens_total", 0)) for agent in agents.values())
 
-        timeline = self._build_cost_timeline(agents, days)
+        timeline = self._build_cost_timeline(days)
 
         return {
             "timestamp": datetime.utcnow().isoformat(),
@@ -136,7 +519,7 @@ class TokenUsageService:
         }
 
     def build_empty_summary(self, agent_names: Iterable[str]) -> Dict[str, Any]:
-        agents = {self._normalize_agent_name(name): self._build_empty_agent_entry() for name in agent_names}
+        agents = {self._normalize_agent_name(name): _build_empty_agent_entry() for name in agent_names}
         return {
             "timestamp": datetime.utcnow().isoformat(),
             "agents": agents,
@@ -148,33 +531,18 @@ class TokenUsageService:
         }
 
     def load_data(self) -> Dict[str, Any]:
-        with _lock:
-            return self._load_data()
+        return {"agents": self._ledger.snapshot_agents(), "last_updated": self._ledger.last_updated}
+
+    def close(self) -> None:
+        """Libera el ledger compartido; la última instancia abierta hace el checkpoint final y lo cierra."""
+        if self._closed:
+            return
+        self._closed = True
+        _release_ledger(self._token_file, self._ledger)
 
-    def _build_cost_timeline(self, agents: Dict[str, Any], days: int) -> List[Dict[str, Any]]:
+    def _build_cost_timeline(self, days: int) -> List[Dict[str, Any]]:
         cutoff = datetime.utcnow().date() - timedelta(days=days - 1)
-        daily_totals: Dict[str, Dict[str, Any]] = {}
-
-        for agent_name, entry in agents.items():
-            for record in entry.get("history", []):
-                record_dt = self._parse_timestamp(record.get("timestamp"))
-                if not record_dt:
-                    continue
-                if record_dt.date() < cutoff:
-                    continue
-                key = record_dt.date().isoformat()
-                day_entry = daily_totals.setdefault(
-                    key,
-                    {
-                        "date": key,
-                        "agents": defaultdict(lambda: {"tokens": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}),
-                    },
-                )
-                agent_bucket = day_entry["agents"][agent_name]
-                agent_bucket["tokens"] += int(record.get("tokens", 0))
-                agent_bucket["prompt_tokens"] += int(record.get("prompt_tokens", 0))
-                agent_bucket["completion_tokens"] += int(record.get("completion_tokens", 0))
-                agent_bucket["cost_usd"] = round(agent_bucket["cost_usd"] + float(record.get("cost_usd", 0.0)), 6)
+        daily_totals = self._ledger.snapshot_days(cutoff.isoformat())
 
         timeline: List[Dict[str, Any]] = []
         for date_key in sorted(daily_totals.keys()):
@@ -183,7 +551,7 @@ class TokenUsageService:
             total_cost = 0.0
             total_prompt = 0
             total_completion = 0
-            for agent_name, payload in daily_totals[date_key]["agents"].items():
+            for agent_name, payload in daily_totals[date_key].items():
                 agents_payload[agent_name] = payload
                 total_tokens += payload["tokens"]
                 total_cost = round(total_cost + payload["cost_usd"], 6)
@@ -201,74 +569,6 @@ class TokenUsageService:
             )
         return timeline
 
-    def _load_data(self) -> Dict[str, Any]:
-        if not self._token_file.exists():
-            return {"agents": {}, "last_updated": None}
-
-        try:
-            with self._token_file.open("r", encoding="utf-8") as file:
-                return json.load(file)
-        except (JSONDecodeError, OSError) as exc:
-            _logger.warning(
-                {
-                    "event": "token_tracking_load_failed",
-                    "error": str(exc),
-                }
-            )
-            return {"agents": {}, "last_updated": None}
-
-    def _write_data(self, data: Dict[str, Any]) -> None:
-        temp_file = self._token_file.with_suffix(".tmp")
-        with temp_file.open("w", encoding="utf-8") as file:
-            json.dump(data, file, indent=2)
-        temp_file.replace(self._token_file)
-
     @staticmethod
     def _normalize_agent_name(name: str | None) -> str:
         return (name or "").strip() or "unknown"
-
-    @staticmethod
-    def _build_empty_agent_entry() -> Dict[str, Any]:
-        return {
-            "total_tokens": 0,
-            "prompt_tokens_total": 0,
-            "completion_tokens_total": 0,
-            "cost_usd": 0.0,
-            "history": [],
-            "provider": "openai",
-        }
-
-    def _ensure_agent_entries(self, data: Dict[str, Any], agent_names: Iterable[str]) -> bool:
-        updated = False
-        agents = data.setdefault("agents", {})
-        for name in agent_names or []:
-            agent_id = self._normalize_agent_name(name)
-            if agent_id not in agents:
-                agents[agent_id] = self._build_empty_agent_entry()
-                updated = True
-        return updated
-
-    @staticmethod
-    def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-        try:
-            if value.endswith("Z"):
-                return datetime.fromisoformat(value.replace("Z", "+00:00"))
-            return datetime.fromisoformat(value)
-        except ValueError:
-            return None
-
-    @staticmethod
-    def _normalize_agent_entry(entry: Dict[str, Any]) -> bool:
-        updated = False
-        if "prompt_tokens_total" not in entry:
-            entry["prompt_tokens_total"] = 0
-            updated = True
-        if "completion_tokens_total" not in entry:
-            entry["completion_tokens_total"] = 0
-            updated = True
-        if "history" not in entry or not isinstance(entry.get("history"), list):
-            entry["history"] = []
-            updated = True
-        return updated
@@ -98,6 +98,10 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(default="sqlite:///./data/capi.db", description="Database URL")
     DATABASE_POOL_SIZE: int = Field(default=10, description="Database pool size", ge=1, le=100)
+    ALERTS_SEARCH_TRIGRAM_FALLBACK: bool = Field(
+        default=True,
+        description="Fall back to pg_trgm title similarity when alert full-text search finds nothing",
+    )
 
     # Logging
     LOG_LEVEL: LogLevel = Field(default=LogLevel.INFO, description="Log level")
@@ -108,10 +112,22 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enable rate limiting")
     RATE_LIMIT_REQUESTS: int = Field(default=100, description="Requests per minute", ge=1)
     RATE_LIMIT_WINDOW: int = Field(default=60, description="Rate limit window in seconds", ge=1)
+    RATE_LIMIT_BACKEND: str = Field(default="memory", description="Rate limit store (memory|sqlite shared by workers)")
+    RATE_LIMIT_SQLITE_PATH: str = Field(default="/tmp/capi_rate_limits.db", description="SQLite file for RATE_LIMIT_BACKEND=sqlite")
+    RATE_LIMIT_MAX_KEYS: int = Field(default=100_000, description="Max tracked clients in the in-memory rate limit store", ge=16)
 
     # Cache
     REDIS_URL: Optional[str] = Field(default=None, description="Redis URL for caching")
     CACHE_TTL: int = Field(default=3600, description="Cache TTL in seconds", ge=60)
+    SNAPSHOT_CACHE_TTL: float = Field(
+        default=30.0,
+        description="Max age in seconds of the saldos/maps read snapshots (0 = only explicit invalidation)",
+        ge=0,
+    )
+    SNAPSHOT_CACHE_LISTEN: bool = Field(
+        default=False,
+        description="Invalidate saldos/maps snapshots from Postgres LISTEN/NOTIFY",
+    )
 
     # File Storage
     UPLOAD_MAX_SIZE: int = Field(default=10 * 1024 * 1024, description="Max upload size in bytes")
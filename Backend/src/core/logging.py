@@ -13,15 +13,19 @@ ARCHITECTURE.md Compliance:
 from __future__ import annotations
 
 import asyncio
+import atexit
 import builtins
+import copy
 import json
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 try:
     from pythonjsonlogger.json import JsonFormatter as _JsonFormatterBase  # type: ignore[attr-defined]
@@ -41,6 +45,8 @@ SERVICE_NAME = os.getenv("SERVICE_NAME", "backend")
 LOG_PREFIX = "[Backend]"
 DEFAULT_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
 DEFAULT_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Registros en espera entre la aplicacion y el hilo que escribe; llena, se descarta y se cuenta
+DEFAULT_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
 
 class UnifiedFormatter(logging.Formatter):
@@ -113,7 +119,54 @@ else:
         pass
 
 
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que nunca bloquea: con la cola llena descarta el registro y lo cuenta.
+
+    El formateo (texto o JSON) queda para el hilo del listener; en el hilo que
+    loguea se encola una copia con el mensaje fijado junto a sus args, que
+    podrian mutar despues, y el traceback ya renderizado en ``exc_text``.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Como QueueHandler.prepare: el registro del llamador no se toca y la
+        # cola no retiene el traceback vivo (frames y locals) de la excepcion
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # Los mensajes dict se conservan para el JsonFormatter, que toma el
+            # traceback de exc_text cuando exc_info ya no esta
+            if not record.exc_text:
+                record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+
+class _LogQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Con la cola llena put_nowait fallaria; el listener la va vaciando
+        self.queue.put(self._sentinel)
+
+
 _logging_configured = False
+_queue_handler: Optional[DroppingQueueHandler] = None
+_queue_listener: Optional[_LogQueueListener] = None
 
 
 def _build_log_file_path() -> Path:
@@ -195,42 +248,89 @@ def _configure_print_redirect(logger: logging.Logger) -> None:
     builtins.print = logging_print
 
 
-def setup_unified_logging() -> None:
-    global _logging_configured
-
-    log_format = os.getenv("LOG_FORMAT", "text").lower()
+def build_output_handlers(
+    log_format: str = "text",
+    log_file_path: Optional[Path] = None,
+    stream: Any = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> List[logging.Handler]:
+    """Handlers de consola y archivo rotativo; los ejecuta el hilo del QueueListener."""
     use_json = log_format == "json" and _JsonFormatterBase is not None
-
-    log_file_path = _build_log_file_path()
     formatter: logging.Formatter = JsonFormatter(fmt="%(message)s") if use_json else UnifiedFormatter()
     console_formatter: logging.Formatter = JsonConsoleFormatter(fmt="%(message)s") if use_json else UnifiedFormatter()
 
-    root_logger = logging.getLogger()
-    root_logger.handlers.clear()
-    root_logger.setLevel(logging.INFO)
-
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
+    log_file_path = log_file_path or _build_log_file_path()
     try:
         file_handler = logging.handlers.RotatingFileHandler(
             log_file_path,
-            maxBytes=DEFAULT_MAX_BYTES,
+            maxBytes=max_bytes,
             backupCount=DEFAULT_BACKUP_COUNT,
             encoding="utf-8",
         )
     except OSError as exc:
-        root_logger.warning(
-            "File logging disabled for %s (%s). Falling back to console-only logging.",
-            log_file_path,
-            exc,
+        console_handler.handle(
+            logging.makeLogRecord(
+                {
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "File logging disabled for %s (%s). Falling back to console-only logging.",
+                    "args": (log_file_path, exc),
+                }
+            )
         )
     else:
         file_handler.setFormatter(formatter)
         file_handler.setLevel(logging.INFO)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    return handlers
+
+
+def start_queue_logging(
+    handlers: List[logging.Handler],
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> tuple[DroppingQueueHandler, logging.handlers.QueueListener]:
+    """Cola acotada + un unico hilo listener duenio de los handlers de salida."""
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    listener = _LogQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return DroppingQueueHandler(log_queue), listener
+
+
+def _stop_queue_logging() -> None:
+    global _queue_listener
+    if _queue_listener is not None:
+        listener, _queue_listener = _queue_listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Registros en cola y descartados por cola llena desde el ultimo setup."""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+def setup_unified_logging() -> None:
+    global _logging_configured, _queue_handler, _queue_listener
+
+    log_format = os.getenv("LOG_FORMAT", "text").lower()
+
+    root_logger = logging.getLogger()
+    root_logger.handlers.clear()
+    root_logger.setLevel(logging.INFO)
+
+    # La aplicacion solo encola; consola, archivo, rotacion y JSON corren en el listener
+    _stop_queue_logging()
+    _queue_handler, _queue_listener = start_queue_logging(build_output_handlers(log_format))
+    root_logger.addHandler(_queue_handler)
 
     _install_exception_hooks()
     logging.getLogger("uvicorn").propagate = True
@@ -254,6 +354,7 @@ def get_logger(name: str) -> logging.Logger:
 
 # Configurar automaticamente al importar
 ensure_logging_configured()
+atexit.register(_stop_queue_logging)
 
 
 def setup_logging() -> None:
@@ -5,8 +5,11 @@ Author: Claude Code Expert
 """
 
 import asyncio
+import base64
+import binascii
 import logging
-from typing import Optional, List, Dict, Any, Union
+import uuid
+from typing import Optional, List, Dict, Any, Tuple, Union
 from datetime import datetime, timezone
 import asyncpg
 from asyncpg import Connection, Pool
@@ -14,20 +17,130 @@ from contextlib import asynccontextmanager
 import json
 from dataclasses import dataclass, asdict
 from enum import Enum
-from decimal import Decimal
 
 from ...core.config import get_settings
-from ...core.exceptions import DatabaseError, ConfigurationError
+from ...core.exceptions import DatabaseError, ConfigurationError, ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+async def _init_connection(conn: Connection) -> None:
+    """Decode json/jsonb columns natively so shaped rows need no post-processing."""
+    for type_name in ("jsonb", "json"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=_json_dumps,
+            decoder=_json_loads,
+            schema="pg_catalog",
+        )
+
+
+def _sql_capitalize(column: str) -> str:
+    """SQL equivalent of ``str.capitalize`` with ``'N/D'`` for empty values."""
+    return (
+        f"COALESCE(NULLIF(upper(left({column}, 1)) || lower(substr({column}, 2)), ''), 'N/D')"
+    )
+
+
+# Fragmentos compartidos por el listado y el detalle de alertas: el shaping se
+# resuelve en SQL y el codec jsonb entrega listas/dicts listos para serializar.
+# Los NUMERIC conservan su escala dentro del jsonb y se decodifican como float.
+# entity_name reproduce ``str(item)`` del shaping anterior: null -> 'None',
+# booleanos -> 'True'/'False'; objetos y listas llegan como jsonb y los
+# convierte _render_entity_names.
+_ALERT_AFFECTED_ENTITIES_SQL = """
+            COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object(
+                        'entity_type', 'dato_clave',
+                        'entity_name', CASE jsonb_typeof(elem)
+                            WHEN 'null' THEN to_jsonb('None'::text)
+                            WHEN 'boolean' THEN to_jsonb(CASE WHEN elem = 'true'::jsonb THEN 'True' ELSE 'False' END)
+                            WHEN 'number' THEN to_jsonb(elem #>> '{}')
+                            ELSE elem
+                        END,
+                        'impact_level', NULL
+                    ) ORDER BY ord
+                )
+                FROM jsonb_array_elements(
+                    CASE WHEN jsonb_typeof(a.datos_clave) = 'array' THEN a.datos_clave ELSE '[]'::jsonb END
+                ) WITH ORDINALITY AS t(elem, ord)
+            ), '[]'::jsonb) AS affected_entities"""
+
+_ALERT_SUCURSAL_SQL = """
+            CASE WHEN COALESCE(a.sucursal_id, '') <> '' THEN jsonb_build_object(
+                'sucursal_id', a.sucursal_id,
+                'nombre', suc.sucursal_nombre,
+                'saldo_total', suc.saldo_total_sucursal,
+                'caja_teorica', suc.caja_teorica_sucursal,
+                'saldo_cobertura_pct', CASE
+                    WHEN suc.caja_teorica_sucursal IS NULL OR suc.caja_teorica_sucursal = 0 THEN NULL
+                    ELSE ROUND((suc.saldo_total_sucursal / suc.caja_teorica_sucursal) * 100, 2)
+                END
+            ) END AS sucursal"""
+
+_ALERT_DISPOSITIVO_SQL = """
+            CASE WHEN COALESCE(a.dispositivo_id, '') <> '' THEN jsonb_build_object(
+                'dispositivo_id', a.dispositivo_id,
+                'tipo', sad.tipo_dispositivo,
+                'saldo_total', sad.saldo_total,
+                'caja_teorica', sad.caja_teorica,
+                'saldo_cobertura_pct', CASE
+                    WHEN sad.caja_teorica IS NULL OR sad.caja_teorica = 0 THEN NULL
+                    ELSE ROUND((sad.saldo_total / sad.caja_teorica) * 100, 2)
+                END,
+                'latitud', sad.latitud,
+                'longitud', sad.longitud
+            ) END AS dispositivo"""
+
+_ALERT_SUMMARY_DEFAULTS: Dict[str, Any] = {
+    'financial_impact': None,
+    'currency': 'USD',
+    'confidence_score': None,
+    'pending_tasks': 0,
+}
+
+def _render_entity_names(row: Any) -> Dict[str, Any]:
+    """Row as a dict with object/array ``datos_clave`` entries rendered like ``str(item)``."""
+    shaped = dict(row)
+    entities = shaped.get('affected_entities') or []
+    if any(not isinstance(entity.get('entity_name'), str) for entity in entities):
+        shaped['affected_entities'] = [
+            {**entity, 'entity_name': str(entity.get('entity_name'))} for entity in entities
+        ]
+    return shaped
+
+
+def encode_alert_cursor(created_at: datetime, alert_id: int) -> str:
+    """Opaque keyset cursor for ``(creada_en, id)`` alert pagination."""
+    raw = f"{created_at.isoformat()}|{int(alert_id)}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
-def _to_float(value: Any) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, Decimal):
-        return float(value)
+
+def decode_alert_cursor(cursor: str) -> Tuple[datetime, int]:
     try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, alert_raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        created_at = datetime.fromisoformat(created_raw)
+        alert_id = int(alert_raw)
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise ValidationError("Cursor de paginacion invalido") from exc
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at, alert_id
+
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -247,6 +360,7 @@ class PostgreSQLClient:
         self.settings = get_settings()
         self._pool: Optional[Pool] = None
         self._initialized = False
+        self._trigram_available: Optional[bool] = None
 
     @classmethod
     def _normalize_sucursal_record(cls, record: Any) -> Dict[str, Any]:
@@ -307,6 +421,7 @@ class PostgreSQLClient:
                 database_url,
                 min_size=2,
                 max_size=10,
+                init=_init_connection,
                 max_queries=50000,
                 max_inactive_connection_lifetime=300,
                 command_timeout=60,
@@ -366,133 +481,137 @@ class PostgreSQLClient:
                 raise DatabaseError(f"Database operation failed: {e}")
 
 
+    def _historical_alerts_query(
+        self,
+        *,
+        limit: int,
+        offset: int = 0,
+        status_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        cursor: Optional[Tuple[datetime, int]] = None,
+    ) -> Tuple[str, List[Any]]:
+        """Build the alerts listing query with only the predicates in use.
+
+        Filters are added as plain equality predicates (no ``$n IS NULL OR``
+        branches) so the planner can pick the matching keyset index, and the
+        page of ids is resolved before joining balances.
+        """
+        params: List[Any] = []
+
+        def bind(value: Any) -> str:
+            params.append(value)
+            return f"${len(params)}"
+
+        predicates: List[str] = []
+        if status_filter is not None:
+            predicates.append(f"a.estado = {bind(status_filter)}")
+        if priority_filter is not None:
+            predicates.append(f"a.prioridad = {bind(priority_filter)}")
+        if agent_id is not None:
+            predicates.append(f"a.agente_id = {bind(agent_id)}::uuid")
+        if cursor is not None:
+            created_at, alert_pk = cursor
+            predicates.append(f"(a.creada_en, a.id) < ({bind(created_at)}, {bind(alert_pk)})")
+
+        where_clause = f"WHERE {' AND '.join(predicates)}" if predicates else ""
+        page_clause = f"LIMIT {bind(limit)}"
+        if offset and cursor is None:
+            page_clause += f" OFFSET {bind(offset)}"
+
+        query = f"""
+        WITH pagina AS (
+            SELECT a.id
+            FROM public.alertas a
+            {where_clause}
+            ORDER BY a.creada_en DESC, a.id DESC
+            {page_clause}
+        )
+        SELECT
+            a.id::text        AS id,
+            COALESCE(NULLIF(a.dedupe_clave, ''), 'alert_' || a.id) AS alert_code,
+            a.creada_en       AS timestamp,
+            COALESCE(NULLIF(a.problema, ''), 'Alerta sin titulo') AS title,
+            {_sql_capitalize('a.prioridad')} AS priority,
+            {_sql_capitalize('a.estado')} AS status,{_ALERT_AFFECTED_ENTITIES_SQL},{_ALERT_SUCURSAL_SQL},{_ALERT_DISPOSITIVO_SQL}
+        FROM pagina p
+        JOIN public.alertas a ON a.id = p.id
+        LEFT JOIN public.saldos_sucursal suc ON suc.sucursal_id = a.sucursal_id
+        LEFT JOIN LATERAL (
+            SELECT s.tipo_dispositivo, s.saldo_total, s.caja_teorica, s.latitud, s.longitud
+            FROM public.saldos_dispositivo s
+            WHERE s.sucursal_id = a.sucursal_id
+              AND s.dispositivo_id = a.dispositivo_id
+            ORDER BY s.medido_en DESC
+            LIMIT 1
+        ) sad ON TRUE
+        ORDER BY a.creada_en DESC, a.id DESC
+        """
+        return query, params
+
     async def get_historical_alerts(
         self,
         limit: int = 50,
         offset: int = 0,
         status_filter: Optional[str] = None,
         priority_filter: Optional[str] = None,
-        agent_filter: Optional[str] = None
+        agent_filter: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get historical alerts from the public.alertas catalog"""
+        page = await self.get_historical_alerts_page(
+            limit=limit,
+            offset=offset,
+            status_filter=status_filter,
+            priority_filter=priority_filter,
+            agent_filter=agent_filter,
+            cursor=cursor,
+        )
+        return page["items"]
+
+    async def get_historical_alerts_page(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        status_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None,
+        agent_filter: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Get one page of alerts plus the keyset cursor for the next page.
 
-        query = """
-        SELECT
-            a.id::text        AS id,
-            a.creada_en       AS created_at,
-            a.prioridad       AS priority,
-            a.estado          AS status,
-            a.problema        AS title,
-            a.hipotesis       AS hypothesis,
-            a.datos_clave     AS datos_clave,
-            a.acciones        AS acciones,
-            a.dedupe_clave    AS dedupe,
-            a.agente_id::text AS agent_id,
-            ev.tipo_evento    AS event_type,
-            ev.mensaje        AS event_message,
-            a.sucursal_id     AS sucursal_id,
-            suc.sucursal_nombre AS sucursal_nombre,
-            suc.saldo_total_sucursal AS sucursal_saldo_total,
-            suc.caja_teorica_sucursal AS sucursal_caja_teorica,
-            CASE
-              WHEN suc.caja_teorica_sucursal IS NULL OR suc.caja_teorica_sucursal = 0
-                THEN NULL
-              ELSE ROUND((suc.saldo_total_sucursal / suc.caja_teorica_sucursal) * 100, 2)
-            END AS sucursal_saldo_pct,
-            a.dispositivo_id  AS dispositivo_id,
-            sad.tipo_dispositivo AS dispositivo_tipo,
-            sad.saldo_total   AS dispositivo_saldo_total,
-            sad.caja_teorica  AS dispositivo_caja_teorica,
-            CASE
-              WHEN sad.caja_teorica IS NULL OR sad.caja_teorica = 0
-                THEN NULL
-              ELSE ROUND((sad.saldo_total / sad.caja_teorica) * 100, 2)
-            END AS dispositivo_saldo_pct,
-            sad.latitud       AS dispositivo_latitud,
-            sad.longitud      AS dispositivo_longitud
-        FROM public.alertas a
-        LEFT JOIN public.agentes ag ON ag.id = a.agente_id
-        LEFT JOIN public.eventos ev ON ev.id = a.evento_id
-        LEFT JOIN public.saldos_sucursal suc ON suc.sucursal_id = a.sucursal_id
-        LEFT JOIN public.saldos_actuales_dispositivo sad
-          ON sad.sucursal_id = a.sucursal_id
-         AND sad.dispositivo_id = a.dispositivo_id
-        WHERE ($3::text IS NULL OR a.estado = $3)
-          AND ($4::text IS NULL OR a.prioridad = $4)
-          AND ($5::text IS NULL OR a.agente_id::text = $5)
-        ORDER BY a.creada_en DESC
-        LIMIT $1 OFFSET $2
+        ``cursor`` (from a previous ``next_cursor``) pages on
+        ``(creada_en, id)`` and takes precedence over ``offset``.
         """
+        keyset = decode_alert_cursor(cursor) if cursor else None
 
         agent_param = agent_filter if agent_filter and len(agent_filter) == 36 else None
+        if agent_param is not None:
+            try:
+                agent_param = str(uuid.UUID(agent_param))
+            except ValueError:
+                return {"items": [], "next_cursor": None}
+
+        query, params = self._historical_alerts_query(
+            limit=limit,
+            offset=offset,
+            status_filter=status_filter,
+            priority_filter=priority_filter,
+            agent_id=agent_param,
+            cursor=keyset,
+        )
 
         async with self.get_connection() as conn:
-            rows = await conn.fetch(query, limit, offset, status_filter, priority_filter, agent_param)
-
-        alerts: List[Dict[str, Any]] = []
-        for row in rows:
-            datos_clave = row.get('datos_clave')
-            if isinstance(datos_clave, list):
-                claves = datos_clave
-            elif datos_clave:
-                try:
-                    claves = json.loads(datos_clave)
-                except Exception:
-                    claves = []
-            else:
-                claves = []
+            rows = await conn.fetch(query, *params)
 
-            affected_entities = [
-                {
-                    'entity_type': 'dato_clave',
-                    'entity_name': str(item),
-                    'impact_level': None
-                }
-                for item in claves
-            ]
-
-            priority_value = (row['priority'] or '').capitalize() if row['priority'] else 'N/D'
-            status_value = (row['status'] or '').capitalize() if row['status'] else 'N/D'
-
-            sucursal_info = None
-            if row['sucursal_id']:
-                sucursal_info = {
-                    'sucursal_id': row['sucursal_id'],
-                    'nombre': row.get('sucursal_nombre'),
-                    'saldo_total': _to_float(row.get('sucursal_saldo_total')),
-                    'caja_teorica': _to_float(row.get('sucursal_caja_teorica')),
-                    'saldo_cobertura_pct': _to_float(row.get('sucursal_saldo_pct')),
-                }
+        alerts = [{**_render_entity_names(row), **_ALERT_SUMMARY_DEFAULTS} for row in rows]
 
-            dispositivo_info = None
-            if row['dispositivo_id']:
-                dispositivo_info = {
-                    'dispositivo_id': row['dispositivo_id'],
-                    'tipo': row.get('dispositivo_tipo'),
-                    'saldo_total': _to_float(row.get('dispositivo_saldo_total')),
-                    'caja_teorica': _to_float(row.get('dispositivo_caja_teorica')),
-                    'saldo_cobertura_pct': _to_float(row.get('dispositivo_saldo_pct')),
-                    'latitud': _to_float(row.get('dispositivo_latitud')),
-                    'longitud': _to_float(row.get('dispositivo_longitud')),
-                }
+        next_cursor = None
+        if rows and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_alert_cursor(last['timestamp'], int(last['id']))
 
-            alerts.append({
-                'id': row['id'],
-                'alert_code': row['dedupe'] or f"alert_{row['id']}",
-                'timestamp': row['created_at'],
-                'title': row['title'] or 'Alerta sin titulo',
-                'priority': priority_value,
-                'status': status_value,
-                'financial_impact': None,
-                'currency': 'USD',
-                'confidence_score': None,
-                'pending_tasks': 0,
-                'affected_entities': affected_entities,
-                'sucursal': sucursal_info,
-                'dispositivo': dispositivo_info,
-            })
-
-        return alerts
+        return {"items": alerts, "next_cursor": next_cursor}
 
     async def get_alert_by_id(self, alert_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific alert by ID with enriched data from public.alertas"""
@@ -502,48 +621,27 @@ class PostgreSQLClient:
         except (TypeError, ValueError):
             return None
 
-        query = """
+        query = f"""
         SELECT
             a.id::text        AS id,
+            COALESCE(NULLIF(a.dedupe_clave, ''), 'alert_' || a.id) AS alert_code,
             a.creada_en       AS created_at,
-            a.prioridad       AS priority,
-            a.estado          AS status,
-            a.problema        AS title,
+            {_sql_capitalize('a.prioridad')} AS priority,
+            {_sql_capitalize('a.estado')} AS status,
+            COALESCE(NULLIF(a.problema, ''), 'Alerta') AS title,
             a.hipotesis       AS hypothesis,
             a.impacto         AS impacto,
             a.datos_clave     AS datos_clave,
             a.acciones        AS acciones,
-            a.dedupe_clave    AS dedupe,
-            a.agente_id::text AS agent_id,
-            ag.nombre        AS agent_name,
+            COALESCE(NULLIF(ag.nombre, ''), a.agente_id::text, 'desconocido') AS agent_source,
+            COALESCE(NULLIF(ev.tipo_evento, ''), 'alerta_manual') AS alert_type,
             ev.id::text       AS event_id,
-            ev.tipo_evento    AS event_type,
             ev.ocurrido_en    AS event_timestamp,
             ev.estado         AS event_status,
             ev.mensaje        AS event_message,
             ev.duracion_ms    AS event_duration,
             ev.tokens_total   AS event_tokens,
-            ev.costo_usd      AS event_cost,
-            a.sucursal_id     AS sucursal_id,
-            suc.sucursal_nombre AS sucursal_nombre,
-            suc.saldo_total_sucursal AS sucursal_saldo_total,
-            suc.caja_teorica_sucursal AS sucursal_caja_teorica,
-            CASE
-              WHEN suc.caja_teorica_sucursal IS NULL OR suc.caja_teorica_sucursal = 0
-                THEN NULL
-              ELSE ROUND((suc.saldo_total_sucursal / suc.caja_teorica_sucursal) * 100, 2)
-            END AS sucursal_saldo_pct,
-            a.dispositivo_id  AS dispositivo_id,
-            sad.tipo_dispositivo AS dispositivo_tipo,
-            sad.saldo_total   AS dispositivo_saldo_total,
-            sad.caja_teorica  AS dispositivo_caja_teorica,
-            CASE
-              WHEN sad.caja_teorica IS NULL OR sad.caja_teorica = 0
-                THEN NULL
-              ELSE ROUND((sad.saldo_total / sad.caja_teorica) * 100, 2)
-            END AS dispositivo_saldo_pct,
-            sad.latitud       AS dispositivo_latitud,
-            sad.longitud      AS dispositivo_longitud
+            ev.costo_usd      AS event_cost,{_ALERT_AFFECTED_ENTITIES_SQL},{_ALERT_SUCURSAL_SQL},{_ALERT_DISPOSITIVO_SQL}
         FROM public.alertas a
         LEFT JOIN public.agentes ag ON ag.id = a.agente_id
         LEFT JOIN public.eventos ev ON ev.id = a.evento_id
@@ -560,64 +658,19 @@ class PostgreSQLClient:
         if not row:
             return None
 
-        datos_clave = row.get('datos_clave')
-        if isinstance(datos_clave, list):
-            claves = datos_clave
-        elif datos_clave:
-            try:
-                claves = json.loads(datos_clave)
-            except Exception:
-                claves = []
-        else:
-            claves = []
-
-        affected_entities = [
-            {
-                'entity_type': 'dato_clave',
-                'entity_name': str(item),
-                'impact_level': None
-            }
-            for item in claves
-        ]
-
-        priority_value = (row['priority'] or '').capitalize() if row['priority'] else 'N/D'
-        status_value = (row['status'] or '').capitalize() if row['status'] else 'N/D'
-
-        sucursal_info = None
-        if row['sucursal_id']:
-            sucursal_info = {
-                'sucursal_id': row['sucursal_id'],
-                'nombre': row.get('sucursal_nombre'),
-                'saldo_total': _to_float(row.get('sucursal_saldo_total')),
-                'caja_teorica': _to_float(row.get('sucursal_caja_teorica')),
-                'saldo_cobertura_pct': _to_float(row.get('sucursal_saldo_pct')),
-            }
-
-        dispositivo_info = None
-        if row['dispositivo_id']:
-            dispositivo_info = {
-                'dispositivo_id': row['dispositivo_id'],
-                'tipo': row.get('dispositivo_tipo'),
-                'saldo_total': _to_float(row.get('dispositivo_saldo_total')),
-                'caja_teorica': _to_float(row.get('dispositivo_caja_teorica')),
-                'saldo_cobertura_pct': _to_float(row.get('dispositivo_saldo_pct')),
-                'latitud': _to_float(row.get('dispositivo_latitud')),
-                'longitud': _to_float(row.get('dispositivo_longitud')),
-            }
-
         detail = {
             'id': row['id'],
-            'alert_code': row['dedupe'] or f"alert_{row['id']}",
+            'alert_code': row['alert_code'],
             'timestamp': row['created_at'],
-            'alert_type': row['event_type'] or 'alerta_manual',
-            'priority': priority_value,
-            'agent_source': row['agent_name'] or row['agent_id'] or 'desconocido',
-            'title': row['title'] or 'Alerta',
+            'alert_type': row['alert_type'],
+            'priority': row['priority'],
+            'agent_source': row['agent_source'],
+            'title': row['title'],
             'description': row['hypothesis'],
             'financial_impact': None,
             'currency': 'USD',
             'confidence_score': None,
-            'status': status_value,
+            'status': row['status'],
             'resolved_at': None,
             'resolved_by': None,
             'created_at': row['created_at'],
@@ -630,10 +683,10 @@ class PostgreSQLClient:
             'risk_assessment': row['impacto'],
             'confidence_level': None,
             'model_version': None,
-            'affected_entities': affected_entities,
+            'affected_entities': _render_entity_names(row)['affected_entities'],
             'human_tasks': [],
             'acciones': row['acciones'],
-            'datos_clave': claves,
+            'datos_clave': row['datos_clave'],
             'evento': {
                 'id': row['event_id'],
                 'estado': row['event_status'],
@@ -643,8 +696,8 @@ class PostgreSQLClient:
                 'costo_usd': row['event_cost'],
                 'mensaje': row['event_message'],
             },
-            'sucursal': sucursal_info,
-            'dispositivo': dispositivo_info,
+            'sucursal': row['sucursal'],
+            'dispositivo': row['dispositivo'],
         }
 
         return detail
@@ -1021,20 +1074,23 @@ class PostgreSQLClient:
             return result.split()[-1] == '1'  # Check if one row was updated
 
     async def get_team_workload(self) -> List[Dict[str, Any]]:
-        """Get current workload by team"""
+        """Get current workload by team.
+
+        Reads ``alerts.team_workload_summary``, kept in sync with
+        ``alerts.human_tasks`` by trigger, instead of aggregating every task.
+        """
 
         query = """
         SELECT
             t.team_name,
-            COUNT(ht.id) as total_tasks,
-            COUNT(CASE WHEN ht.status = 'pending' THEN 1 END) as pending_tasks,
-            COUNT(CASE WHEN ht.status = 'in_progress' THEN 1 END) as in_progress_tasks,
-            COUNT(CASE WHEN ht.status = 'completed' THEN 1 END) as completed_tasks,
-            COALESCE(AVG(ht.progress_percentage), 0) as avg_progress
+            COALESCE(s.total_tasks, 0) as total_tasks,
+            COALESCE(s.pending_tasks, 0) as pending_tasks,
+            COALESCE(s.in_progress_tasks, 0) as in_progress_tasks,
+            COALESCE(s.completed_tasks, 0) as completed_tasks,
+            COALESCE(s.progress_sum::numeric / NULLIF(s.progress_count, 0), 0) as avg_progress
         FROM alerts.teams t
-        LEFT JOIN alerts.human_tasks ht ON t.team_name = ht.assigned_to_team
+        LEFT JOIN alerts.team_workload_summary s ON s.team_name = t.team_name
         WHERE t.active = true
-        GROUP BY t.id, t.team_name
         ORDER BY pending_tasks DESC
         """
 
@@ -1043,50 +1099,80 @@ class PostgreSQLClient:
             return [dict(row) for row in rows]
 
     async def get_critical_alerts_summary(self) -> Dict[str, Any]:
-        """Get summary of critical active alerts"""
+        """Get summary of critical active alerts.
+
+        Single-row read of ``alerts.critical_alerts_summary``, maintained by
+        triggers on ``historical_alerts`` and ``ai_analysis``.
+        """
 
         query = """
         SELECT
-            COUNT(*) as total_critical,
-            COALESCE(SUM(financial_impact), 0) as total_financial_impact,
-            COALESCE(AVG(confidence_score), 0) as avg_confidence,
-            COUNT(CASE WHEN aa.probability_fraud > 0.7 THEN 1 END) as high_fraud_risk
-        FROM alerts.historical_alerts ha
-        LEFT JOIN alerts.ai_analysis aa ON ha.id = aa.alert_id
-        WHERE ha.priority = 'critical' AND ha.status = 'active'
+            COALESCE(MAX(total_critical), 0) as total_critical,
+            COALESCE(MAX(total_financial_impact), 0) as total_financial_impact,
+            COALESCE(MAX(confidence_sum / NULLIF(confidence_count, 0)), 0) as avg_confidence,
+            COALESCE(MAX(high_fraud_risk), 0) as high_fraud_risk
+        FROM alerts.critical_alerts_summary
         """
 
         async with self.get_connection() as conn:
             row = await conn.fetchrow(query)
             return dict(row)
 
-    async def search_alerts(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Full-text search in alerts"""
-
-        query = """
-        SELECT
-            ha.id,
+    _SEARCH_COLUMNS = """
+            ha.id::text AS id,
             ha.alert_code,
             ha.title,
             ha.description,
             ha.priority,
             ha.status,
-            ha.timestamp,
-            ha.financial_impact,
-            ts_rank(
-                to_tsvector('english', ha.title || ' ' || ha.description),
-                plainto_tsquery('english', $1)
-            ) as relevance_score
-        FROM alerts.historical_alerts ha
-        WHERE to_tsvector('english', ha.title || ' ' || ha.description) @@ plainto_tsquery('english', $1)
-        ORDER BY relevance_score DESC, ha.timestamp DESC
+            ha."timestamp",
+            ha.financial_impact"""
+
+    async def search_alerts(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search in alerts.
+
+        Ranks the stored ``search_vector`` (GIN-indexed, ``alerts.capi_es``
+        configuration) against a web-style query. When nothing matches and
+        pg_trgm is installed, falls back to title similarity so typos still
+        find results.
+        """
+
+        query = f"""
+        SELECT {self._SEARCH_COLUMNS},
+            ts_rank(ha.search_vector, q.query) AS relevance_score
+        FROM alerts.historical_alerts ha,
+             websearch_to_tsquery('alerts.capi_es', $1) AS q(query)
+        WHERE ha.search_vector @@ q.query
+        ORDER BY relevance_score DESC, ha."timestamp" DESC
         LIMIT $2
         """
 
         async with self.get_connection() as conn:
             rows = await conn.fetch(query, search_term, limit)
+            if not rows and await self._use_trigram_fallback(conn):
+                rows = await conn.fetch(
+                    f"""
+                    SELECT {self._SEARCH_COLUMNS},
+                        similarity(ha.title, $1) AS relevance_score
+                    FROM alerts.historical_alerts ha
+                    WHERE ha.title % $1
+                    ORDER BY relevance_score DESC, ha."timestamp" DESC
+                    LIMIT $2
+                    """,
+                    search_term,
+                    limit,
+                )
             return [dict(row) for row in rows]
 
+    async def _use_trigram_fallback(self, conn: Connection) -> bool:
+        if not self.settings.ALERTS_SEARCH_TRIGRAM_FALLBACK:
+            return False
+        if self._trigram_available is None:
+            self._trigram_available = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+            )
+        return self._trigram_available
+
 # Global instance
 _postgres_client: Optional[PostgreSQLClient] = None
 
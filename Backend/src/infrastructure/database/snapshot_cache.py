@@ -0,0 +1,193 @@
+"""
+Read-through snapshots for small, hot tables polled by dashboards.
+
+Each ``TableSnapshot`` keeps the last rows loaded for one table and the
+pre-serialised bodies rendered from them (one per view), tagged with a strong
+content ETag. Concurrent misses share a single load, write paths call
+``invalidate`` and, when enabled, a Postgres ``LISTEN`` connection invalidates
+on changes made outside the API. A TTL bounds staleness when neither fires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import asyncpg
+
+from ...core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SALDOS_NOTIFY_CHANNEL = "capi_saldos"
+
+Rows = List[Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class RenderedSnapshot:
+    body: bytes
+    etag: str
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class TableSnapshot:
+    """Cached rows of one table plus the bodies rendered from them."""
+
+    def __init__(
+        self,
+        table: str,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.loads = 0
+        self._clock = clock
+        self._rows: Optional[Rows] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._rendered: Dict[str, RenderedSnapshot] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._rows = None
+        self._rendered = {}
+
+    def _fresh(self) -> bool:
+        if self._rows is None:
+            return False
+        return not self.ttl_seconds or self._clock() - self._loaded_at < self.ttl_seconds
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def rows(self, load: Callable[[], Awaitable[Rows]]) -> Rows:
+        if self._fresh():
+            return self._rows
+        async with self._get_lock():
+            if self._fresh():
+                return self._rows
+            generation = self._generation
+            rows = await load()
+            self.loads += 1
+            # Una invalidacion durante la carga descarta el resultado para el proximo lector
+            if generation == self._generation:
+                self._rows = rows
+                self._loaded_at = self._clock()
+                self._rendered = {}
+            return rows
+
+    async def render(
+        self,
+        view: str,
+        load: Callable[[], Awaitable[Rows]],
+        renderer: Callable[[Rows], bytes],
+    ) -> RenderedSnapshot:
+        rows = await self.rows(load)
+        if rows is self._rows:
+            cached = self._rendered.get(view)
+            if cached is not None:
+                return cached
+        body = renderer(rows)
+        snapshot = RenderedSnapshot(body=body, etag=strong_etag(body))
+        if rows is self._rows:
+            self._rendered[view] = snapshot
+        return snapshot
+
+
+class SnapshotRegistry:
+    """Named table snapshots plus the optional ``LISTEN`` invalidation feed."""
+
+    LISTEN_RETRY_SECONDS = 60.0
+
+    def __init__(self, ttl_seconds: float = 30.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, TableSnapshot] = {}
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._listener_failed_at = float("-inf")
+
+    def snapshot(self, table: str) -> TableSnapshot:
+        if table not in self._snapshots:
+            self._snapshots[table] = TableSnapshot(table, ttl_seconds=self.ttl_seconds)
+        return self._snapshots[table]
+
+    def invalidate(self, tables: Optional[Iterable[str]] = None) -> None:
+        targets = self._snapshots.values() if tables is None else (
+            self._snapshots[table] for table in tables if table in self._snapshots
+        )
+        for snapshot in targets:
+            snapshot.invalidate()
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.invalidate([payload] if payload else None)
+
+    def _on_listener_closed(self, connection: Any) -> None:
+        self._listener = None
+        self.invalidate()
+
+    def start_listener(self, database_url: str) -> None:
+        """Subscribe to ``SALDOS_NOTIFY_CHANNEL`` in the background (no-op when running).
+
+        Failed attempts are retried at most every ``LISTEN_RETRY_SECONDS``;
+        until then snapshots rely on write-path invalidation and the TTL.
+        """
+        if self._listener is not None and not self._listener.is_closed():
+            return
+        if self._listener_task is not None and not self._listener_task.done():
+            return
+        if time.monotonic() - self._listener_failed_at < self.LISTEN_RETRY_SECONDS:
+            return
+        self._listener_task = asyncio.get_running_loop().create_task(self._listen(database_url))
+
+    async def _listen(self, database_url: str) -> None:
+        try:
+            connection = await asyncpg.connect(database_url, timeout=5)
+            await connection.add_listener(SALDOS_NOTIFY_CHANNEL, self._on_notify)
+            connection.add_termination_listener(self._on_listener_closed)
+        except Exception as exc:
+            self._listener_failed_at = time.monotonic()
+            logger.warning(f"LISTEN {SALDOS_NOTIFY_CHANNEL} no disponible, se usa solo TTL: {exc}")
+            return
+        # Lo ocurrido antes de suscribirse no llego por NOTIFY
+        self.invalidate()
+        self._listener = connection
+        logger.info(f"Snapshots de saldos suscriptos a LISTEN {SALDOS_NOTIFY_CHANNEL}")
+
+    async def close(self) -> None:
+        """Stop the ``LISTEN`` feed, including a subscription still connecting."""
+        task, self._listener_task = self._listener_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await listener.close()
+
+
+_snapshot_registry: Optional[SnapshotRegistry] = None
+
+
+def get_snapshot_registry() -> SnapshotRegistry:
+    """Get the process-wide snapshot registry"""
+    global _snapshot_registry
+    if _snapshot_registry is None:
+        _snapshot_registry = SnapshotRegistry(ttl_seconds=get_settings().SNAPSHOT_CACHE_TTL)
+    return _snapshot_registry
@@ -1,7 +1,7 @@
 """Google Workspace integration helpers (OAuth, Gmail, Drive, Calendar)."""
 
 from .auth import GoogleOAuthSettings, GoogleCredentialsManager, GoogleServiceFactory
-from .gmail import GmailClient, GMAIL_READ_SCOPE, GMAIL_MODIFY_SCOPE
+from .gmail import GmailClient, GMAIL_READ_SCOPE, GMAIL_MODIFY_SCOPE, GMAIL_BATCH_SIZE
 from .drive import DriveClient, DRIVE_SCOPE
 from .calendar import CalendarClient, CALENDAR_SCOPE
 
@@ -12,6 +12,7 @@ __all__ = [
     "GmailClient",
     "GMAIL_READ_SCOPE",
     "GMAIL_MODIFY_SCOPE",
+    "GMAIL_BATCH_SIZE",
     "DriveClient",
     "DRIVE_SCOPE",
     "CalendarClient",
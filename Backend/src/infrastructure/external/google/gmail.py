@@ -12,6 +12,10 @@ from .auth import GoogleServiceFactory, GoogleOAuthSettings, GoogleCredentialsMa
 GMAIL_READ_SCOPE = "https://www.googleapis.com/auth/gmail.readonly"
 GMAIL_MODIFY_SCOPE = "https://www.googleapis.com/auth/gmail.modify"
 
+# Gmail recommends at most 50 calls per batch request.
+GMAIL_BATCH_SIZE = 50
+DEFAULT_METADATA_HEADERS = ("From", "Subject", "Date")
+
 
 class GmailClient:
     """Thin wrapper over the Gmail API with sensible defaults."""
@@ -45,6 +49,51 @@ class GmailClient:
         service = self._service_factory.get_service("gmail", "v1")
         return service.users().messages().get(userId=self._user_id, id=message_id, format=format).execute()
 
+    def batch_get_messages(
+        self,
+        message_ids: Sequence[str],
+        *,
+        format: str = "metadata",
+        metadata_headers: Sequence[str] | None = DEFAULT_METADATA_HEADERS,
+    ) -> List[dict]:
+        """Fetches several messages using Gmail batch requests (one round trip per 50 ids).
+
+        Messages that no longer exist (404) are skipped; other errors are raised.
+        """
+        ids = [message_id for message_id in dict.fromkeys(message_ids) if message_id]
+        if not ids:
+            return []
+
+        service = self._service_factory.get_service("gmail", "v1")
+        found: Dict[str, dict] = {}
+        errors: List[HttpError] = []
+
+        def _collect(request_id: str, response: dict, exception: Exception | None) -> None:
+            if exception is None:
+                found[request_id] = response
+            elif isinstance(exception, HttpError) and getattr(exception.resp, "status", None) == 404:
+                return
+            else:
+                errors.append(exception)
+
+        for offset in range(0, len(ids), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=_collect)
+            for message_id in ids[offset:offset + GMAIL_BATCH_SIZE]:
+                kwargs: Dict[str, Any] = {"userId": self._user_id, "id": message_id, "format": format}
+                if format == "metadata" and metadata_headers:
+                    kwargs["metadataHeaders"] = list(metadata_headers)
+                batch.add(service.users().messages().get(**kwargs), request_id=message_id)
+            batch.execute()
+
+        if errors:
+            raise errors[0]
+        return [found[message_id] for message_id in ids if message_id in found]
+
+    def get_profile(self) -> Dict[str, Any]:
+        """Returns the mailbox profile, including the current ``historyId``."""
+        service = self._service_factory.get_service("gmail", "v1")
+        return service.users().getProfile(userId=self._user_id).execute()
+
     def send_plain_text(
         self,
         *,
@@ -130,4 +179,4 @@ class GmailClient:
         return GmailClient(factory, user_id=credentials_settings.agent_email or "me")
 
 
-__all__ = ["GmailClient", "GMAIL_READ_SCOPE", "GMAIL_MODIFY_SCOPE"]
+__all__ = ["GmailClient", "GMAIL_READ_SCOPE", "GMAIL_MODIFY_SCOPE", "GMAIL_BATCH_SIZE"]
@@ -13,6 +13,7 @@ from langgraph.checkpoint.memory import MemorySaver
 
 from src.core.logging import get_logger
 from src.infrastructure.langgraph.state_schema import GraphState
+from src.infrastructure.langgraph.node_metrics import instrument_node
 from src.infrastructure.langgraph.nodes.base import GraphNode, StartNode, FinalizeNode
 from src.infrastructure.langgraph.nodes.intent_node import IntentNode
 from src.infrastructure.langgraph.nodes.react_node import ReActNode
@@ -288,10 +289,7 @@ class GraphBuilder:
 
     @staticmethod
     def _wrap_node(node: GraphNode) -> Callable[[GraphState], GraphState]:
-        def _runner(state: GraphState) -> GraphState:
-            return node.run(state)
-
-        return _runner
+        return instrument_node(node)
 
     def _compile_state_graph(
         self,
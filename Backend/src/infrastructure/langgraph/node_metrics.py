@@ -0,0 +1,134 @@
+"""
+Per-node latency metrics for the LangGraph runtime.
+
+``instrument_node`` wraps a node's ``run`` and records, for every execution,
+wall time, CPU time of the executing thread, time spent merging state through
+``StateMutator`` and (sampled) serialised state size. Values are exported as
+Prometheus histograms labelled by node and, when the turn runs with
+``config["node_spans"]``, appended to one compact ``reasoning_trace`` entry.
+"""
+from __future__ import annotations
+
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Histogram  # type: ignore
+
+from src.infrastructure.langgraph.nodes.base import GraphNode
+from src.infrastructure.langgraph.state_schema import MERGE_SECONDS, GraphState
+
+# Clave de config del turno que activa la lista de spans en reasoning_trace
+SPANS_CONFIG_KEY = "node_spans"
+SPANS_TRACE_TYPE = "node_spans"
+SPAN_FIELDS = ("node", "wall_ms", "cpu_ms", "merge_ms", "state_bytes")
+# Serializar el estado cuesta como un merge: se mide 1 de cada N ejecuciones por nodo
+STATE_SIZE_SAMPLE_EVERY = 32
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+NODE_WALL_SECONDS = Histogram(
+    "capi_graph_node_wall_seconds",
+    "Wall time per LangGraph node execution",
+    labelnames=("node",),
+    buckets=_LATENCY_BUCKETS,
+)
+NODE_CPU_SECONDS = Histogram(
+    "capi_graph_node_cpu_seconds",
+    "CPU time of the executing thread per LangGraph node execution",
+    labelnames=("node",),
+    buckets=_LATENCY_BUCKETS,
+)
+NODE_MERGE_SECONDS = Histogram(
+    "capi_graph_node_state_merge_seconds",
+    "Time spent in StateMutator merges per LangGraph node execution",
+    labelnames=("node",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+NODE_STATE_BYTES = Histogram(
+    "capi_graph_node_state_bytes",
+    "Serialised GraphState size after a LangGraph node (sampled)",
+    labelnames=("node",),
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+def instrument_node(node: GraphNode) -> Callable[[GraphState], GraphState]:
+    """Return the LangGraph callable for ``node`` with latency instrumentation."""
+    name = node.name
+    wall_histogram = NODE_WALL_SECONDS.labels(node=name)
+    cpu_histogram = NODE_CPU_SECONDS.labels(node=name)
+    merge_histogram = NODE_MERGE_SECONDS.labels(node=name)
+    size_histogram = NODE_STATE_BYTES.labels(node=name)
+    executions = itertools.count()
+
+    def _runner(state: GraphState) -> GraphState:
+        merge_seconds = [0.0]
+        token = MERGE_SECONDS.set(merge_seconds)
+        cpu_started = time.thread_time()
+        started = time.perf_counter()
+        try:
+            result = node.run(state)
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            MERGE_SECONDS.reset(token)
+            wall_histogram.observe(wall)
+            cpu_histogram.observe(cpu)
+            merge_histogram.observe(merge_seconds[0])
+
+        if not isinstance(result, GraphState):
+            return result
+        spans_enabled = bool(result.config.get(SPANS_CONFIG_KEY))
+        state_bytes = None
+        if spans_enabled or next(executions) % STATE_SIZE_SAMPLE_EVERY == 0:
+            state_bytes = _state_size(result)
+            if state_bytes is not None:
+                size_histogram.observe(state_bytes)
+        if spans_enabled:
+            _append_span(result, [
+                name,
+                round(wall * 1000, 3),
+                round(cpu * 1000, 3),
+                round(merge_seconds[0] * 1000, 3),
+                state_bytes,
+            ])
+        return result
+
+    return _runner
+
+
+def _state_size(state: GraphState) -> Optional[int]:
+    try:
+        return len(state.__pydantic_serializer__.to_json(state, fallback=str))
+    except Exception:
+        return None
+
+
+def _append_span(state: GraphState, span: List[Any]) -> None:
+    # Lista nueva: la del estado puede ser el valor del canal de LangGraph
+    trace = list(state.reasoning_trace or [])
+    for index in range(len(trace) - 1, -1, -1):
+        entry = trace[index]
+        if isinstance(entry, dict) and entry.get("type") == SPANS_TRACE_TYPE:
+            trace[index] = {**entry, "spans": [*entry.get("spans", []), span]}
+            break
+    else:
+        trace.append({"type": SPANS_TRACE_TYPE, "fields": list(SPAN_FIELDS), "spans": [span]})
+    state.reasoning_trace = trace
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Per-node execution count and summed wall/CPU/merge milliseconds."""
+    nodes: Dict[str, Dict[str, float]] = {}
+    for key, histogram in (("wall_ms", NODE_WALL_SECONDS), ("cpu_ms", NODE_CPU_SECONDS),
+                           ("merge_ms", NODE_MERGE_SECONDS)):
+        for family in histogram.collect():
+            for sample in family.samples:
+                node = sample.labels.get("node")
+                entry = nodes.setdefault(node, {"count": 0.0, "wall_ms": 0.0, "cpu_ms": 0.0, "merge_ms": 0.0})
+                if sample.name.endswith("_sum"):
+                    entry[key] = round(sample.value * 1000, 3)
+                elif sample.name.endswith("_count"):
+                    entry["count"] = sample.value
+    return nodes
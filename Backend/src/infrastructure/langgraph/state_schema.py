@@ -7,6 +7,9 @@ Respects ARCHITECTURE.md: lives under infrastructure, consumes domain contracts.
 """
 from __future__ import annotations
 
+import functools
+import time
+from contextvars import ContextVar
 from typing import Annotated, Dict, Any, Optional, List
 from datetime import datetime
 from enum import Enum
@@ -125,16 +128,39 @@ class GraphState(BaseModel):
         }
 
 
+# Acumulador del tiempo de merge del nodo en ejecucion; lo activa node_metrics
+MERGE_SECONDS: ContextVar[Optional[List[float]]] = ContextVar("graph_state_merge_seconds", default=None)
+
+
+def _timed_merge(func):
+    """Add the helper's duration to ``MERGE_SECONDS`` while a node is being measured."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        accumulator = MERGE_SECONDS.get()
+        if accumulator is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            accumulator[0] += time.perf_counter() - started
+
+    return wrapper
+
+
 class StateMutator:
     """Immutable-style mutation helpers: return new GraphState instances."""
 
     @staticmethod
+    @_timed_merge
     def update_field(state: GraphState, field: str, value: Any) -> GraphState:
         data = state.model_dump()
         data[field] = value
         return GraphState(**data)
 
     @staticmethod
+    @_timed_merge
     def append_to_list(state: GraphState, field: str, value: Any) -> GraphState:
         data = state.model_dump()
         current = list(data.get(field, []))
@@ -143,6 +169,7 @@ class StateMutator:
         return GraphState(**data)
 
     @staticmethod
+    @_timed_merge
     def merge_dict(state: GraphState, field: str, values: Dict[str, Any]) -> GraphState:
         data = state.model_dump()
         current = dict(data.get(field, {}))
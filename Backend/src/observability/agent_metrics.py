@@ -1,18 +1,31 @@
 from __future__ import annotations
 
+import atexit
 import json
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.core.logging import get_logger
 
 _LOGGER = get_logger(__name__)
-_LOCK = Lock()
 _LOG_FILE_NAME = "agent_metrics.jsonl"
 
+# Cola acotada entre el request path y el writer: si se llena, se descarta y se cuenta
+_QUEUE_MAX_EVENTS = 10_000
+# Un flush agrupa hasta este numero de eventos o lo que llego en la ventana de tiempo
+_BATCH_MAX_EVENTS = 500
+_FLUSH_INTERVAL_SECONDS = 0.2
+# Rotacion por tamano: agent_metrics.jsonl -> agent_metrics.1.jsonl -> ... (coincide con agent_metrics*.jsonl de Logstash)
+_MAX_FILE_BYTES = 50 * 1024 * 1024
+_BACKUP_COUNT = 5
+_SHUTDOWN_TIMEOUT_SECONDS = 5.0
+_DROP_WARNING_EVERY = 1000
+
 
 def _resolve_log_path() -> Path:
     env_dir = os.getenv("CAPI_LOG_DIR")
@@ -36,6 +49,165 @@ def _sanitize(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {key: value for key, value in payload.items() if value is not None}
 
 
+class _EventWriter:
+    """Background JSONL writer: the request path only enqueues serialized lines.
+
+    A single daemon thread drains the queue in batches, keeps the file handle
+    open between flushes and rotates by size. ``flush`` and ``shutdown`` wait for
+    everything enqueued before the call to reach the file.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        max_queue: int = _QUEUE_MAX_EVENTS,
+        batch_size: int = _BATCH_MAX_EVENTS,
+        flush_interval: float = _FLUSH_INTERVAL_SECONDS,
+        max_bytes: int = _MAX_FILE_BYTES,
+        backup_count: int = _BACKUP_COUNT,
+    ) -> None:
+        self._path = path
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._handle = None
+        self._size = 0
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def submit(self, line: str) -> bool:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            # Nunca bloquear el request path: el evento se pierde pero queda contado
+            with self._drop_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped % _DROP_WARNING_EVERY == 1:
+                _LOGGER.warning({"event": "agent_metrics_events_dropped", "dropped_total": dropped})
+            return False
+
+    def flush(self, timeout: float = _SHUTDOWN_TIMEOUT_SECONDS) -> bool:
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        marker = threading.Event()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.wait(timeout)
+
+    def shutdown(self, timeout: float = _SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        with self._start_lock:
+            thread, self._closed = self._thread, True
+        if thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name="AgentMetricsWriter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: List[str] = []
+            markers: List[threading.Event] = []
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if item is None:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+        self._close_handle()
+
+    def _write_batch(self, batch: List[str]) -> None:
+        # ensure_ascii=True: un caracter por byte, el tamano se lleva sin consultar el archivo
+        data = "\n".join(batch) + "\n"
+        try:
+            if self._handle is None:
+                self._open()
+            if self._size and self._size + len(data) > self._max_bytes:
+                self._rotate()
+            self._handle.write(data)
+            self._handle.flush()
+            self._size += len(data)
+            self.written += len(batch)
+        except OSError as exc:
+            self._close_handle()
+            _LOGGER.error({"event": "agent_metrics_write_failed", "error": str(exc), "path": str(self._path)})
+
+    def _rotate(self) -> None:
+        self._close_handle()
+        stem, suffix = self._path.stem, self._path.suffix
+        backups = [self._path.with_name(f"{stem}.{index}{suffix}") for index in range(1, self._backup_count + 1)]
+        if backups:
+            backups[-1].unlink(missing_ok=True)
+            for older, newer in zip(reversed(backups[:-1]), reversed(backups[1:])):
+                if older.exists():
+                    older.replace(newer)
+            self._path.replace(backups[0])
+        else:
+            self._path.unlink(missing_ok=True)
+        self._open()
+        self.rotations += 1
+
+    def _open(self) -> None:
+        self._path = self._path or _resolve_log_path()
+        self._handle = self._path.open("a", encoding="utf-8")
+        self._size = self._path.stat().st_size
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+
+_WRITER = _EventWriter()
+atexit.register(_WRITER.shutdown)
+
+
 def _write_event(payload: Dict[str, Any]) -> None:
     try:
         line = json.dumps(payload, ensure_ascii=True)
@@ -43,13 +215,16 @@ def _write_event(payload: Dict[str, Any]) -> None:
         _LOGGER.warning({"event": "agent_metrics_serialization_failed", "error": str(exc)})
         return
 
-    path = _resolve_log_path()
-    with _LOCK:
-        try:
-            with path.open("a", encoding="utf-8") as handle:
-                handle.write(line + "\n")
-        except OSError as exc:
-            _LOGGER.error({"event": "agent_metrics_write_failed", "error": str(exc), "path": str(path)})
+    _WRITER.submit(line)
+
+
+def flush_events(timeout: float = _SHUTDOWN_TIMEOUT_SECONDS) -> bool:
+    """Block until every event recorded so far is written to the JSONL file."""
+    return _WRITER.flush(timeout)
+
+
+def get_writer_stats() -> Dict[str, Any]:
+    return _WRITER.stats()
 
 
 def record_turn_event(
@@ -12,6 +12,31 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Tuple
 from collections import defaultdict, Counter
 import re
+import threading
+
+
+# Stop words (español e inglés) que no aportan a la búsqueda
+STOP_WORDS = frozenset({
+    "el", "la", "de", "que", "y", "a", "en", "un", "es", "se", "no", "te", "lo", "le",
+    "da", "su", "por", "son", "con", "para", "al", "del", "los", "las", "una", "como",
+    "pero", "sus", "le", "ya", "o", "porque", "cuando", "muy", "sin", "sobre", "tambien",
+    "me", "hasta", "donde", "quien", "desde", "todos", "durante", "todo", "algo", "mismo",
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with",
+    "by", "from", "up", "about", "into", "through", "during", "before", "after", "above",
+    "below", "to", "from", "down", "out", "off", "over", "under", "again", "further",
+    "then", "once", "here", "there", "when", "where", "why", "how", "all", "any", "both",
+    "each", "few", "more", "most", "other", "some", "such", "only", "own", "same", "so",
+    "than", "too", "very", "can", "will", "just", "should", "now"
+})
+
+# unicode61 sin diacríticos: "gestión" y "gestion" son el mismo término
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+# Peso BM25 por columna (title, content): el título pesa más que el cuerpo
+BM25_WEIGHTS = (10.0, 1.0)
+SNIPPET_TOKENS = 24
+PAGE_CACHE_KIB = 32 * 1024
+HIGHLIGHT_OPEN = "**"
+HIGHLIGHT_CLOSE = "**"
 
 
 class KnowledgeBase:
@@ -29,18 +54,30 @@ class KnowledgeBase:
         for directory in [self.knowledge_root, self.documents_dir]:
             directory.mkdir(parents=True, exist_ok=True)
         
+        # Conexión única de larga vida (WAL) compartida entre hilos
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Caché de páginas amplia: las listas de postings de FTS5 quedan en memoria
+        self._conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB}")
+        
         # Inicializar base de datos de índices
         self._init_search_database()
     
     def _init_search_database(self):
-        """Inicializa la base de datos SQLite para búsquedas"""
-        with sqlite3.connect(self.index_file) as conn:
+        """Inicializa la base de datos SQLite y el índice FTS5 para búsquedas"""
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            # Tabla principal de documentos
+            # Bases anteriores usan el rowid implícito, que un VACUUM puede renumerar
+            self._migrate_documents_id(cursor)
+            
+            # Tabla principal de documentos; id es el rowid estable del índice FTS5
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS documents (
-                    doc_id TEXT PRIMARY KEY,
+                    id INTEGER PRIMARY KEY,
+                    doc_id TEXT NOT NULL UNIQUE,
                     title TEXT NOT NULL,
                     content TEXT NOT NULL,
                     content_hash TEXT NOT NULL,
@@ -52,36 +89,102 @@ class KnowledgeBase:
                 )
             ''')
             
-            # Tabla de palabras clave para búsqueda
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS keywords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    doc_id TEXT NOT NULL,
-                    keyword TEXT NOT NULL,
-                    frequency INTEGER DEFAULT 1,
-                    FOREIGN KEY (doc_id) REFERENCES documents (doc_id) ON DELETE CASCADE
-                )
+                CREATE INDEX IF NOT EXISTS idx_documents_type 
+                ON documents (doc_type)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_documents_created 
+                ON documents (created_at)
             ''')
             
-            # Índices para optimizar búsquedas
+            # La tabla de palabras clave armada a mano queda reemplazada por FTS5
+            cursor.execute("DROP TABLE IF EXISTS keywords")
+            
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'"
+            )
+            fts_exists = cursor.fetchone() is not None
+            
+            # Índice full-text de contenido externo: no duplica el texto, lo lee de documents
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, content,
+                    content='documents', content_rowid='id',
+                    tokenize='{FTS_TOKENIZER}'
+                )
+            ''')
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_keywords_keyword 
-                ON keywords (keyword)
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts_terms
+                USING fts5vocab(documents_fts, 'row')
             ''')
+            
+            # Triggers: cada alta, cambio o baja en documents actualiza el índice incrementalmente
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_keywords_doc_id 
-                ON keywords (doc_id)
+                CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+                    INSERT INTO documents_fts (rowid, title, content)
+                    VALUES (new.id, new.title, new.content);
+                END
             ''')
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_documents_type 
-                ON documents (doc_type)
+                CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+                    INSERT INTO documents_fts (documents_fts, rowid, title, content)
+                    VALUES ('delete', old.id, old.title, old.content);
+                END
             ''')
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_documents_created 
-                ON documents (created_at)
+                CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF title, content ON documents
+                WHEN old.title IS NOT new.title OR old.content IS NOT new.content BEGIN
+                    INSERT INTO documents_fts (documents_fts, rowid, title, content)
+                    VALUES ('delete', old.id, old.title, old.content);
+                    INSERT INTO documents_fts (rowid, title, content)
+                    VALUES (new.id, new.title, new.content);
+                END
             ''')
             
-            conn.commit()
+            # Bases creadas antes del índice FTS5: poblarlo una sola vez
+            if not fts_exists:
+                cursor.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+    
+    @staticmethod
+    def _migrate_documents_id(cursor: sqlite3.Cursor) -> None:
+        """Reconstruye una tabla documents sin columna ``id`` y descarta su índice FTS5"""
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(documents)")]
+        if not columns or "id" in columns:
+            return
+        
+        # El índice y sus triggers apuntan al rowid anterior: se recrean y repueblan
+        cursor.execute("DROP TABLE IF EXISTS documents_fts_terms")
+        cursor.execute("DROP TABLE IF EXISTS documents_fts")
+        cursor.execute('''
+            CREATE TABLE documents_migrated (
+                id INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                created_at DATETIME NOT NULL,
+                updated_at DATETIME NOT NULL,
+                doc_type TEXT DEFAULT 'general',
+                file_path TEXT,
+                metadata TEXT
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO documents_migrated
+            (doc_id, title, content, content_hash, created_at, updated_at,
+             doc_type, file_path, metadata)
+            SELECT doc_id, title, content, content_hash, created_at, updated_at,
+                   doc_type, file_path, metadata
+            FROM documents ORDER BY rowid
+        ''')
+        cursor.execute("DROP TABLE documents")
+        cursor.execute("ALTER TABLE documents_migrated RENAME TO documents")
+    
+    def close(self) -> None:
+        """Cierra la conexión al índice"""
+        with self._lock:
+            self._conn.close()
     
     def add_document(self, 
                     doc_id: str,
@@ -113,8 +216,8 @@ class KnowledgeBase:
         # Extraer palabras clave del contenido
         keywords = self._extract_keywords_advanced(content)
         
-        # Guardar en base de datos
-        with sqlite3.connect(self.index_file) as conn:
+        # Guardar en base de datos (los triggers mantienen el índice FTS5)
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             # Verificar si el documento ya existe
@@ -130,9 +233,6 @@ class KnowledgeBase:
                     WHERE doc_id = ?
                 ''', (content, content_hash, now, title, doc_type, 
                      file_path, json.dumps(metadata or {}), doc_id))
-                
-                # Limpiar palabras clave existentes
-                cursor.execute("DELETE FROM keywords WHERE doc_id = ?", (doc_id,))
             else:
                 # Insertar nuevo documento
                 cursor.execute('''
@@ -142,16 +242,7 @@ class KnowledgeBase:
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (doc_id, title, content, content_hash, now, now, 
                      doc_type, file_path, json.dumps(metadata or {})))
-            
-            # Insertar palabras clave
-            for keyword, frequency in keywords.items():
-                cursor.execute('''
-                    INSERT INTO keywords (doc_id, keyword, frequency)
-                    VALUES (?, ?, ?)
-                ''', (doc_id, keyword, frequency))
-            
-            conn.commit()
-        
+
         # Actualizar estadísticas
         self._update_stats()
         
@@ -170,8 +261,11 @@ class KnowledgeBase:
                         doc_type: str = None,
                         days_back: int = None) -> List[Dict[str, Any]]:
         """
-        Busca documentos en la base de conocimiento
-        
+        Busca documentos en la base de conocimiento (índice FTS5, ranking BM25)
+
+        Se exigen todos los términos de la consulta; si ningún documento los
+        contiene a todos, alcanza con cualquiera de ellos.
+
         Args:
             query: Consulta de búsqueda
             limit: Número máximo de resultados
@@ -181,86 +275,87 @@ class KnowledgeBase:
         Returns:
             Lista de documentos relevantes con puntuaciones
         """
-        query_keywords = self._extract_keywords_advanced(query.lower())
+        terms = self._match_terms(query)
         
-        if not query_keywords:
+        if not terms:
             return []
         
-        # Construir consulta SQL
-        base_query = '''
-            SELECT d.doc_id, d.title, d.content, d.created_at, d.updated_at,
-                   d.doc_type, d.file_path, d.metadata,
-                   SUM(k.frequency) as relevance_score
-            FROM documents d
-            JOIN keywords k ON d.doc_id = k.doc_id
-            WHERE k.keyword IN ({})
-        '''.format(','.join(['?' for _ in query_keywords]))
-        
-        params = list(query_keywords.keys())
-        
-        # Agregar filtros adicionales
+        # Filtros adicionales sobre la tabla de documentos
+        filters = ""
+        filter_params: List[Any] = []
         if doc_type:
-            base_query += " AND d.doc_type = ?"
-            params.append(doc_type)
+            filters += " AND d.doc_type = ?"
+            filter_params.append(doc_type)
         
         if days_back:
             cutoff_date = datetime.now() - timedelta(days=days_back)
-            base_query += " AND d.created_at >= ?"
-            params.append(cutoff_date)
-        
-        base_query += '''
-            GROUP BY d.doc_id
-            ORDER BY relevance_score DESC, d.updated_at DESC
-            LIMIT ?
-        '''
-        params.append(limit)
+            filters += " AND d.created_at >= ?"
+            filter_params.append(cutoff_date)
+        
+        # Todos los términos primero; si ningún documento los tiene a todos, cualquiera
+        match_query = " ".join(terms)
+        with self._lock:
+            ranked = self._rank_matches(match_query, filters, filter_params, limit)
+            if not ranked and len(terms) > 1:
+                match_query = " OR ".join(terms)
+                ranked = self._rank_matches(match_query, filters, filter_params, limit)
+            hits = self._fetch_hits(match_query, [doc_rowid for doc_rowid, _ in ranked])
         
-        # Ejecutar búsqueda
         results = []
-        with sqlite3.connect(self.index_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute(base_query, params)
+        for doc_rowid, rank in ranked:
+            (doc_id, title, content, created_at, updated_at, doc_type,
+             file_path, metadata, snippet, highlighted_title) = hits[doc_rowid]
             
-            for row in cursor.fetchall():
-                doc_id, title, content, created_at, updated_at, doc_type, file_path, metadata, score = row
-                
-                # Calcular score mejorado basado en coincidencias exactas
-                enhanced_score = score
-                content_lower = content.lower()
-                query_lower = query.lower()
-                
-                # Bonus por coincidencia exacta de la consulta
-                if query_lower in content_lower:
-                    enhanced_score += 50
-                
-                # Bonus por coincidencia en el título
-                if query_lower in title.lower():
-                    enhanced_score += 30
-                
-                # Extraer fragmentos relevantes
-                relevant_snippets = self._extract_relevant_snippets(content, query, max_snippets=3)
-                
-                try:
-                    parsed_metadata = json.loads(metadata) if metadata else {}
-                except:
-                    parsed_metadata = {}
-                
-                results.append({
-                    "doc_id": doc_id,
-                    "title": title,
-                    "content": content,
-                    "score": enhanced_score,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "doc_type": doc_type,
-                    "file_path": file_path,
-                    "metadata": parsed_metadata,
-                    "relevant_snippets": relevant_snippets
-                })
+            try:
+                parsed_metadata = json.loads(metadata) if metadata else {}
+            except:
+                parsed_metadata = {}
+            
+            results.append({
+                "doc_id": doc_id,
+                "title": title,
+                "highlighted_title": highlighted_title,
+                "content": content,
+                "score": -rank,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "doc_type": doc_type,
+                "file_path": file_path,
+                "metadata": parsed_metadata,
+                "relevant_snippets": [snippet] if snippet else []
+            })
         
-        # Ordenar por score mejorado
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return results
+    
+    def _rank_matches(self, match_query: str, filters: str,
+                      filter_params: List[Any], limit: int) -> List[Tuple[int, float]]:
+        """Top ``limit`` por BM25 (menor es mejor); sólo une documents si hay filtros"""
+        join = " JOIN documents d ON d.id = documents_fts.rowid" if filters else ""
+        cursor = self._conn.execute(f'''
+            SELECT documents_fts.rowid, bm25(documents_fts, ?, ?) AS rank
+            FROM documents_fts{join}
+            WHERE documents_fts MATCH ?{filters}
+            ORDER BY rank
+            LIMIT ?
+        ''', [*BM25_WEIGHTS, match_query, *filter_params, limit])
+        return cursor.fetchall()
+    
+    def _fetch_hits(self, match_query: str, doc_rowids: List[int]) -> Dict[int, Tuple]:
+        """Datos, snippet() y highlight() sólo de los documentos que sobrevivieron al LIMIT"""
+        if not doc_rowids:
+            return {}
+        cursor = self._conn.execute(f'''
+            SELECT documents_fts.rowid, d.doc_id, d.title, d.content, d.created_at,
+                   d.updated_at, d.doc_type, d.file_path, d.metadata,
+                   snippet(documents_fts, 1, ?, ?, '...', ?),
+                   highlight(documents_fts, 0, ?, ?)
+            FROM documents_fts
+            JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+              AND documents_fts.rowid IN ({','.join('?' for _ in doc_rowids)})
+        ''', [HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, SNIPPET_TOKENS,
+              HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE, match_query, *doc_rowids])
+        return {row[0]: row[1:] for row in cursor.fetchall()}
     
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -272,8 +367,8 @@ class KnowledgeBase:
         Returns:
             Documento completo o None si no existe
         """
-        with sqlite3.connect(self.index_file) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute('''
                 SELECT doc_id, title, content, created_at, updated_at,
                        doc_type, file_path, metadata
@@ -313,11 +408,11 @@ class KnowledgeBase:
         Returns:
             True si se eliminó exitosamente
         """
-        with sqlite3.connect(self.index_file) as conn:
+        # El trigger documents_fts_delete saca el documento del índice FTS5
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
             deleted = cursor.rowcount > 0
-            conn.commit()
         
         if deleted:
             self._update_stats()
@@ -360,8 +455,8 @@ class KnowledgeBase:
         params.append(limit)
         
         results = []
-        with sqlite3.connect(self.index_file) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute(base_query, params)
             
             for row in cursor.fetchall():
@@ -394,15 +489,15 @@ class KnowledgeBase:
             "last_updated": datetime.now().isoformat()
         }
         
-        with sqlite3.connect(self.index_file) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
             
             # Contar documentos totales
             cursor.execute("SELECT COUNT(*) FROM documents")
             stats["total_documents"] = cursor.fetchone()[0]
             
-            # Contar palabras clave totales
-            cursor.execute("SELECT COUNT(*) FROM keywords")
+            # Términos distintos del índice FTS5
+            cursor.execute("SELECT COUNT(*) FROM documents_fts_terms")
             stats["total_keywords"] = cursor.fetchone()[0]
             
             # Estadísticas por tipo de documento
@@ -454,105 +549,65 @@ class KnowledgeBase:
     
     def reindex_documents(self) -> Dict[str, Any]:
         """
-        Reindexar todos los documentos para mejorar la búsqueda
+        Reconstruye el índice FTS5 desde la tabla de documentos.
+        
+        Las altas y bajas ya se indexan de forma incremental y el índice usa
+        ``documents.id``, estable ante un VACUUM; esto sólo hace falta si el
+        índice quedó desalineado y, de paso, compacta sus segmentos.
         
         Returns:
             Resultado de la reindexación
         """
         start_time = datetime.now()
         
-        with sqlite3.connect(self.index_file) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM documents")
+            total_documents = cursor.fetchone()[0]
             
-            # Obtener todos los documentos
-            cursor.execute("SELECT doc_id, content FROM documents")
-            documents = cursor.fetchall()
-            
-            # Limpiar índices existentes
-            cursor.execute("DELETE FROM keywords")
-            
-            # Reindexar cada documento
-            for doc_id, content in documents:
-                keywords = self._extract_keywords_advanced(content)
-                
-                for keyword, frequency in keywords.items():
-                    cursor.execute('''
-                        INSERT INTO keywords (doc_id, keyword, frequency)
-                        VALUES (?, ?, ?)
-                    ''', (doc_id, keyword, frequency))
-            
-            conn.commit()
+            cursor.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
         
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
         
         return {
-            "reindexed_documents": len(documents),
+            "reindexed_documents": total_documents,
             "processing_time_seconds": round(processing_time, 2),
             "completed_at": end_time.isoformat()
         }
     
+    def _match_terms(self, query: str) -> List[str]:
+        """Términos de la consulta libre como cadenas FTS5 entre comillas"""
+        terms = []
+        for term in re.findall(r'\w+', query.lower()):
+            if term not in STOP_WORDS and term not in terms:
+                terms.append(term)
+        
+        # Entre comillas la sintaxis de FTS5 (AND, NOT, *, ^) queda literal
+        return [f'"{term}"' for term in terms]
+    
     def _extract_keywords_advanced(self, text: str) -> Dict[str, int]:
         """Extrae palabras clave con análisis de frecuencia avanzado"""
         # Limpiar texto
         text = re.sub(r'[^\w\s]', ' ', text.lower())
         words = text.split()
         
-        # Stop words expandida
-        stop_words = {
-            "el", "la", "de", "que", "y", "a", "en", "un", "es", "se", "no", "te", "lo", "le",
-            "da", "su", "por", "son", "con", "para", "al", "del", "los", "las", "una", "como",
-            "pero", "sus", "le", "ya", "o", "porque", "cuando", "muy", "sin", "sobre", "tambien",
-            "me", "hasta", "donde", "quien", "desde", "todos", "durante", "todo", "algo", "mismo",
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with",
-            "by", "from", "up", "about", "into", "through", "during", "before", "after", "above",
-            "below", "to", "from", "down", "out", "off", "over", "under", "again", "further",
-            "then", "once", "here", "there", "when", "where", "why", "how", "all", "any", "both",
-            "each", "few", "more", "most", "other", "some", "such", "only", "own", "same", "so",
-            "than", "too", "very", "can", "will", "just", "should", "now"
-        }
-        
         # Contar frecuencias
         word_freq = Counter()
         
         for word in words:
             # Filtrar palabras muy cortas y stop words
-            if len(word) >= 3 and word not in stop_words and word.isalpha():
+            if len(word) >= 3 and word not in STOP_WORDS and word.isalpha():
                 word_freq[word] += 1
         
         # Filtrar palabras con frecuencia muy baja si hay muchas palabras
         if len(word_freq) > 50:
             min_frequency = 2
-            word_freq = {word: freq for word, freq in word_freq.items() if freq >= min_frequency}
+            word_freq = Counter({word: freq for word, freq in word_freq.items() if freq >= min_frequency})
         
         return dict(word_freq.most_common(100))  # Top 100 palabras
     
-    def _extract_relevant_snippets(self, content: str, query: str, max_snippets: int = 3) -> List[str]:
-        """Extrae fragmentos relevantes del contenido"""
-        query_lower = query.lower()
-        content_lower = content.lower()
-        snippets = []
-        
-        # Buscar coincidencias exactas
-        sentences = content.split('.')
-        for sentence in sentences:
-            if query_lower in sentence.lower() and len(sentence.strip()) > 10:
-                # Limpiar y truncar si es necesario
-                snippet = sentence.strip()
-                if len(snippet) > 200:
-                    # Encontrar la posición de la consulta y mostrar contexto
-                    query_pos = snippet.lower().find(query_lower)
-                    start = max(0, query_pos - 50)
-                    end = min(len(snippet), query_pos + len(query) + 50)
-                    snippet = "..." + snippet[start:end] + "..."
-                
-                snippets.append(snippet)
-                
-                if len(snippets) >= max_snippets:
-                    break
-        
-        return snippets
-    
     def _update_stats(self):
         """Actualiza estadísticas internas (llamada automáticamente)"""
         # Las estadísticas se calculan dinámicamente en get_stats()
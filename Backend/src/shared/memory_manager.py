@@ -3,12 +3,15 @@ Memory Manager - Sistema de memoria persistente para la IA
 """
 
 import os
+import re
 import json
 import uuid
+import sqlite3
 import hashlib
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
 from src.core.logging import get_logger
@@ -16,6 +19,20 @@ from src.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Stop words básicas (español e inglés)
+# Los términos cortos (IVA, ATM, USD) se buscan: solo se descartan estas palabras
+STOP_WORDS = frozenset({
+    "el", "la", "de", "que", "y", "a", "en", "un", "es", "se", "no", "te", "lo", "le",
+    "da", "su", "por", "son", "con", "para", "al", "del", "los", "las", "una", "como",
+    "o", "u", "e", "ni", "me", "mi", "tu", "si", "ya", "sus", "sin", "hay", "muy", "mas",
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with"
+})
+
+# unicode61 sin diacríticos, igual que el índice de la KnowledgeBase
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+MATCHED_CONTENT_PER_SESSION = 3
+RELEVANT_MESSAGES_PER_SESSION = 5
+
 
 class MemoryManager:
     """
@@ -28,9 +45,96 @@ class MemoryManager:
         self.context_dir = self.memory_root / "context"
         self.embeddings_dir = self.memory_root / "embeddings"
         
+        self.index_file = self.context_dir / "memory_index.db"
+        
         # Crear directorios necesarios
         for directory in [self.conversations_dir, self.context_dir, self.embeddings_dir]:
             directory.mkdir(parents=True, exist_ok=True)
+        
+        # Índice invertido único y persistente (FTS5) sobre una conexión WAL de larga vida
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_index()
+    
+    def _init_index(self):
+        """Crea el índice de sesiones y mensajes; migra conversaciones previas una sola vez"""
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'"
+            )
+            index_exists = cursor.fetchone() is not None
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    stored_at TEXT NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    metadata TEXT,
+                    file_path TEXT NOT NULL,
+                    file_size INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_stored_at ON sessions (stored_at)")
+            
+            # stored_at se repite por mensaje para filtrar la ventana de tiempo dentro del índice
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    message_index INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    stored_at TEXT NOT NULL
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id)")
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    content, content='messages', content_rowid='id',
+                    tokenize='{FTS_TOKENIZER}'
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                    INSERT INTO messages_fts (messages_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END
+            ''')
+        
+        if not index_exists:
+            self._backfill_index()
+    
+    def _backfill_index(self):
+        """Indexa las conversaciones guardadas antes del índice y borra los index_*.json"""
+        for conversation_file in self.conversations_dir.glob("conversation_*.json"):
+            try:
+                with open(conversation_file, 'r', encoding='utf-8') as f:
+                    conversation_data = json.load(f)
+                self._index_conversation(
+                    conversation_data["session_id"],
+                    conversation_data.get("messages", []),
+                    conversation_data["stored_at"],
+                    metadata=conversation_data.get("metadata", {}),
+                    conversation_file=conversation_file,
+                )
+            except Exception:
+                logger.exception('Failed to index conversation file %s', conversation_file, extra={'log_context': f'file={conversation_file}'})
+        
+        for legacy_index in self.context_dir.glob("index_*.json"):
+            legacy_index.unlink(missing_ok=True)
+    
+    def close(self) -> None:
+        """Cierra la conexión al índice"""
+        with self._lock:
+            self._conn.close()
     
     def store_conversation(self, 
                           session_id: str, 
@@ -61,8 +165,11 @@ class MemoryManager:
         with open(conversation_file, 'w', encoding='utf-8') as f:
             json.dump(conversation_data, f, indent=2, ensure_ascii=False, default=str)
         
-        # Crear índice de búsqueda
-        self._index_conversation(session_id, messages, conversation_data["stored_at"])
+        # Actualizar el índice de búsqueda
+        self._index_conversation(
+            session_id, messages, conversation_data["stored_at"],
+            metadata=conversation_data["metadata"], conversation_file=conversation_file,
+        )
         
         return {
             "session_id": session_id,
@@ -110,7 +217,7 @@ class MemoryManager:
         Returns:
             Lista de contexto relevante
         """
-        # Buscar en el índice de conversaciones
+        # Buscar en el índice: sólo se leen las sesiones que coinciden
         relevant_contexts = self._search_conversation_index(
             query, session_id, limit, time_window_days
         )
@@ -122,15 +229,17 @@ class MemoryManager:
             try:
                 conversation = self.retrieve_conversation(context["session_id"])
                 if conversation:
+                    messages = conversation["messages"]
                     enriched_context = {
                         "session_id": context["session_id"],
                         "relevance_score": context["score"],
                         "matched_content": context["matched_content"],
                         "timestamp": context["timestamp"],
                         "full_conversation": conversation,
-                        "relevant_messages": self._extract_relevant_messages(
-                            conversation["messages"], query
-                        )
+                        "relevant_messages": [
+                            messages[index] for index in context["message_indexes"]
+                            if index < len(messages)
+                        ][:RELEVANT_MESSAGES_PER_SESSION]
                     }
                     enriched_contexts.append(enriched_context)
             except Exception:
@@ -192,32 +301,31 @@ class MemoryManager:
             Lista de conversaciones con resúmenes
         """
         cutoff_date = datetime.now() - timedelta(days=days_back)
-        conversations = []
         
-        for conversation_file in self.conversations_dir.glob("conversation_*.json"):
-            conversation_session_id = None
-            try:
-                with open(conversation_file, 'r', encoding='utf-8') as f:
-                    conversation_data = json.load(f)
-                    conversation_session_id = conversation_data.get('session_id')
-                
-                stored_at = datetime.fromisoformat(conversation_data["stored_at"])
-                if stored_at >= cutoff_date:
-                    summary = {
-                        "session_id": conversation_data["session_id"],
-                        "stored_at": conversation_data["stored_at"],
-                        "message_count": conversation_data["message_count"],
-                        "metadata": conversation_data.get("metadata", {}),
-                        "file_path": str(conversation_file)
-                    }
-                    conversations.append(summary)
-            except Exception:
-                logger.exception('Failed to read conversation file %s', conversation_file, extra={'session_id': conversation_session_id, 'log_context': f'file={conversation_file}'})
-                continue
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT session_id, stored_at, message_count, metadata, file_path
+                FROM sessions
+                WHERE stored_at >= ?
+                ORDER BY stored_at DESC
+                LIMIT ?
+            ''', (cutoff_date.isoformat(), limit)).fetchall()
         
-        # Ordenar por fecha más reciente
-        conversations.sort(key=lambda x: x["stored_at"], reverse=True)
-        return conversations[:limit]
+        conversations = []
+        for session_id, stored_at, message_count, metadata, file_path in rows:
+            try:
+                parsed_metadata = json.loads(metadata) if metadata else {}
+            except ValueError:
+                parsed_metadata = {}
+            conversations.append({
+                "session_id": session_id,
+                "stored_at": stored_at,
+                "message_count": message_count,
+                "metadata": parsed_metadata,
+                "file_path": file_path
+            })
+        
+        return conversations
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -226,15 +334,6 @@ class MemoryManager:
         Returns:
             Estadísticas de memoria
         """
-        total_conversations = len(list(self.conversations_dir.glob("conversation_*.json")))
-        
-        # Calcular tamaño total
-        total_size = 0
-        for file_path in self.memory_root.rglob("*"):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-        
-        # Estadísticas por período
         now = datetime.now()
         periods = {
             "last_day": now - timedelta(days=1),
@@ -242,19 +341,26 @@ class MemoryManager:
             "last_month": now - timedelta(days=30)
         }
         
-        period_stats = {}
-        for period_name, cutoff in periods.items():
-            count = 0
-            for conversation_file in self.conversations_dir.glob("conversation_*.json"):
-                try:
-                    with open(conversation_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    stored_at = datetime.fromisoformat(data["stored_at"])
-                    if stored_at >= cutoff:
-                        count += 1
-                except Exception:
-                    continue
-            period_stats[period_name] = count
+        # Conteos y tamaños desde el índice, sin abrir cada conversación
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM sessions")
+            total_conversations, conversations_size = cursor.fetchone()
+            
+            # Estadísticas por período
+            period_stats = {}
+            for period_name, cutoff in periods.items():
+                cursor.execute(
+                    "SELECT COUNT(*) FROM sessions WHERE stored_at >= ?", (cutoff.isoformat(),)
+                )
+                period_stats[period_name] = cursor.fetchone()[0]
+        
+        # Calcular tamaño total (índice y embeddings son pocos archivos)
+        total_size = conversations_size
+        for directory in [self.context_dir, self.embeddings_dir]:
+            for file_path in directory.rglob("*"):
+                if file_path.is_file():
+                    total_size += file_path.stat().st_size
         
         return {
             "total_conversations": total_conversations,
@@ -262,7 +368,7 @@ class MemoryManager:
             "memory_root": str(self.memory_root),
             "period_stats": period_stats,
             "directories": {
-                "conversations": len(list(self.conversations_dir.glob("*"))),
+                "conversations": total_conversations,
                 "context": len(list(self.context_dir.glob("*"))),
                 "embeddings": len(list(self.embeddings_dir.glob("*")))
             }
@@ -273,117 +379,109 @@ class MemoryManager:
         conversation_text = json.dumps(messages, sort_keys=True)
         return hashlib.md5(conversation_text.encode()).hexdigest()
     
-    def _index_conversation(self, session_id: str, messages: List[Dict[str, Any]], timestamp: str):
-        """Crea índice de búsqueda para la conversación"""
-        index_file = self.context_dir / f"index_{session_id}.json"
-        
-        # Extraer contenido de búsqueda
-        searchable_content = []
-        for i, message in enumerate(messages):
-            content = message.get("content", "")
-            if content:
-                searchable_content.append({
-                    "message_index": i,
-                    "role": message.get("role", "unknown"),
-                    "content": content,
-                    "keywords": self._extract_keywords(content)
-                })
-        
-        index_data = {
-            "session_id": session_id,
-            "created_at": timestamp,
-            "content": searchable_content,
-            "total_messages": len(messages)
-        }
-        
-        with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, indent=2, ensure_ascii=False)
+    def _index_conversation(self,
+                            session_id: str,
+                            messages: List[Dict[str, Any]],
+                            timestamp: str,
+                            metadata: Dict[str, Any] = None,
+                            conversation_file: Path = None):
+        """Reemplaza incrementalmente la sesión en el índice (los triggers mantienen FTS5)"""
+        conversation_file = conversation_file or self.conversations_dir / f"conversation_{session_id}.json"
+        try:
+            file_size = conversation_file.stat().st_size
+        except OSError:
+            file_size = 0
+        
+        rows = [
+            (session_id, i, message.get("role", "unknown"), str(message["content"]), timestamp)
+            for i, message in enumerate(messages)
+            if message.get("content")
+        ]
+        
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.executemany('''
+                INSERT INTO messages (session_id, message_index, role, content, stored_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+            conn.execute('''
+                INSERT OR REPLACE INTO sessions
+                (session_id, stored_at, message_count, metadata, file_path, file_size)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (session_id, timestamp, len(messages),
+                  json.dumps(metadata or {}, ensure_ascii=False, default=str),
+                  str(conversation_file), file_size))
     
     def _search_conversation_index(self, query: str, session_id: str, limit: int, time_window_days: int) -> List[Dict[str, Any]]:
-        """Busca en los índices de conversaciones"""
-        query_lower = query.lower()
-        query_keywords = self._extract_keywords(query)
-        results = []
+        """Busca en el índice invertido: sesiones ordenadas por la suma de BM25 de sus mensajes"""
+        terms = self._match_terms(query)
+        if not terms:
+            return []
         
+        match_query = " OR ".join(terms)
         cutoff_date = datetime.now() - timedelta(days=time_window_days)
         
-        index_pattern = f"index_{session_id}.json" if session_id else "index_*.json"
-        for index_file in self.context_dir.glob(index_pattern):
-            try:
-                with open(index_file, 'r', encoding='utf-8') as f:
-                    index_data = json.load(f)
-                
-                # Verificar ventana de tiempo
-                created_at = datetime.fromisoformat(index_data["created_at"])
-                if created_at < cutoff_date:
-                    continue
-                
-                # Calcular relevancia
-                relevance_score = 0
-                matched_content = []
-                
-                for content_item in index_data["content"]:
-                    item_content = content_item["content"].lower()
-                    item_keywords = content_item["keywords"]
-                    
-                    # Búsqueda por coincidencia exacta
-                    if query_lower in item_content:
-                        relevance_score += 10
-                        matched_content.append(content_item["content"])
-                    
-                    # Búsqueda por keywords
-                    matching_keywords = set(query_keywords) & set(item_keywords)
-                    if matching_keywords:
-                        relevance_score += len(matching_keywords) * 5
-                        matched_content.append(content_item["content"])
-                
-                if relevance_score > 0:
-                    results.append({
-                        "session_id": index_data["session_id"],
-                        "score": relevance_score,
-                        "matched_content": matched_content[:3],  # Top 3 matches
-                        "timestamp": index_data["created_at"]
-                    })
+        filters = " AND m.stored_at >= ?"
+        filter_params: List[Any] = [cutoff_date.isoformat()]
+        if session_id:
+            filters += " AND m.session_id = ?"
+            filter_params.append(session_id)
+        
+        with self._lock:
+            # rank es bm25() como columna: a diferencia de la función, se puede agregar
+            sessions = self._conn.execute(f'''
+                SELECT m.session_id, MAX(m.stored_at), -SUM(messages_fts.rank) AS score
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                WHERE messages_fts MATCH ?{filters}
+                GROUP BY m.session_id
+                ORDER BY score DESC
+                LIMIT ?
+            ''', [match_query, *filter_params, limit]).fetchall()
             
-            except Exception:
-                logger.exception('Failed to search index %s', index_file, extra={'log_context': f'index={index_file}'})
-                continue
-        
-        # Ordenar por relevancia
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
-    
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extrae keywords básicos del texto"""
-        # Lista de stop words básica
-        stop_words = {
-            "el", "la", "de", "que", "y", "a", "en", "un", "es", "se", "no", "te", "lo", "le", 
-            "da", "su", "por", "son", "con", "para", "al", "del", "los", "las", "una", "como",
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with"
-        }
-        
-        words = text.lower().split()
-        keywords = []
-        
-        for word in words:
-            # Limpiar palabra
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if len(clean_word) > 3 and clean_word not in stop_words:
-                keywords.append(clean_word)
+            if not sessions:
+                return []
+            
+            # Mensajes coincidentes sólo de las sesiones elegidas, por rowid: sin rank,
+            # FTS5 salta directo a esas filas en lugar de recorrer todas las coincidencias
+            placeholders = ','.join('?' for _ in sessions)
+            message_ids = [row[0] for row in self._conn.execute(
+                f"SELECT id FROM messages WHERE session_id IN ({placeholders})",
+                [row[0] for row in sessions],
+            )]
+            placeholders = ','.join('?' for _ in message_ids)
+            matches = self._conn.execute(f'''
+                SELECT m.session_id, m.message_index, m.content
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                WHERE messages_fts MATCH ? AND messages_fts.rowid IN ({placeholders})
+                ORDER BY m.session_id, m.message_index
+            ''', [match_query, *message_ids]).fetchall()
+        
+        matched_by_session: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        for match_session_id, message_index, content in matches:
+            matched_by_session[match_session_id].append((message_index, content))
         
-        return list(set(keywords))  # Remover duplicados
+        results = []
+        for match_session_id, timestamp, score in sessions:
+            matched = matched_by_session[match_session_id]
+            results.append({
+                "session_id": match_session_id,
+                "score": score,
+                "matched_content": [content for _, content in matched[:MATCHED_CONTENT_PER_SESSION]],
+                "message_indexes": [index for index, _ in matched],
+                "timestamp": timestamp
+            })
+        
+        return results
     
-    def _extract_relevant_messages(self, messages: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
-        """Extrae mensajes más relevantes a la consulta"""
-        query_lower = query.lower()
-        relevant_messages = []
-        
-        for message in messages:
-            content = message.get("content", "").lower()
-            if query_lower in content:
-                relevant_messages.append(message)
-        
-        return relevant_messages[:5]  # Top 5 mensajes más relevantes
+    def _match_terms(self, query: str) -> List[str]:
+        """Términos de la consulta como cadenas FTS5 entre comillas (sintaxis literal)"""
+        terms = []
+        for term in re.findall(r'\w+', query.lower()):
+            if term not in STOP_WORDS and term not in terms:
+                terms.append(term)
+        return [f'"{term}"' for term in terms]
     
     def _get_word_frequency(self, text: str) -> Dict[str, int]:
         """Obtiene frecuencia de palabras en el texto"""
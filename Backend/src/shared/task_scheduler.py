@@ -5,17 +5,33 @@ Task Scheduler - Sistema de programación de tareas para la IA
 import os
 import json
 import uuid
+import heapq
 import asyncio
+import inspect
+import itertools
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable, Union
+from typing import Dict, List, Any, Optional, Callable, Union, Tuple
 from enum import Enum
-import time
 from collections import defaultdict
 import logging
 
 
+# Las funciones que declaran este parámetro reciben un threading.Event que se
+# activa al cancelar la tarea o al vencer su timeout (cancelación cooperativa)
+CANCEL_EVENT_KWARG = "cancel_event"
+# Tiempo que las tareas terminadas siguen consultables antes de expirar
+COMPLETED_TASK_RETENTION = timedelta(hours=24)
+# Espera máxima del loop sin eventos (cubre saltos del reloj de pared)
+MAX_IDLE_WAIT_SECONDS = 60.0
+# Journal append-only de las tareas persistentes (una línea JSON por transición)
+JOURNAL_FILE_NAME = "journal.jsonl"
+# El journal se compacta cuando supera max(este mínimo, 2x las tareas vivas)
+JOURNAL_COMPACT_MIN_RECORDS = 1000
+
+
 class TaskStatus(Enum):
     """Estados posibles de una tarea"""
     PENDING = "pending"
@@ -26,6 +42,10 @@ class TaskStatus(Enum):
     SCHEDULED = "scheduled"
 
 
+# Estados terminales tal como quedan serializados en el journal
+FINISHED_STATUS_VALUES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value, TaskStatus.CANCELLED.value}
+
+
 class TaskPriority(Enum):
     """Prioridades de tarea"""
     LOW = 1
@@ -34,6 +54,14 @@ class TaskPriority(Enum):
     CRITICAL = 4
 
 
+def _accepts_cancel_event(function: Callable) -> bool:
+    """True si la función declara explícitamente el parámetro de cancelación"""
+    try:
+        return CANCEL_EVENT_KWARG in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 class Task:
     """Representa una tarea individual"""
     
@@ -69,6 +97,12 @@ class Task:
         self.result = None
         self.retry_count = 0
         self.execution_time = None
+        
+        # Ejecución en curso: cada intento tiene su token y su evento de cancelación
+        self.cancel_event = threading.Event()
+        self.attempt = 0
+        self.accepts_cancel_event = _accepts_cancel_event(function)
+        self.persistent = False
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte la tarea a diccionario para serialización"""
@@ -93,23 +127,54 @@ class Task:
 class TaskScheduler:
     """
     Programador de tareas que puede ejecutar funciones de forma asíncrona
+    
+    Las tareas esperan en heaps: por (scheduled_time, -prioridad) hasta vencer,
+    luego por prioridad hasta que haya un worker libre en un pool fijo de
+    ``max_concurrent_tasks`` hilos. El loop duerme en una condición hasta el
+    próximo vencimiento, timeout o expiración, así que su costo no depende de
+    cuántas tareas haya pendientes.
+    
+    Las tareas persistentes se registran en un único journal append-only
+    (``tasks/journal.jsonl``): cada transición agrega una línea con el estado
+    completo de la tarea y el arranque reproduce ese archivo. Cuando el journal
+    crece más del doble que las tareas vivas se reescribe compactado.
     """
     
-    def __init__(self, workspace_root: Path, max_concurrent_tasks: int = 5):
+    def __init__(self,
+                 workspace_root: Path,
+                 max_concurrent_tasks: int = 5,
+                 completed_retention: timedelta = COMPLETED_TASK_RETENTION):
         self.workspace_root = Path(workspace_root)
         self.tasks_dir = self.workspace_root / "tasks"
+        self.journal_file = self.tasks_dir / JOURNAL_FILE_NAME
         self.max_concurrent_tasks = max_concurrent_tasks
+        self.completed_retention = completed_retention
         
         # Cola de tareas y estado
         self.tasks: Dict[str, Task] = {}
-        self.running_tasks: Dict[str, threading.Thread] = {}
-        self.completed_tasks: List[str] = []
-        self.failed_tasks: List[str] = []
+        self.running_tasks: Dict[str, Future] = {}
+        self.completed_tasks: set = set()
+        self.failed_tasks: set = set()
+        
+        # Heaps con borrado perezoso: las entradas obsoletas se descartan al salir
+        self._sequence = itertools.count()
+        self._timer_heap: List[Tuple[datetime, int, int, str]] = []     # (scheduled_time, -prioridad, seq, id)
+        self._ready_heap: List[Tuple[int, datetime, int, str]] = []     # (-prioridad, scheduled_time, seq, id)
+        self._deadline_heap: List[Tuple[datetime, int, str]] = []       # (vence timeout, intento, id)
+        self._expiry_heap: List[Tuple[datetime, str]] = []              # (completed_at, id)
+        self._busy_workers = 0
         
         # Control de ejecución
         self.is_running = False
         self.scheduler_thread = None
         self.lock = threading.Lock()
+        self._wakeup = threading.Condition(self.lock)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Último estado conocido de cada tarea persistente (incluye las recuperadas)
+        self.persisted_tasks: Dict[str, Dict[str, Any]] = {}
+        self._journal = None
+        self._journal_records = 0
         
         # Configurar logging
         self.logger = logging.getLogger(__name__)
@@ -166,9 +231,14 @@ class TaskScheduler:
         
         with self.lock:
             self.tasks[task_id] = task
+            self._push_timer(task)
             
             if persist:
                 self._save_task_to_disk(task)
+            
+            # Despertar al loop sólo si esta tarea vence antes que la que esperaba
+            if self._timer_heap[0][3] == task_id:
+                self._wakeup.notify()
         
         self.logger.info(f"Tarea programada: {name} (ID: {task_id})")
         return task_id
@@ -255,16 +325,16 @@ class TaskScheduler:
             task = self.tasks[task_id]
             
             if task.status == TaskStatus.RUNNING:
-                # Intentar detener thread si está ejecutándose
+                # Un hilo no se puede matar: se avisa por cancel_event y se
+                # ignora su resultado; el worker se libera cuando la función retorna
                 if task_id in self.running_tasks:
-                    # Note: threading.Thread no tiene un método kill() seguro
-                    # Marcar como cancelada y esperar que termine naturalmente
-                    task.status = TaskStatus.CANCELLED
-                    task.completed_at = datetime.now()
+                    task.cancel_event.set()
+                    task.attempt += 1
+                    del self.running_tasks[task_id]
+                    self._finish(task, TaskStatus.CANCELLED)
                     return True
             elif task.status in [TaskStatus.PENDING, TaskStatus.SCHEDULED]:
-                task.status = TaskStatus.CANCELLED
-                task.completed_at = datetime.now()
+                self._finish(task, TaskStatus.CANCELLED)
                 return True
         
         return False
@@ -313,21 +383,32 @@ class TaskScheduler:
             return
         
         self.is_running = True
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_tasks, thread_name_prefix="task-scheduler"
+        )
         self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
         self.scheduler_thread.start()
         self.logger.info("Task scheduler iniciado")
     
     def stop_scheduler(self):
         """Detiene el scheduler de tareas"""
-        self.is_running = False
+        with self.lock:
+            self.is_running = False
+            self._wakeup.notify_all()
+            running = list(self.running_tasks.values())
         
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
         
         # Esperar que terminen las tareas en ejecución
-        for task_id, thread in list(self.running_tasks.items()):
-            if thread.is_alive():
-                thread.join(timeout=2)
+        if running:
+            wait_futures(running, timeout=2)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        
+        with self.lock:
+            self._close_journal()
         
         self.logger.info("Task scheduler detenido")
     
@@ -344,6 +425,7 @@ class TaskScheduler:
                 "running_tasks": len(self.running_tasks),
                 "completed_tasks": len(self.completed_tasks),
                 "failed_tasks": len(self.failed_tasks),
+                "persisted_tasks": len(self.persisted_tasks),
                 "is_running": self.is_running,
                 "max_concurrent_tasks": self.max_concurrent_tasks,
                 "status_breakdown": defaultdict(int),
@@ -389,159 +471,273 @@ class TaskScheduler:
             return stats
     
     def _scheduler_loop(self):
-        """Loop principal del scheduler"""
-        while self.is_running:
-            try:
-                self._process_scheduled_tasks()
-                self._cleanup_completed_tasks()
-                time.sleep(1)  # Verificar cada segundo
-            except Exception as e:
-                self.logger.error(f"Error en scheduler loop: {e}")
-                time.sleep(5)
+        """Loop principal: despacha lo vencido y duerme hasta el próximo evento"""
+        with self._wakeup:
+            while self.is_running:
+                try:
+                    now = datetime.now()
+                    self._process_scheduled_tasks(now)
+                    self._cleanup_completed_tasks(now)
+                    timeout = self._seconds_until_next_event(now)
+                except Exception as e:
+                    self.logger.error(f"Error en scheduler loop: {e}")
+                    timeout = 5
+                self._wakeup.wait(timeout)
     
-    def _process_scheduled_tasks(self):
-        """Procesa tareas programadas que estén listas para ejecutar"""
-        now = datetime.now()
+    def _process_scheduled_tasks(self, now: datetime):
+        """Procesa tareas programadas que estén listas para ejecutar (requiere el lock)"""
+        # Tareas vencidas: del heap de tiempo al de prioridad
+        while self._timer_heap and self._timer_heap[0][0] <= now:
+            scheduled_time, neg_priority, sequence, task_id = heapq.heappop(self._timer_heap)
+            if self._is_current_entry(task_id, scheduled_time):
+                heapq.heappush(self._ready_heap, (neg_priority, scheduled_time, sequence, task_id))
+        
+        # Timeouts vencidos de tareas en ejecución
+        while self._deadline_heap and self._deadline_heap[0][0] <= now:
+            _, attempt, task_id = heapq.heappop(self._deadline_heap)
+            task = self.tasks.get(task_id)
+            if task and task.status == TaskStatus.RUNNING and task.attempt == attempt:
+                self._expire_attempt(task)
+        
+        # Ejecutar por prioridad mientras haya workers libres
+        while self._ready_heap and self._busy_workers < self.max_concurrent_tasks:
+            _, scheduled_time, _, task_id = heapq.heappop(self._ready_heap)
+            if self._is_current_entry(task_id, scheduled_time):
+                self._execute_task(self.tasks[task_id], now)
+    
+    def _is_current_entry(self, task_id: str, scheduled_time: datetime) -> bool:
+        """Una entrada de heap es válida si la tarea sigue pendiente para ese horario"""
+        task = self.tasks.get(task_id)
+        return (task is not None and
+                task.status in [TaskStatus.PENDING, TaskStatus.SCHEDULED] and
+                task.scheduled_time == scheduled_time)
+    
+    def _execute_task(self, task: Task, now: datetime):
+        """Envía un intento de la tarea al pool de workers (requiere el lock)"""
+        task.attempt += 1
+        task.cancel_event = threading.Event()
+        task.status = TaskStatus.RUNNING
+        task.started_at = now
+        if task.persistent:
+            self._journal_task(task)
+        
+        self._busy_workers += 1
+        self.running_tasks[task.task_id] = self._executor.submit(
+            self._run_attempt, task, task.attempt, task.cancel_event
+        )
+        if task.timeout:
+            deadline = now + timedelta(seconds=task.timeout)
+            heapq.heappush(self._deadline_heap, (deadline, task.attempt, task.task_id))
+    
+    def _run_attempt(self, task: Task, attempt: int, cancel_event: threading.Event):
+        """Ejecuta un intento en un worker y registra el resultado si sigue vigente"""
+        error = None
+        result = None
+        try:
+            result = self._call_task(task, cancel_event)
+        except Exception as e:
+            error = e
         
         with self.lock:
-            # Encontrar tareas listas para ejecutar
-            ready_tasks = [
-                task for task in self.tasks.values()
-                if (task.status in [TaskStatus.PENDING, TaskStatus.SCHEDULED] and 
-                    task.scheduled_time <= now and
-                    len(self.running_tasks) < self.max_concurrent_tasks)
-            ]
-            
-            # Ordenar por prioridad
-            ready_tasks.sort(key=lambda t: -t.priority.value)
-            
-            # Ejecutar tareas disponibles
-            for task in ready_tasks:
-                if len(self.running_tasks) >= self.max_concurrent_tasks:
-                    break
-                
-                self._execute_task(task)
-    
-    def _execute_task(self, task: Task):
-        """Ejecuta una tarea en un hilo separado"""
-        def task_executor():
-            task.status = TaskStatus.RUNNING
-            task.started_at = datetime.now()
-            
-            try:
-                # Ejecutar función con timeout
-                result = self._execute_with_timeout(
-                    task.function, 
-                    task.args, 
-                    task.kwargs, 
-                    task.timeout
-                )
-                
-                task.result = result
-                task.status = TaskStatus.COMPLETED
-                task.completed_at = datetime.now()
-                task.execution_time = (task.completed_at - task.started_at).total_seconds()
-                
-                with self.lock:
-                    self.completed_tasks.append(task.task_id)
-                
-                self.logger.info(f"Tarea completada: {task.name} (ID: {task.task_id})")
-                
-            except Exception as e:
-                task.error_message = str(e)
-                task.completed_at = datetime.now()
-                
-                # Verificar si se debe reintentar
-                if task.retry_count < task.max_retries:
-                    task.retry_count += 1
-                    task.status = TaskStatus.PENDING
-                    task.scheduled_time = datetime.now() + timedelta(minutes=2 ** task.retry_count)
-                    self.logger.warning(f"Tarea falló, reintentando ({task.retry_count}/{task.max_retries}): {task.name}")
+            self._busy_workers -= 1
+            # Si venció el timeout o se canceló, el intento ya no es el vigente
+            if task.attempt == attempt and task.status == TaskStatus.RUNNING:
+                del self.running_tasks[task.task_id]
+                if error is None:
+                    task.result = result
+                    self._finish(task, TaskStatus.COMPLETED)
+                    self.completed_tasks.add(task.task_id)
+                    self.logger.info(f"Tarea completada: {task.name} (ID: {task.task_id})")
                 else:
-                    task.status = TaskStatus.FAILED
-                    with self.lock:
-                        self.failed_tasks.append(task.task_id)
-                    self.logger.error(f"Tarea falló definitivamente: {task.name} - {e}")
-            
-            finally:
-                with self.lock:
-                    if task.task_id in self.running_tasks:
-                        del self.running_tasks[task.task_id]
-        
-        # Iniciar hilo de ejecución
-        thread = threading.Thread(target=task_executor, daemon=True)
-        self.running_tasks[task.task_id] = thread
-        thread.start()
+                    self._record_failure(task, error)
+            self._wakeup.notify()
     
-    def _execute_with_timeout(self, function: Callable, args: tuple, kwargs: dict, timeout: int):
-        """Ejecuta una función con timeout"""
-        import signal
-        
-        def timeout_handler(signum, frame):
-            raise TimeoutError(f"Tarea excedió el timeout de {timeout} segundos")
-        
-        # Configurar timeout (solo funciona en sistemas Unix)
+    def _call_task(self, task: Task, cancel_event: threading.Event):
+        """Llama a la función de la tarea; las corrutinas se cancelan de verdad al vencer el timeout"""
+        kwargs = task.kwargs
+        if task.accepts_cancel_event and CANCEL_EVENT_KWARG not in kwargs:
+            kwargs = {**kwargs, CANCEL_EVENT_KWARG: cancel_event}
+        
+        if not inspect.iscoroutinefunction(task.function):
+            return task.function(*task.args, **kwargs)
+        
+        coroutine = task.function(*task.args, **kwargs)
+        if task.timeout:
+            coroutine = asyncio.wait_for(coroutine, task.timeout)
         try:
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(timeout)
-            result = function(*args, **kwargs)
-            signal.alarm(0)  # Cancelar alarma
-            return result
-        except AttributeError:
-            # En Windows, ejecutar sin timeout
-            return function(*args, **kwargs)
-    
-    def _cleanup_completed_tasks(self):
-        """Limpia tareas completadas antiguas"""
-        cutoff_date = datetime.now() - timedelta(hours=24)
+            return asyncio.run(coroutine)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Tarea excedió el timeout de {task.timeout} segundos")
+    
+    def _expire_attempt(self, task: Task):
+        """Vence el timeout de un intento: se avisa a la función y se ignora su resultado"""
+        task.cancel_event.set()
+        task.attempt += 1
+        del self.running_tasks[task.task_id]
+        self._record_failure(task, TimeoutError(f"Tarea excedió el timeout de {task.timeout} segundos"))
+    
+    def _record_failure(self, task: Task, error: Exception):
+        """Reintenta con backoff exponencial o marca la tarea como fallida (requiere el lock)"""
+        task.error_message = str(error)
+        task.completed_at = datetime.now()
+        
+        # Verificar si se debe reintentar
+        if task.retry_count < task.max_retries:
+            task.retry_count += 1
+            task.status = TaskStatus.PENDING
+            task.scheduled_time = datetime.now() + timedelta(minutes=2 ** task.retry_count)
+            self._push_timer(task)
+            if task.persistent:
+                self._journal_task(task)
+            self.logger.warning(f"Tarea falló, reintentando ({task.retry_count}/{task.max_retries}): {task.name}")
+        else:
+            self._finish(task, TaskStatus.FAILED)
+            self.failed_tasks.add(task.task_id)
+            self.logger.error(f"Tarea falló definitivamente: {task.name} - {error}")
+    
+    def _finish(self, task: Task, status: TaskStatus):
+        """Estado terminal: la tarea queda consultable hasta que expire (requiere el lock)"""
+        task.status = status
+        task.completed_at = datetime.now()
+        if status == TaskStatus.COMPLETED and task.started_at:
+            task.execution_time = (task.completed_at - task.started_at).total_seconds()
+        heapq.heappush(self._expiry_heap, (task.completed_at, task.task_id))
+        if task.persistent:
+            self._journal_task(task)
+    
+    def _push_timer(self, task: Task):
+        heapq.heappush(
+            self._timer_heap,
+            (task.scheduled_time, -task.priority.value, next(self._sequence), task.task_id)
+        )
+    
+    def _cleanup_completed_tasks(self, now: datetime):
+        """Expira tareas terminadas más antiguas que la retención (requiere el lock)"""
+        cutoff_date = now - self.completed_retention
         
-        with self.lock:
-            tasks_to_remove = [
-                task_id for task_id, task in self.tasks.items()
-                if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and
-                    task.completed_at and task.completed_at < cutoff_date)
-            ]
-            
-            for task_id in tasks_to_remove:
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff_date:
+            completed_at, task_id = heapq.heappop(self._expiry_heap)
+            task = self.tasks.get(task_id)
+            if task is None or task.completed_at != completed_at:
+                continue
+            if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
                 del self.tasks[task_id]
-                if task_id in self.completed_tasks:
-                    self.completed_tasks.remove(task_id)
-                if task_id in self.failed_tasks:
-                    self.failed_tasks.remove(task_id)
+                self.completed_tasks.discard(task_id)
+                self.failed_tasks.discard(task_id)
+                if task.persistent:
+                    self._forget_persisted(task_id)
+    
+    def _seconds_until_next_event(self, now: datetime) -> float:
+        """Segundos hasta el próximo vencimiento, timeout o expiración"""
+        upcoming = []
+        if self._timer_heap:
+            upcoming.append(self._timer_heap[0][0])
+        if self._deadline_heap:
+            upcoming.append(self._deadline_heap[0][0])
+        if self._expiry_heap:
+            upcoming.append(self._expiry_heap[0][0] + self.completed_retention)
+        if not upcoming:
+            return MAX_IDLE_WAIT_SECONDS
+        return min(max((min(upcoming) - now).total_seconds(), 0.0), MAX_IDLE_WAIT_SECONDS)
     
     def _save_task_to_disk(self, task: Task):
-        """Guarda una tarea en disco para persistencia"""
-        task_file = self.tasks_dir / f"task_{task.task_id}.json"
-        
-        # No podemos serializar funciones, solo metadata
-        task_data = {
-            "task_id": task.task_id,
-            "name": task.name,
-            "priority": task.priority.value,
-            "scheduled_time": task.scheduled_time.isoformat(),
-            "max_retries": task.max_retries,
-            "timeout": task.timeout,
-            "metadata": task.metadata,
-            "created_at": task.created_at.isoformat(),
-            "persistent": True
-        }
-        
-        with open(task_file, 'w', encoding='utf-8') as f:
-            json.dump(task_data, f, indent=2, ensure_ascii=False)
+        """Marca la tarea como persistente y registra su alta en el journal (requiere el lock)"""
+        # No podemos serializar funciones, solo el estado de la tarea
+        task.persistent = True
+        self._journal_task(task)
+    
+    def _journal_task(self, task: Task):
+        """Agrega al journal el estado actual de una tarea persistente (requiere el lock)"""
+        record = task.to_dict()
+        record["persistent"] = True
+        self.persisted_tasks[task.task_id] = record
+        self._append_journal({"op": "upsert", "task": record})
+    
+    def _forget_persisted(self, task_id: str):
+        """Registra en el journal que una tarea persistente expiró (requiere el lock)"""
+        if self.persisted_tasks.pop(task_id, None) is not None:
+            self._append_journal({"op": "remove", "task_id": task_id})
+    
+    def _append_journal(self, entry: Dict[str, Any]):
+        """Escribe una línea al final del journal y compacta si creció demasiado"""
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        self._journal_records += 1
+        
+        if self._journal_records > max(JOURNAL_COMPACT_MIN_RECORDS, 2 * len(self.persisted_tasks)):
+            self._compact_journal(datetime.now())
+    
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    def _compact_journal(self, now: datetime):
+        """Reescribe el journal con una línea por tarea viva, descartando las expiradas"""
+        cutoff_date = now - self.completed_retention
+        for task_id, record in list(self.persisted_tasks.items()):
+            completed_at = record.get("completed_at")
+            if (record.get("status") in FINISHED_STATUS_VALUES and completed_at and
+                    datetime.fromisoformat(completed_at) < cutoff_date):
+                del self.persisted_tasks[task_id]
+        
+        # Escritura atómica: un corte a mitad de la compactación conserva el journal anterior
+        self._close_journal()
+        temp_file = self.journal_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for record in self.persisted_tasks.values():
+                f.write(json.dumps({"op": "upsert", "task": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.journal_file)
+        self._journal_records = len(self.persisted_tasks)
     
     def _load_persistent_tasks(self):
-        """Carga tareas persistentes desde disco"""
-        if not self.tasks_dir.exists():
-            return
-        
+        """Reproduce el journal y migra los archivos task_*.json del formato anterior"""
+        records = 0
+        if self.journal_file.exists():
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    records += 1
+                    try:
+                        entry = json.loads(line)
+                        if entry["op"] == "upsert":
+                            self.persisted_tasks[entry["task"]["task_id"]] = entry["task"]
+                        else:
+                            self.persisted_tasks.pop(entry["task_id"], None)
+                    except (ValueError, KeyError, TypeError) as e:
+                        # Un corte abrupto puede dejar la última línea incompleta
+                        self.logger.warning(f"Registro inválido en el journal de tareas: {e}")
+        
+        migrated = []
         for task_file in self.tasks_dir.glob("task_*.json"):
             try:
                 with open(task_file, 'r', encoding='utf-8') as f:
                     task_data = json.load(f)
-                
-                # Solo cargar metadata, las funciones no se pueden restaurar
-                self.logger.info(f"Tarea persistente encontrada: {task_data['name']} (no ejecutable tras reinicio)")
-                
+                task_data.setdefault("status", TaskStatus.PENDING.value)
+                self.persisted_tasks[task_data["task_id"]] = task_data
+                migrated.append(task_file)
             except Exception as e:
                 self.logger.error(f"Error cargando tarea persistente {task_file}: {e}")
-                continue
\ No newline at end of file
+                continue
+        
+        # Solo se recupera metadata, las funciones no se pueden restaurar: lo que
+        # quedó sin terminar se da por cancelado y expira con la retención normal
+        now = datetime.now()
+        orphaned = 0
+        for record in self.persisted_tasks.values():
+            if record.get("status") not in FINISHED_STATUS_VALUES:
+                record["status"] = TaskStatus.CANCELLED.value
+                record["error_message"] = "no ejecutable tras reinicio"
+                record["completed_at"] = now.isoformat()
+                orphaned += 1
+        if orphaned:
+            self.logger.info(f"Tareas persistentes encontradas: {orphaned} (no ejecutables tras reinicio)")
+        
+        self._journal_records = records
+        if migrated or orphaned or records > max(JOURNAL_COMPACT_MIN_RECORDS, 2 * len(self.persisted_tasks)):
+            self._compact_journal(now)
+        for task_file in migrated:
+            task_file.unlink(missing_ok=True)
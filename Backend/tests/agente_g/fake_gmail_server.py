@@ -0,0 +1,189 @@
+"""In-process fake of the Gmail v1 API used by Agente G tests and benchmarks.
+
+Emulates the googleapiclient resource chain (``users().messages().list``,
+``get``, ``history().list``, ``getProfile`` and batch requests) and counts
+HTTP round trips, optionally sleeping ``latency`` seconds on each one.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def _http_error(status: int, reason: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": status, "reason": reason}), reason.encode("utf-8"))
+
+
+class _Request:
+    def __init__(self, server: "FakeGmailServer", kind: str, handler: Callable[[], Any]) -> None:
+        self._server = server
+        self.kind = kind
+        self._handler = handler
+
+    def execute(self) -> Any:
+        self._server._round_trip(self.kind)
+        return self._handler()
+
+
+class _Batch:
+    def __init__(self, server: "FakeGmailServer", callback: Callable[[str, Any, Optional[Exception]], None]) -> None:
+        self._server = server
+        self._callback = callback
+        self._requests: List[tuple[str, _Request]] = []
+
+    def add(self, request: _Request, request_id: str) -> None:
+        self._requests.append((request_id, request))
+
+    def execute(self) -> None:
+        self._server._round_trip("batch")
+        for request_id, request in self._requests:
+            self._server.calls[f"batch:{request.kind}"] += 1
+            try:
+                response, error = request._handler(), None
+            except HttpError as exc:
+                response, error = None, exc
+            self._callback(request_id, response, error)
+
+
+class _Messages:
+    def __init__(self, server: "FakeGmailServer") -> None:
+        self._server = server
+
+    def list(self, userId: str, maxResults: int = 100, q: Optional[str] = None, **_: Any) -> _Request:
+        def handler() -> Dict[str, Any]:
+            ids = self._server.message_ids(unread_only=q == "is:unread")[:maxResults]
+            return {"messages": [{"id": message_id, "threadId": f"t-{message_id}"} for message_id in ids]}
+
+        return _Request(self._server, "messages.list", handler)
+
+    def get(self, userId: str, id: str, format: str = "full", metadataHeaders: Optional[List[str]] = None) -> _Request:
+        def handler() -> Dict[str, Any]:
+            message = self._server.messages.get(id)
+            if message is None:
+                raise _http_error(404, "Not Found")
+            return self._server.render(message, metadataHeaders)
+
+        return _Request(self._server, "messages.get", handler)
+
+
+class _History:
+    def __init__(self, server: "FakeGmailServer") -> None:
+        self._server = server
+
+    def list(self, userId: str, startHistoryId: str, maxResults: int = 100, pageToken: Optional[str] = None, **_: Any) -> _Request:
+        def handler() -> Dict[str, Any]:
+            start = int(startHistoryId)
+            if start < self._server.oldest_history_id:
+                raise _http_error(404, "Requested entity was not found.")
+            records = [record for record in self._server.history if record["id"] > start]
+            offset = int(pageToken or 0)
+            page = records[offset:offset + maxResults]
+            response: Dict[str, Any] = {"historyId": str(self._server.history_id)}
+            if page:
+                response["history"] = [{**record, "id": str(record["id"])} for record in page]
+            if offset + maxResults < len(records):
+                response["nextPageToken"] = str(offset + maxResults)
+            return response
+
+        return _Request(self._server, "history.list", handler)
+
+
+class _Users:
+    def __init__(self, server: "FakeGmailServer") -> None:
+        self._server = server
+
+    def messages(self) -> _Messages:
+        return _Messages(self._server)
+
+    def history(self) -> _History:
+        return _History(self._server)
+
+    def getProfile(self, userId: str) -> _Request:
+        return _Request(
+            self._server,
+            "getProfile",
+            lambda: {"emailAddress": "agente.g@example.com", "historyId": str(self._server.history_id)},
+        )
+
+
+class FakeGmailServer:
+    """Mailbox state plus the subset of the Gmail API that Agente G uses."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.messages: Dict[str, Dict[str, Any]] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.history_id = 1000
+        self.oldest_history_id = 0
+        self.round_trips = 0
+        self.calls: Counter[str] = Counter()
+
+    # -- mailbox mutations -------------------------------------------------
+    def add_message(self, message_id: str, *, subject: str, sender: str = "tesoreria@example.com", unread: bool = True) -> None:
+        labels = ["INBOX"] + (["UNREAD"] if unread else [])
+        self.messages[message_id] = {"id": message_id, "subject": subject, "from": sender, "labels": labels}
+        self._record({"messagesAdded": [{"message": {"id": message_id, "threadId": f"t-{message_id}", "labelIds": labels}}]})
+
+    def delete_message(self, message_id: str) -> None:
+        self.messages.pop(message_id, None)
+        self._record({"messagesDeleted": [{"message": {"id": message_id, "threadId": f"t-{message_id}"}}]})
+
+    def mark_read(self, message_id: str) -> None:
+        self.messages[message_id]["labels"].remove("UNREAD")
+        self._record({"labelsRemoved": [{"message": {"id": message_id}, "labelIds": ["UNREAD"]}]})
+
+    def expire_history(self) -> None:
+        self.oldest_history_id = self.history_id
+
+    def _record(self, change: Dict[str, Any]) -> None:
+        self.history_id += 1
+        self.history.append({"id": self.history_id, **change})
+
+    # -- API surface -------------------------------------------------------
+    def users(self) -> _Users:
+        return _Users(self)
+
+    def new_batch_http_request(self, callback: Callable[[str, Any, Optional[Exception]], None]) -> _Batch:
+        return _Batch(self, callback)
+
+    def message_ids(self, *, unread_only: bool = False) -> List[str]:
+        ids = [mid for mid, msg in self.messages.items() if not unread_only or "UNREAD" in msg["labels"]]
+        return list(reversed(ids))
+
+    def render(self, message: Dict[str, Any], headers: Optional[List[str]]) -> Dict[str, Any]:
+        all_headers = [
+            {"name": "From", "value": message["from"]},
+            {"name": "Subject", "value": message["subject"]},
+            {"name": "Date", "value": "Thu, 10 Oct 2025 12:00:00 +0000"},
+            {"name": "X-Mailer", "value": "fake"},
+        ]
+        if headers:
+            all_headers = [header for header in all_headers if header["name"] in headers]
+        return {
+            "id": message["id"],
+            "threadId": f"t-{message['id']}",
+            "labelIds": list(message["labels"]),
+            "snippet": message["subject"][:40],
+            "historyId": str(self.history_id),
+            "payload": {"headers": all_headers},
+        }
+
+    def _round_trip(self, kind: str) -> None:
+        self.round_trips += 1
+        self.calls[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FakeServiceFactory:
+    """Drop-in replacement for ``GoogleServiceFactory`` returning the fake server."""
+
+    def __init__(self, server: FakeGmailServer) -> None:
+        self.server = server
+
+    def get_service(self, api_name: str, version: str, scopes: Any = None) -> FakeGmailServer:
+        return self.server
@@ -0,0 +1,109 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+IA_WORKSPACE = BACKEND_DIR / "ia_workspace"
+if IA_WORKSPACE.exists() and str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.agente_g.handler import AgenteGAgent
+from agentes.agente_g.message_cache import GmailMessageCache
+from src.infrastructure.external.google.gmail import GmailClient
+from tests.agente_g.fake_gmail_server import FakeGmailServer, FakeServiceFactory
+
+
+class StubPushService:
+    def get_status(self):
+        return {"active": False}
+
+
+@pytest.fixture
+def server() -> FakeGmailServer:
+    fake = FakeGmailServer()
+    for index in range(12):
+        fake.add_message(f"m{index}", subject=f"Pedido sucursal {index}")
+    return fake
+
+
+@pytest.fixture
+def agent(server, tmp_path) -> AgenteGAgent:
+    return AgenteGAgent(
+        gmail_client=GmailClient(FakeServiceFactory(server)),
+        drive_client=object(),
+        calendar_client=object(),
+        push_service=StubPushService(),
+        compose_with_llm=False,
+        message_cache=GmailMessageCache(tmp_path / "gmail_cache.sqlite3"),
+    )
+
+
+def _list(agent: AgenteGAgent, **params):
+    result = agent._execute_operation("list_gmail", params)
+    return result.artifact["items"], result.metrics
+
+
+def test_batch_get_messages_uses_one_round_trip_per_chunk(server):
+    client = GmailClient(FakeServiceFactory(server))
+
+    messages = client.batch_get_messages(["m1", "m2", "missing", "m1"])
+
+    assert [message["id"] for message in messages] == ["m1", "m2"]
+    assert server.calls["batch"] == 1
+    assert server.calls["messages.get"] == 0
+    assert {h["name"] for h in messages[0]["payload"]["headers"]} == {"From", "Subject", "Date"}
+
+
+def test_first_listing_batches_metadata_fetch(agent, server):
+    items, metrics = _list(agent)
+
+    assert [item["id"] for item in items] == [f"m{index}" for index in range(11, 1, -1)]
+    assert items[0]["subject"] == "Pedido sucursal 11"
+    assert items[0]["from"] == "tesoreria@example.com"
+    assert server.calls == {"messages.list": 1, "getProfile": 1, "batch": 1, "batch:messages.get": 10}
+    assert metrics["google_api_calls"] == 3
+    assert metrics["cache_hits"] == 0
+
+
+def test_repeat_listing_is_served_from_cache(agent, server):
+    _list(agent)
+    server.calls.clear()
+
+    items, metrics = _list(agent)
+
+    assert len(items) == 10
+    assert server.calls == {"messages.list": 1, "history.list": 1}
+    assert metrics["cache_hits"] == 10
+
+
+def test_history_delta_updates_cache(agent, server):
+    _list(agent)
+    server.add_message("m12", subject="Nuevo pedido")
+    server.mark_read("m10")
+    server.delete_message("m11")
+    server.calls.clear()
+
+    items, metrics = _list(agent)
+
+    by_id = {item["id"]: item for item in items}
+    assert list(by_id)[0] == "m12"
+    assert "m11" not in by_id
+    assert "UNREAD" not in by_id["m10"]["label_ids"]
+    assert server.calls["batch:messages.get"] == 1
+    assert metrics["cache_hits"] == 9
+    assert agent.message_cache.get_many(["m11"]) == {}
+
+
+def test_expired_history_rebuilds_cache(agent, server):
+    _list(agent)
+    server.mark_read("m5")
+    server.expire_history()
+    server.calls.clear()
+
+    items, metrics = _list(agent)
+
+    assert server.calls["getProfile"] == 1
+    assert server.calls["batch:messages.get"] == 10
+    assert metrics["cache_hits"] == 0
+    assert "UNREAD" not in {item["id"]: item for item in items}["m5"]["label_ids"]
@@ -0,0 +1,147 @@
+"""Synthetic alert datasets for the PostgreSQL benchmarks.
+
+Builds branches, device readings, agents and ``rows`` alerts (``public.alertas``
+and ``alerts.historical_alerts``) with
+``generate_series`` so millions of rows load in seconds. The data is
+deterministic (no random()) and reused between runs while the row count
+matches.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import asyncpg
+
+SCHEMA_SQL = Path(__file__).resolve().parents[2] / "database" / "schema.sql"
+BRANCHES = 200
+DEVICES_PER_BRANCH = 3
+AGENTS = 20
+
+
+async def ensure_schema(conn: asyncpg.Connection) -> None:
+    # schema.sql es idempotente: se reaplica para sumar columnas/indices nuevos
+    await conn.execute(SCHEMA_SQL.read_text(encoding="utf-8"))
+
+
+async def ensure_alerts_dataset(conn: asyncpg.Connection, rows: int) -> None:
+    await ensure_schema(conn)
+    current = await conn.fetchval("SELECT count(*) FROM public.alertas")
+    if current == rows:
+        return
+
+    await conn.execute(
+        "TRUNCATE public.alertas, public.eventos, public.saldos_dispositivo, public.saldos_sucursal, public.agentes CASCADE"
+    )
+    await conn.execute(
+        f"""
+        INSERT INTO public.agentes (nombre, rol)
+        SELECT 'agente_bench_' || g, 'benchmark' FROM generate_series(1, {AGENTS}) g;
+
+        INSERT INTO public.saldos_sucursal (sucursal_id, sucursal_numero, sucursal_nombre, saldo_total_sucursal, caja_teorica_sucursal)
+        SELECT 'SUC-' || g, g, 'Sucursal ' || g, 1000000 + g * 1000, 1000000
+        FROM generate_series(1, {BRANCHES}) g;
+
+        INSERT INTO public.saldos_dispositivo (sucursal_id, dispositivo_id, tipo_dispositivo, saldo_total, caja_teorica, latitud, longitud, medido_en)
+        SELECT 'SUC-' || s, 'DEV-' || s || '-' || d, (ARRAY['ATM','ATS','TESORO'])[d], 100000 + m * 1000, 120000,
+               -34.6 + s / 1000.0, -58.4 - s / 1000.0, now() - (m || ' hours')::interval
+        FROM generate_series(1, {BRANCHES}) s, generate_series(1, {DEVICES_PER_BRANCH}) d, generate_series(1, 3) m;
+        """
+    )
+    await conn.execute(
+        f"""
+        WITH agentes AS (SELECT array_agg(id ORDER BY nombre) AS ids FROM public.agentes)
+        INSERT INTO public.alertas (creada_en, agente_id, prioridad, estado, problema, hipotesis, datos_clave, sucursal_id, dispositivo_id, dedupe_clave)
+        SELECT
+            timestamptz '2025-01-01' + ((g / 2) || ' seconds')::interval,
+            agentes.ids[1 + g % {AGENTS}],
+            (ARRAY['baja','media','alta','critica'])[1 + g % 4],
+            (ARRAY['abierta','resuelta','resuelta','silenciada'])[1 + (g / 7) % 4],
+            'Desvio de caja ' || g,
+            'Hipotesis sintetica ' || g,
+            jsonb_build_array('monto=' || g, 'sucursal=SUC-' || (1 + g % {BRANCHES})),
+            'SUC-' || (1 + g % {BRANCHES}),
+            CASE WHEN g % 3 = 0 THEN 'DEV-' || (1 + g % {BRANCHES}) || '-' || (1 + g % {DEVICES_PER_BRANCH}) END,
+            'bench_' || g
+        FROM generate_series(1, {rows}) g, agentes
+        """
+    )
+    await conn.execute("ANALYZE public.alertas; ANALYZE public.saldos_dispositivo; ANALYZE public.saldos_sucursal")
+
+
+SEARCH_TOPICS = (
+    "desvio de caja", "faltante de efectivo", "sobrante en tesoro", "falla de ATM",
+    "recarga demorada", "transferencia duplicada", "acreditacion pendiente", "arqueo inconsistente",
+)
+SEARCH_PLACES = ("Palermo", "Belgrano", "Caballito", "Rosario", "Cordoba", "Mendoza", "La Plata", "Neuquen")
+
+
+async def ensure_historical_alerts_dataset(conn: asyncpg.Connection, rows: int) -> None:
+    """``rows`` Spanish alerts in ``alerts.historical_alerts`` for the search benchmark.
+
+    Each alert gets a unique ``HA-<n>`` code inside its description, so exact
+    lookups match a single row while topic words match a large share.
+    """
+    await ensure_schema(conn)
+    current = await conn.fetchval("SELECT count(*) FROM alerts.historical_alerts")
+    if current == rows:
+        return
+
+    await conn.execute("TRUNCATE alerts.historical_alerts CASCADE")
+    await conn.execute(
+        f"""
+        INSERT INTO alerts.historical_alerts (id, alert_code, "timestamp", alert_type, priority, agent_source,
+                                              title, description, financial_impact, status)
+        SELECT
+            gen_random_uuid(),
+            'HA-' || g,
+            timestamptz '2025-01-01' + (g || ' seconds')::interval,
+            'operativa',
+            (ARRAY['low','medium','high','critical'])[1 + g % 4],
+            'capi_alertas',
+            initcap((ARRAY{list(SEARCH_TOPICS)})[1 + g % {len(SEARCH_TOPICS)}])
+                || ' en sucursal ' || (ARRAY{list(SEARCH_PLACES)})[1 + (g / 7) % {len(SEARCH_PLACES)}],
+            'Operacion HA-' || g || ' revisada por el equipo de tesoreria; lote ' || (g % 997),
+            (g % 100000) * 10.5,
+            (ARRAY['active','in_progress','resolved'])[1 + g % 3]
+        FROM generate_series(1, {rows}) g
+        """
+    )
+    await conn.execute("ANALYZE alerts.historical_alerts")
+
+
+DASHBOARD_TEAMS = ("Tesoreria", "Operaciones", "Seguridad", "Auditoria", "Soporte ATM")
+
+
+async def ensure_dashboard_dataset(conn: asyncpg.Connection, rows: int) -> None:
+    """Historical alerts plus one AI analysis per odd alert and one human task per even alert."""
+    await ensure_historical_alerts_dataset(conn, rows)
+    current = await conn.fetchval("SELECT count(*) FROM alerts.ai_analysis")
+    if current == (rows + 1) // 2:
+        return
+
+    await conn.execute("TRUNCATE alerts.ai_analysis, alerts.human_tasks")
+    await conn.execute(
+        f"""
+        INSERT INTO alerts.teams (id, team_name, department)
+        SELECT gen_random_uuid(), name, 'benchmark' FROM unnest(ARRAY{list(DASHBOARD_TEAMS)}) AS name
+        ON CONFLICT (team_name) DO NOTHING;
+
+        INSERT INTO alerts.ai_analysis (alert_id, probability_fraud, confidence_level, model_version)
+        SELECT id, (serial % 1000) / 1000.0, 0.8, 'bench'
+        FROM (
+            SELECT id, substr(alert_code, 4)::int AS serial FROM alerts.historical_alerts
+        ) ha
+        WHERE serial % 4 IN (1, 3);
+
+        INSERT INTO alerts.human_tasks (alert_id, task_title, status, assigned_to_team, progress_percentage)
+        SELECT id, 'Revisar ' || alert_code,
+               (ARRAY['pending','in_progress','completed'])[1 + serial % 3],
+               (ARRAY{list(DASHBOARD_TEAMS)})[1 + serial % {len(DASHBOARD_TEAMS)}],
+               (serial * 7) % 101
+        FROM (
+            SELECT id, alert_code, substr(alert_code, 4)::int AS serial FROM alerts.historical_alerts
+        ) ha
+        WHERE serial % 4 IN (0, 2);
+        """
+    )
+    await conn.execute("ANALYZE alerts.ai_analysis; ANALYZE alerts.human_tasks")
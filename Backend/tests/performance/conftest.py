@@ -0,0 +1,45 @@
+"""Shared helpers for the performance benchmarks."""
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def bench_scale() -> int:
+    """Volume multiplier for benchmarks (``CAPI_BENCH_SCALE``, default 1)."""
+    try:
+        return max(1, int(os.getenv("CAPI_BENCH_SCALE", "1")))
+    except ValueError:
+        return 1
+
+
+@pytest.fixture
+def bench_timing() -> bool:
+    """Whether wall-clock ratio asserts run (``CAPI_BENCH=1``); off in the regression run."""
+    return os.getenv("CAPI_BENCH") == "1"
+
+
+@pytest.fixture
+def bench_report():
+    """Print a machine-readable benchmark line: ``BENCH <name> {json}``."""
+
+    def _report(name: str, **results) -> None:
+        print(f"BENCH {name} {json.dumps(results, sort_keys=True)}")
+
+    return _report
+
+
+@pytest.fixture
+def bench_pg_dsn() -> str:
+    """DSN of a disposable PostgreSQL database (``CAPI_BENCH_PG_DSN``); skips when unset."""
+    dsn = os.getenv("CAPI_BENCH_PG_DSN")
+    if not dsn:
+        pytest.skip("CAPI_BENCH_PG_DSN no configurado")
+    return dsn
+
+
+@pytest.fixture
+def bench_alert_rows() -> int:
+    """Synthetic alert volume for the PostgreSQL benchmarks (``CAPI_BENCH_ALERT_ROWS``)."""
+    return int(os.getenv("CAPI_BENCH_ALERT_ROWS", "5000000"))
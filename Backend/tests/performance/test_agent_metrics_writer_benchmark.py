@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.observability.agent_metrics import _EventWriter
+
+THREADS = 4
+
+
+def _legacy_write(path, lock: threading.Lock, line: str) -> None:
+    # Lo que hacia _write_event antes: lock global + open/append/close por evento
+    with lock:
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+def _request_path_us(events: int, emit) -> float:
+    # Costo por evento visto desde los hilos que atienden requests
+    barrier = threading.Barrier(THREADS + 1)
+    per_thread = events // THREADS
+    line = json.dumps({"event_type": "agent_turn_completed", "agent_name": "capi_desktop", "latency_ms": 1840})
+
+    def worker() -> None:
+        barrier.wait()
+        for _ in range(per_thread):
+            emit(line)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - started) * 1e6 / (per_thread * THREADS)
+
+
+@pytest.mark.performance
+def test_request_path_cost_drops_to_an_enqueue(tmp_path, bench_scale, bench_report):
+    events = 20_000 * bench_scale
+    legacy_path = tmp_path / "legacy.jsonl"
+    lock = threading.Lock()
+    legacy_us = _request_path_us(events, lambda line: _legacy_write(legacy_path, lock, line))
+
+    path = tmp_path / "agent_metrics.jsonl"
+    writer = _EventWriter(path, max_queue=events)
+    try:
+        enqueue_us = _request_path_us(events, writer.submit)
+        started = time.perf_counter()
+        assert writer.flush(timeout=60)
+        drain_ms = (time.perf_counter() - started) * 1000
+        stats = writer.stats()
+    finally:
+        writer.shutdown()
+
+    bench_report(
+        "agent_metrics_writer",
+        events=events,
+        threads=THREADS,
+        legacy_us_per_event=round(legacy_us, 2),
+        enqueue_us_per_event=round(enqueue_us, 2),
+        drain_after_burst_ms=round(drain_ms, 1),
+        **stats,
+    )
+
+    assert stats["written"] == events and stats["dropped"] == 0
+    assert len(path.read_text(encoding="utf-8").splitlines()) == events
+    assert enqueue_us < legacy_us / 3
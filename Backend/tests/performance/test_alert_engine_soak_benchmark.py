@@ -0,0 +1,70 @@
+import logging
+import time
+import tracemalloc
+
+import pytest
+
+from src.application.alerts.alert_engine import AlertCondition, AlertEngine, AlertSeverity
+from src.application.alerts.alert_store import SQLiteAlertArchive
+
+TICKS = 7 * 24 * 6  # una evaluacion cada 10 minutos durante 7 dias
+ENTITIES = 5
+HISTORY_SIZE = 1000
+
+
+def _engine(archive) -> AlertEngine:
+    engine = AlertEngine(history_size=HISTORY_SIZE, archive=archive)
+    engine.conditions = [
+        AlertCondition("high_risk_score", "threshold", {"metric": "metrics.risk_score", "threshold": 0.7}),
+        AlertCondition("error_rate_high", "threshold", {"metric": "metrics.error_rate", "threshold": 0.05}),
+    ]
+    return engine
+
+
+@pytest.mark.performance
+def test_alert_engine_memory_stays_flat(tmp_path, bench_scale, bench_report):
+    logging.getLogger("src.application.alerts.alert_engine").setLevel(logging.ERROR)
+    archive = SQLiteAlertArchive(tmp_path / "alert_history.sqlite")
+    engine = _engine(archive)
+    ticks = TICKS * bench_scale
+    checkpoint = ticks // 5
+    data = [
+        {"entity_id": f"SUC-{entity}", "metrics": {"risk_score": 0.9, "error_rate": 0.1}}
+        for entity in range(ENTITIES)
+    ]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        for tick in range(ticks):
+            for payload in data:
+                engine.evaluate_data(payload, trace_id="soak")
+            # Los operadores resuelven todo lo activo; la evaluacion siguiente vuelve a disparar
+            for alert in engine.get_active_alerts(severity_filter=AlertSeverity.CRITICAL):
+                engine.resolve_alert(alert.id)
+            if tick == checkpoint:
+                warm_bytes, _ = tracemalloc.get_traced_memory()
+        engine.flush_history()
+        final_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+
+    triggered = engine.metrics["alerts_triggered"]
+    bench_report(
+        "alert_engine_soak",
+        simulated_days=7 * bench_scale,
+        alerts_triggered=triggered,
+        archived=archive.count(),
+        history_in_memory=len(engine.alert_history),
+        warm_kib=round(warm_bytes / 1024, 1),
+        final_kib=round(final_bytes / 1024, 1),
+        peak_kib=round(peak_bytes / 1024, 1),
+        us_per_evaluation=round(elapsed * 1e6 / (ticks * ENTITIES), 1),
+    )
+
+    assert triggered == ticks * ENTITIES * 2
+    assert len(engine.alert_history) == HISTORY_SIZE
+    assert archive.count() == triggered - HISTORY_SIZE
+    # Crecimiento acotado: sin fuga por alerta disparada
+    assert final_bytes - warm_bytes < 256 * 1024
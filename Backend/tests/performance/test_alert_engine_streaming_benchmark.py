@@ -0,0 +1,80 @@
+import logging
+import random
+import time
+
+import pytest
+
+from src.application.alerts.alert_engine import AlertCondition, AlertEngine
+
+METRICS = ("total_volume", "avg_amount", "performance_score", "risk_score", "error_rate")
+ROUNDS = 12
+HISTORY = 50
+LEGACY_SAMPLE = 200
+
+
+def _conditions(stream: dict) -> list:
+    # 5 metricas x 4 tipos = 20 condiciones
+    conditions = []
+    for metric in METRICS:
+        path = f"metrics.{metric}"
+        conditions += [
+            AlertCondition(f"{metric}_anomaly", "anomaly", {"metric": path, "threshold_std": 6.0, **stream}),
+            AlertCondition(f"{metric}_trend", "trend",
+                           {"metric": path, "trend_type": "increasing", "threshold": 50.0, **stream}),
+            AlertCondition(f"{metric}_volatility", "pattern",
+                           {"pattern_type": "volatility_spike", "metric": path, "volatility_threshold": 5.0, **stream}),
+            AlertCondition(f"{metric}_increases", "pattern",
+                           {"pattern_type": "consecutive_increases", "metric": path, "min_consecutive": 30, **stream}),
+        ]
+    return conditions
+
+
+def _engine(**stream) -> AlertEngine:
+    engine = AlertEngine()
+    engine.conditions = _conditions(stream)
+    return engine
+
+
+def _observation(rng: random.Random) -> dict:
+    return {metric: 1000.0 + rng.gauss(0, 10) for metric in METRICS}
+
+
+@pytest.mark.performance
+def test_streaming_conditions_evaluate_in_constant_time(bench_scale, bench_report):
+    logging.getLogger("src.application.alerts.alert_engine").setLevel(logging.WARNING)
+    entities = 1_000 * bench_scale
+    rng = random.Random(42)
+
+    streaming = _engine(stream=True, max_entities=entities)
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for entity in range(entities):
+            streaming.evaluate_data({"entity_id": entity, "metrics": _observation(rng)}, trace_id="bench")
+    streaming_s = time.perf_counter() - started
+    pushes = ROUNDS * entities
+
+    # Camino previo: cada push trae la historia y se recalcula la serie completa
+    legacy = _engine()
+    history = [{"metrics": _observation(rng)} for _ in range(HISTORY)]
+    started = time.perf_counter()
+    for entity in range(LEGACY_SAMPLE):
+        legacy.evaluate_data(
+            {"entity_id": entity, "metrics": _observation(rng), "historical_data": history}, trace_id="bench"
+        )
+    legacy_s = time.perf_counter() - started
+
+    streaming_us = streaming_s * 1e6 / pushes
+    legacy_us = legacy_s * 1e6 / LEGACY_SAMPLE
+    bench_report(
+        "alert_engine_streaming",
+        entities=entities,
+        conditions=len(streaming.conditions),
+        pushes=pushes,
+        streaming_us_per_push=round(streaming_us, 1),
+        legacy_history=HISTORY,
+        legacy_us_per_push=round(legacy_us, 1),
+        streams_per_condition=len(streaming.conditions[0]._streams),
+    )
+
+    assert len(streaming.conditions[0]._streams) == entities
+    assert streaming_us < legacy_us
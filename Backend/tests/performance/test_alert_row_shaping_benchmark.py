@@ -0,0 +1,199 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+import asyncpg
+import pytest
+
+from src.api.alerts_endpoints import AlertSummaryResponse
+from src.infrastructure.database.postgres_client import (
+    _ALERT_SUMMARY_DEFAULTS,
+    PostgreSQLClient,
+    _init_connection,
+    _render_entity_names,
+)
+from tests.performance.alerts_dataset import ensure_alerts_dataset, ensure_schema
+
+orjson = pytest.importorskip("orjson")
+
+PAGE_SIZE = 1000
+ROUNDS = 5
+
+# Consulta y shaping previos (columnas planas + post-proceso en Python), como referencia.
+LEGACY_QUERY = """
+SELECT a.id::text AS id, a.creada_en AS created_at, a.prioridad AS priority, a.estado AS status,
+       a.problema AS title, a.datos_clave AS datos_clave, a.dedupe_clave AS dedupe,
+       a.sucursal_id, suc.sucursal_nombre, suc.saldo_total_sucursal AS sucursal_saldo_total,
+       suc.caja_teorica_sucursal AS sucursal_caja_teorica,
+       CASE WHEN suc.caja_teorica_sucursal IS NULL OR suc.caja_teorica_sucursal = 0 THEN NULL
+            ELSE ROUND((suc.saldo_total_sucursal / suc.caja_teorica_sucursal) * 100, 2) END AS sucursal_saldo_pct,
+       a.dispositivo_id, sad.tipo_dispositivo AS dispositivo_tipo, sad.saldo_total AS dispositivo_saldo_total,
+       sad.caja_teorica AS dispositivo_caja_teorica,
+       CASE WHEN sad.caja_teorica IS NULL OR sad.caja_teorica = 0 THEN NULL
+            ELSE ROUND((sad.saldo_total / sad.caja_teorica) * 100, 2) END AS dispositivo_saldo_pct,
+       sad.latitud AS dispositivo_latitud, sad.longitud AS dispositivo_longitud
+FROM (SELECT id FROM public.alertas ORDER BY creada_en DESC, id DESC LIMIT $1) p
+JOIN public.alertas a ON a.id = p.id
+LEFT JOIN public.saldos_sucursal suc ON suc.sucursal_id = a.sucursal_id
+LEFT JOIN LATERAL (
+    SELECT s.tipo_dispositivo, s.saldo_total, s.caja_teorica, s.latitud, s.longitud
+    FROM public.saldos_dispositivo s
+    WHERE s.sucursal_id = a.sucursal_id AND s.dispositivo_id = a.dispositivo_id
+    ORDER BY s.medido_en DESC LIMIT 1
+) sad ON TRUE
+ORDER BY a.creada_en DESC, a.id DESC
+"""
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _legacy_shape(row) -> dict:
+    claves = json.loads(row["datos_clave"]) if row["datos_clave"] else []
+    sucursal = None
+    if row["sucursal_id"]:
+        sucursal = {
+            "sucursal_id": row["sucursal_id"],
+            "nombre": row["sucursal_nombre"],
+            "saldo_total": _to_float(row["sucursal_saldo_total"]),
+            "caja_teorica": _to_float(row["sucursal_caja_teorica"]),
+            "saldo_cobertura_pct": _to_float(row["sucursal_saldo_pct"]),
+        }
+    dispositivo = None
+    if row["dispositivo_id"]:
+        dispositivo = {
+            "dispositivo_id": row["dispositivo_id"],
+            "tipo": row["dispositivo_tipo"],
+            "saldo_total": _to_float(row["dispositivo_saldo_total"]),
+            "caja_teorica": _to_float(row["dispositivo_caja_teorica"]),
+            "saldo_cobertura_pct": _to_float(row["dispositivo_saldo_pct"]),
+            "latitud": _to_float(row["dispositivo_latitud"]),
+            "longitud": _to_float(row["dispositivo_longitud"]),
+        }
+    return {
+        "id": row["id"],
+        "alert_code": row["dedupe"] or f"alert_{row['id']}",
+        "timestamp": row["created_at"],
+        "title": row["title"] or "Alerta sin titulo",
+        "priority": row["priority"].capitalize() if row["priority"] else "N/D",
+        "status": row["status"].capitalize() if row["status"] else "N/D",
+        "financial_impact": None,
+        "currency": "USD",
+        "confidence_score": None,
+        "pending_tasks": 0,
+        "affected_entities": [
+            {"entity_type": "dato_clave", "entity_name": str(item), "impact_level": None} for item in claves
+        ],
+        "sucursal": sucursal,
+        "dispositivo": dispositivo,
+    }
+
+
+async def _cpu_per_row(fetch, shape, serialize) -> dict:
+    serialize(shape(await fetch()))  # calentamiento: prepara el statement
+    fetch_cpu = shape_cpu = serialize_cpu = 0.0
+    rows_seen = 0
+    for _ in range(ROUNDS):
+        started = time.process_time()
+        rows = await fetch()
+        fetched = time.process_time()
+        items = shape(rows)
+        shaped = time.process_time()
+        serialize(items)
+        done = time.process_time()
+        fetch_cpu += fetched - started
+        shape_cpu += shaped - fetched
+        serialize_cpu += done - shaped
+        rows_seen += len(rows)
+    per_row = lambda seconds: round(seconds * 1_000_000 / rows_seen, 2)  # noqa: E731
+    return {
+        "fetch_us_per_row": per_row(fetch_cpu),
+        "shape_us_per_row": per_row(shape_cpu),
+        "serialize_us_per_row": per_row(serialize_cpu),
+        "total_us_per_row": per_row(fetch_cpu + shape_cpu + serialize_cpu),
+    }
+
+
+async def _measure(dsn: str, rows: int) -> dict:
+    plain = await asyncpg.connect(dsn)
+    shaped = await asyncpg.connect(dsn)
+    try:
+        await ensure_alerts_dataset(plain, rows)
+        await _init_connection(shaped)
+        query, params = PostgreSQLClient()._historical_alerts_query(limit=PAGE_SIZE)
+
+        before = await _cpu_per_row(
+            lambda: plain.fetch(LEGACY_QUERY, PAGE_SIZE),
+            lambda records: [_legacy_shape(record) for record in records],
+            lambda items: json.dumps(
+                [AlertSummaryResponse(**item).model_dump(mode="json") for item in items]
+            ),
+        )
+        after = await _cpu_per_row(
+            lambda: shaped.fetch(query, *params),
+            lambda records: [{**_render_entity_names(record), **_ALERT_SUMMARY_DEFAULTS} for record in records],
+            lambda items: orjson.dumps(items, option=orjson.OPT_UTC_Z),
+        )
+        sample = {**_render_entity_names((await shaped.fetch(query, *params))[0]), **_ALERT_SUMMARY_DEFAULTS}
+        legacy_sample = _legacy_shape((await plain.fetch(LEGACY_QUERY, PAGE_SIZE))[0])
+        return {"before": before, "after": after, "sample": sample, "legacy_sample": legacy_sample}
+    finally:
+        await plain.close()
+        await shaped.close()
+
+
+@pytest.mark.performance
+@pytest.mark.external
+def test_alert_row_shaping_cpu(bench_pg_dsn, bench_alert_rows, bench_report):
+    results = asyncio.run(_measure(bench_pg_dsn, bench_alert_rows))
+
+    bench_report(
+        "alerts_row_shaping",
+        rows=bench_alert_rows,
+        page_size=PAGE_SIZE,
+        before=results["before"],
+        after=results["after"],
+    )
+
+    assert results["sample"] == results["legacy_sample"]
+    assert results["after"]["total_us_per_row"] < results["before"]["total_us_per_row"]
+
+
+async def _shape_mixed_datos_clave(dsn: str) -> tuple:
+    plain = await asyncpg.connect(dsn)
+    shaped = await asyncpg.connect(dsn)
+    try:
+        await ensure_schema(plain)
+        await _init_connection(shaped)
+        # La alerta mas reciente: encabeza tanto la consulta anterior como la nueva
+        alert_id = await plain.fetchval(
+            """
+            INSERT INTO public.alertas (creada_en, prioridad, problema, datos_clave)
+            VALUES ('2100-01-01', 'alta', 'Datos clave mixtos', $1::jsonb)
+            RETURNING id
+            """,
+            json.dumps([None, True, False, {"saldo": 1.5, "ok": None}, [1, "x"], 7, 2.25, "texto"]),
+        )
+        try:
+            query, params = PostgreSQLClient()._historical_alerts_query(limit=1)
+            new = {**_render_entity_names((await shaped.fetch(query, *params))[0]), **_ALERT_SUMMARY_DEFAULTS}
+            legacy = _legacy_shape((await plain.fetch(LEGACY_QUERY, 1))[0])
+        finally:
+            await plain.execute("DELETE FROM public.alertas WHERE id = $1", alert_id)
+        return new, legacy
+    finally:
+        await plain.close()
+        await shaped.close()
+
+
+@pytest.mark.performance
+@pytest.mark.external
+def test_mixed_datos_clave_match_legacy_shaping(bench_pg_dsn):
+    new, legacy = asyncio.run(_shape_mixed_datos_clave(bench_pg_dsn))
+
+    assert new["affected_entities"] == legacy["affected_entities"]
+    assert [entity["entity_name"] for entity in new["affected_entities"]] == [
+        "None", "True", "False", "{'saldo': 1.5, 'ok': None}", "[1, 'x']", "7", "2.25", "texto",
+    ]
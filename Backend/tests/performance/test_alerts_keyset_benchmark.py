@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import asyncpg
+import pytest
+
+from src.infrastructure.database.postgres_client import PostgreSQLClient
+from tests.performance.alerts_dataset import ensure_alerts_dataset
+
+PAGE_SIZE = 50
+DEPTHS = (1, 100, 1_000, 10_000)
+
+
+def _nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def _explain(conn: asyncpg.Connection, query: str, params) -> dict:
+    raw = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *params)
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    root = plan["Plan"]
+    return {
+        "ms": round(plan["Execution Time"], 3),
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "seq_scan": any(
+            node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "alertas"
+            for node in _nodes(root)
+        ),
+    }
+
+
+async def _page_key(conn: asyncpg.Connection, depth: int, status: str | None):
+    where = "WHERE estado = $2" if status else ""
+    params = [(depth - 1) * PAGE_SIZE - 1] + ([status] if status else [])
+    return await conn.fetchrow(
+        f"SELECT creada_en, id FROM public.alertas {where} ORDER BY creada_en DESC, id DESC OFFSET $1 LIMIT 1",
+        *params,
+    )
+
+
+async def _measure(dsn: str, rows: int) -> dict:
+    client = PostgreSQLClient()
+    conn = await asyncpg.connect(dsn)
+    try:
+        await ensure_alerts_dataset(conn, rows)
+        results = {}
+        for status in (None, "abierta"):
+            label = status or "all"
+            results[label] = {}
+            for depth in DEPTHS:
+                if (depth - 1) * PAGE_SIZE >= rows // (4 if status else 1):
+                    continue
+                offset_query, offset_params = client._historical_alerts_query(
+                    limit=PAGE_SIZE, offset=(depth - 1) * PAGE_SIZE, status_filter=status
+                )
+                cursor = None
+                if depth > 1:
+                    key = await _page_key(conn, depth, status)
+                    cursor = (key["creada_en"], key["id"])
+                keyset_query, keyset_params = client._historical_alerts_query(
+                    limit=PAGE_SIZE, status_filter=status, cursor=cursor
+                )
+                results[label][depth] = {
+                    "offset": await _explain(conn, offset_query, offset_params),
+                    "keyset": await _explain(conn, keyset_query, keyset_params),
+                }
+        return results
+    finally:
+        await conn.close()
+
+
+@pytest.mark.performance
+@pytest.mark.external
+def test_alert_keyset_pages_are_flat(bench_pg_dsn, bench_alert_rows, bench_report):
+    results = asyncio.run(_measure(bench_pg_dsn, bench_alert_rows))
+
+    bench_report("alerts_keyset_pagination", rows=bench_alert_rows, page_size=PAGE_SIZE, pages=results)
+
+    for label, pages in results.items():
+        first = pages[1]["keyset"]
+        deepest = pages[max(pages)]["keyset"]
+        assert not any(page["keyset"]["seq_scan"] for page in pages.values()), label
+        # Keyset: el trabajo por pagina no depende de la profundidad
+        assert deepest["buffers"] <= 2 * first["buffers"] + 10, label
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import statistics
+import time
+
+import asyncpg
+import pytest
+
+from src.infrastructure.database.postgres_client import PostgreSQLClient
+from tests.performance.alerts_dataset import SEARCH_PLACES, ensure_historical_alerts_dataset
+
+REPEATS = 7
+
+# Consulta previa: to_tsvector('english') calculado dos veces por fila, sin indice.
+LEGACY_QUERY = """
+SELECT ha.id, ts_rank(to_tsvector('english', ha.title || ' ' || ha.description),
+                      plainto_tsquery('english', $1)) AS relevance_score
+FROM alerts.historical_alerts ha
+WHERE to_tsvector('english', ha.title || ' ' || ha.description) @@ plainto_tsquery('english', $1)
+ORDER BY relevance_score DESC, ha.timestamp DESC
+LIMIT 20
+"""
+
+
+def _nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def _explain(conn: asyncpg.Connection, query: str, *params) -> dict:
+    raw = await conn.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", *params)
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return {
+        "ms": round(plan["Execution Time"], 3),
+        "seq_scan": any(
+            node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "historical_alerts"
+            for node in _nodes(plan["Plan"])
+        ),
+    }
+
+
+async def _latency(client: PostgreSQLClient, term: str) -> dict:
+    await client.search_alerts(term)
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        results = await client.search_alerts(term)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "results": len(results)}
+
+
+async def _measure(dsn: str, rows: int) -> dict:
+    conn = await asyncpg.connect(dsn)
+    client = PostgreSQLClient()
+    try:
+        await ensure_historical_alerts_dataset(conn, rows)
+        serial = rows // 2
+        code = f"HA-{serial}"
+        place = SEARCH_PLACES[(serial // 7) % len(SEARCH_PLACES)]
+        stored_query = (
+            "SELECT ha.id FROM alerts.historical_alerts ha, websearch_to_tsquery('alerts.capi_es', $1) q "
+            "WHERE ha.search_vector @@ q ORDER BY ts_rank(ha.search_vector, q) DESC LIMIT 20"
+        )
+        return {
+            "explain": {
+                "legacy": await _explain(conn, LEGACY_QUERY, code),
+                "stored": await _explain(conn, stored_query, code),
+            },
+            "terms": {
+                "codigo": await _latency(client, code),
+                "frase": await _latency(client, f'"sucursal {place}" {code}'),
+                "acentos": await _latency(client, "Operación revisada tesorería lote 17"),
+                "typo": await _latency(client, "Arqueo incosistente en sucursal Rosaro"),
+            },
+        }
+    finally:
+        await client.close()
+        await conn.close()
+
+
+@pytest.mark.performance
+@pytest.mark.external
+def test_alert_search_uses_stored_vector(monkeypatch, bench_pg_dsn, bench_alert_rows, bench_report):
+    monkeypatch.setenv("DATABASE_URL", bench_pg_dsn)
+    results = asyncio.run(_measure(bench_pg_dsn, bench_alert_rows))
+
+    bench_report("alerts_full_text_search", rows=bench_alert_rows, **results)
+
+    assert not results["explain"]["stored"]["seq_scan"]
+    assert results["terms"]["codigo"]["results"] == 1
+    assert results["terms"]["codigo"]["median_ms"] < 10
@@ -0,0 +1,113 @@
+import asyncio
+import statistics
+import time
+
+import asyncpg
+import pytest
+
+from src.infrastructure.database.postgres_client import PostgreSQLClient
+from tests.performance.alerts_dataset import ensure_dashboard_dataset
+
+REPEATS = 7
+WRITES = 1000
+
+# Consultas previas: agregan toda la historia en cada carga del dashboard.
+LEGACY_CRITICAL = """
+SELECT
+    COUNT(*) as total_critical,
+    COALESCE(SUM(financial_impact), 0) as total_financial_impact,
+    COALESCE(AVG(confidence_score), 0) as avg_confidence,
+    COUNT(CASE WHEN aa.probability_fraud > 0.7 THEN 1 END) as high_fraud_risk
+FROM alerts.historical_alerts ha
+LEFT JOIN alerts.ai_analysis aa ON ha.id = aa.alert_id
+WHERE ha.priority = 'critical' AND ha.status = 'active'
+"""
+
+LEGACY_WORKLOAD = """
+SELECT
+    t.team_name,
+    COUNT(ht.id) as total_tasks,
+    COUNT(CASE WHEN ht.status = 'pending' THEN 1 END) as pending_tasks,
+    COUNT(CASE WHEN ht.status = 'in_progress' THEN 1 END) as in_progress_tasks,
+    COUNT(CASE WHEN ht.status = 'completed' THEN 1 END) as completed_tasks,
+    COALESCE(AVG(ht.progress_percentage), 0) as avg_progress
+FROM alerts.teams t
+LEFT JOIN alerts.human_tasks ht ON t.team_name = ht.assigned_to_team
+WHERE t.active = true
+GROUP BY t.id, t.team_name
+ORDER BY pending_tasks DESC
+"""
+
+
+async def _median_ms(call) -> float:
+    await call()
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+async def _write_ms(conn: asyncpg.Connection) -> float:
+    # Costo de mantener los agregados: analisis nuevos sobre alertas criticas activas
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        started = time.perf_counter()
+        await conn.execute(
+            f"""
+            INSERT INTO alerts.ai_analysis (alert_id, probability_fraud, model_version)
+            SELECT id, 0.9, 'bench_write' FROM alerts.historical_alerts
+            WHERE priority = 'critical' AND status = 'active' LIMIT {WRITES}
+            """
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        legacy = dict(await conn.fetchrow(LEGACY_CRITICAL))
+        summary = dict(await conn.fetchrow(
+            "SELECT total_critical, high_fraud_risk FROM alerts.critical_alerts_summary"
+        ))
+        assert summary == {key: legacy[key] for key in summary}
+        return round(elapsed, 3)
+    finally:
+        await transaction.rollback()
+
+
+async def _measure(dsn: str, rows: int) -> dict:
+    conn = await asyncpg.connect(dsn)
+    client = PostgreSQLClient()
+    try:
+        await ensure_dashboard_dataset(conn, rows)
+        legacy_critical = dict(await conn.fetchrow(LEGACY_CRITICAL))
+        legacy_workload = [dict(row) for row in await conn.fetch(LEGACY_WORKLOAD)]
+        return {
+            "critical_matches": await client.get_critical_alerts_summary() == legacy_critical,
+            "workload_matches": sorted(await client.get_team_workload(), key=lambda row: row["team_name"])
+            == sorted(legacy_workload, key=lambda row: row["team_name"]),
+            "critical_ms": {
+                "legacy": await _median_ms(lambda: conn.fetchrow(LEGACY_CRITICAL)),
+                "summary": await _median_ms(client.get_critical_alerts_summary),
+            },
+            "workload_ms": {
+                "legacy": await _median_ms(lambda: conn.fetch(LEGACY_WORKLOAD)),
+                "summary": await _median_ms(client.get_team_workload),
+            },
+            "insert_ms_per_1k_analyses": await _write_ms(conn),
+        }
+    finally:
+        await client.close()
+        await conn.close()
+
+
+@pytest.mark.performance
+@pytest.mark.external
+def test_dashboard_reads_maintained_summaries(monkeypatch, bench_pg_dsn, bench_alert_rows, bench_report):
+    monkeypatch.setenv("DATABASE_URL", bench_pg_dsn)
+    results = asyncio.run(_measure(bench_pg_dsn, bench_alert_rows))
+
+    bench_report("dashboard_summaries", rows=bench_alert_rows, **results)
+
+    assert results["critical_matches"]
+    assert results["workload_matches"]
+    assert results["critical_ms"]["summary"] < results["critical_ms"]["legacy"]
+    assert results["workload_ms"]["summary"] < results["workload_ms"]["legacy"]
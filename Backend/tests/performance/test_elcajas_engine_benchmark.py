@@ -0,0 +1,89 @@
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+IA_WORKSPACE = BACKEND_DIR / "ia_workspace"
+if str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.capi_elcajas.handler import ElCajasAgent
+from agentes.capi_elcajas.policy_engine import CHANNEL_FIELDS
+from src.domain.agents.agent_models import AgentTask, IntentType
+
+POLICIES = [
+    {"channel": "Saldo Total", "max_surplus_pct": 0.08, "max_deficit_pct": 0.05, "min_buffer_amount": 600000, "truck_fixed_cost": 150000, "truck_variable_cost_per_kg": 3800},
+    {"channel": "ATM", "max_surplus_pct": 0.12, "max_deficit_pct": 0.06, "min_buffer_amount": 500000, "truck_fixed_cost": 120000, "truck_variable_cost_per_kg": 3500},
+    {"channel": "ATS", "max_surplus_pct": 0.10, "max_deficit_pct": 0.05, "min_buffer_amount": 300000, "truck_fixed_cost": 110000, "truck_variable_cost_per_kg": 3200},
+    {"channel": "Tesoro", "max_surplus_pct": 0.15, "max_deficit_pct": 0.08, "min_buffer_amount": 750000, "truck_fixed_cost": 90000, "truck_variable_cost_per_kg": 2800},
+    {"channel": "Ventanilla", "max_surplus_pct": 0.08, "max_deficit_pct": 0.04, "min_buffer_amount": 150000, "truck_fixed_cost": 85000, "truck_variable_cost_per_kg": 2600},
+    {"channel": "Caja Chica", "max_surplus_pct": 0.04, "max_deficit_pct": 0.03, "min_buffer_amount": 30000, "truck_fixed_cost": 70000, "truck_variable_cost_per_kg": 2200},
+]
+
+
+def _branch_rows(count: int):
+    rng = random.Random(1000)
+    rows = []
+    for index in range(count):
+        amounts = {field: round(rng.uniform(50_000, 2_000_000), 2) for field in CHANNEL_FIELDS.values()}
+        measured = sum(amounts.values())
+        rows.append({
+            "sucursal_id": f"SUC-{index:05d}",
+            "sucursal_nombre": f"Sucursal {index}",
+            "saldo_total_sucursal": measured,
+            "caja_teorica_sucursal": round(measured * rng.uniform(0.9, 1.1), 2),
+            **amounts,
+        })
+    return rows
+
+
+def _run(agent: ElCajasAgent, rows, **context):
+    task = AgentTask(
+        task_id="bench",
+        intent=IntentType.BRANCH,
+        query="diagnostico red",
+        user_id="bench",
+        session_id="bench",
+        context={"branch_rows": rows, "policies": POLICIES, **context},
+    )
+
+    async def timed():
+        started = time.perf_counter()
+        result = await agent.process(task)
+        return result, (time.perf_counter() - started) * 1000
+
+    return asyncio.run(timed())
+
+
+@pytest.mark.performance
+def test_elcajas_network_analysis(tmp_path, bench_scale, bench_report):
+    branches = 1000 * bench_scale
+    rows = _branch_rows(branches)
+
+    consolidated = ElCajasAgent(policy_service=None)
+    consolidated._workspace_root = tmp_path / "consolidated"
+    result, consolidated_ms = _run(consolidated, rows)
+    consolidated_files = len(list(consolidated._workspace_root.rglob("*.json")))
+
+    sliced = ElCajasAgent(policy_service=None)
+    sliced._workspace_root = tmp_path / "sliced"
+    _, sliced_ms = _run(sliced, rows, branch_artifacts=True)
+    sliced_files = len(list(sliced._workspace_root.rglob("*.json")))
+
+    bench_report(
+        "elcajas_network_analysis",
+        branches=branches,
+        flagged=result.data["recommendation_report"]["branches"],
+        consolidated_ms=round(consolidated_ms, 1),
+        consolidated_files=consolidated_files,
+        per_branch_slices_ms=round(sliced_ms, 1),
+        per_branch_slices_files=sliced_files,
+    )
+
+    assert len(result.data["analysis"]) == branches
+    assert consolidated_files == 1
+    assert sliced_files == result.data["recommendation_report"]["branches"] + 1
@@ -0,0 +1,70 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+IA_WORKSPACE = BACKEND_DIR / "ia_workspace"
+if str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.agente_g.handler import AgenteGAgent
+from agentes.agente_g.message_cache import GmailMessageCache
+from src.infrastructure.external.google.gmail import GmailClient
+from tests.agente_g.fake_gmail_server import FakeGmailServer, FakeServiceFactory
+
+ROUND_TRIP_LATENCY = 0.002
+
+
+class _NoPush:
+    pass
+
+
+def _agent(server: FakeGmailServer, cache: GmailMessageCache | None) -> AgenteGAgent:
+    agent = AgenteGAgent(
+        gmail_client=GmailClient(FakeServiceFactory(server)),
+        drive_client=object(),
+        calendar_client=object(),
+        push_service=_NoPush(),
+        compose_with_llm=False,
+        message_cache=cache,
+    )
+    agent.message_cache = cache
+    return agent
+
+
+def _measure(agent: AgenteGAgent, server: FakeGmailServer, listings: int) -> dict:
+    server.round_trips = 0
+    started = time.perf_counter()
+    for _ in range(listings):
+        agent._execute_operation("list_gmail", {"max_results": 10})
+    elapsed = time.perf_counter() - started
+    return {"round_trips": server.round_trips, "ms_per_listing": round(elapsed * 1000 / listings, 2)}
+
+
+@pytest.mark.performance
+def test_gmail_listing_round_trips(tmp_path, bench_scale, bench_report):
+    listings = 5 * bench_scale
+    server = FakeGmailServer(latency=ROUND_TRIP_LATENCY)
+    for index in range(50):
+        server.add_message(f"m{index}", subject=f"Pedido {index}")
+
+    legacy = _measure(_agent(server, None), server, listings)
+
+    cached_agent = _agent(server, GmailMessageCache(tmp_path / "bench_cache.sqlite3"))
+    cold = _measure(cached_agent, server, 1)
+    warm = _measure(cached_agent, server, listings)
+
+    bench_report(
+        "gmail_listing",
+        listings=listings,
+        latency_ms=ROUND_TRIP_LATENCY * 1000,
+        per_message=legacy,
+        batched_cold=cold,
+        cached_warm=warm,
+    )
+
+    assert legacy["round_trips"] == 11 * listings
+    assert cold["round_trips"] == 3
+    assert warm["round_trips"] == 2 * listings
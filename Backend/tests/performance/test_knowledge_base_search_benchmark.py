@@ -0,0 +1,83 @@
+import itertools
+import random
+import statistics
+import time
+
+import pytest
+
+from src.shared.knowledge_base import KnowledgeBase
+
+DOMAIN_TERMS = (
+    "efectivo sucursal arqueo caja faltante sobrante tesorería liquidez préstamo crédito tarjeta fraude "
+    "cliente nómina cajero depósito extracción transferencia comisión auditoría riesgo política límite "
+    "operación reporte conciliación cheque moneda divisa cotización saldo cuenta plazo fijo inversión "
+    "seguro hipoteca tasa interés mora cobranza reclamo atención región zona gerente"
+).split()
+SYLLABLES = ("ca", "de", "li", "mo", "ra", "sen", "to", "bu", "ne", "gar", "pi", "lo", "ver", "sa", "qui", "don")
+VOCABULARY_SIZE = 20_000
+WORDS_PER_DOCUMENT = 150
+QUERIES = ("arqueo de caja", "fraude tarjeta", "tesoreria liquidez", "prestamo hipoteca tasa", "cheque")
+REPEATS = 20
+
+
+def _vocabulary(rng: random.Random) -> list:
+    # Terminos del dominio intercalados entre palabras sinteticas; frecuencia Zipf por posicion
+    words = {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(VOCABULARY_SIZE * 2)}
+    vocabulary = sorted(words - set(DOMAIN_TERMS))[:VOCABULARY_SIZE]
+    rng.shuffle(vocabulary)
+    for position, term in enumerate(DOMAIN_TERMS):
+        vocabulary.insert(20 + position * 25, term)
+    return vocabulary
+
+
+def _document(rng: random.Random, vocabulary: list, weights: list, index: int) -> tuple:
+    words = rng.choices(vocabulary, cum_weights=weights, k=WORDS_PER_DOCUMENT)
+    sentences = [" ".join(words[start:start + 15]).capitalize() for start in range(0, len(words), 15)]
+    title = " ".join(rng.choices(vocabulary, cum_weights=weights, k=4)).capitalize()
+    return f"doc-{index}", ". ".join(sentences) + ".", title
+
+
+@pytest.mark.performance
+def test_knowledge_base_search_latency(tmp_path, bench_scale, bench_report):
+    documents = 10_000 * bench_scale
+    rng = random.Random(39)
+    vocabulary = _vocabulary(rng)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    kb = KnowledgeBase(tmp_path / "knowledge")
+    try:
+        started = time.perf_counter()
+        for index in range(documents):
+            doc_id, content, title = _document(rng, vocabulary, weights, index)
+            kb.add_document(doc_id, content, title=title, doc_type=("manual", "reporte")[index % 2])
+        add_us = (time.perf_counter() - started) * 1e6 / documents
+
+        samples = {query: [] for query in QUERIES}
+        for _ in range(REPEATS):
+            for query in QUERIES:
+                started = time.perf_counter()
+                results = kb.search_documents(query, limit=10)
+                samples[query].append((time.perf_counter() - started) * 1000)
+                assert results
+                assert all(result["relevant_snippets"] for result in results)
+
+        started = time.perf_counter()
+        kb.add_document("doc-0", "Documento actualizado sobre conciliaciones interbancarias.", title="Arqueo")
+        kb.delete_document("doc-1")
+        update_ms = (time.perf_counter() - started) * 1000
+        assert [result["doc_id"] for result in kb.search_documents("interbancarias")] == ["doc-0"]
+    finally:
+        kb.close()
+
+    medians = {query: round(statistics.median(values), 3) for query, values in samples.items()}
+    every_sample = sorted(value for values in samples.values() for value in values)
+    p95_ms = every_sample[int(len(every_sample) * 0.95) - 1]
+    bench_report(
+        "knowledge_base_search",
+        documents=documents,
+        add_us_per_document=round(add_us, 1),
+        median_ms=medians,
+        p95_ms=round(p95_ms, 3),
+        incremental_update_and_delete_ms=round(update_ms, 3),
+    )
+
+    assert max(medians.values()) < 10
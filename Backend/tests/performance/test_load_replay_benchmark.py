@@ -0,0 +1,61 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tests.performance.load_replay import DEFAULT_PROFILE, load_sessions, run_replay
+
+# Latencias al 1% del perfil real: el replay mide el costo propio del backend
+LATENCY_SCALE = 0.01
+
+
+def _levels() -> tuple:
+    raw = os.getenv("CAPI_REPLAY_CONCURRENCY", "1,4")
+    return tuple(int(level) for level in raw.split(",") if level.strip())
+
+
+def _write_output(report: dict) -> None:
+    output = os.getenv("CAPI_REPLAY_OUTPUT")
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+@pytest.mark.performance
+def test_adapter_replay_is_deterministic_across_concurrency(monkeypatch, tmp_path, bench_scale, bench_report):
+    report = run_replay(
+        monkeypatch,
+        tmp_path,
+        concurrency_levels=_levels(),
+        profile=DEFAULT_PROFILE.scaled(LATENCY_SCALE),
+        repeat=bench_scale,
+    )
+    bench_report("load_replay", **report)
+    _write_output(report)
+
+    recorded_intents = {turn.intent for session in load_sessions() for turn in session.turns}
+    levels = list(report["concurrency"].values())
+    for level in levels:
+        assert level["turns"] == report["turns_per_pass"]
+        assert level["errors"] == 0
+        assert level["mismatched_routes"] == 0
+        assert set(level["per_intent"]) == recorded_intents
+    # Misma carga en cada nivel: la concurrencia no cambia el trabajo hecho contra los fakes
+    assert all(level["external_calls"] == levels[0]["external_calls"] for level in levels)
+
+
+@pytest.mark.performance
+def test_websocket_replay_reports_every_turn(monkeypatch, tmp_path, bench_report):
+    report = run_replay(
+        monkeypatch,
+        tmp_path,
+        concurrency_levels=(1, 2),
+        transport="ws",
+        profile=DEFAULT_PROFILE.scaled(LATENCY_SCALE),
+    )
+    bench_report("load_replay_ws", **report)
+
+    for level in report["concurrency"].values():
+        assert level["turns"] == report["turns_per_pass"]
+        assert level["errors"] == 0
+        assert level["mismatched_routes"] == 0
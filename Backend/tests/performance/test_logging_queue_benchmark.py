@@ -0,0 +1,71 @@
+import logging
+import os
+import statistics
+import time
+
+import pytest
+
+from src.core.logging import build_output_handlers, start_queue_logging
+
+# Rotacion frecuente para que los picos de disco aparezcan en la medicion
+MAX_BYTES = 1024 * 1024
+# Trabajo del nodo entre un log y el siguiente (~100 us)
+STEP_WORK = 2_000
+
+
+def _hot_path_us(logger: logging.Logger, calls: int) -> list:
+    # Lo que paga un nodo por cada logger.info en el camino de la request
+    samples = []
+    for index in range(calls):
+        sum(range(STEP_WORK))
+        started = time.perf_counter()
+        logger.info("nodo %s paso %d completado", "capi_datab", index, extra={"session_id": "s-1"})
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def _summary(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean_us": round(statistics.fmean(samples), 2),
+        "p99_us": round(ordered[int(len(ordered) * 0.99)], 2),
+        "max_us": round(ordered[-1], 1),
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("log_format", ["text", "json"])
+def test_log_call_overhead_before_and_after_queue(tmp_path, bench_scale, bench_report, bench_timing, log_format):
+    calls = 20_000 * bench_scale
+    results = {}
+    with open(os.devnull, "w", encoding="utf-8") as console:
+        for mode in ("sync", "queue"):
+            handlers = build_output_handlers(log_format, tmp_path / f"{mode}.log", stream=console, max_bytes=MAX_BYTES)
+            logger = logging.getLogger(f"bench.logging.{log_format}.{mode}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            listener = None
+            if mode == "sync":
+                logger.handlers = handlers
+            else:
+                queue_handler, listener = start_queue_logging(handlers, queue_size=calls)
+                logger.handlers = [queue_handler]
+            try:
+                samples = _hot_path_us(logger, calls)
+            finally:
+                if listener is not None:
+                    listener.stop()
+                for handler in handlers:
+                    handler.close()
+                logger.handlers = []
+            results[mode] = _summary(samples)
+            if listener is not None:
+                results[mode]["dropped"] = queue_handler.dropped
+
+    bench_report("logging_hot_path_%s" % log_format, calls=calls, max_bytes=MAX_BYTES, **results)
+
+    assert results["queue"]["dropped"] == 0
+    if bench_timing:
+        # El hilo que loguea ya no formatea ni escribe: media y p99 por debajo del camino sincrono
+        assert results["queue"]["mean_us"] < results["sync"]["mean_us"] * 0.8
+        assert results["queue"]["p99_us"] < results["sync"]["p99_us"]
@@ -0,0 +1,78 @@
+import random
+import statistics
+import time
+
+import pytest
+
+from src.shared.memory_manager import MemoryManager
+
+FILLER = (
+    "saldo sucursal cliente consulta informe cuenta tarjeta transferencia deposito cajero limite "
+    "movimiento reporte gerente region horario reclamo tasa plazo prestamo cotizacion"
+).split()
+RARE_TERM = "conciliacion"
+MATCHING_SESSIONS = 20
+MESSAGES_PER_SESSION = 8
+REPEATS = 15
+
+
+def _messages(rng: random.Random, rare: bool) -> list:
+    messages = [
+        {"role": ("user", "assistant")[index % 2], "content": " ".join(rng.choices(FILLER, k=14))}
+        for index in range(MESSAGES_PER_SESSION)
+    ]
+    if rare:
+        messages[3]["content"] += f" {RARE_TERM} bancaria pendiente"
+    return messages
+
+
+def _store(memory: MemoryManager, rng: random.Random, start: int, stop: int, every: int) -> None:
+    for index in range(start, stop):
+        memory.store_conversation(f"session-{index}", _messages(rng, rare=index % every == 0))
+
+
+def _median_ms(memory: MemoryManager, query: str) -> tuple:
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        contexts = memory.retrieve_context(query, limit=5)
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3), contexts
+
+
+@pytest.mark.performance
+def test_context_lookup_does_not_grow_with_stored_conversations(tmp_path, bench_scale, bench_report, monkeypatch):
+    sessions = 2_000 * bench_scale
+    small = sessions // 10
+    rng = random.Random(40)
+    memory = MemoryManager(tmp_path / "memory")
+    try:
+        # El termino raro aparece siempre en MATCHING_SESSIONS sesiones, sin importar el volumen
+        _store(memory, rng, 0, small, every=small // MATCHING_SESSIONS)
+        small_ms, _ = _median_ms(memory, RARE_TERM)
+
+        _store(memory, rng, small, sessions, every=sessions)
+        loaded = []
+        original = memory.retrieve_conversation
+        monkeypatch.setattr(memory, "retrieve_conversation", lambda session_id: loaded.append(session_id) or original(session_id))
+        full_ms, contexts = _median_ms(memory, RARE_TERM)
+        reads = len(loaded)
+        common_ms, _ = _median_ms(memory, "saldo sucursal")
+        stats = memory.get_stats()
+    finally:
+        memory.close()
+
+    bench_report(
+        "memory_context_lookup",
+        conversations=sessions,
+        matching_sessions=MATCHING_SESSIONS,
+        rare_query_ms={"conversations_%d" % small: small_ms, "conversations_%d" % sessions: full_ms},
+        common_query_ms=common_ms,
+        conversations_read_per_lookup=reads // REPEATS,
+    )
+
+    assert stats["total_conversations"] == sessions
+    assert len(contexts) == 5
+    assert reads == 5 * REPEATS
+    # 10x conversaciones almacenadas, mismas sesiones coincidentes: costo practicamente igual
+    assert full_ms < small_ms * 3
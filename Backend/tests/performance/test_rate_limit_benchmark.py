@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.api.middleware import RateLimitStore, SQLiteRateLimitStore
+
+CLIENTS = 200
+REQUESTS_PER_CLIENT = 100
+LIMIT = 1_000
+WINDOW = 60
+REPEATS = 3
+
+
+class _LegacyRateLimitStore:
+    # Lo que hacia RateLimitStore antes: un deque de datetime.now() por clave, podado en cada hit
+    def __init__(self):
+        self._store = defaultdict(deque)
+
+    def is_allowed(self, key: str, limit: int, window: int):
+        now = datetime.now()
+        bucket = self._store[key]
+        cutoff = now - timedelta(seconds=window)
+        while bucket and bucket[0] < cutoff:
+            bucket.popleft()
+        if len(bucket) >= limit:
+            return False, 0
+        bucket.append(now)
+        return True, limit - len(bucket)
+
+
+def _traffic(store, requests_per_client: int) -> float:
+    keys = [f"10.0.{index // 250}.{index % 250}:GET:/api/ping" for index in range(CLIENTS)]
+    started = time.perf_counter()
+    for _ in range(requests_per_client):
+        for key in keys:
+            allowed, _ = store.is_allowed(key, LIMIT, WINDOW)
+            assert allowed
+    return (time.perf_counter() - started) * 1e6 / (requests_per_client * CLIENTS)
+
+
+def _measure(factory, requests_per_client: int) -> dict:
+    # Mejor de REPEATS para el costo; memoria retenida medida en una corrida aparte
+    best_us = min(_traffic(factory(), requests_per_client) for _ in range(REPEATS))
+    tracemalloc.start()
+    store = factory()
+    _traffic(store, requests_per_client)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_check": round(best_us, 2), "retained_kib": round(retained / 1024, 1)}
+
+
+@pytest.mark.performance
+def test_gcra_store_is_constant_memory_and_cheaper_per_check(tmp_path, bench_scale, bench_report):
+    requests_per_client = min(REQUESTS_PER_CLIENT * bench_scale, LIMIT)
+    results = {}
+    for label, factory in (("legacy", _LegacyRateLimitStore), ("gcra", RateLimitStore)):
+        results[label] = {
+            "light": _measure(factory, requests_per_client // 10),
+            "heavy": _measure(factory, requests_per_client),
+        }
+
+    shared = SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    try:
+        results["sqlite_shared_us_per_check"] = round(_traffic(shared, 10), 2)
+    finally:
+        shared.close()
+
+    bench_report("rate_limit_store", clients=CLIENTS, requests_per_client=requests_per_client, **results)
+
+    legacy, gcra = results["legacy"], results["gcra"]
+    # Un float por clave: 10x trafico no cambia la memoria retenida
+    assert gcra["heavy"]["retained_kib"] < gcra["light"]["retained_kib"] * 1.5
+    assert legacy["heavy"]["retained_kib"] > legacy["light"]["retained_kib"] * 4
+    assert gcra["heavy"]["retained_kib"] * 10 < legacy["heavy"]["retained_kib"]
+    # Sin datetime ni deques: el chequeo no es mas caro que antes aun sin expiraciones que podar
+    assert gcra["heavy"]["us_per_check"] < legacy["heavy"]["us_per_check"] * 1.1
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.application.alerts.alert_engine import Alert, AlertCategory, AlertSeverity
+from src.application.alerts.smart_recommender import SmartRecommender
+from src.application.reasoning.llm_reasoner import LLMReasoningResult
+
+LLM_LATENCY_S = 0.01
+SHAPES = (
+    ("low_liquidity", AlertSeverity.URGENT, AlertCategory.RISK_MANAGEMENT, 0.12),
+    ("low_liquidity", AlertSeverity.URGENT, AlertCategory.RISK_MANAGEMENT, 0.22),
+    ("high_risk_score", AlertSeverity.CRITICAL, AlertCategory.RISK_MANAGEMENT, 0.5),
+    ("error_rate_high", AlertSeverity.CRITICAL, AlertCategory.OPERATIONAL, 0.5),
+)
+
+
+class FakeReasoner:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def reason(self, query, context_data=None, trace_id=None):
+        self.calls += 1
+        await asyncio.sleep(LLM_LATENCY_S)
+        return LLMReasoningResult(success=True, response="Reforzar tesoreria " * 20, confidence_score=0.8)
+
+
+def _burst(size: int) -> list:
+    # Faltante de efectivo en toda la red: muchas sucursales, pocas formas distintas
+    burst = []
+    for index in range(size):
+        condition, severity, category, liquidity = SHAPES[index % len(SHAPES)]
+        entity = f"SUC-{index}"
+        alert = Alert(
+            id=f"alert_{entity}", title=condition, description=condition, severity=severity, category=category,
+            triggered_by=condition, triggered_at=datetime.now(timezone.utc), data_context={},
+            recommendations=["Revisar cash flow"],
+        )
+        data = {"entity_id": entity, "metrics": {"liquidity_ratio": liquidity + (index % 3) / 100, "risk_score": 0.8}}
+        burst.append((data, [alert]))
+    return burst
+
+
+async def _sequential(recommender: SmartRecommender, burst: list) -> float:
+    started = time.perf_counter()
+    for data, alerts in burst:
+        await recommender.generate_recommendations(data, alerts, trace_id="bench")
+    return time.perf_counter() - started
+
+
+async def _concurrent(recommender: SmartRecommender, burst: list) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(recommender.generate_recommendations(data, alerts, trace_id="bench") for data, alerts in burst))
+    return time.perf_counter() - started
+
+
+@pytest.mark.performance
+def test_alert_burst_bounded_by_unique_signatures(bench_scale, bench_report):
+    logging.getLogger("src.application.alerts.smart_recommender").setLevel(logging.WARNING)
+    burst = _burst(100 * bench_scale)
+    results = {}
+    for mode, runner in (("sequential", _sequential), ("concurrent", _concurrent)):
+        for label, ttl in (("legacy", 0), ("cached", 300)):
+            reasoner = FakeReasoner()
+            elapsed = asyncio.run(runner(SmartRecommender(llm_reasoner=reasoner, llm_cache_ttl=ttl), burst))
+            results[f"{mode}_{label}"] = {"llm_calls": reasoner.calls, "ms": round(elapsed * 1000, 1)}
+
+    bench_report("recommendation_burst", alerts=len(burst), unique_signatures=len(SHAPES), **results)
+
+    assert results["sequential_cached"]["llm_calls"] == len(SHAPES)
+    assert results["concurrent_cached"]["llm_calls"] == len(SHAPES)
+    assert results["sequential_legacy"]["llm_calls"] == len(burst)
+    assert results["sequential_cached"]["ms"] < results["sequential_legacy"]["ms"]
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.responses import JSONResponse
+
+from src.api import maps_endpoints, saldos_endpoints
+from src.api.main import app
+from src.infrastructure.database import snapshot_cache
+from src.infrastructure.database.snapshot_cache import SnapshotRegistry
+
+TABS = 200
+POLLS = 10
+WRITE_ROUNDS = (2, 5, 8)
+LEGACY_POLLS = 2
+QUERY_LATENCY_S = 0.005
+
+
+class CountingSaldosClient:
+    """In-memory saldos with a fixed per-query latency; counts table reads."""
+
+    def __init__(self, branches: int) -> None:
+        self.reads = 0
+        self.rows = [
+            {
+                "sucursal_id": f"SUC-{index}",
+                "sucursal_numero": index,
+                "sucursal_nombre": f"Sucursal {index}",
+                "saldo_total_sucursal": 1_000_000.0 + index,
+                "caja_teorica_sucursal": 1_000_000.0,
+                **{field: 100_000.0 for field in (
+                    "total_atm", "total_ats", "total_tesoro", "total_cajas_ventanilla",
+                    "total_buzon_depositos", "total_recaudacion", "total_caja_chica", "total_otros",
+                )},
+                "latitud": -34.6 - index / 1000,
+                "longitud": -58.4 - index / 1000,
+            }
+            for index in range(1, branches + 1)
+        ]
+
+    async def get_sucursales(self):
+        self.reads += 1
+        await asyncio.sleep(QUERY_LATENCY_S)
+        return [dict(row) for row in self.rows]
+
+    async def update_sucursal(self, sucursal_id, payload):
+        row = next(row for row in self.rows if row["sucursal_id"] == sucursal_id)
+        row.update(payload)
+        return dict(row)
+
+
+async def _legacy_poll(db: CountingSaldosClient) -> None:
+    # Camino previo: consulta + validacion + serializacion en cada request
+    rows = await db.get_sucursales()
+    JSONResponse(content=[saldos_endpoints.SucursalResponse(**row).model_dump(mode="json") for row in rows])
+
+
+async def _run(branches: int) -> dict:
+    db = CountingSaldosClient(branches)
+    app.dependency_overrides[saldos_endpoints.get_db_client] = lambda: db
+    app.dependency_overrides[maps_endpoints.get_db_client] = lambda: db
+    transport = httpx.ASGITransport(app=app)
+    etags = [None] * TABS
+    statuses = {200: 0, 304: 0}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            async def poll(tab: int) -> None:
+                path = "/api/maps/sucursales" if tab % 2 else "/api/saldos/sucursales"
+                headers = {"If-None-Match": etags[tab]} if etags[tab] else {}
+                response = await http.get(path, headers=headers)
+                statuses[response.status_code] += 1
+                etags[tab] = response.headers["etag"]
+
+            started = time.perf_counter()
+            for round_index in range(POLLS):
+                if round_index in WRITE_ROUNDS:
+                    await http.put(f"/api/saldos/sucursales/SUC-{round_index}", json={"observacion": f"r{round_index}"})
+                await asyncio.gather(*(poll(tab) for tab in range(TABS)))
+            cached_s = time.perf_counter() - started
+            cached_reads = db.reads
+
+        db.reads = 0
+        started = time.perf_counter()
+        for _ in range(LEGACY_POLLS):
+            await asyncio.gather(*(_legacy_poll(db) for _ in range(TABS)))
+        legacy_s = time.perf_counter() - started
+        return {
+            "snapshot_reads": cached_reads,
+            "snapshot_statuses": statuses,
+            "snapshot_http_ms_per_request": round(cached_s * 1000 / (TABS * POLLS), 3),
+            "legacy_reads_per_poll_round": db.reads // LEGACY_POLLS,
+            "legacy_handler_ms_per_request": round(legacy_s * 1000 / (TABS * LEGACY_POLLS), 3),
+        }
+    finally:
+        app.dependency_overrides.pop(saldos_endpoints.get_db_client, None)
+        app.dependency_overrides.pop(maps_endpoints.get_db_client, None)
+
+
+@pytest.mark.performance
+def test_saldos_pollers_hit_snapshot(monkeypatch, bench_scale, bench_report):
+    monkeypatch.setattr(snapshot_cache, "_snapshot_registry", SnapshotRegistry(ttl_seconds=0))
+    branches = 200 * bench_scale
+
+    results = asyncio.run(_run(branches))
+
+    bench_report("saldos_snapshot_polling", tabs=TABS, polls=POLLS, writes=len(WRITE_ROUNDS), branches=branches, **results)
+
+    # Una lectura inicial mas una por cada escritura
+    assert results["snapshot_reads"] == len(WRITE_ROUNDS) + 1
+    assert results["legacy_reads_per_poll_round"] == TABS
+    assert results["snapshot_statuses"][304] > results["snapshot_statuses"][200]
@@ -0,0 +1,78 @@
+import json
+import logging
+import time
+from datetime import datetime
+
+import pytest
+
+from src.shared.task_scheduler import TaskScheduler
+
+REPEATS = 3
+
+
+def _write_legacy_files(tasks_dir, count: int) -> None:
+    # Formato anterior: un task_<id>.json indentado por tarea persistente
+    tasks_dir.mkdir(parents=True)
+    now = datetime.now().isoformat()
+    for index in range(count):
+        task_data = {
+            "task_id": f"task-{index:06d}",
+            "name": f"reporte recurrente {index}",
+            "priority": 2,
+            "scheduled_time": now,
+            "max_retries": 3,
+            "timeout": 300,
+            "metadata": {"recurring": True, "execution": index % 50},
+            "created_at": now,
+            "persistent": True,
+        }
+        with open(tasks_dir / f"task_{task_data['task_id']}.json", "w", encoding="utf-8") as f:
+            json.dump(task_data, f, indent=2, ensure_ascii=False)
+
+
+def _legacy_startup_seconds(tasks_dir) -> float:
+    # Lo que hacia _load_persistent_tasks antes: glob y parseo de todo el directorio
+    started = time.perf_counter()
+    loaded = 0
+    for task_file in tasks_dir.glob("task_*.json"):
+        with open(task_file, "r", encoding="utf-8") as f:
+            json.load(f)
+        loaded += 1
+    elapsed = time.perf_counter() - started
+    assert loaded > 0
+    return elapsed
+
+
+def _startup_seconds(workspace) -> tuple:
+    started = time.perf_counter()
+    scheduler = TaskScheduler(workspace)
+    return time.perf_counter() - started, scheduler
+
+
+@pytest.mark.performance
+def test_startup_replays_a_single_journal(tmp_path, bench_scale, bench_report):
+    logging.getLogger("src.shared.task_scheduler").setLevel(logging.WARNING)
+    persisted = 5_000 * bench_scale
+    tasks_dir = tmp_path / "tasks"
+    _write_legacy_files(tasks_dir, persisted)
+
+    legacy_s = min(_legacy_startup_seconds(tasks_dir) for _ in range(REPEATS))
+    migration_s, _ = _startup_seconds(tmp_path)
+    replays = [_startup_seconds(tmp_path) for _ in range(REPEATS)]
+    replay_s = min(elapsed for elapsed, _ in replays)
+    scheduler = replays[-1][1]
+    files_after = sum(1 for _ in tasks_dir.iterdir())
+
+    bench_report(
+        "task_journal_startup",
+        persisted_tasks=persisted,
+        legacy_glob_ms=round(legacy_s * 1000, 1),
+        one_time_migration_ms=round(migration_s * 1000, 1),
+        journal_replay_ms=round(replay_s * 1000, 1),
+        files_after=files_after,
+    )
+
+    assert len(scheduler.persisted_tasks) == persisted
+    assert files_after == 1
+    # Un solo archivo secuencial: menos que abrir y parsear un archivo por tarea
+    assert replay_s < legacy_s
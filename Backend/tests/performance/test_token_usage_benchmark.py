@@ -0,0 +1,97 @@
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.application.services.token_usage_service import HISTORY_LIMIT, TokenUsageService
+
+AGENTS = [f"agente_{index:02d}" for index in range(20)]
+DAYS = 90
+LEGACY_CALLS = 50
+
+
+def _timestamp(index: int) -> str:
+    return (datetime.utcnow() - timedelta(days=index % DAYS)).isoformat()
+
+
+def _legacy_record_ms(token_file, calls: int) -> float:
+    # Lo que hacia record_usage antes: leer el JSON completo, mutar y reescribirlo indentado
+    data = {"agents": {}, "last_updated": None}
+    for agent in AGENTS:
+        data["agents"][agent] = {
+            "total_tokens": 0, "prompt_tokens_total": 0, "completion_tokens_total": 0, "cost_usd": 0.0,
+            "provider": "openai",
+            "history": [{"timestamp": _timestamp(index), "tokens": 120, "prompt_tokens": 80, "completion_tokens": 40,
+                         "cost_usd": 0.0021, "model": "gpt-4o", "provider": "openai"} for index in range(HISTORY_LIMIT)],
+        }
+    token_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    started = time.perf_counter()
+    for index in range(calls):
+        with token_file.open("r", encoding="utf-8") as file:
+            data = json.load(file)
+        entry = data["agents"][AGENTS[index % len(AGENTS)]]
+        entry["history"] = (entry["history"] + [entry["history"][0]])[-HISTORY_LIMIT:]
+        temp_file = token_file.with_suffix(".tmp")
+        with temp_file.open("w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        temp_file.replace(token_file)
+    return (time.perf_counter() - started) * 1000 / calls
+
+
+def _record(service: TokenUsageService, start: int, stop: int) -> float:
+    started = time.perf_counter()
+    for index in range(start, stop):
+        service.record_usage(AGENTS[index % len(AGENTS)], tokens_used=120, cost_usd=0.0021, prompt_tokens=80,
+                             completion_tokens=40, model="gpt-4o", usage_timestamp=_timestamp(index))
+    return (time.perf_counter() - started) * 1000 / (stop - start)
+
+
+def _summary_ms(service: TokenUsageService) -> float:
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        summary = service.get_summary(days=DAYS)
+        samples.append((time.perf_counter() - started) * 1000)
+    assert len(summary["cost_timeline"]) == DAYS
+    return statistics.median(samples)
+
+
+@pytest.mark.performance
+def test_recording_is_an_append_and_summary_scales_with_days_and_agents(tmp_path, bench_scale, bench_report, bench_timing):
+    records = 10_000 * bench_scale
+    legacy_ms = _legacy_record_ms(tmp_path / "legacy.json", LEGACY_CALLS)
+
+    token_file = tmp_path / "token_tracking.json"
+    service = TokenUsageService(token_file=token_file)
+    first_ms = _record(service, 0, records // 10)
+    small_summary_ms = _summary_ms(service)
+    full_ms = _record(service, records // 10, records)
+    full_summary_ms = _summary_ms(service)
+    total_tokens = service.get_summary(days=DAYS)["total_tokens"]
+    service.close()
+
+    started = time.perf_counter()
+    reopened = TokenUsageService(token_file=token_file)
+    reopen_ms = (time.perf_counter() - started) * 1000
+    reopened_tokens = reopened.get_summary(days=DAYS)["total_tokens"]
+    reopened.close()
+
+    bench_report(
+        "token_usage_ledger",
+        records=records,
+        agents=len(AGENTS),
+        days=DAYS,
+        legacy_record_ms=round(legacy_ms, 3),
+        record_ms={"first_%d" % (records // 10): round(first_ms, 4), "up_to_%d" % records: round(full_ms, 4)},
+        summary_ms={"records_%d" % (records // 10): round(small_summary_ms, 3), "records_%d" % records: round(full_summary_ms, 3)},
+        reopen_ms=round(reopen_ms, 1),
+    )
+
+    assert total_tokens == reopened_tokens == records * 120
+    if bench_timing:
+        assert full_ms < legacy_ms / 10
+        # El resumen depende de dias x agentes, no de cuantos consumos se registraron
+        assert full_summary_ms < small_summary_ms * 3
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.application.services.agent_authorization_service import AgentAuthorizationService, PrivilegeLevel
+from src.infrastructure.database import postgres_client
+
+CONFIG = {
+    "privilege_levels": {
+        "restricted": {"permissions": ["basic_calculations"]},
+        "standard": {"permissions": ["read_workspace_data"]},
+        "elevated": {"permissions": ["read_workspace_data", "write_workspace_data"]},
+    },
+    "agent_assignments": {"capi_gus": {"privilege_level": "standard", "restrictions": []}},
+    "security_policies": {"audit_trail": True, "privilege_escalation_allowed": True, "audit_log_limit": 5},
+    "allowed_extensions": {"default": [".txt"]},
+}
+
+
+class _FakeClient:
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+        self.queries = 0
+
+    @asynccontextmanager
+    async def get_connection(self):
+        self.queries += 1
+        if self.error:
+            raise self.error
+        yield self
+
+    async def fetch(self, query):
+        return self.rows
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    config_path = tmp_path / "agent_privileges.json"
+    config_path.write_text(json.dumps(CONFIG), encoding="utf-8")
+    monkeypatch.setenv("DATABASE_URL", "postgresql://fake/db")
+    return AgentAuthorizationService(config_path)
+
+
+def _use_client(monkeypatch, client):
+    monkeypatch.setattr(postgres_client, "get_postgres_client", lambda: client)
+
+
+def test_privilege_levels_come_from_a_background_snapshot(service, monkeypatch):
+    client = _FakeClient(rows=[("capi_gus", "elevated"), ("sin_nivel", None)])
+    _use_client(monkeypatch, client)
+
+    async def scenario():
+        # La primera consulta no espera a la BD: usa la config JSON y agenda la recarga
+        assert service.get_agent_privileges("capi_gus").privilege_level is PrivilegeLevel.STANDARD
+        await asyncio.sleep(0)
+        results = [service.authorize_operation("capi_gus", "write_file", "/data/out.txt") for _ in range(50)]
+        return results
+
+    assert all(asyncio.run(scenario()))
+    assert client.queries == 1
+    assert service.privilege_levels.loads == 1
+    # Agentes sin fila o sin nivel quedan cacheados como ausentes: no hay otra consulta
+    assert service.get_agent_privileges("desconocido").privilege_level is PrivilegeLevel.RESTRICTED
+    assert client.queries == 1
+
+
+def test_unreachable_database_is_negatively_cached(service, monkeypatch):
+    client = _FakeClient(error=OSError("sin conexion"))
+    _use_client(monkeypatch, client)
+
+    async def scenario():
+        for _ in range(20):
+            service.get_agent_privileges("capi_gus")
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert client.queries == 1
+    assert service.privilege_levels.failures == 1
+    assert service.get_agent_privileges("capi_gus").privilege_level is PrivilegeLevel.STANDARD
+
+
+def test_elevation_invalidates_and_audit_log_is_bounded(service, monkeypatch):
+    client = _FakeClient(rows=[("capi_gus", "standard")])
+    _use_client(monkeypatch, client)
+
+    async def scenario():
+        service.get_agent_privileges("capi_gus")
+        await asyncio.sleep(0)
+        client.rows = [("capi_gus", "elevated")]
+        assert service.elevate_privileges("capi_gus", "elevated", "cierre mensual")
+        await asyncio.sleep(0)
+        return service.get_agent_privileges("capi_gus").privilege_level
+
+    assert asyncio.run(scenario()) is PrivilegeLevel.ELEVATED
+    assert client.queries == 2
+
+    for index in range(8):
+        service.authorize_operation("capi_gus", "read_file", f"/data/{index}.txt")
+    audit = service.get_audit_log()
+    assert len(audit) == 5
+    assert audit[-1]["path"] == "/data/7.txt"
+    assert audit[-1]["timestamp"][:4].isdigit()
+
+
+def test_refresh_task_is_retained_and_failures_are_logged(service, monkeypatch, caplog):
+    cache = service.privilege_levels
+    started = []
+
+    async def failing_refresh():
+        started.append(True)
+        await asyncio.sleep(0)
+        raise RuntimeError("pool cerrado")
+
+    monkeypatch.setattr(cache, "refresh", failing_refresh)
+
+    async def scenario():
+        cache.get("capi_gus")
+        task = cache._refresh_task
+        # Con una recarga pendiente no se agenda otra, aunque se invalide
+        cache.invalidate("capi_gus")
+        assert cache._refresh_task is task
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    with caplog.at_level("ERROR"):
+        task = asyncio.run(scenario())
+    assert task.done()
+    assert len(started) == 1
+    assert "pool cerrado" in caplog.text
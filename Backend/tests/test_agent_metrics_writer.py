@@ -0,0 +1,70 @@
+import json
+
+from src.observability import agent_metrics
+from src.observability.agent_metrics import _EventWriter
+
+
+def _lines(path) -> list:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_events_are_batched_and_flushed_in_order(tmp_path):
+    path = tmp_path / "agent_metrics.jsonl"
+    writer = _EventWriter(path, batch_size=64)
+    try:
+        for index in range(1000):
+            assert writer.submit(json.dumps({"turn_id": index}))
+        assert writer.flush()
+        assert [json.loads(line)["turn_id"] for line in _lines(path)] == list(range(1000))
+        assert writer.stats()["written"] == 1000
+    finally:
+        writer.shutdown()
+    assert writer.stats()["queued"] == 0
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking(tmp_path, monkeypatch):
+    writer = _EventWriter(tmp_path / "agent_metrics.jsonl", max_queue=3)
+    # Sin writer drenando la cola
+    monkeypatch.setattr(writer, "_start", lambda: None)
+
+    accepted = [writer.submit(f'{{"n": {index}}}') for index in range(5)]
+
+    assert accepted == [True, True, True, False, False]
+    assert writer.stats()["dropped"] == 2
+
+
+def test_file_is_rotated_by_size_keeping_backup_count(tmp_path):
+    path = tmp_path / "agent_metrics.jsonl"
+    writer = _EventWriter(path, batch_size=1, max_bytes=200, backup_count=2)
+    try:
+        for index in range(40):
+            writer.submit(json.dumps({"turn_id": index, "agent_name": "capi_desktop"}))
+        assert writer.flush()
+    finally:
+        writer.shutdown()
+
+    files = sorted(item.name for item in tmp_path.iterdir())
+    assert files == ["agent_metrics.1.jsonl", "agent_metrics.2.jsonl", "agent_metrics.jsonl"]
+    assert all((tmp_path / name).stat().st_size <= 200 for name in files)
+    assert json.loads(_lines(path)[-1])["turn_id"] == 39
+    assert writer.stats()["rotations"] >= 2
+
+
+def test_record_functions_only_enqueue(tmp_path, monkeypatch):
+    writer = _EventWriter(tmp_path / "agent_metrics.jsonl")
+    monkeypatch.setattr(agent_metrics, "_WRITER", writer)
+    try:
+        agent_metrics.record_turn_event(
+            agent_name="capi_desktop", session_id="s-1", turn_id=2, latency_ms=120,
+            input_tokens=10, output_tokens=5, cost_usd=0.01, channel="web",
+        )
+        agent_metrics.record_feedback_event(agent_name="capi_desktop", session_id="s-1", turn_id=2, feedback_score="4")
+        assert agent_metrics.flush_events()
+    finally:
+        writer.shutdown()
+
+    turn, feedback = [json.loads(line) for line in _lines(tmp_path / "agent_metrics.jsonl")]
+    assert turn["event_type"] == "agent_turn_completed"
+    assert turn["tokens_total"] == 15
+    assert "user_id" not in turn
+    assert feedback["feedback_score"] == 4.0
@@ -0,0 +1,131 @@
+from src.application.alerts.alert_engine import (
+    AlertCategory,
+    AlertCondition,
+    AlertEngine,
+    AlertSeverity,
+)
+from src.application.alerts.alert_store import SQLiteAlertArchive
+
+
+def _engine(**kwargs) -> AlertEngine:
+    engine = AlertEngine(**kwargs)
+    engine.conditions = [
+        AlertCondition(
+            name="high_risk_score",
+            condition_type="threshold",
+            parameters={"metric": "metrics.risk_score", "threshold": 0.7, "operator": "greater_than"},
+        ),
+        AlertCondition(
+            name="high_processing_time",
+            condition_type="threshold",
+            parameters={"metric": "processing_time", "threshold": 10.0, "operator": "greater_than"},
+        ),
+    ]
+    return engine
+
+
+def _push(engine: AlertEngine, entity: str, risk: float = 0.9, processing: float = 0.0):
+    return engine.evaluate_data({"entity_id": entity, "metrics": {"risk_score": risk}, "processing_time": processing})
+
+
+def test_repeated_triggers_are_deduplicated_per_entity():
+    engine = _engine()
+
+    first = _push(engine, "SUC-1")
+    assert len(first) == 1
+    assert _push(engine, "SUC-1") == []
+    assert len(_push(engine, "SUC-2")) == 1
+
+    assert len(engine.active_alerts) == 2
+    assert first[0].metadata["occurrences"] == 2
+    assert engine.metrics["alerts_deduplicated"] == 1
+
+
+def test_resolution_frees_the_dedupe_slot_and_updates_indexes():
+    engine = _engine()
+    alert = _push(engine, "SUC-1", processing=20.0)[0]
+    operational = _push(engine, "SUC-2", risk=0.0, processing=20.0)[0]
+
+    assert engine.get_active_alerts(severity_filter=AlertSeverity.CRITICAL) == [alert]
+    assert engine.get_active_alerts(
+        severity_filter=AlertSeverity.WARNING, category_filter=AlertCategory.OPERATIONAL
+    ) == engine.get_active_alerts(category_filter=AlertCategory.OPERATIONAL)
+    assert len(engine.get_active_alerts(category_filter=AlertCategory.OPERATIONAL)) == 2
+
+    assert engine.resolve_alert(alert.id)
+    assert not engine.resolve_alert(alert.id)
+    assert alert.resolved
+    assert engine.get_alert_summary()["alerts_by_severity"]["critical"] == 0
+    assert operational.id in engine.active_alerts
+
+    assert len(_push(engine, "SUC-1")) == 1
+
+
+def test_history_is_bounded_and_spills_to_sqlite(tmp_path):
+    archive = SQLiteAlertArchive(tmp_path / "alerts.sqlite")
+    engine = _engine(history_size=10, archive=archive)
+    alerts = []
+    for index in range(25):
+        alert = _push(engine, f"SUC-{index}")[0]
+        alerts.append(alert)
+
+    assert len(engine.alert_history) == 10
+    engine.resolve_alert(alerts[0].id)
+    engine.flush_history()
+
+    assert archive.count() == 15
+    archived = {row["id"]: row for row in archive.recent(limit=50)}
+    assert archived[alerts[0].id]["resolved"] is True
+    assert alerts[-1].id not in archived
+
+
+def test_clear_resolved_alerts_archives_them(tmp_path):
+    archive = SQLiteAlertArchive(tmp_path / "alerts.sqlite")
+    engine = _engine(archive=archive)
+    alert = _push(engine, "SUC-1")[0]
+    engine.resolve_alert(alert.id)
+
+    engine.clear_resolved_alerts(older_than_hours=0)
+
+    assert len(engine.alert_history) == 0
+    assert archive.recent()[0]["id"] == alert.id
+
+
+def test_triggers_without_entity_are_not_deduplicated():
+    engine = _engine()
+    payload = {"metrics": {"risk_score": 0.9}, "processing_time": 0.0}
+
+    assert len(engine.evaluate_data(payload)) == 1
+    assert len(engine.evaluate_data(payload)) == 1
+    assert len(engine.active_alerts) == 2
+    assert engine.metrics["alerts_deduplicated"] == 0
+
+
+def test_close_writes_the_pending_spill_batch(tmp_path):
+    archive = SQLiteAlertArchive(tmp_path / "alerts.sqlite")
+    engine = _engine(history_size=2, archive=archive)
+    for index in range(5):
+        _push(engine, f"SUC-{index}")
+    assert archive.count() == 0
+
+    engine.close()
+
+    assert archive.count() == 3
+
+
+def test_pending_spill_is_flushed_after_interval(tmp_path, monkeypatch):
+    from src.application.alerts import alert_store
+
+    now = [100.0]
+    monkeypatch.setattr(alert_store.time, "monotonic", lambda: now[0])
+    archive = SQLiteAlertArchive(tmp_path / "alerts.sqlite")
+    engine = _engine(history_size=1, archive=archive)
+    engine.alert_history.flush_interval = 30.0
+    _push(engine, "SUC-0")
+    _push(engine, "SUC-1")
+    assert archive.count() == 0
+
+    now[0] += 31
+    _push(engine, "SUC-2")
+
+    assert archive.count() == 2
@@ -0,0 +1,176 @@
+import random
+import statistics
+
+import pytest
+
+from src.application.alerts import alert_engine
+from src.application.alerts.alert_engine import (
+    AlertCondition,
+    AlertEngine,
+    EwmaVolatility,
+    SlidingTrend,
+    WelfordStats,
+)
+
+
+def _batch_slope(values):
+    n = len(values)
+    x_mean = (n - 1) / 2
+    y_mean = sum(values) / n
+    numerator = sum((i - x_mean) * (values[i] - y_mean) for i in range(n))
+    return numerator / sum((i - x_mean) ** 2 for i in range(n))
+
+
+def test_welford_matches_population_stats():
+    rng = random.Random(7)
+    values = [rng.gauss(1000, 250) for _ in range(500)]
+    stats = WelfordStats()
+    for value in values:
+        stats.push(value)
+
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.std_dev == pytest.approx(statistics.pstdev(values))
+
+
+def test_sliding_trend_matches_regression_over_window():
+    rng = random.Random(11)
+    values = [100 + i * 0.5 + rng.uniform(-3, 3) for i in range(137)]
+    trend = SlidingTrend(window=20)
+    for index, value in enumerate(values, start=1):
+        trend.push(value)
+        window = values[max(0, index - 20):index]
+        if len(window) >= 2:
+            assert trend.slope == pytest.approx(_batch_slope(window), rel=1e-9, abs=1e-9)
+
+
+def test_ewma_volatility_ignores_changes_from_zero():
+    ewma = EwmaVolatility(alpha=0.5)
+    for value in (0.0, 10.0, 11.0, 9.9):
+        ewma.push(value)
+
+    assert ewma.observations == 4
+    assert ewma.changes == 2
+
+
+def test_stream_anomaly_is_tracked_per_entity():
+    condition = AlertCondition(
+        name="volume_spike",
+        condition_type="anomaly",
+        parameters={"metric": "metrics.total_volume", "threshold_std": 2.5, "stream": True},
+    )
+    for step in range(30):
+        for entity in ("SUC-1", "SUC-2"):
+            value = 1000 + (step % 5)
+            assert not condition.evaluate({"entity_id": entity, "metrics": {"total_volume": value}})
+
+    assert condition.evaluate({"entity_id": "SUC-1", "metrics": {"total_volume": 5000}})
+    assert not condition.evaluate({"entity_id": "SUC-2", "metrics": {"total_volume": 1002}})
+
+
+def test_stream_trend_and_consecutive_increases():
+    trend = AlertCondition(
+        name="performance_decline",
+        condition_type="trend",
+        parameters={"metric": "score", "trend_type": "decreasing", "threshold": 0.05, "min_periods": 3,
+                    "stream": True},
+    )
+    increases = AlertCondition(
+        name="increases",
+        condition_type="pattern",
+        parameters={"pattern_type": "consecutive_increases", "metric": "score", "min_consecutive": 3,
+                    "stream": True},
+    )
+
+    assert [trend.evaluate({"entity_id": "SUC-1", "score": value}) for value in (1.0, 0.9, 0.8, 0.7)] == [
+        False, False, True, True
+    ]
+    assert [increases.evaluate({"entity_id": "SUC-1", "score": value}) for value in (1, 2, 3, 4, 1)] == [
+        False, False, False, True, False
+    ]
+
+
+def test_historical_data_keeps_batch_evaluation():
+    condition = AlertCondition(
+        name="performance_decline",
+        condition_type="trend",
+        parameters={"metric": "score", "trend_type": "decreasing", "threshold": 0.05, "min_periods": 3,
+                    "stream": True},
+    )
+    data = {"entity_id": "SUC-1", "score": 1.0, "historical_data": [{"score": 0.8}, {"score": 0.6}]}
+
+    assert condition.evaluate(data)
+    assert condition.evaluate(data)
+    assert condition._streams == {}
+
+
+def test_engine_extracts_each_metric_once(monkeypatch):
+    calls = []
+    original = alert_engine._extract_metric_value
+
+    def counting(data, metric):
+        calls.append(metric)
+        return original(data, metric)
+
+    monkeypatch.setattr(alert_engine, "_extract_metric_value", counting)
+    engine = AlertEngine()
+    engine.conditions = [
+        AlertCondition(name="a", condition_type="anomaly",
+                       parameters={"metric": "metrics.total_volume", "stream": True}),
+        AlertCondition(name="t", condition_type="trend",
+                       parameters={"metric": "metrics.total_volume", "stream": True}),
+        AlertCondition(name="v", condition_type="pattern",
+                       parameters={"pattern_type": "volatility_spike", "metric": "metrics.total_volume",
+                                   "stream": True}),
+        AlertCondition(name="u", condition_type="threshold",
+                       parameters={"metric": "metrics.total_volume", "threshold": 10**9}),
+    ]
+
+    engine.evaluate_data({"entity_id": "SUC-1", "metrics": {"total_volume": 100.0}})
+
+    assert calls == ["metrics.total_volume"]
+
+
+def test_stream_mode_is_opt_in():
+    condition = AlertCondition(name="volume_spike", condition_type="anomaly", parameters={"metric": "volume"})
+    for value in range(20):
+        assert not condition.evaluate({"entity_id": "SUC-1", "volume": value})
+
+    assert condition._streams == {}
+
+
+def test_stream_without_entity_is_not_observed():
+    condition = AlertCondition(
+        name="increases",
+        condition_type="pattern",
+        parameters={"pattern_type": "consecutive_increases", "metric": "score", "min_consecutive": 1,
+                    "stream": True},
+    )
+
+    assert [condition.evaluate({"score": value}) for value in (1, 2, 3)] == [False, False, False]
+    assert condition._streams == {}
+
+
+def test_stream_state_is_bounded_by_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(alert_engine.time, "monotonic", lambda: now[0])
+    condition = AlertCondition(
+        name="volume_spike",
+        condition_type="anomaly",
+        parameters={"metric": "volume", "stream": True, "max_entities": 3, "entity_ttl_seconds": 60},
+    )
+    for entity in ("SUC-1", "SUC-2", "SUC-3"):
+        condition.evaluate({"entity_id": entity, "volume": 1.0})
+    condition.evaluate({"entity_id": "SUC-1", "volume": 1.0})
+    condition.evaluate({"entity_id": "SUC-4", "volume": 1.0})
+
+    # SUC-2 era la menos reciente
+    assert list(condition._streams) == ["SUC-3", "SUC-1", "SUC-4"]
+    assert condition._streams["SUC-1"][0].count == 2
+
+    now[0] += 61
+    condition.evaluate({"entity_id": "SUC-1", "volume": 1.0})
+    condition.evaluate({"entity_id": "SUC-5", "volume": 1.0})
+
+    # Las series vencidas se descartan y la entidad que vuelve empieza de cero
+    assert list(condition._streams) == ["SUC-1", "SUC-5"]
+    assert condition._streams["SUC-1"][0].count == 1
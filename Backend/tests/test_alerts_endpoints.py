@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import alerts_endpoints
+from src.api.alerts_endpoints import AlertSummaryResponse, get_db_client
+from src.api.main import app
+
+
+_SHAPED_ALERT = {
+    "id": "42",
+    "alert_code": "alert_42",
+    "timestamp": datetime(2025, 10, 1, 12, 30, 15, 250000, tzinfo=timezone.utc),
+    "title": "Desvio de caja",
+    "priority": "Alta",
+    "status": "Abierta",
+    "affected_entities": [
+        {"entity_type": "dato_clave", "entity_name": "monto=1200", "impact_level": None},
+    ],
+    "sucursal": {
+        "sucursal_id": "SUC-1",
+        "nombre": "Sucursal 1",
+        "saldo_total": 1001000.0,
+        "caja_teorica": 1000000.0,
+        "saldo_cobertura_pct": 100.1,
+    },
+    "dispositivo": None,
+    "financial_impact": None,
+    "currency": "USD",
+    "confidence_score": None,
+    "pending_tasks": 0,
+}
+
+
+class StubAlertsClient:
+    def __init__(self, next_cursor=None) -> None:
+        self.next_cursor = next_cursor
+
+    async def get_historical_alerts_page(self, **kwargs):
+        return {"items": [_SHAPED_ALERT], "next_cursor": self.next_cursor}
+
+    async def search_alerts(self, search_term: str, limit: int = 20):
+        self.searched = (search_term, limit)
+        return [
+            {
+                "id": "6f1d0c4e-8a51-4f7e-9a55-0d6f1e0c9b21",
+                "alert_code": "HA-1",
+                "title": "Desvio de caja en sucursal",
+                "description": None,
+                "priority": "high",
+                "status": "active",
+                "timestamp": _SHAPED_ALERT["timestamp"],
+                "financial_impact": None,
+                "relevance_score": 0.6,
+            }
+        ]
+
+
+@pytest.fixture
+def client():
+    def _override(stub: StubAlertsClient) -> TestClient:
+        app.dependency_overrides[get_db_client] = lambda: stub
+        return TestClient(app)
+
+    yield _override
+    app.dependency_overrides.pop(get_db_client, None)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_listing_matches_pydantic_serialization(client, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(alerts_endpoints, "orjson", None)
+
+    response = client(StubAlertsClient(next_cursor="abc")).get("/api/alerts/")
+
+    assert response.status_code == 200
+    assert response.headers["x-next-cursor"] == "abc"
+    assert response.json() == [AlertSummaryResponse(**_SHAPED_ALERT).model_dump(mode="json")]
+
+
+def test_listing_without_next_page_has_no_cursor_header(client):
+    response = client(StubAlertsClient()).get("/api/alerts/")
+
+    assert response.status_code == 200
+    assert "x-next-cursor" not in response.headers
+
+
+def test_search_route_is_not_shadowed_by_alert_detail(client):
+    stub = StubAlertsClient()
+
+    response = client(stub).get("/api/alerts/search", params={"q": "desvio caja", "limit": 5})
+
+    assert response.status_code == 200
+    assert stub.searched == ("desvio caja", 5)
+    assert response.json()[0]["alert_code"] == "HA-1"
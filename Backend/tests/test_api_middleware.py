@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+
+import pytest
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.api import middleware
+from src.api.middleware import CapiHTTPMiddleware, RateLimitStore
+
+API_KEY = "clave-de-prueba-middleware"
+
+
+def _build_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for index in range(3):
+                yield f"chunk-{index}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.websocket("/ws")
+    async def echo(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text(await websocket.receive_text())
+        await websocket.close()
+
+    app.add_middleware(CapiHTTPMiddleware, **options)
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(middleware, "rate_limit_store", RateLimitStore())
+    with TestClient(_build_app(rate_limit_requests=2, rate_limit_window=60, api_key=API_KEY)) as instance:
+        instance.headers["X-API-Key"] = API_KEY
+        yield instance
+
+
+def test_request_id_security_and_rate_limit_headers_in_one_pass(client):
+    response = client.get("/api/ping")
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == response.json()["request_id"]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["X-RateLimit-Limit"] == "2"
+    assert response.headers["X-RateLimit-Remaining"] == "1"
+
+
+def test_api_key_is_required_on_api_paths_only(client):
+    del client.headers["X-API-Key"]
+
+    rejected = client.get("/api/ping")
+    assert rejected.status_code == 401
+    assert rejected.json()["detail"]["type"] == "authentication_error"
+    assert rejected.headers["WWW-Authenticate"] == "Bearer"
+    assert "X-Request-ID" in rejected.headers
+
+    assert client.get("/api/ping", params={"api_key": API_KEY}).status_code == 200
+    assert client.get("/health").status_code == 200
+
+
+def test_rate_limit_rejects_with_retry_after(client):
+    assert [client.get("/api/ping").status_code for _ in range(2)] == [200, 200]
+
+    rejected = client.get("/api/ping")
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"]["type"] == "rate_limit_error"
+    assert rejected.headers["Retry-After"] == "60"
+    # Health checks no consumen cupo
+    assert all(client.get("/health").status_code == 200 for _ in range(5))
+
+
+def test_streaming_and_websocket_traffic_pass_through(client):
+    with client.stream("GET", "/api/stream") as response:
+        assert response.status_code == 200
+        assert "X-Request-ID" in response.headers
+        assert list(response.iter_lines()) == ["chunk-0", "chunk-1", "chunk-2"]
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_text("hola")
+        assert websocket.receive_text() == "hola"
+
+
+def test_gcra_store_keeps_one_timestamp_per_key_and_evicts_idle_keys(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(middleware.time, "monotonic", lambda: clock[0])
+    store = RateLimitStore(shards=1, max_keys=8)
+
+    assert [store.is_allowed("cliente", 3, 30) for _ in range(4)] == [(True, 2), (True, 1), (True, 0), (False, 0)]
+    clock[0] += 10
+    assert store.is_allowed("cliente", 3, 30) == (True, 0)
+
+    for index in range(100):
+        store.is_allowed(f"rafaga-{index}", 3, 30)
+    assert len(store) <= 8
+
+    # Pasada la ventana, las claves quedan inactivas y se descartan al llegar una nueva
+    clock[0] += 31
+    assert store.is_allowed("nueva", 3, 30) == (True, 2)
+    assert len(store) == 1
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    first = middleware.SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    second = middleware.SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    try:
+        assert first.is_allowed("ip:GET:/api/ping", 2, 60) == (True, 1)
+        assert second.is_allowed("ip:GET:/api/ping", 2, 60) == (True, 0)
+        assert first.is_allowed("ip:GET:/api/ping", 2, 60) == (False, 0)
+        assert second.is_allowed("otra", 2, 60) == (True, 1)
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_store_checks_run_off_the_event_loop(tmp_path):
+    store = middleware.SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    threads = []
+    original = store.is_allowed
+
+    def recording(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+
+    store.is_allowed = recording
+    app = _build_app(rate_limit_requests=2, rate_limit_window=60, api_key=API_KEY, rate_limit_store=store)
+    try:
+        with TestClient(app) as instance:
+            response = instance.get("/api/ping", headers={"X-API-Key": API_KEY})
+        assert response.headers["X-RateLimit-Remaining"] == "1"
+        assert threads and all(name.startswith("rate-limit-sqlite") for name in threads)
+    finally:
+        store.close()
+
+
+def test_sqlite_store_surfaces_lock_errors_when_begin_fails(tmp_path):
+    holder = middleware.SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    store = middleware.SQLiteRateLimitStore(tmp_path / "rate_limits.db")
+    store._conn.execute("PRAGMA busy_timeout = 0")
+    holder._conn.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            store.is_allowed("cliente", 3, 30)
+    finally:
+        holder._conn.execute("ROLLBACK")
+        holder.close()
+        store.close()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+IA_WORKSPACE = BACKEND_DIR / "ia_workspace"
+if str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.capi_elcajas.handler import ElCajasAgent
+from agentes.capi_elcajas.policy_engine import CashPolicyEngine
+from src.domain.agents.agent_models import AgentTask, IntentType
+
+FIXTURES = Path(__file__).parent / "fixtures" / "capi_elcajas"
+
+
+@pytest.fixture(scope="module")
+def golden():
+    payload = json.loads((FIXTURES / "golden_input.json").read_text(encoding="utf-8"))
+    expected = json.loads((FIXTURES / "golden_analysis.json").read_text(encoding="utf-8"))
+    return payload, expected
+
+
+@pytest.fixture
+def agent(tmp_path):
+    instance = ElCajasAgent(policy_service=None)
+    instance._workspace_root = tmp_path
+    return instance
+
+
+def _policy_map(agent, policies):
+    normalized = [agent._normalize_policy(policy) for policy in policies]
+    return {policy["channel"].lower(): policy for policy in normalized}
+
+
+def _task(rows, policies, **context):
+    return AgentTask(
+        task_id="t-1",
+        intent=IntentType.BRANCH,
+        query="diagnostico de caja",
+        user_id="u-1",
+        session_id="golden",
+        context={"branch_rows": rows, "policies": policies, **context},
+    )
+
+
+def test_vectorized_engine_matches_golden_analysis(agent, golden):
+    payload, expected = golden
+    now = datetime.fromisoformat(payload["now"])
+
+    analysis = agent._analyze_branches(payload["rows"], _policy_map(agent, payload["policies"]), now)
+
+    for branch in analysis:
+        assert branch.pop("recommendation_artifact") is None
+    assert json.loads(json.dumps(analysis, default=str)) == expected
+
+
+def test_engine_orders_recommendations_like_per_branch_loop(agent, golden):
+    payload, _ = golden
+    evaluation = CashPolicyEngine().evaluate(payload["rows"], _policy_map(agent, payload["policies"]))
+
+    assert len(evaluation.branches) == len(payload["rows"])
+    assert len(evaluation.channels) == len(payload["rows"]) * len(evaluation.channel_names)
+    ordered = evaluation.recommendations["branch"].tolist()
+    assert ordered == sorted(ordered)
+
+
+def test_process_writes_single_consolidated_artifact(agent, golden, tmp_path):
+    payload, expected = golden
+
+    result = asyncio.run(agent.process(_task(payload["rows"], payload["policies"])))
+
+    files = list((tmp_path / "data" / "sessions").rglob("*.json"))
+    flagged = [branch for branch in expected if branch["recommendations"]]
+    report = result.data["recommendation_report"]
+    assert [path.name for path in files] == [report["filename"]]
+    assert report["branches"] == len(flagged)
+    assert {item["path"] for item in result.data["recommendation_files"]} == {report["path"]}
+    assert len(result.data["recommendation_files"]) == len(flagged)
+
+    written = json.loads(files[0].read_text(encoding="utf-8"))
+    assert written["branches_analyzed"] == len(payload["rows"])
+    assert [item["branch_id"] for item in written["branches"]] == [branch["branch_id"] for branch in flagged]
+
+
+def test_process_can_write_per_branch_slices(agent, golden, tmp_path):
+    payload, _ = golden
+    rows = payload["rows"][:3]
+
+    result = asyncio.run(agent.process(_task(rows, payload["policies"], branch_artifacts=True)))
+
+    names = sorted(path.name for path in (tmp_path / "data" / "sessions").rglob("*.json"))
+    slices = [item["filename"] for item in result.data["recommendation_files"]]
+    assert names == sorted([result.data["recommendation_report"]["filename"], *slices])
+    assert all(name.startswith("recommendation_SUC-") for name in slices)
@@ -0,0 +1,113 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+IA_WORKSPACE = BACKEND_ROOT / "ia_workspace"
+if str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.capi_noticias.handler import AmbitoNewsFetcher, ArticleHTMLParser
+
+FIXTURES = BACKEND_ROOT / "tests" / "fixtures" / "capi_noticias"
+ARTICLE_URL = "https://www.ambito.com/finanzas/nota-n1"
+SOURCE_URL = "https://www.ambito.com/finanzas"
+
+BACKENDS = ArticleHTMLParser.available_backends()
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.fixture(params=BACKENDS)
+def fetcher(request) -> AmbitoNewsFetcher:
+    return AmbitoNewsFetcher(parser=ArticleHTMLParser(request.param))
+
+
+def test_bs4_backend_is_always_available():
+    assert BACKENDS[-1] == "bs4"
+    # Instalar lxml o selectolax como dependencia transitiva no cambia el parser de produccion
+    assert ArticleHTMLParser().backend == "bs4"
+    with pytest.raises(ValueError):
+        ArticleHTMLParser("no-such-backend")
+
+
+def test_parse_article_from_jsonld(fetcher):
+    article = fetcher._parse_article(_fixture("article_jsonld.html"), ARTICLE_URL, SOURCE_URL)
+
+    assert article.url == ARTICLE_URL
+    assert article.source == SOURCE_URL
+    assert article.headline == "El BCRA evalúa nuevos topes para retiros en cajeros"
+    assert article.summary == "La entidad analiza límites de extracción de efectivo en sucursales."
+    assert article.raw_keywords == ["bcra", "cajeros", "efectivo"]
+    assert article.published_at == datetime(2025, 3, 14, 9, 30, tzinfo=timezone.utc)
+    assert article.snippet == (
+        "El Banco Central analiza nuevos topes diarios para retiros de efectivo en cajeros automáticos."
+    )
+
+
+def test_parse_article_jsonld_does_not_build_dom(fetcher, monkeypatch):
+    def _fail(_html):
+        raise AssertionError("DOM should not be built when JSON-LD has headline and body")
+
+    monkeypatch.setattr(fetcher.parser, "document", _fail)
+    article = fetcher._parse_article(_fixture("article_jsonld.html"), ARTICLE_URL, SOURCE_URL)
+    assert article.headline.startswith("El BCRA")
+
+
+def test_parse_article_falls_back_to_dom(fetcher):
+    article = fetcher._parse_article(_fixture("article_dom.html"), ARTICLE_URL, SOURCE_URL)
+
+    assert article.headline == "Reservas delBCRA: qué pasa con el dólar"
+    assert article.summary == "Resumen desde JSON-LD"
+    assert article.raw_keywords == ["dólar", "reservas"]
+    assert article.published_at == datetime(2025, 3, 15, 11, 0, tzinfo=timezone(timedelta(hours=-3)))
+    assert article.snippet == (
+        "Las reservas brutas cayeron & el mercado reaccionó. "
+        "Los depósitos en sucursales se mantienen   estables."
+    )
+
+
+def test_parse_article_without_title_uses_placeholder(fetcher):
+    article = fetcher._parse_article("<html><body><p>Sin datos</p></body></html>", ARTICLE_URL, SOURCE_URL)
+
+    assert article.headline == "Sin título"
+    assert article.summary == ""
+    assert article.snippet == ""
+    assert article.published_at is None
+
+
+def test_extract_article_urls_from_jsonld(fetcher):
+    urls = fetcher._extract_article_urls(_fixture("listing_jsonld.html"), SOURCE_URL)
+
+    assert urls == [
+        "https://www.ambito.com/finanzas/bcra-retiros-n123",
+        "https://www.ambito.com/economia/inflacion-n456",
+    ]
+
+
+def test_extract_article_urls_falls_back_to_anchors(fetcher):
+    urls = fetcher._extract_article_urls(_fixture("listing_anchors.html"), SOURCE_URL)
+
+    assert urls == [
+        "https://www.ambito.com/economia/plazo-fijo-n10",
+        "https://www.ambito.com/economia/depositos-n12",
+    ]
+
+
+@pytest.mark.parametrize("html", ["", "   \n", "<!-- sin contenido -->"])
+def test_parse_empty_body_uses_placeholder(fetcher, html):
+    article = fetcher._parse_article(html, ARTICLE_URL, SOURCE_URL)
+
+    assert article.headline == "Sin título"
+    assert article.snippet == ""
+
+
+def test_parse_article_with_xml_declaration(fetcher):
+    html = '<?xml version="1.0" encoding="utf-8"?><html><body><h1>Con declaracion</h1></body></html>'
+    article = fetcher._parse_article(html, ARTICLE_URL, SOURCE_URL)
+
+    assert article.headline == "Con declaracion"
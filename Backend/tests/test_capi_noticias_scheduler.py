@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+
+from src.application.services import capi_noticias_service as service_module
+
+
+class FakeConfigManager:
+    def __init__(self) -> None:
+        self.config: Dict[str, Any] = {"enabled": True, "interval_minutes": 60}
+        self.load_calls = 0
+
+    def load_config(self) -> Dict[str, Any]:
+        self.load_calls += 1
+        return dict(self.config)
+
+    def save_config(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.config.update(data)
+        return dict(self.config)
+
+    def load_status(self) -> Dict[str, Any]:
+        return {"run_history": []}
+
+
+class FakeAgent:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.triggers: List[str] = []
+        self.ran = threading.Event()
+
+    def run_cycle(self, *, trigger: str, **_: Any) -> Dict[str, Any]:
+        self.triggers.append(trigger)
+        time.sleep(self.delay)
+        self.ran.set()
+        return {"trigger": trigger, "articles": []}
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(service_module, "CapiNoticiasAgent", FakeAgent)
+    monkeypatch.setattr(service_module, "CapiNoticiasConfigManager", FakeConfigManager)
+    instance = service_module.CapiNoticiasSchedulerService()
+    yield instance
+    instance.stop()
+
+
+def test_scheduler_sleeps_without_polling_config(scheduler):
+    scheduler.start()
+    loads_after_start = scheduler.config_manager.load_calls
+    time.sleep(0.3)
+
+    assert scheduler.agent.triggers == []
+    assert scheduler.config_manager.load_calls == loads_after_start
+
+
+def test_scheduler_wakes_early_when_schedule_changes(scheduler):
+    scheduler.start()
+    with scheduler._wakeup:
+        scheduler._next_run = datetime.utcnow()
+        scheduler._wakeup.notify_all()
+
+    assert scheduler.agent.ran.wait(2.0)
+    assert scheduler.agent.triggers == ["scheduler"]
+
+    status = scheduler.get_status()["status"]
+    latency = status["run_latencies"][-1]
+    assert latency["trigger"] == "scheduler"
+    assert latency["schedule_lag_seconds"] < 1.0
+    assert datetime.fromisoformat(status["next_run"]) > datetime.utcnow() + timedelta(minutes=59)
+
+
+def test_disabled_scheduler_waits_for_configuration(scheduler):
+    scheduler.start()
+    scheduler.update_configuration(enabled=False)
+    with scheduler._wakeup:
+        scheduler._next_run = datetime.utcnow()
+        scheduler._wakeup.notify_all()
+    time.sleep(0.2)
+    assert scheduler.agent.triggers == []
+
+    scheduler.stop()
+    assert scheduler._thread is None
+
+
+def test_overlapping_runs_are_skipped(scheduler):
+    scheduler.agent.delay = 0.3
+    results: List[Dict[str, Any]] = []
+    worker = threading.Thread(target=lambda: results.append(scheduler.trigger_run(trigger="manual")))
+    worker.start()
+    time.sleep(0.05)
+
+    assert scheduler.trigger_run(trigger="langgraph") == {}
+    worker.join()
+
+    assert scheduler.agent.triggers == ["manual"]
+    assert results == [{"trigger": "manual", "articles": []}]
+    assert scheduler.get_status()["status"]["run_latencies"][-1]["duration_seconds"] >= 0.3
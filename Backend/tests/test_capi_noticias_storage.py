@@ -0,0 +1,137 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+IA_WORKSPACE = BACKEND_ROOT / "ia_workspace"
+if str(IA_WORKSPACE) not in sys.path:
+    sys.path.insert(0, str(IA_WORKSPACE))
+
+from agentes.capi_noticias.handler import NoticiasStorage
+
+SEGMENTS = {
+    "daily": {
+        "file": "daily.json",
+        "min_priority": 4.0,
+        "fallback_min": 0,
+        "max_items": 2,
+        "lookback_hours": 36,
+    },
+    "weekly": {
+        "file": "weekly.json",
+        "min_priority": 0.0,
+        "fallback_min": 0,
+        "max_items": 10,
+        "lookback_days": 7,
+    },
+}
+
+
+def _article(slug: str, published_at: str, priority: float, urgency: str = "normal"):
+    return {
+        "url": f"https://www.ambito.com/finanzas/{slug}",
+        "headline": f"Noticia {slug}",
+        "summary": "Resumen",
+        "published_at": published_at,
+        "source": "https://www.ambito.com/finanzas",
+        "score": priority,
+        "priority_score": priority,
+        "urgency_level": urgency,
+    }
+
+
+def _run(generated_at: str, *articles):
+    return {"generated_at": generated_at, "articles": list(articles)}
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> NoticiasStorage:
+    return NoticiasStorage(tmp_path / "runs", tmp_path / "segments", lambda: {k: dict(v) for k, v in SEGMENTS.items()})
+
+
+def _segment(storage: NoticiasStorage, name: str):
+    return json.loads((storage.segments_root / f"{name}.json").read_text(encoding="utf-8"))
+
+
+def test_persist_run_skips_duplicates_via_index(storage):
+    first = storage.persist_run(_run("2025-03-10T12:00:00", _article("a-n1", "2025-03-10T10:00:00", 5.0)))
+    second = storage.persist_run(
+        _run(
+            "2025-03-10T13:00:00",
+            _article("a-n1", "2025-03-10T10:00:00", 5.0),
+            _article("b-n2", "2025-03-10T11:00:00", 6.0),
+        )
+    )
+
+    assert len(first["saved"]) == 1
+    assert [entry["url"].rsplit("/", 1)[-1] for entry in second["saved"]] == ["b-n2"]
+    assert [item["reason"] for item in second["skipped"]] == ["duplicate"]
+    assert storage.index_store.count() == 2
+    assert not storage.index_path.exists()
+
+    saved = second["saved"][0]
+    assert storage.index_store.get(saved["fingerprint"])["md_path"] == saved["md_path"]
+    assert (storage.root / saved["md_path"]).exists()
+
+
+def test_segments_are_ranked_trimmed_and_aged_out(storage):
+    storage.persist_run(
+        _run(
+            "2025-03-10T12:00:00",
+            _article("low-n1", "2025-03-10T09:00:00", 3.0),
+            _article("mid-n2", "2025-03-10T10:00:00", 5.0),
+            _article("top-n3", "2025-03-10T11:00:00", 8.0, urgency="high"),
+            _article("tie-n4", "2025-03-10T11:30:00", 5.0, urgency="high"),
+        )
+    )
+
+    daily = _segment(storage, "daily")
+    assert [item["headline"] for item in daily["items"]] == ["Noticia top-n3", "Noticia tie-n4"]
+    assert daily["items"][0]["md_path"]
+    assert len(_segment(storage, "weekly")["items"]) == 4
+
+    # Two days later the daily items fall outside the 36h lookback window.
+    result = storage.persist_run(_run("2025-03-12T12:00:00", _article("new-n5", "2025-03-12T11:00:00", 4.5)))
+
+    assert result["segments"] == {"daily": 1, "weekly": 5}
+    assert [item["headline"] for item in _segment(storage, "daily")["items"]] == ["Noticia new-n5"]
+
+
+def test_segment_keeps_higher_priority_version(storage):
+    storage.persist_run(_run("2025-03-10T12:00:00", _article("a-n1", "2025-03-10T10:00:00", 7.0)))
+    storage.persist_run(_run("2025-03-10T13:00:00", _article("a-n1", "2025-03-10T10:00:00", 4.5)))
+
+    items = _segment(storage, "daily")["items"]
+    assert len(items) == 1
+    assert items[0]["priority_score"] == 7.0
+
+
+def test_legacy_index_and_segments_are_migrated(tmp_path: Path):
+    runs = tmp_path / "runs"
+    segments = tmp_path / "segments"
+    runs.mkdir()
+    segments.mkdir()
+    legacy_entry = {
+        "fingerprint": "legacy-fp",
+        "headline": "Noticia previa",
+        "url": "https://www.ambito.com/finanzas/previa-n9",
+        "published_at": "2025-03-10T08:00:00",
+        "md_path": "2025/03/previa.md",
+        "json_path": "2025/03/previa.json",
+    }
+    (runs / "index.json").write_text(json.dumps({"legacy-fp": legacy_entry}), encoding="utf-8")
+    (segments / "weekly.json").write_text(
+        json.dumps({"timeframe": "weekly", "items": [{**legacy_entry, "priority_score": 9.0}]}),
+        encoding="utf-8",
+    )
+
+    storage = NoticiasStorage(runs, segments, lambda: {k: dict(v) for k, v in SEGMENTS.items()})
+    assert storage.index_store.contains("legacy-fp")
+
+    storage.persist_run(_run("2025-03-10T12:00:00", _article("a-n1", "2025-03-10T10:00:00", 5.0)))
+
+    weekly = _segment(storage, "weekly")
+    assert [item["fingerprint"] for item in weekly["items"]][0] == "legacy-fp"
+    assert len(weekly["items"]) == 2
@@ -0,0 +1,68 @@
+import time
+
+from src.infrastructure.langgraph import node_metrics
+from src.infrastructure.langgraph.graph_builder import GraphBuilder
+from src.infrastructure.langgraph.nodes.base import GraphNode
+from src.infrastructure.langgraph.state_schema import GraphState, StateMutator
+
+
+class _SleepyNode(GraphNode):
+    def __init__(self, name: str, sleep_seconds: float) -> None:
+        super().__init__(name=name)
+        self.sleep_seconds = sleep_seconds
+
+    def run(self, state: GraphState) -> GraphState:
+        time.sleep(self.sleep_seconds)
+        updated = StateMutator.update_field(state, "current_node", self.name)
+        return StateMutator.append_to_list(updated, "completed_nodes", self.name)
+
+
+def _compile(*nodes: GraphNode):
+    builder = GraphBuilder()
+    for node in nodes:
+        builder.add_node(node)
+    for source, target in zip(nodes, nodes[1:]):
+        builder.add_edge(source.name, target.name)
+    builder._finish_node = nodes[-1].name
+    return builder._compile_state_graph(checkpointer=None, interrupt_before=None)
+
+
+def _state(**config) -> GraphState:
+    return GraphState(session_id="s-metrics", trace_id="t-1", user_id="u", original_query="hola", config=config)
+
+
+def _count(histogram, node: str) -> float:
+    for family in histogram.collect():
+        for sample in family.samples:
+            if sample.name.endswith("_count") and sample.labels.get("node") == node:
+                return sample.value
+    return 0.0
+
+
+def test_node_spans_are_attached_to_reasoning_trace_when_enabled():
+    graph = _compile(_SleepyNode("metrics_lento", 0.02), _SleepyNode("metrics_rapido", 0.0))
+
+    result = graph.invoke(_state(node_spans=True), {"configurable": {"thread_id": "spans"}})
+
+    entries = [entry for entry in result["reasoning_trace"] if entry.get("type") == "node_spans"]
+    assert len(entries) == 1
+    spans = {span[0]: dict(zip(entries[0]["fields"], span)) for span in entries[0]["spans"]}
+    assert list(spans) == ["metrics_lento", "metrics_rapido"]
+    assert spans["metrics_lento"]["wall_ms"] >= 20
+    # Dormir no consume CPU; los merges de StateMutator quedan medidos aparte
+    assert spans["metrics_lento"]["cpu_ms"] < spans["metrics_lento"]["wall_ms"] / 2
+    assert 0 < spans["metrics_rapido"]["merge_ms"] <= spans["metrics_rapido"]["wall_ms"]
+    assert spans["metrics_rapido"]["state_bytes"] > 0
+
+
+def test_histograms_are_recorded_without_touching_the_trace_by_default():
+    node = _SleepyNode("metrics_default", 0.0)
+    graph = _compile(node)
+    before = _count(node_metrics.NODE_WALL_SECONDS, "metrics_default")
+
+    result = graph.invoke(_state(), {"configurable": {"thread_id": "default"}})
+
+    assert result["reasoning_trace"] == []
+    assert _count(node_metrics.NODE_WALL_SECONDS, "metrics_default") == before + 1
+    assert _count(node_metrics.NODE_MERGE_SECONDS, "metrics_default") == before + 1
+    assert node_metrics.snapshot()["metrics_default"]["count"] == before + 1
@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+
+from src.shared.knowledge_base import KnowledgeBase
+
+
+@pytest.fixture
+def kb(tmp_path):
+    knowledge_base = KnowledgeBase(tmp_path / "knowledge")
+    knowledge_base.add_document(
+        "caja-01",
+        "La gestión de efectivo en sucursales. El arqueo diario detecta faltantes en caja.",
+        title="Gestión de caja",
+        doc_type="procedimiento",
+    )
+    knowledge_base.add_document(
+        "fraude-01",
+        "Reporte de fraude con tarjetas de crédito. Se revisan movimientos de caja sospechosos.",
+        title="Fraude con tarjetas",
+        doc_type="reporte",
+    )
+    knowledge_base.add_document(
+        "prestamos-01",
+        "Condiciones de préstamos personales para clientes con nómina.",
+        title="Préstamos",
+        doc_type="reporte",
+    )
+    yield knowledge_base
+    knowledge_base.close()
+
+
+def test_search_ignores_diacritics_and_highlights_matches(kb):
+    results = kb.search_documents("gestion")
+
+    assert [result["doc_id"] for result in results] == ["caja-01"]
+    assert results[0]["highlighted_title"] == "**Gestión** de caja"
+    assert results[0]["relevant_snippets"] == [
+        "La **gestión** de efectivo en sucursales. El arqueo diario detecta faltantes en caja."
+    ]
+    assert results[0]["score"] > 0
+
+
+def test_title_matches_rank_first_and_filters_apply(kb):
+    results = kb.search_documents("caja")
+
+    assert [result["doc_id"] for result in results] == ["caja-01", "fraude-01"]
+    assert [result["doc_id"] for result in kb.search_documents("caja", doc_type="reporte")] == ["fraude-01"]
+    assert kb.search_documents("caja", limit=1)[0]["doc_id"] == "caja-01"
+
+
+def test_query_syntax_is_treated_as_literal_terms(kb):
+    assert kb.search_documents('fraude AND "NOT" * ^(') [0]["doc_id"] == "fraude-01"
+    assert kb.search_documents("de la en") == []
+    assert kb.search_documents("   ") == []
+
+
+def test_index_follows_updates_and_deletes(kb):
+    kb.add_document("caja-01", "Manual de cajeros automáticos.", title="Cajeros")
+
+    assert kb.search_documents("arqueo") == []
+    assert [result["doc_id"] for result in kb.search_documents("cajeros")] == ["caja-01"]
+
+    assert kb.delete_document("fraude-01")
+    assert kb.search_documents("fraude") == []
+    assert not kb.delete_document("fraude-01")
+
+
+def test_index_is_keyed_on_the_integer_primary_key(kb):
+    # id INTEGER PRIMARY KEY es alias del rowid: SQLite no lo renumera en un VACUUM
+    columns = {row[1]: (row[2], row[5]) for row in kb._conn.execute("PRAGMA table_info(documents)")}
+    assert columns["id"] == ("INTEGER", 1)
+
+    assert kb.delete_document("caja-01")
+    kb._conn.execute("VACUUM")
+    assert kb.delete_document("fraude-01")
+    kb.add_document("cajeros-01", "Manual de cajeros automáticos.", title="Cajeros")
+
+    indexed = {row[0] for row in kb._conn.execute("SELECT rowid FROM documents_fts")}
+    assert indexed == {row[0] for row in kb._conn.execute("SELECT id FROM documents")}
+    kb._conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('integrity-check')")
+    assert kb.search_documents("tarjetas") == []
+    assert [result["doc_id"] for result in kb.search_documents("cajeros")] == ["cajeros-01"]
+
+
+def test_existing_database_is_indexed_on_open(tmp_path):
+    root = tmp_path / "knowledge"
+    root.mkdir()
+    # Base creada antes del índice FTS5, con la tabla de palabras clave anterior
+    with sqlite3.connect(root / "search_index.db") as conn:
+        conn.execute(
+            "CREATE TABLE documents (doc_id TEXT PRIMARY KEY, title TEXT NOT NULL, content TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, "
+            "doc_type TEXT DEFAULT 'general', file_path TEXT, metadata TEXT)"
+        )
+        conn.execute("CREATE TABLE keywords (id INTEGER PRIMARY KEY, doc_id TEXT, keyword TEXT, frequency INTEGER)")
+        conn.execute(
+            "INSERT INTO documents VALUES ('old-1', 'Política de tesorería', 'Límites de liquidez diaria', "
+            "'hash', '2024-01-01', '2024-01-01', 'general', NULL, '{}')"
+        )
+    conn.close()
+
+    knowledge_base = KnowledgeBase(root)
+    try:
+        assert [result["doc_id"] for result in knowledge_base.search_documents("tesoreria")] == ["old-1"]
+        assert "id" in [row[1] for row in knowledge_base._conn.execute("PRAGMA table_info(documents)")]
+        assert knowledge_base.reindex_documents()["reindexed_documents"] == 1
+        assert knowledge_base.get_stats()["total_keywords"] == 6
+    finally:
+        knowledge_base.close()
@@ -0,0 +1,73 @@
+import logging
+import queue
+import sys
+import threading
+
+from src.core.logging import DroppingQueueHandler, start_queue_logging
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.threads.add(threading.current_thread().name)
+        self.lines.append(self.format(record))
+
+
+def _isolated_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_records_are_formatted_on_the_listener_thread():
+    output = _RecordingHandler()
+    output.setLevel(logging.INFO)
+    handler, listener = start_queue_logging([output], queue_size=100)
+    logger = _isolated_logger("tests.logging.listener", handler)
+    payload = ["antes"]
+    try:
+        logger.info("valor %s", payload)
+        # Los args se fijan al encolar: mutarlos despues no cambia el registro
+        payload[0] = "despues"
+        logger.debug("filtrado por nivel")
+        logger.info({"event": "estructurado"})
+    finally:
+        listener.stop()
+
+    assert output.lines == ["valor ['antes']", "{'event': 'estructurado'}"]
+    assert threading.current_thread().name not in output.threads
+
+
+def test_prepare_copies_the_record_and_renders_the_traceback():
+    handler = DroppingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("saldo invalido")
+    except ValueError:
+        record = logging.getLogger("tests.logging.prepare").makeRecord(
+            "tests.logging.prepare", logging.ERROR, __file__, 1, "fallo %s", ("arqueo",), sys.exc_info()
+        )
+
+    prepared = handler.prepare(record)
+
+    assert prepared is not record
+    assert record.args == ("arqueo",) and record.exc_info is not None
+    assert prepared.msg == "fallo arqueo" and prepared.args is None
+    assert prepared.exc_info is None
+    assert "ValueError: saldo invalido" in prepared.exc_text
+
+
+def test_full_queue_drops_and_counts_without_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = _isolated_logger("tests.logging.dropping", handler)
+
+    for index in range(5):
+        logger.info("registro %d", index)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.shared.memory_manager import MemoryManager
+
+
+@pytest.fixture
+def memory(tmp_path):
+    manager = MemoryManager(tmp_path / "memory")
+    manager.store_conversation(
+        "palermo",
+        [
+            {"role": "user", "content": "¿Cuál es el saldo de la sucursal Palermo?"},
+            {"role": "assistant", "content": "El saldo de Palermo es de 1.2 millones."},
+            {"role": "user", "content": "Gracias"},
+        ],
+        metadata={"channel": "chat"},
+    )
+    manager.store_conversation(
+        "tesoreria",
+        [{"role": "user", "content": "Necesito el informe de tesorería del mes"}],
+    )
+    yield manager
+    manager.close()
+
+
+def test_retrieve_context_reads_only_matching_sessions(memory, monkeypatch):
+    loaded = []
+    original = memory.retrieve_conversation
+
+    def tracking(session_id):
+        loaded.append(session_id)
+        return original(session_id)
+
+    monkeypatch.setattr(memory, "retrieve_conversation", tracking)
+    contexts = memory.retrieve_context("saldo Palermo")
+
+    assert loaded == ["palermo"]
+    assert [context["session_id"] for context in contexts] == ["palermo"]
+    assert contexts[0]["relevance_score"] > 0
+    assert sorted(message["role"] for message in contexts[0]["relevant_messages"]) == ["assistant", "user"]
+    assert len(contexts[0]["matched_content"]) == 2
+
+
+def test_search_ignores_diacritics_and_respects_session_filter(memory):
+    assert [context["session_id"] for context in memory.retrieve_context("tesoreria")] == ["tesoreria"]
+    assert memory.retrieve_context("tesoreria", session_id="palermo") == []
+    assert memory.retrieve_context("de la en") == []
+
+
+def test_short_acronyms_are_searchable(memory):
+    memory.store_conversation("impuestos", [{"role": "user", "content": "Cuanto IVA se retuvo en USD?"}])
+
+    assert [context["session_id"] for context in memory.retrieve_context("IVA")] == ["impuestos"]
+    assert [context["session_id"] for context in memory.retrieve_context("usd")] == ["impuestos"]
+    assert memory.retrieve_context("o si ya") == []
+
+
+def test_restoring_a_session_replaces_its_index_entries(memory):
+    memory.store_conversation("palermo", [{"role": "user", "content": "Consulta sobre préstamos"}])
+
+    assert memory.retrieve_context("saldo") == []
+    assert [context["session_id"] for context in memory.retrieve_context("prestamos")] == ["palermo"]
+    assert memory.get_stats()["total_conversations"] == 2
+
+
+def test_time_window_is_applied_in_the_index(memory):
+    old = (datetime.now() - timedelta(days=90)).isoformat()
+    memory._index_conversation("viejo", [{"role": "user", "content": "saldo histórico"}], old)
+
+    assert [context["session_id"] for context in memory._search_conversation_index("saldo", None, 5, 30)] == ["palermo"]
+    assert {context["session_id"] for context in memory._search_conversation_index("saldo", None, 5, 120)} == {
+        "palermo",
+        "viejo",
+    }
+    assert [conversation["session_id"] for conversation in memory.list_conversations(days_back=30)] == [
+        "tesoreria",
+        "palermo",
+    ]
+    assert memory.get_stats()["period_stats"] == {"last_day": 2, "last_week": 2, "last_month": 2}
+
+
+def test_existing_conversations_are_indexed_on_open(tmp_path):
+    root = tmp_path / "memory"
+    (root / "conversations").mkdir(parents=True)
+    (root / "context").mkdir()
+    stored_at = datetime.now().isoformat()
+    conversation = {
+        "session_id": "previa",
+        "stored_at": stored_at,
+        "message_count": 1,
+        "metadata": {},
+        "messages": [{"role": "user", "content": "arqueo de caja"}],
+    }
+    (root / "conversations" / "conversation_previa.json").write_text(json.dumps(conversation), encoding="utf-8")
+    (root / "context" / "index_previa.json").write_text("{}", encoding="utf-8")
+
+    manager = MemoryManager(root)
+    try:
+        assert [context["session_id"] for context in manager.retrieve_context("arqueo")] == ["previa"]
+        assert manager.list_conversations()[0]["stored_at"] == stored_at
+        assert not list((root / "context").glob("index_*.json"))
+    finally:
+        manager.close()
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.exceptions import ValidationError
+from src.infrastructure.database.postgres_client import (
+    PostgreSQLClient,
+    _render_entity_names,
+    decode_alert_cursor,
+    encode_alert_cursor,
+)
+
+
+@pytest.fixture
+def client() -> PostgreSQLClient:
+    return PostgreSQLClient()
+
+
+def test_unfiltered_query_has_no_optional_predicates(client):
+    query, params = client._historical_alerts_query(limit=50)
+
+    assert "::text IS NULL" not in query
+    assert not any(f"{column} =" in query for column in ("a.estado", "a.prioridad", "a.agente_id"))
+    assert "OFFSET" not in query
+    assert "ORDER BY a.creada_en DESC, a.id DESC" in query
+    assert params == [50]
+
+
+def test_filters_and_cursor_are_bound_in_order(client):
+    created_at = datetime(2025, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+    query, params = client._historical_alerts_query(
+        limit=25,
+        offset=100,
+        status_filter="abierta",
+        agent_id="8a9d4669-e718-4361-998b-a578e557646b",
+        cursor=(created_at, 42),
+    )
+
+    assert "a.estado = $1" in query
+    assert "a.prioridad =" not in query
+    assert "a.agente_id = $2::uuid" in query
+    assert "(a.creada_en, a.id) < ($3, $4)" in query
+    assert "OFFSET" not in query
+    assert params == ["abierta", "8a9d4669-e718-4361-998b-a578e557646b", created_at, 42, 25]
+
+
+def test_offset_is_kept_without_cursor(client):
+    query, params = client._historical_alerts_query(limit=10, offset=30, priority_filter="alta")
+
+    assert "LIMIT $2 OFFSET $3" in query
+    assert params == ["alta", 10, 30]
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 10, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+    cursor = encode_alert_cursor(created_at, 987)
+
+    assert "=" not in cursor
+    assert decode_alert_cursor(cursor) == (created_at, 987)
+
+
+@pytest.mark.parametrize("cursor", ["bogus", "", encode_alert_cursor(datetime.now(timezone.utc), 1)[:-3]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        decode_alert_cursor(cursor)
+
+
+def test_composite_datos_clave_are_rendered_like_str():
+    # Escalares ya vienen como texto desde SQL; objetos y listas llegan decodificados del jsonb
+    row = {"id": "1", "affected_entities": [
+        {"entity_type": "dato_clave", "entity_name": "None", "impact_level": None},
+        {"entity_type": "dato_clave", "entity_name": "True", "impact_level": None},
+        {"entity_type": "dato_clave", "entity_name": {"saldo": 1.5, "ok": None}, "impact_level": None},
+        {"entity_type": "dato_clave", "entity_name": [1, "x"], "impact_level": None},
+    ]}
+
+    shaped = _render_entity_names(row)
+
+    assert [entity["entity_name"] for entity in shaped["affected_entities"]] == [
+        "None", "True", "{'saldo': 1.5, 'ok': None}", "[1, 'x']",
+    ]
+    assert row["affected_entities"][2]["entity_name"] == {"saldo": 1.5, "ok": None}
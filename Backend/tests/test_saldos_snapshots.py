@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import maps_endpoints, saldos_endpoints
+from src.api.main import app
+from src.infrastructure.database import snapshot_cache
+from src.infrastructure.database.snapshot_cache import SnapshotRegistry, TableSnapshot
+
+_SUCURSAL = {
+    "sucursal_id": "SUC-1",
+    "sucursal_numero": 1,
+    "sucursal_nombre": "Sucursal 1",
+    "saldo_total_sucursal": 1500000.0,
+    "caja_teorica_sucursal": 1400000.0,
+    "total_atm": 500000.0,
+    "total_ats": 200000.0,
+    "total_tesoro": 600000.0,
+    "total_cajas_ventanilla": 100000.0,
+    "total_buzon_depositos": 50000.0,
+    "total_recaudacion": 30000.0,
+    "total_caja_chica": 10000.0,
+    "total_otros": 10000.0,
+    "latitud": -34.6,
+    "longitud": -58.4,
+}
+
+
+class StubSaldosClient:
+    def __init__(self) -> None:
+        self.sucursales = [dict(_SUCURSAL)]
+        self.sucursal_reads = 0
+
+    async def get_sucursales(self):
+        self.sucursal_reads += 1
+        return [dict(row) for row in self.sucursales]
+
+    async def update_sucursal(self, sucursal_id, payload):
+        self.sucursales[0].update(payload)
+        return dict(self.sucursales[0])
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "_snapshot_registry", SnapshotRegistry(ttl_seconds=0))
+    client = StubSaldosClient()
+    app.dependency_overrides[saldos_endpoints.get_db_client] = lambda: client
+    app.dependency_overrides[maps_endpoints.get_db_client] = lambda: client
+    yield client
+    app.dependency_overrides.pop(saldos_endpoints.get_db_client, None)
+    app.dependency_overrides.pop(maps_endpoints.get_db_client, None)
+
+
+def test_pollers_get_304_until_a_write_invalidates(stub):
+    http = TestClient(app)
+
+    first = http.get("/api/saldos/sucursales")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.json()[0]["sucursal_id"] == "SUC-1"
+
+    for _ in range(5):
+        polled = http.get("/api/saldos/sucursales", headers={"If-None-Match": etag})
+        assert polled.status_code == 304
+        assert polled.content == b""
+    assert stub.sucursal_reads == 1
+
+    assert http.put("/api/saldos/sucursales/SUC-1", json={"observacion": "arqueo"}).status_code == 200
+
+    changed = http.get("/api/saldos/sucursales", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["observacion"] == "arqueo"
+    assert stub.sucursal_reads == 2
+
+
+def test_maps_and_saldos_share_one_read(stub):
+    http = TestClient(app)
+
+    maps = http.get("/api/maps/sucursales")
+    saldos = http.get("/api/saldos/sucursales")
+
+    assert maps.status_code == saldos.status_code == 200
+    assert maps.json() == [maps_endpoints.SucursalResponse(**_SUCURSAL).model_dump(mode="json")]
+    assert stub.sucursal_reads == 1
+
+
+def test_concurrent_misses_share_one_load():
+    snapshot = TableSnapshot("saldos_sucursal", ttl_seconds=0)
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return [{"n": loads}]
+
+    async def scenario():
+        return await asyncio.gather(*(snapshot.render("v", load, lambda rows: repr(rows).encode()) for _ in range(50)))
+
+    results = asyncio.run(scenario())
+
+    assert loads == 1
+    assert len({result.etag for result in results}) == 1
+
+
+def test_invalidation_during_load_is_not_cached():
+    snapshot = TableSnapshot("saldos_sucursal", ttl_seconds=0)
+
+    async def scenario():
+        async def stale_load():
+            snapshot.invalidate()
+            return [{"version": 1}]
+
+        async def fresh_load():
+            return [{"version": 2}]
+
+        await snapshot.rows(stale_load)
+        return await snapshot.rows(fresh_load)
+
+    assert asyncio.run(scenario()) == [{"version": 2}]
+
+
+def test_ttl_expires_snapshot():
+    now = [0.0]
+    snapshot = TableSnapshot("saldos_sucursal", ttl_seconds=5, clock=lambda: now[0])
+
+    async def load():
+        return [{"at": now[0]}]
+
+    assert asyncio.run(snapshot.rows(load)) == [{"at": 0.0}]
+    now[0] = 4.0
+    assert asyncio.run(snapshot.rows(load)) == [{"at": 0.0}]
+    now[0] = 6.0
+    assert asyncio.run(snapshot.rows(load)) == [{"at": 6.0}]
+
+
+def test_app_shutdown_closes_the_listen_connection(monkeypatch):
+    class FakeListener:
+        closed = False
+
+        def is_closed(self):
+            return self.closed
+
+        async def close(self):
+            self.closed = True
+
+    registry = SnapshotRegistry()
+    listener = FakeListener()
+    registry._listener = listener
+    monkeypatch.setattr(snapshot_cache, "_snapshot_registry", registry)
+
+    with TestClient(app):
+        pass
+
+    assert listener.closed
+    assert registry._listener is None
+
+
+def test_close_cancels_a_pending_subscription():
+    registry = SnapshotRegistry()
+
+    async def scenario():
+        connecting = asyncio.Event()
+
+        async def never_connects(_url):
+            connecting.set()
+            await asyncio.Event().wait()
+
+        registry._listen = never_connects
+        registry.start_listener("postgresql://snapshot.invalid/capi")
+        task = registry._listener_task
+        await connecting.wait()
+        await registry.close()
+        return task
+
+    task = asyncio.run(scenario())
+
+    assert task.cancelled()
+    assert registry._listener_task is None
@@ -0,0 +1,195 @@
+import asyncio
+from datetime import datetime, timezone
+
+from src.application.alerts.alert_engine import Alert, AlertCategory, AlertSeverity
+from src.application.alerts.smart_recommender import (
+    RecommendationCache,
+    SmartRecommender,
+    recommendation_signature,
+)
+from src.application.reasoning.llm_reasoner import LLMReasoningResult
+
+
+class FakeReasoner:
+    def __init__(self, latency: float = 0.01) -> None:
+        self.calls = 0
+        self.latency = latency
+
+    async def reason(self, query, context_data=None, trace_id=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return LLMReasoningResult(success=True, response="Reforzar tesoreria", confidence_score=0.8, total_tokens=42)
+
+
+def _alert(entity: str, condition: str = "low_liquidity") -> Alert:
+    return Alert(
+        id=f"alert_{entity}",
+        title="Liquidez Baja Crítica",
+        description="Liquidez bajo el minimo",
+        severity=AlertSeverity.URGENT,
+        category=AlertCategory.RISK_MANAGEMENT,
+        triggered_by=condition,
+        triggered_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        data_context={},
+        recommendations=["Revisar cash flow"],
+    )
+
+
+def _data(entity: str, liquidity: float = 0.12) -> dict:
+    return {"entity_id": entity, "metrics": {"liquidity_ratio": liquidity, "risk_score": 0.42, "total_volume": 120_000}}
+
+
+def test_signature_ignores_entity_and_buckets_metrics():
+    base = recommendation_signature(_data("SUC-1"), [_alert("SUC-1")])
+
+    assert recommendation_signature(_data("SUC-2", liquidity=0.14), [_alert("SUC-2")]) == base
+    assert recommendation_signature(_data("SUC-3", liquidity=0.31), [_alert("SUC-3")]) != base
+    assert recommendation_signature(_data("SUC-4"), [_alert("SUC-4", condition="high_risk_score")]) != base
+
+
+def test_burst_is_bounded_by_unique_signatures():
+    reasoner = FakeReasoner()
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+    burst = [(_data(f"SUC-{i}"), [_alert(f"SUC-{i}")]) for i in range(30)]
+    burst += [(_data(f"ATM-{i}", liquidity=0.5), [_alert(f"ATM-{i}", "error_rate_high")]) for i in range(30)]
+
+    async def scenario():
+        first = await asyncio.gather(*(recommender.generate_recommendations(data, alerts) for data, alerts in burst))
+        again = await recommender.generate_recommendations(*burst[0])
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert reasoner.calls == 2
+    assert recommender.metrics["llm_coalesced"] == 58
+    assert recommender.metrics["llm_cache_hits"] == 1
+    llm_recs = [rec for recs in first for rec in recs if rec.metadata.get("generation_method") == "llm"]
+    assert len(llm_recs) == 60
+    assert len({rec.id for rec in llm_recs}) == 60
+    assert llm_recs[0].context_data["entity_id"] != llm_recs[1].context_data["entity_id"]
+    assert any(rec.metadata.get("llm_source") == "cache" for rec in again)
+
+
+def test_stream_yields_templates_before_llm_refinement():
+    reasoner = FakeReasoner(latency=0.05)
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+
+    async def scenario():
+        chunks = []
+        async for chunk in recommender.stream_recommendations(_data("SUC-1"), [_alert("SUC-1")]):
+            chunks.append((reasoner.calls, [rec.metadata["generation_method"] for rec in chunk]))
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert chunks[0][0] == 0
+    assert "llm" not in chunks[0][1]
+    assert chunks[1][1] == ["llm"]
+
+
+def test_cache_expires_and_skips_empty_results():
+    now = [0.0]
+    cache = RecommendationCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put("empty", [])
+    cache.put("sig", ["rec"])
+
+    assert cache.get("empty") is None
+    assert cache.get("sig") == ["rec"]
+    now[0] = 11.0
+    assert cache.get("sig") is None
+
+
+def test_failed_llm_call_is_not_cached():
+    class FailingReasoner(FakeReasoner):
+        async def reason(self, query, context_data=None, trace_id=None):
+            self.calls += 1
+            return LLMReasoningResult(success=False, response=None, error="timeout")
+
+    reasoner = FailingReasoner()
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+
+    async def scenario():
+        await recommender.generate_recommendations(_data("SUC-1"), [_alert("SUC-1")])
+        await recommender.generate_recommendations(_data("SUC-2"), [_alert("SUC-2")])
+
+    asyncio.run(scenario())
+
+    assert reasoner.calls == 2
+
+
+def test_signature_tolerates_non_finite_metrics():
+    data = {"entity_id": "SUC-1", "metrics": {"total_volume": float("inf"), "risk_score": float("nan")}}
+
+    assert recommendation_signature(data) != recommendation_signature(_data("SUC-1"))
+    assert recommendation_signature(data) == recommendation_signature({**data, "entity_id": "SUC-2"})
+
+
+def test_cached_text_does_not_leak_the_first_entity():
+    class EchoReasoner(FakeReasoner):
+        async def reason(self, query, context_data=None, trace_id=None):
+            self.calls += 1
+            entity = context_data["financial_data"]["entity_id"]
+            return LLMReasoningResult(success=True, response=f"Reforzar tesoreria de {entity}", confidence_score=0.8)
+
+    reasoner = EchoReasoner()
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+
+    async def scenario():
+        first = await recommender.generate_recommendations(_data("SUC-1"), [_alert("SUC-1")])
+        second = await recommender.generate_recommendations(_data("SUC-22"), [_alert("SUC-22")])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    first_llm = [rec for rec in first if rec.metadata.get("generation_method") == "llm"]
+    second_llm = [rec for rec in second if rec.metadata.get("generation_method") == "llm"]
+
+    assert reasoner.calls == 1
+    assert "SUC-1" in first_llm[0].description
+    assert "SUC-22" in second_llm[0].description
+    assert "SUC-1" not in second_llm[0].description.replace("SUC-22", "")
+
+
+def test_numeric_entity_id_is_not_templated_out_of_quantities():
+    class QuantityReasoner(FakeReasoner):
+        async def reason(self, query, context_data=None, trace_id=None):
+            self.calls += 1
+            entity = context_data["financial_data"]["entity_id"]
+            return LLMReasoningResult(
+                success=True,
+                response=f"Reponer efectivo en los proximos 3 dias en la sucursal {entity}",
+                confidence_score=0.8,
+            )
+
+    reasoner = QuantityReasoner()
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+
+    def data(entity_id: int) -> dict:
+        return {**_data("ignored"), "entity_id": entity_id}
+
+    async def scenario():
+        first = await recommender.generate_recommendations(data(3), [_alert("3")])
+        second = await recommender.generate_recommendations(data(41), [_alert("41")])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    first_llm = [rec for rec in first if rec.metadata.get("generation_method") == "llm"]
+    second_llm = [rec for rec in second if rec.metadata.get("generation_method") == "llm"]
+
+    assert reasoner.calls == 1
+    assert first_llm[0].description == "Reponer efectivo en los proximos 3 dias en la sucursal 3"
+    assert second_llm[0].description == "Reponer efectivo en los proximos 3 dias en la sucursal 41"
+
+
+def test_stream_counts_each_recommendation_once():
+    reasoner = FakeReasoner()
+    recommender = SmartRecommender(llm_reasoner=reasoner)
+
+    async def scenario():
+        return [chunk async for chunk in recommender.stream_recommendations(_data("SUC-1"), [_alert("SUC-1")])]
+
+    chunks = asyncio.run(scenario())
+    delivered = [rec for chunk in chunks for rec in chunk]
+
+    assert recommender.metrics["total_recommendations"] == len(delivered)
+    assert sum(recommender.metrics["recommendations_by_type"].values()) == len(delivered)
+    assert len({rec.title.lower().replace(" ", "") for rec in delivered}) == len(delivered)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.shared import task_scheduler
+from src.shared.task_scheduler import TaskPriority, TaskScheduler
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condición no alcanzada a tiempo")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    instance = TaskScheduler(tmp_path, max_concurrent_tasks=1)
+    instance.start_scheduler()
+    yield instance
+    instance.stop_scheduler()
+
+
+def _status(scheduler: TaskScheduler, task_id: str) -> str:
+    return scheduler.get_task_status(task_id)["status"]
+
+
+def test_ready_tasks_run_by_priority_when_workers_are_busy(scheduler):
+    release = threading.Event()
+    order = []
+    blocker = scheduler.schedule_task("blocker", release.wait)
+    _wait_for(lambda: _status(scheduler, blocker) == "running")
+
+    for name, priority in (("low", TaskPriority.LOW), ("critical", TaskPriority.CRITICAL),
+                           ("normal", TaskPriority.NORMAL)):
+        scheduler.schedule_task(name, order.append, args=(name,), priority=priority)
+    assert scheduler.get_scheduler_stats()["running_tasks"] == 1
+
+    release.set()
+    _wait_for(lambda: len(order) == 3)
+    assert order == ["critical", "normal", "low"]
+
+
+def test_timeout_applies_off_the_main_thread_and_signals_cancellation(scheduler):
+    observed = {}
+
+    def slow(cancel_event):
+        observed["cancelled"] = cancel_event.wait(timeout=2)
+
+    task_id = scheduler.schedule_task("slow", slow, timeout=0.1, max_retries=0)
+    _wait_for(lambda: _status(scheduler, task_id) == "failed")
+
+    status = scheduler.get_task_status(task_id)
+    assert "timeout" in status["error_message"]
+    _wait_for(lambda: "cancelled" in observed)
+    assert observed["cancelled"] is True
+    assert task_id in scheduler.failed_tasks
+
+
+def test_coroutine_tasks_are_cancelled_on_timeout(scheduler):
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    task_id = scheduler.schedule_task("hang", hang, timeout=0.1, max_retries=0)
+    _wait_for(lambda: _status(scheduler, task_id) == "failed")
+    assert cancelled.wait(1)
+
+    done = scheduler.schedule_task("after", lambda: "ok")
+    _wait_for(lambda: _status(scheduler, done) == "completed")
+
+
+def test_future_task_wakes_the_loop_without_polling(scheduler):
+    started = time.monotonic()
+    task_id = scheduler.schedule_task(
+        "later", lambda: "done", scheduled_time=datetime.now() + timedelta(milliseconds=150)
+    )
+    _wait_for(lambda: _status(scheduler, task_id) == "completed")
+
+    assert 0.14 <= time.monotonic() - started < 0.8
+    assert scheduler.get_task_status(task_id)["execution_time"] is not None
+
+
+def test_failed_attempt_is_rescheduled_with_backoff(scheduler):
+    def boom():
+        raise RuntimeError("falla")
+
+    task_id = scheduler.schedule_task("boom", boom, max_retries=2)
+    _wait_for(lambda: scheduler.get_task_status(task_id)["retry_count"] == 1)
+
+    status = scheduler.get_task_status(task_id)
+    assert status["status"] == "pending"
+    assert status["error_message"] == "falla"
+    assert datetime.fromisoformat(status["scheduled_time"]) > datetime.now() + timedelta(seconds=100)
+
+
+def test_cancel_pending_and_expire_finished_tasks(tmp_path):
+    scheduler = TaskScheduler(tmp_path, max_concurrent_tasks=2, completed_retention=timedelta(milliseconds=100))
+    scheduler.start_scheduler()
+    try:
+        later = scheduler.schedule_task("later", lambda: None, scheduled_time=datetime.now() + timedelta(hours=1))
+        done = scheduler.schedule_task("done", lambda: None)
+        assert scheduler.cancel_task(later)
+        assert not scheduler.cancel_task(later)
+
+        _wait_for(lambda: scheduler.get_task_status(done) is None)
+        _wait_for(lambda: scheduler.get_task_status(later) is None)
+        assert scheduler.completed_tasks == set()
+    finally:
+        scheduler.stop_scheduler()
+
+
+def _journal_lines(scheduler: TaskScheduler) -> list:
+    return [json.loads(line) for line in scheduler.journal_file.read_text(encoding="utf-8").splitlines()]
+
+
+def test_persistent_transitions_are_appended_to_one_journal(tmp_path):
+    scheduler = TaskScheduler(tmp_path)
+    scheduler.start_scheduler()
+    try:
+        task_id = scheduler.schedule_task("persistente", lambda: "ok", persist=True, metadata={"origen": "test"})
+        _wait_for(lambda: _status(scheduler, task_id) == "completed")
+    finally:
+        scheduler.stop_scheduler()
+
+    assert [entry["task"]["status"] for entry in _journal_lines(scheduler)] == ["pending", "running", "completed"]
+    assert not list((tmp_path / "tasks").glob("task_*.json"))
+
+    restarted = TaskScheduler(tmp_path)
+    record = restarted.persisted_tasks[task_id]
+    assert record["status"] == "completed"
+    assert record["metadata"] == {"origen": "test"}
+    assert record["execution_time"] is not None
+    assert restarted.get_scheduler_stats()["persisted_tasks"] == 1
+
+
+def test_startup_migrates_legacy_files_and_cancels_orphans(tmp_path):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    legacy = {"task_id": "legacy", "name": "vieja", "priority": 2, "scheduled_time": datetime.now().isoformat(),
+              "max_retries": 3, "timeout": 300, "metadata": {}, "created_at": datetime.now().isoformat(),
+              "persistent": True}
+    (tasks_dir / "task_legacy.json").write_text(json.dumps(legacy), encoding="utf-8")
+    # Última línea cortada por una caída durante la escritura
+    (tasks_dir / "journal.jsonl").write_text('{"op": "upsert", "task": {"task_id": "x"', encoding="utf-8")
+
+    scheduler = TaskScheduler(tmp_path)
+
+    assert not (tasks_dir / "task_legacy.json").exists()
+    assert scheduler.persisted_tasks["legacy"]["status"] == "cancelled"
+    assert scheduler.persisted_tasks["legacy"]["error_message"] == "no ejecutable tras reinicio"
+    assert [entry["task"]["task_id"] for entry in _journal_lines(scheduler)] == ["legacy"]
+
+
+def test_journal_is_compacted_and_expired_tasks_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_scheduler, "JOURNAL_COMPACT_MIN_RECORDS", 4)
+    scheduler = TaskScheduler(tmp_path, completed_retention=timedelta(milliseconds=50))
+    later = datetime.now() + timedelta(hours=1)
+    task_ids = [scheduler.schedule_task(f"t{index}", lambda: None, scheduled_time=later, persist=True)
+                for index in range(10)]
+    for task_id in task_ids[:8]:
+        assert scheduler.cancel_task(task_id)
+    time.sleep(0.1)
+    with scheduler.lock:
+        scheduler._cleanup_completed_tasks(datetime.now())
+        scheduler._close_journal()
+
+    assert set(scheduler.persisted_tasks) == set(task_ids[8:])
+    assert len(_journal_lines(scheduler)) <= max(4, 2 * len(scheduler.persisted_tasks)) + 1
+    assert set(TaskScheduler(tmp_path).persisted_tasks) == set(task_ids[8:])
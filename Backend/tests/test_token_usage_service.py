@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from src.application.services import token_usage_service
 from src.application.services.token_usage_service import TokenUsageService
 
 
@@ -58,3 +60,95 @@ def test_token_usage_service_timeline(tmp_path: Path) -> None:
     assert day2["agents"]["capi_gus"]["tokens"] == 50
     assert day2["agents"]["branch"]["tokens"] == 40
     assert day2["total_cost_usd"] == 0.07
+
+
+def test_accounting_is_exact_across_restarts_without_checkpoint(tmp_path: Path, monkeypatch) -> None:
+    token_file = tmp_path / "token_tracking.json"
+    service = TokenUsageService(token_file=token_file)
+    for index in range(250):
+        service.record_usage("capi_gus", tokens_used=10, cost_usd=0.001, prompt_tokens=6, completion_tokens=4,
+                             usage_timestamp=_iso(-(index % 2)))
+    service.record_usage("branch", tokens_used=7, cost_usd=0.003, model="gpt-4o")
+    before = service.get_summary(days=2)
+
+    # Caída sin checkpoint: el nuevo ledger reproduce el log desde el último checkpoint
+    monkeypatch.setattr(token_usage_service, "_ledgers", {})
+    restarted = TokenUsageService(token_file=token_file)
+    after = restarted.get_summary(days=2)
+
+    assert after["agents"] == before["agents"]
+    assert after["cost_timeline"] == before["cost_timeline"]
+    assert after["total_tokens"] == 2507
+    # Los días se agregan sobre todos los consumos, no solo sobre el historial recortado
+    assert sum(point["agents"]["capi_gus"]["tokens"] for point in after["cost_timeline"]) == 2500
+    assert len(after["agents"]["capi_gus"]["history"]) == token_usage_service.HISTORY_LIMIT
+    assert after["agents"]["branch"]["last_model"] == "gpt-4o"
+    restarted.close()
+
+
+def test_instances_share_aggregates_and_checkpoint_on_close(tmp_path: Path) -> None:
+    token_file = tmp_path / "token_tracking.json"
+    first = TokenUsageService(token_file=token_file)
+    second = TokenUsageService(token_file=token_file)
+    first.record_usage("capi_gus", tokens_used=30, cost_usd=0.01)
+    second.ensure_agents(["capi_datab"])
+
+    assert second.get_summary()["total_tokens"] == 30
+    # Cerrar una instancia no cierra el ledger que otra sigue usando
+    first.close()
+    second.record_usage("capi_gus", tokens_used=5, cost_usd=0.0)
+    second.close()
+    assert token_file.resolve() not in token_usage_service._ledgers
+
+    reopened = TokenUsageService(token_file=token_file)
+    assert set(reopened.load_data()["agents"]) == {"capi_gus", "capi_datab"}
+    assert reopened.get_summary()["agents"]["capi_gus"]["total_tokens"] == 35
+    assert reopened.get_summary()["agents"]["capi_gus"]["cost_usd"] == 0.01
+    reopened.close()
+
+
+def test_legacy_json_is_migrated_once(tmp_path: Path) -> None:
+    token_file = tmp_path / "token_tracking.json"
+    legacy = {
+        "agents": {
+            "capi_gus": {
+                "total_tokens": 5000,
+                "prompt_tokens_total": 3000,
+                "completion_tokens_total": 2000,
+                "cost_usd": 1.5,
+                "last_seen": _iso(-1),
+                "history": [{"timestamp": _iso(-1), "tokens": 100, "prompt_tokens": 60, "completion_tokens": 40,
+                             "cost_usd": 0.02, "model": "gpt-4o", "provider": "openai"}],
+            }
+        },
+        "last_updated": _iso(-1),
+    }
+    token_file.write_text(json.dumps(legacy), encoding="utf-8")
+
+    service = TokenUsageService(token_file=token_file)
+    summary = service.get_summary(days=3)
+    service.record_usage("capi_gus", tokens_used=10, cost_usd=0.01)
+    service.close()
+
+    assert summary["agents"]["capi_gus"]["total_tokens"] == 5000
+    assert summary["cost_timeline"][0]["total_tokens"] == 100
+    reopened = TokenUsageService(token_file=token_file)
+    assert reopened.get_summary()["total_tokens"] == 5010
+    assert len(reopened.load_data()["agents"]["capi_gus"]["history"]) == 2
+    reopened.close()
+
+
+def test_unreadable_legacy_json_does_not_skip_replay(tmp_path: Path, monkeypatch) -> None:
+    token_file = tmp_path / "token_tracking.json"
+    token_file.write_text("{corrupto", encoding="utf-8")
+    service = TokenUsageService(token_file=token_file)
+    for _ in range(3):
+        service.record_usage("capi_gus", tokens_used=10, cost_usd=0.001)
+
+    # Caída antes del primer checkpoint: los consumos del log se reproducen desde el inicio
+    monkeypatch.setattr(token_usage_service, "_ledgers", {})
+    restarted = TokenUsageService(token_file=token_file)
+
+    assert restarted.get_summary()["total_tokens"] == 30
+    assert len(restarted.load_data()["agents"]["capi_gus"]["history"]) == 3
+    restarted.close()